@@ -2,12 +2,14 @@ import json
 import logging
 import operator
 import re
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
 from re import Pattern
 from typing import TYPE_CHECKING, Any, Protocol
 
 from dewey.core.base_script import BaseScript
+from dewey.core.bookkeeping.pattern_classifier import PatternClassifier
 from dewey.llm import llm_utils
 
 if TYPE_CHECKING:
@@ -81,6 +83,9 @@ class ClassificationEngine(BaseScript):
         self.llm: LLM = llm
         self.rules: dict = self._load_rules()
         self.compiled_patterns: dict[str, Pattern] = self._compile_patterns()
+        self.classifier: PatternClassifier[str] = PatternClassifier(
+            self.rules["patterns"].items(),
+        )
         self._valid_categories: list[str] = self.rules["categories"]
         self.RULE_SOURCES = [
             ("overrides.json", 0),  # Highest priority
@@ -296,12 +301,14 @@ class ClassificationEngine(BaseScript):
             A tuple containing the income account, expense account, and absolute amount.
 
         """
-        for pattern, compiled in self.compiled_patterns.items():
-            if compiled.search(description):
-                account: str = self.rules["patterns"][pattern]
-                if amount < 0:
-                    return (account, self.rules["defaults"]["negative"], abs(amount))
-                return (self.rules["defaults"]["positive"], account, amount)
+        return self._entry(self.classifier.classify(description), amount)
+
+    def _entry(self, account: str | None, amount: float) -> tuple[str, str, float]:
+        """Accounts and amount for a rule match, or the defaults without one."""
+        if account is not None:
+            if amount < 0:
+                return (account, self.rules["defaults"]["negative"], abs(amount))
+            return (self.rules["defaults"]["positive"], account, amount)
 
         if amount < 0:
             return (
@@ -315,6 +322,33 @@ class ClassificationEngine(BaseScript):
             amount,
         )
 
+    def classify_many(
+        self, transactions: Iterable[tuple[str, float]],
+    ) -> list[tuple[str, str, float]]:
+        """
+        Classify a batch of (description, amount) pairs.
+
+        Each distinct description is matched against the rules once.
+
+        Args:
+        ----
+            transactions: Descriptions and amounts to classify.
+
+        Returns:
+        -------
+            One (income account, expense account, absolute amount) tuple
+            per transaction, as returned by classify.
+
+        """
+        transactions = list(transactions)
+        accounts = self.classifier.classify_many(
+            description for description, _ in transactions
+        )
+        return [
+            self._entry(account, amount)
+            for account, (_, amount) in zip(accounts, transactions, strict=True)
+        ]
+
     def process_feedback(self, feedback: str, journal_writer: "JournalWriter") -> None:
         """
         Process user feedback to improve classification rules.
@@ -3,6 +3,9 @@ import hashlib
 import os
 from typing import Protocol, runtime_checkable
 
+from dewey.core.base_script import BaseScript
+from dewey.core.bookkeeping.fingerprint_index import FingerprintIndex
+
 
 @runtime_checkable
 class FileSystemInterface(Protocol):
@@ -29,9 +32,6 @@ class RealFileSystem:
         return open(path, mode)
 
 
-from dewey.core.base_script import BaseScript
-
-
 def calculate_file_hash(file_content: bytes) -> str:
     """Calculates the SHA256 hash of a file's content."""
     return hashlib.sha256(file_content).hexdigest()
@@ -44,6 +44,7 @@ class DuplicateChecker(BaseScript):
         self,
         file_system: FileSystemInterface = RealFileSystem(),
         ledger_dir: str | None = None,
+        fingerprints: FingerprintIndex | None = None,
     ) -> None:
         """Initializes the DuplicateChecker with the 'bookkeeping' config section."""
         super().__init__(config_section="bookkeeping")
@@ -53,6 +54,7 @@ class DuplicateChecker(BaseScript):
             if ledger_dir is not None
             else self.get_config_value("ledger_dir", "data/bookkeeping/ledger")
         )
+        self.fingerprints = fingerprints
 
     def find_ledger_files(self) -> dict[str, list[str]]:
         """
@@ -99,12 +101,38 @@ class DuplicateChecker(BaseScript):
         self.logger.info("No duplicate ledger files found.")
         return False
 
+    def find_duplicate_transactions(self) -> list[list[str]]:
+        """
+        Finds transactions that appear more than once across the ledger.
+
+        Uses the persistent fingerprint index of the ledger directory, so
+        only journal files changed since the last check are read.
+
+        Returns
+        -------
+            Groups of "path:line" locations of transactions with the same
+            date, amount, payee and account.
+
+        """
+        if self.fingerprints is None:
+            self.fingerprints = FingerprintIndex.for_ledger(
+                self.ledger_dir, self.get_config_value("fingerprint_index"),
+            )
+        else:
+            self.fingerprints.refresh_directory(self.ledger_dir)
+        groups = self.fingerprints.duplicate_groups()
+        for group in groups:
+            self.logger.warning(f"Possible duplicate transactions: {', '.join(group)}")
+        return groups
+
     def execute(self) -> None:
         """Runs the duplicate check and logs the result."""
         if self.check_duplicates():
             self.logger.error("Duplicate ledger files found.")
         else:
             self.logger.info("No duplicate ledger files found.")
+        if self.get_config_value("check_transactions", False):
+            self.find_duplicate_transactions()
 
 
 def main():
@@ -0,0 +1,406 @@
+"""
+Persistent per-transaction fingerprint index for bookkeeping imports.
+
+Every posting in the ledger is fingerprinted on its normalized (date,
+amount, payee, account), so a bank row and the journal transaction it was
+imported as share a fingerprint whatever category the other side was given.
+Fingerprints live in a SQLite file together with the mtime and size of the
+journal file they came from; a refresh only rescans files whose mtime or
+size changed, and a duplicate check is one indexed lookup per transaction
+instead of rereading and rehashing the books on every run.
+
+Identical fingerprints are counted, not just recorded: two $4.50 coffees on
+the same day are both kept when the ledger holds one of them and an import
+brings two.
+"""
+
+import fnmatch
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+from collections import Counter
+from collections.abc import Callable, Iterable
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from dewey.core.bookkeeping.journal_engine import JournalError, JournalParser
+
+logger = logging.getLogger(__name__)
+
+INDEX_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS ledger_files (
+        path TEXT PRIMARY KEY,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fingerprints (
+        fingerprint TEXT NOT NULL,
+        path TEXT NOT NULL,
+        location TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_fingerprints_fingerprint ON fingerprints (fingerprint)",
+    "CREATE INDEX IF NOT EXISTS idx_fingerprints_path ON fingerprints (path)",
+)
+
+# Versioned backups written by JournalWriter, e.g. 8542_2024_20240301120000.journal
+BACKUP_PATTERN = "*_" + "[0-9]" * 14 + ".journal"
+
+_HEADER_RE = re.compile(r"^[*!]?\s*(?:\([^)]*\)\s*)?(?P<description>.*)$")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_payee(description: str) -> str:
+    """
+    Reduce a description to its payee for matching.
+
+    The payee is the text before an hledger "payee | note" separator,
+    case-folded, with punctuation dropped and whitespace collapsed.
+
+    Args:
+    ----
+        description: Transaction description or bank memo.
+
+    Returns:
+    -------
+        The normalized payee.
+
+    """
+    payee = description.split("|", 1)[0].casefold()
+    return " ".join(_PUNCTUATION_RE.sub(" ", payee).split())
+
+
+def transaction_fingerprint(
+    when: date | str, amount: Decimal | float | str, payee: str, account: str,
+) -> str:
+    """
+    Fingerprint of one side of a transaction.
+
+    Amounts compare by value, so 5, "5.00" and 5.0 agree; the commodity is
+    not part of the key since bank exports do not carry it.
+
+    Args:
+    ----
+        when: Transaction date, as a date or ISO string.
+        amount: Signed amount posted to the account.
+        payee: Description or payee; normalized with normalize_payee.
+        account: Ledger account the amount is posted to.
+
+    Returns:
+    -------
+        A 32 character hex digest.
+
+    """
+    if isinstance(when, str):
+        when = date.fromisoformat(when.strip())
+    value = Decimal(str(amount)).normalize()
+    number = "0" if value == 0 else format(value, "f")
+    key = "|".join(
+        (when.isoformat(), number, normalize_payee(payee), account.strip().casefold()),
+    )
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def journal_fingerprints(text: str, source: str = "<text>") -> list[tuple[str, str]]:
+    """
+    Fingerprints of every posting in journal text.
+
+    Include directives are not followed, since included files are indexed on
+    their own. A single posting with an elided amount gets the balancing
+    amount; balance assignments, whose amount depends on earlier files, are
+    left out.
+
+    Args:
+    ----
+        text: hledger journal text.
+        source: File name used in the returned locations.
+
+    Returns:
+    -------
+        (fingerprint, "source:line") pairs, one per posting with an amount.
+
+    Raises:
+    ------
+        JournalError: If the journal cannot be parsed.
+
+    """
+    parser = JournalParser(includes=False)
+    parser.parse_text(text, source)
+    fingerprints = []
+    for transaction in parser.transactions:
+        payee = _HEADER_RE.match(transaction.description)["description"]
+        amounts = []
+        elided = []
+        assigned = False
+        commodities = set()
+        total = Decimal(0)
+        for posting in transaction.postings:
+            if posting.amount is not None:
+                amounts.append((posting.account, posting.amount[1]))
+                if not posting.virtual:
+                    commodity, value = posting.cost or posting.amount
+                    commodities.add(commodity)
+                    total += value
+            elif posting.assertion is not None:
+                assigned = True
+            elif not posting.virtual:
+                elided.append(posting.account)
+        if len(elided) == 1 and len(commodities) <= 1 and not assigned:
+            amounts.append((elided[0], -total))
+        fingerprints.extend(
+            (
+                transaction_fingerprint(transaction.date, value, payee, account),
+                transaction.location,
+            )
+            for account, value in amounts
+        )
+    return fingerprints
+
+
+def _scan_journal(path: str) -> list[tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return journal_fingerprints(f.read(), path)
+
+
+class FingerprintIndex:
+    """
+    Transaction fingerprints of a set of journal files, kept in SQLite.
+
+    Example:
+    -------
+        >>> index = FingerprintIndex.for_ledger("data/bookkeeping/journals")
+        >>> fp = transaction_fingerprint(
+        ...     "2024-03-01", -4.5, "Blue Bottle", "assets:checking:mercury8542",
+        ... )
+        >>> index.unseen([[fp]])
+        [True]
+
+    """
+
+    def __init__(
+        self,
+        path: str | Path = ":memory:",
+        scan: Callable[[str], Iterable[tuple[str, str]]] = _scan_journal,
+    ) -> None:
+        """
+        Open or create the index.
+
+        Args:
+        ----
+            path: SQLite file holding the index; ":memory:" keeps it in memory.
+            scan: Returns the (fingerprint, location) pairs of a file.
+
+        """
+        self.path = str(path)
+        self.scan = scan
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in INDEX_SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    @classmethod
+    def for_ledger(
+        cls,
+        directory: str | Path,
+        path: str | Path | None = None,
+        exclude: str | None = BACKUP_PATTERN,
+    ) -> "FingerprintIndex":
+        """
+        Open the index of a journal directory and bring it up to date.
+
+        Args:
+        ----
+            directory: Directory searched recursively for *.journal files.
+            path: SQLite file; defaults to .fingerprints.sqlite in the directory.
+            exclude: Pattern of file names to leave out; defaults to the
+                versioned backups, which would count every transaction again.
+
+        Returns:
+        -------
+            The refreshed index.
+
+        """
+        index = cls(path or Path(directory) / ".fingerprints.sqlite")
+        index.refresh_directory(directory, exclude=exclude)
+        return index
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "FingerprintIndex":
+        """Use the index as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the index."""
+        self.close()
+
+    def refresh(self, paths: Iterable[str | Path]) -> list[str]:
+        """
+        Rescan the files whose mtime or size changed since they were indexed.
+
+        Missing files are forgotten. Files that fail to parse are logged and
+        keep their previous fingerprints, so they are retried next time.
+
+        Args:
+        ----
+            paths: Journal files to bring up to date.
+
+        Returns:
+        -------
+            The files that were rescanned.
+
+        """
+        rescanned = []
+        for path in map(str, paths):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self.forget([path])
+                continue
+            known = self._conn.execute(
+                "SELECT mtime_ns, size FROM ledger_files WHERE path = ?", (path,),
+            ).fetchone()
+            if known == (stat.st_mtime_ns, stat.st_size):
+                continue
+            try:
+                rows = [(fp, path, location) for fp, location in self.scan(path)]
+            except (OSError, UnicodeDecodeError, JournalError) as e:
+                logger.warning(f"Could not index {path}: {e}")
+                continue
+            with self._conn:
+                self._conn.execute("DELETE FROM fingerprints WHERE path = ?", (path,))
+                self._conn.executemany(
+                    "INSERT INTO fingerprints (fingerprint, path, location) VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO ledger_files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                    (path, stat.st_mtime_ns, stat.st_size),
+                )
+            rescanned.append(path)
+        if rescanned:
+            logger.info(f"Indexed {len(rescanned)} changed journal files")
+        return rescanned
+
+    def refresh_directory(
+        self,
+        directory: str | Path,
+        pattern: str = "*.journal",
+        exclude: str | None = BACKUP_PATTERN,
+    ) -> list[str]:
+        """
+        Refresh every matching file under a directory and drop the others.
+
+        Args:
+        ----
+            directory: Directory searched recursively.
+            pattern: File name pattern of journal files.
+            exclude: Pattern of file names to leave out; defaults to the
+                versioned backups.
+
+        Returns:
+        -------
+            The files that were rescanned.
+
+        """
+        directory = str(directory)
+        found = set()
+        for root, _dirnames, filenames in os.walk(directory):
+            found.update(
+                os.path.join(root, name)
+                for name in fnmatch.filter(filenames, pattern)
+                if exclude is None or not fnmatch.fnmatch(name, exclude)
+            )
+        prefix = os.path.join(directory, "")
+        gone = [
+            path
+            for (path,) in self._conn.execute("SELECT path FROM ledger_files")
+            if path.startswith(prefix) and path not in found
+        ]
+        self.forget(gone)
+        return self.refresh(sorted(found))
+
+    def forget(self, paths: Iterable[str | Path]) -> None:
+        """Remove files and their fingerprints from the index."""
+        rows = [(str(path),) for path in paths]
+        with self._conn:
+            self._conn.executemany("DELETE FROM fingerprints WHERE path = ?", rows)
+            self._conn.executemany("DELETE FROM ledger_files WHERE path = ?", rows)
+
+    def count(self, fingerprint: str) -> int:
+        """Number of indexed postings with the fingerprint."""
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM fingerprints WHERE fingerprint = ?", (fingerprint,),
+        ).fetchone()[0]
+
+    def __contains__(self, fingerprint: str) -> bool:
+        """Whether any indexed posting has the fingerprint."""
+        return (
+            self._conn.execute(
+                "SELECT 1 FROM fingerprints WHERE fingerprint = ? LIMIT 1", (fingerprint,),
+            ).fetchone()
+            is not None
+        )
+
+    def __len__(self) -> int:
+        """Number of indexed postings."""
+        return self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def unseen(self, transactions: Iterable[Iterable[str]]) -> list[bool]:
+        """
+        Which transactions of an import batch are not in the ledger yet.
+
+        A transaction is a duplicate if any of its fingerprints is already
+        indexed more often than it occurred earlier in the batch, so
+        repeated identical transactions are matched one to one.
+
+        Args:
+        ----
+            transactions: The fingerprints of each transaction, in order.
+
+        Returns:
+        -------
+            One flag per transaction, True for new ones.
+
+        """
+        occurrences: Counter[str] = Counter()
+        flags = []
+        for fingerprints in transactions:
+            fingerprints = list(fingerprints)
+            flags.append(
+                all(self.count(fp) <= occurrences[fp] for fp in fingerprints),
+            )
+            occurrences.update(fingerprints)
+        return flags
+
+    def duplicate_groups(self) -> list[list[str]]:
+        """
+        Locations of transactions that share a fingerprint.
+
+        Returns
+        -------
+            Sorted groups of "path:line" locations, one group per set of
+            transactions that look like the same bank transaction.
+
+        """
+        groups = set()
+        for (locations,) in self._conn.execute(
+            "SELECT group_concat(location, char(31)) FROM fingerprints "
+            "GROUP BY fingerprint HAVING COUNT(*) > 1",
+        ):
+            group = tuple(sorted(set(locations.split("\x1f"))))
+            if len(group) > 1:
+                groups.add(group)
+        return [list(group) for group in sorted(groups)]
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Any, Protocol
 
 from dewey.core.base_script import BaseScript
+from dewey.core.bookkeeping.journal_engine import JournalEngine
 
 
 class SubprocessRunnerInterface(Protocol):
@@ -43,18 +44,45 @@ class HledgerUpdater(BaseScript, HledgerUpdaterInterface):
     """
     Updates opening balances in hledger journal files.
 
+    Balances come from an in-process JournalEngine that parses all.journal
+    once, unless a subprocess runner is injected, in which case the hledger
+    CLI is asked instead.
+
     Inherits from BaseScript for standardized configuration and logging.
     """
 
+    journal_file = "all.journal"
+
     def __init__(
         self,
         subprocess_runner: SubprocessRunnerInterface | None = None,
         fs: FileSystemInterface | None = None,
+        engine: JournalEngine | None = None,
     ) -> None:
-        """Initializes the HledgerUpdater with the 'bookkeeping' config section."""
+        """
+        Initializes the HledgerUpdater with the 'bookkeeping' config section.
+
+        Args:
+        ----
+            subprocess_runner: Runs hledger; when given, balances come from
+                the hledger CLI instead of the journal engine.
+            fs: File system used to read and write journals.
+            engine: A preloaded journal engine; loaded from all.journal on
+                first use otherwise.
+
+        """
         super().__init__(config_section="bookkeeping")
+        self._use_hledger = subprocess_runner is not None
         self._subprocess_runner = subprocess_runner or subprocess.run
         self._fs = fs or PathFileSystem()
+        self._engine = engine
+
+    @property
+    def engine(self) -> JournalEngine:
+        """The journal engine, parsing all.journal if it is not loaded."""
+        if self._engine is None:
+            self._engine = JournalEngine.from_file(self.journal_file, self._fs.open)
+        return self._engine
 
     def get_balance(self, account: str, date: str) -> str | None:
         """
@@ -70,9 +98,11 @@ class HledgerUpdater(BaseScript, HledgerUpdaterInterface):
             The balance amount as a string, or None if an error occurred.
 
         """
+        if not self._use_hledger:
+            return self._engine_balance(account, date)
         try:
             self.logger.debug("🔍 Checking balance | account=%s date=%s", account, date)
-            cmd = f"hledger -f all.journal bal {account} -e {date} --depth 1"
+            cmd = f"hledger -f {self.journal_file} bal {account} -e {date} --depth 1"
             result = self._subprocess_runner(
                 cmd.split(), capture_output=True, text=True, check=False,
             )
@@ -106,6 +136,41 @@ class HledgerUpdater(BaseScript, HledgerUpdaterInterface):
             )
             return None
 
+    def _engine_balance(self, account: str, date: str) -> str | None:
+        """
+        Get a dollar balance from the journal engine.
+
+        Mirrors `hledger bal ACCOUNT -e DATE`: the account is a regex, the end
+        date is exclusive, and a zero balance gives None since hledger prints
+        it without a commodity.
+
+        Args:
+        ----
+            account: The account to check.
+            date: The exclusive end date.
+
+        Returns:
+        -------
+            The balance formatted like hledger, e.g. "$10,000.00", or None.
+
+        """
+        try:
+            value = self.engine.balance(account, end=date).get("$")
+            self.logger.debug(
+                "📊 Balance result | account=%s date=%s value=%s", account, date, value,
+            )
+            if value is None:
+                return None
+            return self.engine.format_amount("$", value)
+        except Exception as e:
+            self.logger.error(
+                "❌ Error getting balance | account=%s error=%s",
+                account,
+                str(e),
+                exc_info=True,
+            )
+            return None
+
     def _read_journal_file(self, journal_file: str) -> str:
         """
         Reads the content of the journal file.
@@ -135,6 +200,8 @@ class HledgerUpdater(BaseScript, HledgerUpdaterInterface):
         """
         with self._fs.open(journal_file, "w") as f:
             f.write(content)
+        # Later years' balances depend on this file's assignments
+        self._engine = None
 
     def update_opening_balances(self, year: int) -> None:
         """
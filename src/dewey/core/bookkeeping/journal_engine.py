@@ -0,0 +1,558 @@
+"""
+In-process hledger journal engine.
+
+Parses .journal files once into a columnar posting store (dates, account
+ids, commodity ids and scaled integer amounts as numpy arrays) and answers
+balance queries with prefix sums, instead of starting an hledger process
+that reparses the whole journal for every account and date.
+
+The parser covers the journal features our ledgers use: transactions with
+elided amounts, balance assertions (=, ==, =*, ==*) and balance
+assignments, @/@@ costs, virtual postings, include, alias and Y
+directives, and comment blocks. Amounts use "." as the decimal mark and ","
+as the thousands separator. Periodic (~) and auto-posting (=) rules are
+skipped, as hledger does without --forecast and --auto.
+"""
+
+import glob
+import logging
+import os
+import re
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DATE_RE = re.compile(r"^(?:(\d{4})[-/.])?(\d{1,2})[-/.](\d{1,2})(?:=\S+)?(?=\s|$)")
+_AMOUNT_RE = re.compile(
+    r"""^(?P<sign>[-+]?)\s*
+    (?:(?P<lsym>"[^"]+"|[^\d\s.,+\-"]+)(?P<lspace>\s*))?
+    (?P<sign2>[-+]?)
+    (?P<num>\d[\d,]*(?:\.\d*)?|\.\d+)
+    (?:(?P<rspace>\s*)(?P<rsym>"[^"]+"|[^\d\s.,+\-"]+))?$""",
+    re.VERBOSE,
+)
+_ASSERTION_RE = re.compile(r"==?\*?")
+_ACCOUNT_SPLIT_RE = re.compile(r"\s{2,}|\t")
+_GLOB_CHARS = re.compile(r"[*?\[]")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class JournalError(Exception):
+    """Raised for malformed journals and failed balance assertions."""
+
+
+@dataclass
+class CommodityStyle:
+    """How hledger displays a commodity, inferred from the journal."""
+
+    symbol: str
+    left: bool = True
+    spaced: bool = False
+    thousands: bool = False
+    precision: int = 0
+
+    def format(self, value: Decimal) -> str:
+        """Render an amount like hledger, e.g. "$-1,234.50"."""
+        number = f"{abs(value):,.{self.precision}f}"
+        if not self.thousands:
+            number = number.replace(",", "")
+        if value < 0:
+            number = f"-{number}"
+        space = " " if self.spaced else ""
+        if self.left:
+            return f"{self.symbol}{space}{number}"
+        return f"{number}{space}{self.symbol}"
+
+
+@dataclass
+class _Posting:
+    account: str
+    amount: tuple[str, Decimal] | None
+    cost: tuple[str, Decimal] | None = None
+    assertion: tuple[str, Decimal] | None = None
+    assertion_kind: str = "="
+    virtual: str = ""
+
+
+@dataclass
+class _Transaction:
+    date: date
+    location: str
+    description: str = ""
+    postings: list[_Posting] = field(default_factory=list)
+
+
+class JournalParser:
+    """Reads journal text, following include directives."""
+
+    def __init__(self, opener: Callable = open, includes: bool = True) -> None:
+        """
+        Initialize the parser.
+
+        Args:
+        ----
+            opener: Function used to open journal files, like builtin open.
+            includes: Whether include directives are followed.
+
+        """
+        self.opener = opener
+        self.includes = includes
+        self.transactions: list[_Transaction] = []
+        self.styles: dict[str, CommodityStyle] = {}
+        self.aliases: list[tuple[str, str]] = []
+        self.year: int | None = None
+        self._stack: list[str] = []
+
+    def parse_file(self, path: str) -> None:
+        """Parse a journal file and everything it includes."""
+        path = os.path.abspath(os.path.expanduser(path))
+        if path in self._stack:
+            raise JournalError(f"Include cycle at {path}")
+        self._stack.append(path)
+        try:
+            with self.opener(path) as f:
+                self.parse_text(f.read(), path)
+        finally:
+            self._stack.pop()
+
+    def parse_text(self, text: str, source: str = "<text>") -> None:
+        """Parse journal text; includes resolve relative to the source."""
+        current: _Transaction | None = None
+        skipping = False  # Inside a periodic/auto rule or a directive block
+        in_comment = False
+        for lineno, raw in enumerate(text.splitlines(), 1):
+            line = raw.rstrip()
+            if in_comment:
+                in_comment = line.strip() != "end comment"
+                continue
+            if not line.strip():
+                current, skipping = None, False
+                continue
+            if line[0] in " \t":
+                if current is not None:
+                    posting = self._parse_posting(line, source, lineno)
+                    if posting is not None:
+                        current.postings.append(posting)
+                elif not skipping and not line.lstrip().startswith((";", "#")):
+                    raise JournalError(f"{source}:{lineno}: unexpected indented line")
+                continue
+
+            current, skipping = None, False
+            first = line[0]
+            if first in ";#*%|":
+                continue
+            if first.isdigit():
+                current = self._parse_header(line, source, lineno)
+                self.transactions.append(current)
+                continue
+            if first in "~=":
+                skipping = True
+                continue
+            self._parse_directive(line, source, lineno)
+            if line.split(None, 1)[0] == "comment":
+                in_comment = True
+            else:
+                skipping = True
+
+    def _parse_header(self, line: str, source: str, lineno: int) -> _Transaction:
+        match = _DATE_RE.match(line)
+        if not match:
+            raise JournalError(f"{source}:{lineno}: bad transaction date")
+        year, month, day = match.groups()
+        if year is None:
+            if self.year is None:
+                raise JournalError(f"{source}:{lineno}: date without a year")
+            year = self.year
+        try:
+            when = date(int(year), int(month), int(day))
+        except ValueError as e:
+            raise JournalError(f"{source}:{lineno}: {e}") from e
+        description = line[match.end() :].split(";", 1)[0].strip()
+        return _Transaction(when, f"{source}:{lineno}", description)
+
+    def _parse_directive(self, line: str, source: str, lineno: int) -> None:
+        keyword, _, rest = line.partition(" ")
+        rest = rest.split(";", 1)[0].strip()
+        if keyword == "include" and self.includes:
+            pattern = os.path.join(os.path.dirname(source), os.path.expanduser(rest))
+            paths = sorted(glob.glob(pattern)) if _GLOB_CHARS.search(rest) else [pattern]
+            for path in paths:
+                self.parse_file(path)
+        elif keyword in ("Y", "year") or (keyword == "apply" and rest.startswith("year")):
+            self.year = int(rest.removeprefix("year").strip())
+        elif keyword == "alias":
+            old, _, new = rest.partition("=")
+            self.aliases.append((old.strip(), new.strip()))
+        elif keyword == "end" and rest == "aliases":
+            self.aliases.clear()
+
+    def _parse_posting(self, line: str, source: str, lineno: int) -> _Posting | None:
+        text = line.split(";", 1)[0].strip()
+        if not text:
+            return None
+        if text[0] in "*!":
+            text = text[1:].lstrip()
+        parts = _ACCOUNT_SPLIT_RE.split(text, maxsplit=1)
+        account = parts[0].strip()
+        virtual = ""
+        if account[:1] in "([" and account[-1:] in ")]":
+            virtual, account = account[0], account[1:-1]
+        account = self._alias(account)
+        posting = _Posting(account, None, virtual=virtual)
+        if len(parts) == 1:
+            return posting
+
+        where = f"{source}:{lineno}"
+        amount_text = parts[1].strip()
+        assertion = _ASSERTION_RE.search(amount_text)
+        if assertion:
+            posting.assertion_kind = assertion.group(0)
+            posting.assertion = self._parse_amount(amount_text[assertion.end() :], where)
+            amount_text = amount_text[: assertion.start()].strip()
+        if "@" in amount_text:
+            amount_text, total, cost_text = re.split(r"(@@?)", amount_text, maxsplit=1)
+            amount_text = amount_text.strip()
+            posting.amount = self._parse_amount(amount_text, where)
+            cost = self._parse_amount(cost_text, where)
+            if total == "@":
+                cost = (cost[0], cost[1] * posting.amount[1])
+            elif posting.amount[1] < 0:
+                cost = (cost[0], -cost[1])
+            posting.cost = cost
+        elif amount_text:
+            posting.amount = self._parse_amount(amount_text, where)
+        return posting
+
+    def _alias(self, account: str) -> str:
+        for old, new in self.aliases:
+            if account == old or account.startswith(f"{old}:"):
+                account = new + account[len(old) :]
+        return account
+
+    def _parse_amount(self, text: str, where: str) -> tuple[str, Decimal]:
+        match = _AMOUNT_RE.match(text.strip())
+        if not match:
+            raise JournalError(f"{where}: cannot parse amount {text.strip()!r}")
+        symbol = (match["lsym"] or match["rsym"] or "").strip('"')
+        number = match["num"]
+        value = Decimal(number.replace(",", ""))
+        if "-" in (match["sign"], match["sign2"]):
+            value = -value
+
+        style = self.styles.get(symbol)
+        if style is None:
+            style = self.styles[symbol] = CommodityStyle(
+                symbol,
+                left=match["rsym"] is None,
+                spaced=bool(match["lspace"] or match["rspace"]),
+            )
+        style.thousands = style.thousands or "," in number
+        if "." in number:
+            style.precision = max(style.precision, len(number.split(".", 1)[1]))
+        return symbol, value
+
+
+class _Balances:
+    """Running per-account balances used to resolve assignments."""
+
+    def __init__(self) -> None:
+        self.by_account: dict[str, dict[str, Decimal]] = defaultdict(
+            lambda: defaultdict(Decimal),
+        )
+
+    def get(self, account: str, subaccounts: bool) -> dict[str, Decimal]:
+        if not subaccounts:
+            return self.by_account[account]
+        totals: dict[str, Decimal] = defaultdict(Decimal)
+        prefix = f"{account}:"
+        for name, amounts in self.by_account.items():
+            if name == account or name.startswith(prefix):
+                for commodity, value in amounts.items():
+                    totals[commodity] += value
+        return totals
+
+
+def _resolve(
+    transactions: list[_Transaction], styles: dict[str, CommodityStyle],
+) -> None:
+    """Fill in assigned and elided amounts and check assertions, in date order."""
+    balances = _Balances()
+    for txn in sorted(transactions, key=lambda t: t.date):
+        # Balance assignments: the amount that brings the account to the target
+        for posting in txn.postings:
+            if posting.amount is None and posting.assertion is not None:
+                commodity, target = posting.assertion
+                current = balances.get(posting.account, "*" in posting.assertion_kind)
+                pending = sum(
+                    (
+                        p.amount[1]
+                        for p in txn.postings
+                        if p is not posting
+                        and p.account == posting.account
+                        and p.amount is not None
+                        and p.amount[0] == commodity
+                    ),
+                    Decimal(0),
+                )
+                posting.amount = (commodity, target - current[commodity] - pending)
+
+        if any(p.virtual for p in txn.postings):
+            for group in ("", "["):
+                postings = [p for p in txn.postings if p.virtual == group]
+                _balance_postings(txn, postings, styles)
+        else:
+            _balance_postings(txn, list(txn.postings), styles)
+
+        for posting in txn.postings:
+            if posting.amount is None:
+                # An unbalanced virtual posting without an amount
+                posting.amount = ("", Decimal(0))
+            commodity, value = posting.amount
+            balances.by_account[posting.account][commodity] += value
+            if posting.assertion is not None:
+                _check_assertion(txn, posting, balances)
+
+
+def _balance_postings(
+    txn: _Transaction, postings: list[_Posting], styles: dict[str, CommodityStyle],
+) -> None:
+    elided = [p for p in postings if p.amount is None]
+    if len(elided) > 1:
+        raise JournalError(f"{txn.location}: more than one posting without an amount")
+    sums: dict[str, Decimal] = defaultdict(Decimal)
+    for posting in postings:
+        if posting.amount is not None:
+            commodity, value = posting.cost or posting.amount
+            sums[commodity] += value
+    nonzero = {c: v for c, v in sums.items() if v}
+    if elided:
+        posting = elided[0]
+        if len(nonzero) > 1:
+            # hledger splits the elided posting per commodity
+            for commodity, value in list(nonzero.items())[1:]:
+                txn.postings.append(
+                    _Posting(posting.account, (commodity, -value), virtual=posting.virtual),
+                )
+        commodity, value = next(iter(nonzero.items()), ("", Decimal(0)))
+        posting.amount = (commodity, -value)
+        return
+    # A transaction with two commodities and no explicit cost converts implicitly
+    if len(nonzero) == 2 and not any(p.cost for p in postings):
+        return
+    # Like hledger, ignore residues below the commodity's display precision
+    nonzero = {
+        c: v
+        for c, v in nonzero.items()
+        if abs(v) >= Decimal(5).scaleb(-(styles[c].precision + 1) if c in styles else -1)
+    }
+    if nonzero:
+        raise JournalError(f"{txn.location}: transaction does not balance {nonzero}")
+
+
+def _check_assertion(
+    txn: _Transaction, posting: _Posting, balances: _Balances,
+) -> None:
+    commodity, expected = posting.assertion
+    actual = balances.get(posting.account, "*" in posting.assertion_kind)
+    if actual[commodity] != expected:
+        raise JournalError(
+            f"{txn.location}: balance assertion failed for {posting.account}: "
+            f"expected {expected} {commodity}, got {actual[commodity]}",
+        )
+    if posting.assertion_kind.startswith("=="):
+        others = {c: v for c, v in actual.items() if c != commodity and v}
+        if others:
+            raise JournalError(
+                f"{txn.location}: balance assertion failed for {posting.account}: "
+                f"unexpected {others}",
+            )
+
+
+class JournalEngine:
+    """
+    Columnar posting store with prefix-sum balance queries.
+
+    Postings are sorted by (account, commodity, date), so every account and
+    commodity pair is a contiguous run whose running total is a slice of
+    one cumulative sum. A balance as of a date is then one binary search
+    per matching run.
+    """
+
+    def __init__(
+        self,
+        transactions: list[_Transaction],
+        styles: dict[str, CommodityStyle] | None = None,
+    ) -> None:
+        """
+        Build the store from resolved transactions.
+
+        Args:
+        ----
+            transactions: Parsed transactions with all amounts filled in.
+            styles: Display styles by commodity symbol.
+
+        """
+        self.styles = styles or {}
+        accounts: dict[str, int] = {}
+        commodities: dict[str, int] = {}
+        dates, account_ids, commodity_ids, values = [], [], [], []
+        for txn in transactions:
+            day = txn.date.toordinal() - _EPOCH_ORDINAL
+            for posting in txn.postings:
+                commodity, value = posting.amount
+                dates.append(day)
+                account_ids.append(accounts.setdefault(posting.account, len(accounts)))
+                commodity_ids.append(commodities.setdefault(commodity, len(commodities)))
+                values.append(value)
+        self.accounts = list(accounts)
+        self.commodities = list(commodities)
+        self.scale = max(0, -min((v.as_tuple().exponent for v in values), default=0))
+
+        days = np.asarray(dates, dtype=np.int64)
+        order = np.lexsort(
+            (
+                days,
+                np.asarray(commodity_ids, dtype=np.int32),
+                np.asarray(account_ids, dtype=np.int32),
+            ),
+        )
+        self.dates = days[order].astype("datetime64[D]")
+        self.account_ids = np.asarray(account_ids, dtype=np.int32)[order]
+        self.commodity_ids = np.asarray(commodity_ids, dtype=np.int16)[order]
+        self.amounts = np.asarray(
+            [int(v.scaleb(self.scale)) for v in values], dtype=np.int64,
+        )[order]
+
+        # Run boundaries and a search key that orders runs, then dates
+        run_keys = self.account_ids.astype(np.int64) * max(len(self.commodities), 1)
+        run_keys += self.commodity_ids
+        starts = np.flatnonzero(np.diff(run_keys, prepend=-1)) if len(run_keys) else []
+        self.run_starts = np.asarray(starts, dtype=np.int64)
+        self.run_accounts = self.account_ids[self.run_starts]
+        self.run_commodities = self.commodity_ids[self.run_starts]
+        self._days_offset = self.dates.min() if len(self.dates) else np.datetime64(0, "D")
+        days = (self.dates - self._days_offset).astype(np.int64)
+        self._search_keys = run_keys << 32 | days
+        self._run_keys = run_keys[self.run_starts]
+        self._prefix = np.concatenate(([0], np.cumsum(self.amounts)))
+        self._query_cache: dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_file(cls, path: str, opener: Callable = open) -> "JournalEngine":
+        """
+        Parse a journal file (and its includes) into an engine.
+
+        Args:
+        ----
+            path: Path to the top-level journal, e.g. all.journal.
+            opener: Function used to open journal files.
+
+        Returns:
+        -------
+            The loaded engine.
+
+        Raises:
+        ------
+            JournalError: If the journal is malformed or an assertion fails.
+
+        """
+        parser = JournalParser(opener)
+        parser.parse_file(path)
+        return cls.from_parser(parser)
+
+    @classmethod
+    def from_text(cls, text: str) -> "JournalEngine":
+        """Parse journal text into an engine."""
+        parser = JournalParser()
+        parser.parse_text(text)
+        return cls.from_parser(parser)
+
+    @classmethod
+    def from_parser(cls, parser: JournalParser) -> "JournalEngine":
+        """Resolve a parser's transactions and build the engine."""
+        _resolve(parser.transactions, parser.styles)
+        logger.debug(
+            f"Loaded {len(parser.transactions)} transactions "
+            f"in {len(parser.styles)} commodities",
+        )
+        return cls(parser.transactions, parser.styles)
+
+    def __len__(self) -> int:
+        """Number of postings."""
+        return len(self.amounts)
+
+    def _matching_runs(self, query: str | None) -> np.ndarray:
+        if query not in self._query_cache:
+            if query is None:
+                account_ids = np.arange(len(self.accounts))
+            else:
+                pattern = re.compile(query.removeprefix("acct:"), re.IGNORECASE)
+                account_ids = np.asarray(
+                    [i for i, name in enumerate(self.accounts) if pattern.search(name)],
+                    dtype=np.int32,
+                )
+            self._query_cache[query] = np.flatnonzero(
+                np.isin(self.run_accounts, account_ids),
+            )
+        return self._query_cache[query]
+
+    def _position(self, run_keys: np.ndarray, when: str | date | None) -> np.ndarray:
+        """Index of the first posting on or after the date in each run."""
+        if when is None:
+            day = (1 << 32) - 1
+        else:
+            day = int((np.datetime64(when, "D") - self._days_offset).astype(np.int64))
+            day = min(max(day, 0), (1 << 32) - 1)
+        return np.searchsorted(self._search_keys, run_keys << 32 | day, side="left")
+
+    def balance(
+        self,
+        query: str | None = None,
+        end: str | date | None = None,
+        begin: str | date | None = None,
+    ) -> dict[str, Decimal]:
+        """
+        Total of the matching accounts, like `hledger bal QUERY -b BEGIN -e END`.
+
+        Args:
+        ----
+            query: Account regex, matched case-insensitively anywhere in the
+                account name; None matches every account.
+            end: Exclusive end date, as with hledger's -e.
+            begin: Inclusive start date, as with hledger's -b.
+
+        Returns:
+        -------
+            Nonzero totals by commodity symbol.
+
+        """
+        runs = self._matching_runs(query)
+        if not len(runs):
+            return {}
+        keys = self._run_keys[runs]
+        upper = self._position(keys, end)
+        if begin is None:
+            lower = self.run_starts[runs]
+        else:
+            lower = self._position(keys, begin)
+        sums = self._prefix[upper] - self._prefix[lower]
+        totals = {}
+        commodities = self.run_commodities[runs]
+        for commodity_id in np.unique(commodities):
+            total = int(sums[commodities == commodity_id].sum())
+            if total:
+                totals[self.commodities[commodity_id]] = Decimal(total).scaleb(
+                    -self.scale,
+                )
+        return totals
+
+    def format_amount(self, commodity: str, value: Decimal) -> str:
+        """Render an amount in the commodity's journal style."""
+        style = self.styles.get(commodity) or CommodityStyle(commodity)
+        return style.format(value)
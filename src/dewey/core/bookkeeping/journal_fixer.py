@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
 
+import logging
 import os
 import re
 import shutil
+from functools import partial
 from typing import Protocol
 
 from dewey.core.base_script import BaseScript
+from dewey.core.bookkeeping.journal_io import (
+    AtomicFile,
+    JournalChange,
+    iter_blocks,
+    run_parallel,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class FileSystemInterface(Protocol):
@@ -55,6 +65,107 @@ class JournalFixerInterface(Protocol):
     def run(self, filenames: list[str] | None = None) -> None: ...
 
 
+def parse_transaction_lines(
+    lines: list[str], log: logging.Logger = logger,
+) -> dict | None:
+    """
+    Parse a transaction from a list of lines.
+
+    Args:
+    ----
+        lines: A list of strings representing the lines of a transaction.
+        log: Logger for skipped entries.
+
+    Returns:
+    -------
+        A dictionary representing the transaction, or None if parsing fails.
+
+    """
+    if not lines or not lines[0].strip():
+        log.debug("Empty transaction lines encountered")
+        return None
+
+    # Parse transaction date and description
+    first_line = lines[0].strip()
+    date_match = re.match(r"(\d{4}-\d{2}-\d{2})", first_line)
+    if not date_match:
+        log.debug("Invalid transaction date format: %s", first_line)
+        return None
+
+    transaction = {
+        "date": date_match.group(1),
+        "description": first_line[len(date_match.group(1)) :].strip(),
+        "postings": [],
+    }
+
+    # Parse postings
+    for line in lines[1:]:
+        if line.strip():
+            parts = line.strip().split()
+            if len(parts) >= 2:
+                account = parts[0]
+                amount = parts[1] if len(parts) > 1 else None
+                transaction["postings"].append(
+                    {"account": account, "amount": amount},
+                )
+
+    return transaction
+
+
+def format_transaction(transaction: dict) -> str:
+    """
+    Render a parsed transaction as a fixed journal entry.
+
+    Args:
+    ----
+        transaction: A transaction dictionary.
+
+    Returns:
+    -------
+        The entry text, ending with a newline.
+
+    """
+    entry = f"{transaction['date']} {transaction['description']}\n"
+    for posting in transaction["postings"]:
+        entry += f"    {posting['account']}  {posting['amount']}\n"
+    return entry
+
+
+def fix_journal_file(file_path: str, dry_run: bool = False) -> list[JournalChange]:
+    """
+    Fix a journal file by streaming its entries.
+
+    Produces the same output as JournalFixer.process_journal_file, but
+    reads one entry at a time and replaces the file atomically, only when
+    an entry changed.
+
+    Args:
+    ----
+        file_path: The path to the journal file.
+        dry_run: Report the changes without writing the file.
+
+    Returns:
+    -------
+        The entries whose text changed, including dropped ones.
+
+    """
+    changes: list[JournalChange] = []
+    with open(file_path, encoding="utf-8") as f, AtomicFile(file_path) as out:
+        written = 0
+        for index, lines in enumerate(iter_blocks(f)):
+            before = "\n".join(lines) + "\n"
+            transaction = parse_transaction_lines(lines)
+            after = format_transaction(transaction) if transaction else ""
+            if after != before:
+                changes.append(JournalChange(file_path, index, lines[0], before, after))
+            if after and not dry_run:
+                out.write(after if written == 0 else "\n" + after)
+                written += 1
+        if dry_run or not changes:
+            out.discard()
+    return changes
+
+
 class JournalFixer(BaseScript, JournalFixerInterface):
     """Corrects formatting issues in Hledger journal files."""
 
@@ -109,16 +220,7 @@ class JournalFixer(BaseScript, JournalFixerInterface):
             The fixed journal content as a string.
 
         """
-        fixed_entries = []
-
-        for transaction in transactions:
-            # Build the transaction entry
-            entry = f"{transaction['date']} {transaction['description']}\n"
-            for posting in transaction["postings"]:
-                entry += f"    {posting['account']}  {posting['amount']}\n"
-            fixed_entries.append(entry)
-
-        return "\n".join(fixed_entries)
+        return "\n".join(format_transaction(transaction) for transaction in transactions)
 
     def parse_transaction(self, lines: list[str]) -> dict | None:
         """
@@ -133,35 +235,7 @@ class JournalFixer(BaseScript, JournalFixerInterface):
             A dictionary representing the transaction, or None if parsing fails.
 
         """
-        if not lines or not lines[0].strip():
-            self.logger.debug("Empty transaction lines encountered")
-            return None
-
-        # Parse transaction date and description
-        first_line = lines[0].strip()
-        date_match = re.match(r"(\d{4}-\d{2}-\d{2})", first_line)
-        if not date_match:
-            self.logger.debug("Invalid transaction date format: %s", first_line)
-            return None
-
-        transaction = {
-            "date": date_match.group(1),
-            "description": first_line[len(date_match.group(1)) :].strip(),
-            "postings": [],
-        }
-
-        # Parse postings
-        for line in lines[1:]:
-            if line.strip():
-                parts = line.strip().split()
-                if len(parts) >= 2:
-                    account = parts[0]
-                    amount = parts[1] if len(parts) > 1 else None
-                    transaction["postings"].append(
-                        {"account": account, "amount": amount},
-                    )
-
-        return transaction
+        return parse_transaction_lines(lines, self.logger)
 
     def process_journal_file(self, file_path: str) -> None:
         """
@@ -208,15 +282,57 @@ class JournalFixer(BaseScript, JournalFixerInterface):
                 self.fs.move(backup_path, file_path)
             raise
 
-    def execute(self, filenames: list[str] | None = None) -> None:
-        """Main function to process all journal files."""
+    def execute(
+        self,
+        filenames: list[str] | None = None,
+        workers: int | None = None,
+        dry_run: bool = False,
+    ) -> list[JournalChange]:
+        """
+        Main function to process all journal files.
+
+        By default files are fixed one after another with a backup copy.
+        With workers set (or dry_run), they are streamed through
+        fix_journal_file in a process pool and replaced atomically.
+
+        Args:
+        ----
+            filenames: Files to fix; defaults to the current directory.
+            workers: Process pool size for the streaming mode; 0 uses
+                every CPU. Defaults to the journal_workers config value.
+            dry_run: Log the changed entries without writing files.
+
+        Returns:
+        -------
+            The changed entries in streaming mode, otherwise empty.
+
+        """
         # Process all journal files in the current directory
         if filenames is None:
             filenames = self.fs.listdir(".")
+        if workers is None:
+            workers = self.get_config_value("journal_workers", None)
+        journals = [filename for filename in filenames if filename.endswith(".journal")]
 
-        for filename in filenames:
-            if filename.endswith(".journal"):
+        if workers is None and not dry_run:
+            for filename in journals:
                 self.process_journal_file(filename)
+            return []
+
+        task = partial(fix_journal_file, dry_run=dry_run)
+        changes = [
+            change
+            for file_changes in run_parallel(task, journals, int(workers or 0))
+            for change in file_changes
+        ]
+        if dry_run:
+            for change in changes:
+                self.logger.info(change.diff())
+        self.logger.info(
+            f"{'Would change' if dry_run else 'Changed'} {len(changes)} entries "
+            f"in {len(journals)} files",
+        )
+        return changes
 
 
 def main() -> None:
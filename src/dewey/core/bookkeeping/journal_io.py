@@ -0,0 +1,318 @@
+"""
+Streaming, atomic journal file processing.
+
+Helpers shared by the journal rewriters (JournalCategorizer, JournalFixer):
+
+- AtomicFile writes next to the target and renames over it on success, so
+  a failed run leaves the original untouched without a backup copy.
+- JsonJournalReader streams the "transactions" array of a JSON journal one
+  transaction at a time, and write_json_journal writes it back byte for
+  byte as json.dump(..., indent=4) would.
+- iter_blocks streams blank-line separated entries of an hledger journal.
+- run_parallel sends independent files to a process pool.
+- JournalChange records a changed transaction for dry-run diffs.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Any, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_WHITESPACE = " \t\r\n"
+_NUMBER_CHARS = frozenset("+-.0123456789eE")
+
+
+@dataclass
+class JournalChange:
+    """A transaction whose rewritten text differs from the original."""
+
+    path: str
+    index: int
+    description: str
+    before: str
+    after: str
+
+    def diff(self) -> str:
+        """The change as a header line plus removed and added lines."""
+        lines = [f"{self.path}:{self.index} {self.description}"]
+        lines += [f"- {line}" for line in self.before.splitlines()]
+        lines += [f"+ {line}" for line in self.after.splitlines()]
+        return "\n".join(lines)
+
+
+class AtomicFile:
+    """
+    A text file written in full before it replaces the target.
+
+    Data goes to a temporary file in the target's directory, which is
+    fsynced and renamed over the target when the block exits cleanly.
+    On an exception, or after discard(), the target is left untouched.
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8") -> None:
+        """
+        Prepare to write the file.
+
+        Args:
+        ----
+            path: The file to replace.
+            encoding: Text encoding of the written file.
+
+        """
+        self.path = path
+        self.encoding = encoding
+        self.discarded = False
+        self._file: IO[str] | None = None
+        self._tmp = ""
+
+    def __enter__(self) -> "AtomicFile":
+        """Open the temporary file."""
+        directory, name = os.path.split(os.path.abspath(self.path))
+        fd, self._tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+        self._file = os.fdopen(fd, "w", encoding=self.encoding)
+        return self
+
+    def write(self, text: str) -> None:
+        """Write text to the temporary file."""
+        self._file.write(text)
+
+    def discard(self) -> None:
+        """Drop the written data and keep the original file."""
+        self.discarded = True
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        """Rename the temporary file over the target, or remove it."""
+        try:
+            if exc_type is None and not self.discarded:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+            if exc_type is None and not self.discarded:
+                if os.path.exists(self.path):
+                    shutil.copymode(self.path, self._tmp)
+                os.replace(self._tmp, self.path)
+        finally:
+            if os.path.exists(self._tmp):
+                os.unlink(self._tmp)
+
+
+class JsonJournalReader:
+    """
+    Incremental reader for a JSON object with a "transactions" array.
+
+    Top-level values other than the array are decoded whole; transactions
+    are decoded one at a time from a bounded buffer. Values after the array
+    are read into `tail` once the transactions are exhausted, so `tail` can
+    be handed to write_json_journal before the transactions are consumed.
+
+    Example:
+    -------
+        >>> reader = JsonJournalReader(f)
+        >>> head = reader.read_head()
+        >>> for transaction in reader.transactions():
+        ...     ...
+        >>> reader.tail
+
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int = 1 << 16) -> None:
+        """
+        Wrap an open text file.
+
+        Args:
+        ----
+            f: The journal file, positioned at the start.
+            chunk_size: Characters read at a time.
+
+        """
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.has_transactions = False
+        self.tail: dict[str, Any] = {}
+        self._first_key = True
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos : self.pos + 1]
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            msg = f"Expected {char!r} in JSON journal, got {self._peek()!r}"
+            raise ValueError(msg)
+        self.pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number the buffer cuts short, e.g. "12." of "12.34", decodes
+            # as a shorter number; retry once the next chunk is in
+            if (
+                isinstance(value, (int, float))
+                and all(char in _NUMBER_CHARS for char in self.buf[end:])
+                and self._fill()
+            ):
+                continue
+            self.pos = end
+            return value
+
+    def _next_key(self) -> str | None:
+        """The next top-level key, or None at the closing brace."""
+        if self._peek() == "}":
+            self.pos += 1
+            return None
+        if not self._first_key:
+            self._expect(",")
+        self._first_key = False
+        key = self._value()
+        self._expect(":")
+        return key
+
+    def read_head(self) -> dict[str, Any]:
+        """Top-level values before the transactions array."""
+        self._expect("{")
+        head: dict[str, Any] = {}
+        while (key := self._next_key()) is not None:
+            if key == "transactions" and self._peek() == "[":
+                self.has_transactions = True
+                return head
+            head[key] = self._value()
+        return head
+
+    def transactions(self) -> Iterator[Any]:
+        """Yield the transactions one at a time."""
+        if not self.has_transactions:
+            return
+        self._expect("[")
+        first = True
+        while self._peek() != "]":
+            if not first:
+                self._expect(",")
+            first = False
+            yield self._value()
+        self.pos += 1
+        while (key := self._next_key()) is not None:
+            self.tail[key] = self._value()
+
+
+def _indented(value: Any, depth: int) -> str:
+    return json.dumps(value, indent=4).replace("\n", "\n" + " " * depth)
+
+
+def write_json_journal(
+    out: Any,
+    head: dict[str, Any],
+    transactions: Iterable[Any] | None,
+    tail: dict[str, Any],
+) -> None:
+    """
+    Write a JSON journal as json.dump(journal, out, indent=4) would.
+
+    Args:
+    ----
+        out: Anything with a write(str) method.
+        head: Top-level values before the transactions.
+        transactions: The transactions, or None if the journal has none.
+        tail: Top-level values after the transactions; read after the
+            transactions are consumed.
+
+    """
+    first = True
+
+    def key(name: str) -> None:
+        nonlocal first
+        out.write(("{" if first else ",") + f"\n    {json.dumps(name)}: ")
+        first = False
+
+    for name, value in head.items():
+        key(name)
+        out.write(_indented(value, 4))
+    if transactions is not None:
+        key("transactions")
+        count = 0
+        for transaction in transactions:
+            out.write(("[" if count == 0 else ",") + "\n        ")
+            out.write(_indented(transaction, 8))
+            count += 1
+        out.write("\n    ]" if count else "[]")
+    for name, value in tail.items():
+        key(name)
+        out.write(_indented(value, 4))
+    out.write("{}" if first else "\n}")
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[list[str]]:
+    """
+    Yield blank-line separated blocks of lines, without line endings.
+
+    Args:
+    ----
+        lines: Lines of a journal, e.g. an open file.
+
+    """
+    block: list[str] = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.strip() == "":
+            if block:
+                yield block
+                block = []
+        else:
+            block.append(line)
+    if block:
+        yield block
+
+
+def run_parallel(
+    func: Callable[[T], R], items: Iterable[T], workers: int | None = None,
+) -> list[R]:
+    """
+    Apply a picklable function to independent items in a process pool.
+
+    Args:
+    ----
+        func: Module-level function to call on each item.
+        items: Arguments, one call each.
+        workers: Pool size; 1 runs in this process, None uses every CPU.
+
+    Returns:
+    -------
+        Results in the order of the items.
+
+    """
+    items = list(items)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ProcessPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(func, items))
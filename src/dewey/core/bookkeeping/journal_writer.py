@@ -2,8 +2,8 @@
 Handles journal file writing and management.
 
 This module provides classes and functions for writing and managing journal files,
-including functionalities for backing up existing files, handling processed hashes,
-and logging classification decisions.
+including functionalities for backing up existing files, skipping transactions
+already in the ledger, and logging classification decisions.
 """
 
 import shutil
@@ -14,6 +14,10 @@ from pathlib import Path
 from typing import Any, Protocol
 
 from dewey.core.base_script import BaseScript
+from dewey.core.bookkeeping.fingerprint_index import (
+    FingerprintIndex,
+    journal_fingerprints,
+)
 from dewey.core.db.connection import DatabaseConnection
 from dewey.llm.llm_utils import LLMClient
 
@@ -77,9 +81,13 @@ class JournalWriter(BaseScript):
             ),
         )
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.processed_hashes_file: Path = self.output_dir / ".processed_hashes"
+        self.fingerprint_file: Path = Path(
+            self.config_source.get_config_value(
+                "fingerprint_index", self.output_dir / ".fingerprints.sqlite",
+            ),
+        )
         self.io_service: IOServiceInterface = io_service or IOService()
-        self.seen_hashes: set[str] = self._load_processed_hashes()
+        self.fingerprints: FingerprintIndex = self._open_fingerprint_index()
         self.audit_log: list[dict[str, str]] = []
         self.db_conn: DatabaseConnection | None = None
         self.llm_client: LLMClient | None = None
@@ -99,45 +107,50 @@ class JournalWriter(BaseScript):
         if self.db_conn:
             result = self.db_conn.execute("SELECT 1")
 
-    def _load_processed_hashes(self) -> set[str]:
+    def _open_fingerprint_index(self) -> FingerprintIndex:
         """
-        Load previously processed transaction hashes.
+        Open the transaction fingerprint index of the output directory.
+
+        Only journal files whose mtime or size changed since the last run
+        are rescanned; versioned backups are left out.
 
         Returns
         -------
-            A set of processed transaction hashes.
+            The up-to-date fingerprint index.
 
         """
-        try:
-            if self.processed_hashes_file.exists():
-                content = self.io_service.read_text(self.processed_hashes_file)
-                return set(content.splitlines())
-            return set()
-        except Exception as e:
-            self.logger.exception("Failed to load processed hashes: %s", e)
-            return set()
+        return FingerprintIndex.for_ledger(self.output_dir, self.fingerprint_file)
 
-    def _save_processed_hashes(self, seen_hashes: set[str]) -> None:
+    def filter_new_entries(self, entries: list[str]) -> list[str]:
         """
-        Persist processed hashes between runs.
+        Drop entries whose transactions are already in the ledger.
 
         Args:
         ----
-            seen_hashes: Set of processed transaction hashes to save.
+            entries: hledger journal entries, one transaction each.
+
+        Returns:
+        -------
+            The entries not yet recorded, in order.
 
         """
-        try:
-            self.io_service.write_text(
-                self.processed_hashes_file, "\n".join(seen_hashes),
+        fingerprints = [
+            [fp for fp, _location in journal_fingerprints(entry)] for entry in entries
+        ]
+        return [
+            entry
+            for entry, new in zip(
+                entries, self.fingerprints.unseen(fingerprints), strict=True,
             )
-        except Exception as e:
-            self.logger.exception("Failed to save processed hashes: %s", e)
+            if new
+        ]
 
     def _write_file_with_backup(
         self,
         filename: Path,
         entries: list[str],
         now_func: Callable[[], datetime] = datetime.now,
+        append: bool = False,
     ) -> None:
         """
         Write file with versioned backup if it exists.
@@ -147,15 +160,20 @@ class JournalWriter(BaseScript):
             filename: Path to the file to write.
             entries: List of journal entries to write.
             now_func: Function to get the current datetime (for testing).
+            append: Keep the existing content and add the entries after it.
 
         """
         try:
+            text = "\n".join(entries) + "\n"
             if filename.exists():
                 timestamp = now_func().strftime("%Y%m%d%H%M%S")
                 backup_name = f"{filename.stem}_{timestamp}{filename.suffix}"
                 self.io_service.copy_file(filename, filename.parent / backup_name)
+                if append:
+                    existing = self.io_service.read_text(filename).rstrip("\n")
+                    text = f"{existing}\n\n{text}" if existing else text
 
-            self.io_service.write_text(filename, "\n".join(entries) + "\n")
+            self.io_service.write_text(filename, text)
         except Exception as e:
             self.logger.exception("Failed to write file with backup: %s", e)
 
@@ -192,7 +210,9 @@ class JournalWriter(BaseScript):
 
     def write_entries(self, entries: dict[str, list[str]]) -> None:
         """
-        Write journal entries to appropriate files.
+        Append new journal entries to the appropriate files.
+
+        Entries whose transactions are already in the ledger are skipped.
 
         Args:
         ----
@@ -202,13 +222,25 @@ class JournalWriter(BaseScript):
         total_entries = sum(len(e) for e in entries.values())
         self.logger.info("Writing %s journal entries", total_entries)
 
+        written = []
         for (account_id, year), entries in self._group_entries_by_account_and_year(
             entries,
         ).items():
+            new_entries = self.filter_new_entries(entries)
+            if len(new_entries) < len(entries):
+                self.logger.info(
+                    "Skipping %s already recorded entries for %s_%s",
+                    len(entries) - len(new_entries),
+                    account_id,
+                    year,
+                )
+            if not new_entries:
+                continue
             filename = self.output_dir / f"{account_id}_{year}.journal"
-            self._write_file_with_backup(filename, entries)
+            self._write_file_with_backup(filename, new_entries, append=True)
+            written.append(filename)
 
-        self._save_processed_hashes(self.seen_hashes)
+        self.fingerprints.refresh(written)
 
     def log_classification_decision(
         self, tx_hash: str, pattern: str, category: str,
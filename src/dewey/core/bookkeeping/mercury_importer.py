@@ -1,6 +1,10 @@
-from typing import Protocol
+from typing import Any, Protocol
 
 from dewey.core.base_script import BaseScript
+from dewey.core.bookkeeping.fingerprint_index import (
+    FingerprintIndex,
+    transaction_fingerprint,
+)
 from dewey.core.config import DeweyConfig
 
 
@@ -31,11 +35,63 @@ class MercuryImporter(BaseScript):
         config: DeweyConfig | None = None,
         db_conn: DatabaseInterface | None = None,
         llm_client: object | None = None,
+        fingerprints: FingerprintIndex | None = None,
     ) -> None:
         """Initializes the MercuryImporter."""
         super().__init__(config_section="mercury", config=config)
         self.db_conn = db_conn
         self.llm_client = llm_client
+        self._fingerprints = fingerprints
+
+    @property
+    def fingerprints(self) -> FingerprintIndex:
+        """Fingerprint index of the journal directory, refreshed on first use."""
+        if self._fingerprints is None:
+            self._fingerprints = FingerprintIndex.for_ledger(
+                self.get_config_value("journal_dir", "data/bookkeeping/journals"),
+                self.get_config_value("fingerprint_index"),
+            )
+        return self._fingerprints
+
+    def transaction_fingerprint(self, row: dict[str, Any]) -> str:
+        """
+        Fingerprint of a validated Mercury row on its bank account side.
+
+        Args:
+        ----
+            row: Row from MercuryDataValidator.validate_row.
+
+        Returns:
+        -------
+            The fingerprint the imported journal posting will have.
+
+        """
+        account = self.get_config_value(
+            "ledger_account", "assets:checking:mercury{account_id}",
+        ).format(account_id=row["account_id"])
+        amount = row["amount"] if row["is_income"] else -row["amount"]
+        return transaction_fingerprint(row["date"], amount, row["description"], account)
+
+    def filter_new_transactions(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Drop rows that are already recorded in the ledger.
+
+        Args:
+        ----
+            rows: Validated Mercury rows, in statement order.
+
+        Returns:
+        -------
+            The rows not yet in the ledger.
+
+        """
+        flags = self.fingerprints.unseen([self.transaction_fingerprint(row)] for row in rows)
+        new_rows = [row for row, new in zip(rows, flags, strict=True) if new]
+        if len(new_rows) < len(rows):
+            self.logger.info(
+                f"Skipping {len(rows) - len(new_rows)} already imported Mercury transactions",
+            )
+        return new_rows
 
     def execute(self) -> None:
         """
@@ -0,0 +1,371 @@
+"""
+Single-pass multi-pattern classification.
+
+Classification rules are ordered (pattern, value) pairs where the first
+pattern found in a description wins. Trying each compiled regex in a Python
+loop costs one search per rule per description, so thousands of rules over
+years of transactions is quadratic in practice. PatternClassifier only
+searches the rules that can possibly match:
+
+- Literal prefilter: most rules are merchant names, and any match must
+  contain a run of literal text from the pattern. Each such rule is indexed
+  under the rarest character trigram of its longest required literal, and a
+  description only tests the rules indexed under one of its own trigrams.
+- Combined alternation: rules without a required literal are compiled
+  together, each as a lookahead anchored at the start of the description,
+  `(?=[\\s\\S]*?(?:rule))(?P<_rN>)`. The engine tries the alternatives in
+  rule order and stops at the first that matches anywhere, which is
+  re.search priority (a plain alternation would report the leftmost match
+  in the text instead).
+
+Candidates from both are resolved in rule order, so the result is always
+the first rule a re.search loop would have found. Results are memoized per
+description, since bank descriptions repeat heavily.
+"""
+
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from re import Pattern
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+# Rules per combined regex; bounds compile time and regex size
+CHUNK_SIZE = 400
+
+# Rules that cannot share a combined regex
+_STANDALONE_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|^\(\?[aiLmsux]+\)")
+_QUANTIFIER_RE = re.compile(r"[*+?]|\{(\d*)(?:,\d*)?\}")
+_INLINE_FLAGS_RE = re.compile(r"\(\?[aiLmsux-]+\)")
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Index just past the character class starting at pattern[i]."""
+    i += 1
+    if pattern[i : i + 1] == "^":
+        i += 1
+    if pattern[i : i + 1] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """Index just past the group starting at pattern[i]."""
+    depth = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def required_literals(pattern: str) -> list[str]:
+    """
+    Runs of ASCII text that every match of the pattern contains.
+
+    Conservative: groups, classes, escapes such as \\s, and optional
+    characters end a run, and a top-level alternation means no literal is
+    required at all.
+
+    Args:
+    ----
+        pattern: A regular expression.
+
+    Returns:
+    -------
+        The literal runs, possibly empty.
+
+    """
+    runs: list[str] = []
+    run: list[str] = []
+    i = 0
+    last_literal = False
+
+    def flush() -> None:
+        if run:
+            runs.append("".join(run))
+            run.clear()
+
+    while i < len(pattern):
+        char = pattern[i]
+        quantifier = _QUANTIFIER_RE.match(pattern, i)
+        if quantifier:
+            token = quantifier.group(0)
+            optional = token in ("*", "?") or quantifier.group(1) in ("", "0")
+            if last_literal and optional:
+                run.pop()  # The character is optional
+            flush()
+            i = quantifier.end()
+            if pattern[i : i + 1] in ("?", "+"):
+                i += 1  # Lazy or possessive suffix
+            last_literal = False
+            continue
+        last_literal = False
+        if char == "|":
+            return []
+        if char == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            i += 2
+            if escaped and not escaped.isalnum() and escaped.isascii():
+                run.append(escaped)
+                last_literal = True
+            else:
+                flush()
+            continue
+        if char == "[":
+            flush()
+            i = _skip_class(pattern, i)
+            continue
+        if char == "(":
+            if _INLINE_FLAGS_RE.match(pattern, i):
+                return []  # Flags such as (?i) change how literals match
+            flush()
+            i = _skip_group(pattern, i)
+            continue
+        i += 1
+        if char in ".^$" or not char.isascii():
+            flush()
+            continue
+        run.append(char)
+        last_literal = True
+    flush()
+    return runs
+
+
+def _trigrams(text: str) -> list[str]:
+    return [text[i : i + 3] for i in range(len(text) - 2)]
+
+
+class _Segment:
+    """Rules without a required literal, answered by one regex."""
+
+    def __init__(self, indexes: Sequence[int], patterns: Sequence[str], flags: int) -> None:
+        self.indexes = list(indexes)
+        if len(patterns) == 1:
+            self.single: Pattern | None = re.compile(patterns[0], flags)
+            return
+        self.single = None
+        self.first = re.compile(
+            "|".join(
+                rf"(?=[\s\S]*?(?:{pattern}))(?P<_r{i}>)"
+                for i, pattern in enumerate(patterns)
+            ),
+            flags,
+        )
+        self.all = re.compile(
+            "".join(
+                rf"(?:(?=[\s\S]*?(?P<_r{i}>{pattern}))|)"
+                for i, pattern in enumerate(patterns)
+            ),
+            flags,
+        )
+        self.first_groups = {
+            self.first.groupindex[f"_r{i}"]: index for i, index in enumerate(indexes)
+        }
+        self.all_groups = [self.all.groupindex[f"_r{i}"] for i in range(len(patterns))]
+
+    def first_match(self, text: str) -> int | None:
+        if self.single is not None:
+            return self.indexes[0] if self.single.search(text) else None
+        match = self.first.match(text)
+        return None if match is None else self.first_groups[match.lastindex]
+
+    def all_matches(self, text: str) -> list[int]:
+        if self.single is not None:
+            return self.indexes[:1] if self.single.search(text) else []
+        spans = self.all.match(text).regs
+        return [
+            index
+            for index, group in zip(self.indexes, self.all_groups, strict=True)
+            if spans[group][0] >= 0
+        ]
+
+
+class PatternClassifier(Generic[T]):
+    """
+    Ordered regex rules that only search the rules that can match.
+
+    Example:
+    -------
+        >>> rules = PatternClassifier([("coffee", "meals"), ("shop", "supplies")])
+        >>> rules.classify("shop coffee")
+        'meals'
+
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[tuple[str, T]],
+        flags: int = re.IGNORECASE,
+        cache_size: int = 65536,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        """
+        Compile and index the rules.
+
+        Args:
+        ----
+            rules: (pattern, value) pairs in priority order.
+            flags: Regex flags applied to every pattern.
+            cache_size: Number of descriptions whose result is memoized.
+            chunk_size: Maximum rules per combined regex.
+
+        Raises:
+        ------
+            re.error: If a pattern is not a valid regex.
+
+        """
+        rules = list(rules)
+        self.patterns = [pattern for pattern, _ in rules]
+        self.values = [value for _, value in rules]
+        self.flags = flags
+        self.compiled = [re.compile(pattern, flags) for pattern in self.patterns]
+        self._fold = bool(flags & re.IGNORECASE)
+
+        # Index each rule under the rarest trigram of its longest literal
+        keys: dict[int, list[str]] = {}
+        if not flags & re.VERBOSE:
+            for index, pattern in enumerate(self.patterns):
+                literals = [
+                    literal.lower() if self._fold else literal
+                    for literal in required_literals(pattern)
+                    if len(literal) >= 3
+                ]
+                if literals:
+                    keys[index] = _trigrams(max(literals, key=len))
+        counts = Counter(gram for grams in keys.values() for gram in set(grams))
+        self.index: dict[str, list[int]] = defaultdict(list)
+        for index, grams in keys.items():
+            self.index[min(grams, key=counts.__getitem__)].append(index)
+
+        self.segments: list[_Segment] = []
+        unindexed = [i for i in range(len(self.patterns)) if i not in keys]
+        pending: list[int] = []
+        for index in unindexed:
+            if _STANDALONE_RE.search(self.patterns[index]):
+                self._add_chunk(pending)
+                pending = []
+                self._add_chunk([index])
+                continue
+            pending.append(index)
+            if len(pending) == chunk_size:
+                self._add_chunk(pending)
+                pending = []
+        self._add_chunk(pending)
+
+        self.first_match = lru_cache(maxsize=cache_size)(self._first_match)
+
+    def _add_chunk(self, indexes: list[int]) -> None:
+        if not indexes:
+            return
+        try:
+            self.segments.append(
+                _Segment(indexes, [self.patterns[i] for i in indexes], self.flags),
+            )
+        except re.error:
+            # Patterns that cannot share a regex (e.g. clashing group names)
+            self.segments.extend(
+                _Segment([i], [self.patterns[i]], self.flags) for i in indexes
+            )
+
+    def __len__(self) -> int:
+        """Number of rules."""
+        return len(self.patterns)
+
+    def _candidates(self, text: str) -> list[int]:
+        """Indexed rules whose key trigram occurs in the text, in rule order."""
+        if self._fold:
+            if not text.isascii():
+                # Unicode case folding can match ASCII literals with other
+                # characters (e.g. the Kelvin sign), so test every rule
+                return sorted(i for ids in self.index.values() for i in ids)
+            text = text.lower()
+        found: set[int] = set()
+        for gram in set(_trigrams(text)):
+            ids = self.index.get(gram)
+            if ids:
+                found.update(ids)
+        return sorted(found)
+
+    def _first_match(self, text: str) -> int | None:
+        best = None
+        for segment in self.segments:
+            best = segment.first_match(text)
+            if best is not None:
+                break
+        for index in self._candidates(text):
+            if best is not None and index > best:
+                break
+            if self.compiled[index].search(text):
+                return index
+        return best
+
+    def classify(self, text: str, default: T | None = None) -> T | None:
+        """
+        Value of the first rule whose pattern is found in the text.
+
+        Args:
+        ----
+            text: Description to classify.
+            default: Returned when no rule matches.
+
+        Returns:
+        -------
+            The matching rule's value, or the default.
+
+        """
+        index = self.first_match(text)
+        return default if index is None else self.values[index]
+
+    def classify_many(
+        self, texts: Iterable[str], default: T | None = None,
+    ) -> list[T | None]:
+        """
+        Classify a batch of descriptions, matching each distinct one once.
+
+        Args:
+        ----
+            texts: Descriptions to classify.
+            default: Value for descriptions no rule matches.
+
+        Returns:
+        -------
+            One value per description, in order.
+
+        """
+        texts = list(texts)
+        results = {text: self.classify(text, default) for text in dict.fromkeys(texts)}
+        return [results[text] for text in texts]
+
+    def all_matches(self, text: str) -> list[int]:
+        """
+        Indexes of every rule whose pattern is found in the text.
+
+        Args:
+        ----
+            text: Description to test.
+
+        Returns:
+        -------
+            Matching rule indexes in priority order.
+
+        """
+        matches = [i for i in self._candidates(text) if self.compiled[i].search(text)]
+        for segment in self.segments:
+            matches.extend(segment.all_matches(text))
+        return sorted(matches)
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Any, Protocol
 
 from dewey.core.base_script import BaseScript
+from dewey.core.bookkeeping.pattern_classifier import PatternClassifier
 from dewey.core.db.connection import DatabaseConnection
 from dewey.llm.llm_utils import LLMClient
 
@@ -178,6 +179,11 @@ class RulesConverter(BaseScript):
             classifications: A dictionary containing classification patterns.
 
         """
+        # One combined pass per description instead of a search per pattern
+        classifier = PatternClassifier(
+            [(pattern, data) for pattern, data in classifications.items()],
+        )
+        seen: set[str] = set()
         for journal_file in self.file_system.glob(journal_dir, "**/*.journal"):
             with self.file_system.open(journal_file) as f:
                 content = f.read()
@@ -189,13 +195,16 @@ class RulesConverter(BaseScript):
                     re.MULTILINE,
                 )
 
-                # Match transactions against patterns
+                # Match each new description against all patterns at once
                 for desc in transactions:
                     desc = desc.strip()
-                    for pattern, data in classifications.items():
-                        if re.search(pattern, desc, re.IGNORECASE):
-                            if desc not in data["examples"]:
-                                data["examples"].append(desc)
+                    if desc in seen:
+                        continue
+                    seen.add(desc)
+                    for index in classifier.all_matches(desc):
+                        examples = classifier.values[index]["examples"]
+                        if desc not in examples:
+                            examples.append(desc)
 
     def generate_rules_data(
         self, classifications: dict[str, dict[str, Any]],
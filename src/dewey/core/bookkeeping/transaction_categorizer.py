@@ -2,14 +2,25 @@
 
 import json
 import os
-import re
 import shutil
 import sys
 from collections.abc import Callable
+from functools import partial
 from pathlib import Path
 from typing import Any, Protocol
 
 from dewey.core.base_script import BaseScript
+from dewey.core.bookkeeping.journal_io import (
+    AtomicFile,
+    JournalChange,
+    JsonJournalReader,
+    run_parallel,
+    write_json_journal,
+)
+from dewey.core.bookkeeping.pattern_classifier import PatternClassifier
+
+# Classifiers built in this process, by rules fingerprint
+_classifiers: dict[str, PatternClassifier[str]] = {}
 
 
 class FileSystemInterface(Protocol):
@@ -60,6 +71,94 @@ class RealFileSystem:
         return os.path.join(path1, path2)
 
 
+def build_classifier(rules: dict[str, Any]) -> PatternClassifier[str]:
+    """
+    Compile a rules dictionary into a classifier.
+
+    Descriptions are lowercased before matching and the patterns are
+    matched as written, as in JournalCategorizer.classify_transaction.
+
+    Args:
+    ----
+        rules: A dictionary containing the classification rules.
+
+    Returns:
+    -------
+        A classifier over the rules' patterns, in order.
+
+    """
+    return PatternClassifier(
+        [(pattern["regex"], pattern["category"]) for pattern in rules["patterns"]],
+        flags=0,
+    )
+
+
+def categorize_journal_file(
+    file_path: str,
+    rules: dict[str, Any],
+    dry_run: bool = False,
+    overwrite: bool = False,
+) -> list[JournalChange]:
+    """
+    Categorize a JSON journal file by streaming its transactions.
+
+    The file is rewritten atomically, and only if a transaction changed.
+    Runs in pool workers, so it compiles the rules once per process.
+
+    Args:
+    ----
+        file_path: Path to the journal file.
+        rules: A dictionary containing the classification rules.
+        dry_run: Report the changes without writing the file.
+        overwrite: Recategorize transactions that already have a category.
+
+    Returns:
+    -------
+        The changed transactions.
+
+    """
+    fingerprint = json.dumps(rules, sort_keys=True)
+    if fingerprint not in _classifiers:
+        _classifiers[fingerprint] = build_classifier(rules)
+    classifier = _classifiers[fingerprint]
+    default = rules["default_category"]
+    changes: list[JournalChange] = []
+
+    def categorized(transactions):
+        for index, trans in enumerate(transactions):
+            before = trans.get("category")
+            # Like the in-memory path, an explicit null counts as categorized
+            if "category" not in trans or overwrite:
+                after = classifier.classify(trans["description"].lower(), default)
+                if after != before:
+                    trans["category"] = after
+                    changes.append(
+                        JournalChange(
+                            file_path, index, trans["description"], before or "", after,
+                        ),
+                    )
+            yield trans
+
+    with open(file_path, encoding="utf-8") as f:
+        reader = JsonJournalReader(f)
+        head = reader.read_head()
+        if dry_run:
+            for _ in categorized(reader.transactions()):
+                pass
+            return changes
+        with AtomicFile(file_path) as out:
+            transactions = categorized(reader.transactions())
+            write_json_journal(
+                out,
+                head,
+                transactions if reader.has_transactions else None,
+                reader.tail,
+            )
+            if not changes:
+                out.discard()
+    return changes
+
+
 class JournalCategorizer(BaseScript):
     """Categorizes transactions in journal files based on predefined rules."""
 
@@ -72,6 +171,7 @@ class JournalCategorizer(BaseScript):
         super().__init__(config_section="bookkeeping")
         self.fs: FileSystemInterface = fs or RealFileSystem()
         self.copy_func = copy_func or shutil.copy2
+        self._classifier: tuple[list, PatternClassifier[str]] | None = None
 
     def load_classification_rules(self, rules_file: str) -> dict[str, Any]:
         """
@@ -145,10 +245,30 @@ class JournalCategorizer(BaseScript):
 
         """
         description = transaction["description"].lower()
-        for pattern in rules["patterns"]:
-            if re.search(pattern["regex"], description):
-                return pattern["category"]
-        return rules["default_category"]
+        return self.get_classifier(rules).classify(
+            description, rules["default_category"],
+        )
+
+    def get_classifier(self, rules: dict[str, Any]) -> PatternClassifier[str]:
+        """
+        Compiled classifier for a rules dictionary.
+
+        The classifier is rebuilt when a different patterns list is passed,
+        so rules are compiled once per load rather than once per transaction.
+
+        Args:
+        ----
+            rules: A dictionary containing the classification rules.
+
+        Returns:
+        -------
+            A classifier over the rules' patterns, in order.
+
+        """
+        patterns = rules["patterns"]
+        if self._classifier is None or self._classifier[0] is not patterns:
+            self._classifier = (patterns, build_classifier(rules))
+        return self._classifier[1]
 
     def process_journal_file(self, file_path: str, rules: dict[str, Any]) -> bool:
         """
@@ -209,23 +329,65 @@ class JournalCategorizer(BaseScript):
 
         return True
 
-    def process_by_year_files(self, base_dir: str, rules: dict[str, Any]) -> None:
+    def process_by_year_files(
+        self,
+        base_dir: str,
+        rules: dict[str, Any],
+        workers: int | None = None,
+        dry_run: bool = False,
+        overwrite: bool = False,
+    ) -> list[JournalChange]:
         """
         Process all journal files within a base directory, organized by year.
 
+        By default each file is loaded, backed up and rewritten in turn.
+        With workers set (or dry_run), files are instead streamed through
+        categorize_journal_file in a process pool and replaced atomically.
+
         Args:
         ----
             base_dir: The base directory containing the journal files.
             rules: A dictionary containing the classification rules.
+            workers: Process pool size for the streaming mode; 0 uses
+                every CPU.
+            dry_run: Log the changed transactions without writing files.
+            overwrite: Recategorize transactions that already have a
+                category (streaming mode only).
+
+        Returns:
+        -------
+            The changed transactions in streaming mode, otherwise empty.
 
         """
+        file_paths = []
         for year_dir in self.fs.listdir(base_dir):
             year_path = self.fs.join(base_dir, year_dir)
             if self.fs.isdir(year_path):
                 for filename in self.fs.listdir(year_path):
                     if filename.endswith(".json"):
-                        file_path = self.fs.join(year_path, filename)
-                        self.process_journal_file(file_path, rules)
+                        file_paths.append(self.fs.join(year_path, filename))
+
+        if workers is None and not dry_run:
+            for file_path in file_paths:
+                self.process_journal_file(file_path, rules)
+            return []
+
+        task = partial(
+            categorize_journal_file, rules=rules, dry_run=dry_run, overwrite=overwrite,
+        )
+        changes = [
+            change
+            for file_changes in run_parallel(task, file_paths, workers)
+            for change in file_changes
+        ]
+        if dry_run:
+            for change in changes:
+                self.logger.info(change.diff())
+        self.logger.info(
+            f"{'Would change' if dry_run else 'Changed'} {len(changes)} transactions "
+            f"in {len(file_paths)} files",
+        )
+        return changes
 
     def execute(self) -> int:
         """
@@ -241,9 +403,17 @@ class JournalCategorizer(BaseScript):
             "classification_rules", "classification_rules.json",
         )
 
+        workers = self.get_config_value("journal_workers", None)
+        dry_run = bool(self.get_config_value("dry_run", False))
+
         try:
             rules = self.load_classification_rules(rules_file)
-            self.process_by_year_files(base_dir, rules)
+            self.process_by_year_files(
+                base_dir,
+                rules,
+                workers=None if workers is None else int(workers),
+                dry_run=dry_run,
+            )
             return 0
         except Exception:
             return 1
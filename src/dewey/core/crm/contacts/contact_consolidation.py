@@ -5,16 +5,29 @@ Contact Consolidation Script
 
 This script consolidates contact information from various tables in the MotherDuck database
 into a single unified_contacts table, focusing on individuals.
+
+Contacts with the same address are merged directly. Addresses that belong to
+the same person are then found with the blocking entity resolver in
+entity_resolution.py; each run only matches addresses it has not seen before.
 """
 
 import json
+from email.utils import parseaddr
 from typing import Any
 
 import duckdb
 
 from dewey.core.base_script import BaseScript
+from dewey.core.crm.contacts.entity_resolution import (
+    ContactRecord,
+    EntityResolver,
+    canonical_email,
+)
 from dewey.core.db.connection import db_manager
 
+# Block keys per candidate lookup query
+_KEY_CHUNK = 1000
+
 
 class ContactConsolidation(BaseScript):
     """Consolidates contact information from various sources into a unified table."""
@@ -30,8 +43,9 @@ class ContactConsolidation(BaseScript):
         This method handles the entire workflow of:
         1. Creating the unified contacts table
         2. Extracting contacts from various sources
-        3. Merging contacts
-        4. Inserting them into the unified table
+        3. Merging contacts with the same address
+        4. Resolving addresses that belong to the same person
+        5. Inserting them into the unified table
         """
         self.logger.info("Starting execution of ContactConsolidation")
 
@@ -50,6 +64,8 @@ class ContactConsolidation(BaseScript):
                 merged_contacts = self.merge_contacts(
                     crm_contacts + email_contacts + subscribers,
                 )
+                entity_of = self.resolve_entities(conn, merged_contacts)
+                merged_contacts = self.consolidate_entities(merged_contacts, entity_of)
 
                 # Insert contacts into unified table
                 self.insert_unified_contacts(conn, merged_contacts)
@@ -125,6 +141,35 @@ class ContactConsolidation(BaseScript):
             )
             """,
             )
+            # Resolution state: every address seen, its entity, and the
+            # blocking keys new addresses are matched through
+            conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS contact_identities (
+                email VARCHAR PRIMARY KEY,
+                entity_email VARCHAR NOT NULL,
+                first_name VARCHAR,
+                last_name VARCHAR,
+                phone_suffix VARCHAR
+            )
+            """,
+            )
+            conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS contact_block_keys (
+                block_key VARCHAR NOT NULL,
+                email VARCHAR NOT NULL
+            )
+            """,
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_contact_block_keys_key "
+                "ON contact_block_keys(block_key)",
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_contact_identities_entity "
+                "ON contact_identities(entity_email)",
+            )
             self.logger.info("Created or verified unified_contacts table")
         except Exception as e:
             self.logger.error(f"Error creating unified_contacts table: {e}")
@@ -546,29 +591,174 @@ class ContactConsolidation(BaseScript):
         merged_contacts = {}
 
         for contact in contacts:
-            email = contact["email"]
+            email = canonical_email(contact["email"])
             if not email:
                 continue
 
-            email = email.lower().strip()
+            # Keep the display name of addresses like "Jane Doe <jane@...>"
+            display_name, _ = parseaddr(contact["email"])
+            if display_name and not contact.get("full_name"):
+                contact = {**contact, "full_name": display_name}
 
             if email not in merged_contacts:
-                merged_contacts[email] = contact
+                merged_contacts[email] = {**contact, "email": email}
                 continue
 
-            # Merge with existing contact, prioritizing non-null values
-            existing = merged_contacts[email]
-            for key, value in contact.items():
-                if key == "email":
-                    continue
-
-                # For all other fields, prefer non-null values
-                if value is not None and existing[key] is None:
-                    existing[key] = value
+            self._fill_missing(merged_contacts[email], contact)
 
         self.logger.info(f"Merged contacts into {len(merged_contacts)} unique contacts")
         return merged_contacts
 
+    @staticmethod
+    def _fill_missing(existing: dict[str, Any], contact: dict[str, Any]) -> None:
+        """Copy the contact's values into the fields existing lacks."""
+        for key, value in contact.items():
+            if key == "email":
+                continue
+
+            # For all other fields, prefer non-null values
+            if value is not None and existing.get(key) is None:
+                existing[key] = value
+
+    def resolve_entities(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        contacts: dict[str, dict[str, Any]],
+    ) -> dict[str, str]:
+        """
+        Assign every contact to an entity, matching only new addresses.
+
+        Addresses not yet in contact_identities are compared with the known
+        addresses that share one of their blocking keys, and with each
+        other. Their identities and keys are then stored; if a new address
+        joins two known entities, the later entity is folded into the
+        earlier one.
+
+        Args:
+        ----
+            conn: DuckDB connection
+            contacts: Merged contacts keyed by email
+
+        Returns:
+        -------
+            Entity email of each contact email
+
+        """
+        resolver = EntityResolver(
+            threshold=float(self.get_config_value("match_threshold", 0.8)),
+            max_block_size=int(self.get_config_value("max_block_size", 1000)),
+        )
+        known = {
+            row[0]
+            for row in conn.execute("SELECT email FROM contact_identities").fetchall()
+        }
+        new_records = [
+            record
+            for record in map(ContactRecord.from_contact, contacts.values())
+            if record is not None and record.email not in known
+        ]
+
+        previous_entity = {}
+        block_keys = sorted(set().union(*(r.block_keys() for r in new_records)))
+        for start in range(0, len(block_keys), _KEY_CHUNK):
+            chunk = block_keys[start : start + _KEY_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"""
+            SELECT DISTINCT i.email, i.entity_email, i.first_name, i.last_name,
+                i.phone_suffix
+            FROM contact_block_keys b
+            JOIN contact_identities i ON i.email = b.email
+            WHERE b.block_key IN (
+                SELECT block_key FROM contact_block_keys
+                WHERE block_key IN ({placeholders})
+                GROUP BY block_key
+                HAVING count(*) < ?
+            )
+            """,
+                [*chunk, resolver.max_block_size],
+            ).fetchall()
+            for email, entity, first_name, last_name, phone in rows:
+                record = ContactRecord(email, first_name or "", last_name or "", phone)
+                resolver.seed(record, entity)
+                previous_entity[email] = entity
+
+        matches = resolver.add(new_records)
+        self.logger.info(
+            f"Resolved {len(new_records)} new addresses against "
+            f"{len(previous_entity)} known candidates ({len(matches)} matches)",
+        )
+
+        if new_records:
+            conn.executemany(
+                "INSERT INTO contact_identities VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        r.email,
+                        resolver.entity(r.email),
+                        r.first_name,
+                        r.last_name,
+                        r.phone,
+                    )
+                    for r in new_records
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO contact_block_keys VALUES (?, ?)",
+                [(key, r.email) for r in new_records for key in r.block_keys()],
+            )
+        folded = {
+            entity: resolver.entity(email)
+            for email, entity in previous_entity.items()
+            if resolver.entity(email) != entity
+        }
+        if folded:
+            conn.executemany(
+                "UPDATE contact_identities SET entity_email = ? WHERE entity_email = ?",
+                [(new, old) for old, new in folded.items()],
+            )
+            self.logger.info(f"Folded {len(folded)} entities into earlier ones")
+
+        entity_of = dict(
+            conn.execute("SELECT email, entity_email FROM contact_identities").fetchall(),
+        )
+        return {email: entity_of.get(email, email) for email in contacts}
+
+    def consolidate_entities(
+        self,
+        contacts: dict[str, dict[str, Any]],
+        entity_of: dict[str, str],
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Merge the contacts of each entity into one, keyed by the entity email.
+
+        The contact whose address is the entity email takes precedence;
+        the others only fill fields it lacks.
+
+        Args:
+        ----
+            contacts: Merged contacts keyed by email
+            entity_of: Entity email of each contact email
+
+        Returns:
+        -------
+            Dictionary of merged contacts keyed by entity email
+
+        """
+        entities: dict[str, dict[str, Any]] = {}
+        ordered = sorted(contacts, key=lambda email: email != entity_of[email])
+        for email in ordered:
+            entity = entity_of[email]
+            if entity not in entities:
+                entities[entity] = {**contacts[email], "email": entity}
+            else:
+                self._fill_missing(entities[entity], contacts[email])
+
+        self.logger.info(
+            f"Consolidated {len(contacts)} addresses into {len(entities)} people",
+        )
+        return entities
+
     def insert_unified_contacts(
         self, conn: duckdb.DuckDBPyConnection, contacts: dict[str, dict[str, Any]],
     ) -> None:
@@ -2,6 +2,7 @@ from typing import Any
 
 import pandas as pd
 from dewey.core.base_script import BaseScript
+from dewey.utils.database import insert_many
 
 
 class CsvContactIntegration(BaseScript):
@@ -85,13 +86,9 @@ class CsvContactIntegration(BaseScript):
             if df.empty:
                 self.logger.info("CSV file is empty or contains only headers.")
             else:
-                # Iterate over rows and insert data into the database
-                for index, row in df.iterrows():
-                    # Extract contact data from the row
-                    contact_data = row.to_dict()
-
-                    # Insert contact data into the database
-                    self.insert_contact(contact_data)
+                # Insert all rows in one transaction, with empty cells as NULL
+                contacts = df.astype(object).where(df.notna(), None).to_dict("records")
+                self.insert_contacts(contacts)
 
             self.logger.info("CSV processing completed.")
 
@@ -118,27 +115,46 @@ class CsvContactIntegration(BaseScript):
         ------
             Exception: If any error occurs during contact insertion.
 
+        """
+        self.insert_contacts([contact_data])
+
+    def insert_contacts(self, contacts: list[dict[str, Any]]) -> int:
+        """
+        Inserts many contacts into the CRM system in one transaction.
+
+        Args:
+        ----
+            contacts: A list of dictionaries containing contact data.
+
+        Returns:
+        -------
+            The number of contacts inserted.
+
+        Raises:
+        ------
+            ValueError: If a contact is empty.
+            TypeError: If a contact holds an unsupported value type.
+            Exception: If any error occurs during contact insertion.
+
         """
         try:
-            # Validate data
-            if not contact_data:
-                raise ValueError("Empty contact data")
+            for contact_data in contacts:
+                # Validate data
+                if not contact_data:
+                    raise ValueError("Empty contact data")
 
-            # Validate data types - ensure all values can be safely converted to strings
-            for key, value in contact_data.items():
-                if not isinstance(value, (str, int, float, bool, type(None))):
-                    raise TypeError(f"Unsupported data type for {key}: {type(value)}")
+                # Validate data types - ensure all values can be safely stored
+                for key, value in contact_data.items():
+                    if not isinstance(value, (str, int, float, bool, type(None))):
+                        raise TypeError(f"Unsupported data type for {key}: {type(value)}")
 
             # Insert contact data into the database
             table_name = "contacts"  # Replace with your actual table name
-            columns = ", ".join(contact_data.keys())
-            values = ", ".join([f"'{value}'" for value in contact_data.values()])
-            query = f"INSERT INTO {table_name} ({columns}) VALUES ({values})"
-
-            # Execute the query using the database connection
-            self.db_conn.execute(query)
+            page_size = self.get_config_value("batch_size", 1000)
+            inserted = insert_many(table_name, contacts, page_size=page_size)
 
-            self.logger.info(f"Inserted contact: {contact_data}")
+            self.logger.info(f"Inserted {inserted} contacts")
+            return inserted
 
         except Exception as e:
             self.logger.error(f"An error occurred during contact insertion: {e}")
@@ -0,0 +1,409 @@
+"""
+Fuzzy entity resolution for contacts.
+
+Comparing every contact with every other is quadratic, so contacts are
+only compared within blocks that share a cheap key: the email domain, a
+Soundex key of the name, the normalized email local part, or the last
+seven digits of a phone number. Candidate pairs from all blocks are scored
+together with numpy on character-bigram vectors, and pairs above the
+threshold are joined with union-find into entities.
+
+EntityResolver is incremental: contacts already resolved are seeded with
+their entity, and add() only scores pairs involving the contacts passed
+to it.
+"""
+
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from email.utils import parseaddr
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Domains shared by unrelated people; they are not used as blocking keys
+FREE_MAIL_DOMAINS = frozenset(
+    {
+        "aol.com",
+        "gmail.com",
+        "googlemail.com",
+        "hotmail.com",
+        "icloud.com",
+        "live.com",
+        "mac.com",
+        "me.com",
+        "msn.com",
+        "outlook.com",
+        "proton.me",
+        "protonmail.com",
+        "yahoo.com",
+    },
+)
+
+PHONE_SUFFIX_DIGITS = 7
+
+# Bigram vectors index pairs of these characters, so there are no collisions
+_ALPHABET = " abcdefghijklmnopqrstuvwxyz0123456789"
+_CHAR_INDEX = {char: i for i, char in enumerate(_ALPHABET)}
+_DIM = len(_ALPHABET) ** 2
+
+# Candidate pairs scored per numpy batch
+_PAIR_CHUNK = 4096
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def canonical_email(value: str | None) -> str | None:
+    """
+    Extract and lowercase the address from an email header value.
+
+    Args:
+    ----
+        value: An address, optionally with a display name.
+
+    Returns:
+    -------
+        The lowercased address, or None if there is none.
+
+    """
+    if not value:
+        return None
+    _, address = parseaddr(value)
+    address = (address or value).strip().lower()
+    return address if "@" in address else None
+
+
+def normalize_local_part(address: str) -> str:
+    """
+    Reduce an address's local part to the letters and digits that identify it.
+
+    Plus-address tags are dropped, as are dots and other punctuation, so
+    ``Jane.Doe+news@`` and ``janedoe@`` give the same result.
+    """
+    local = address.split("@", 1)[0].split("+", 1)[0]
+    return re.sub(r"[^a-z0-9]", "", local.lower())
+
+
+def normalize_name(value: str | None) -> str:
+    """Lowercase a name, strip accents and keep only letters and spaces."""
+    if not value:
+        return ""
+    ascii_value = (
+        unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode()
+    )
+    return " ".join(re.sub(r"[^a-z ]", " ", ascii_value.lower()).split())
+
+
+def soundex(name: str) -> str:
+    """
+    American Soundex code of a name.
+
+    Args:
+    ----
+        name: A normalized (lowercase ASCII) name.
+
+    Returns:
+    -------
+        Four-character code such as ``r163``, or "" for an empty name.
+
+    """
+    letters = [char for char in name if char.isalpha()]
+    if not letters:
+        return ""
+    code = letters[0]
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code
+        if char not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def phone_suffix(phone: str | None) -> str | None:
+    """Last seven digits of a phone number, or None if it has fewer."""
+    digits = re.sub(r"\D", "", phone or "")
+    if len(digits) < PHONE_SUFFIX_DIGITS:
+        return None
+    return digits[-PHONE_SUFFIX_DIGITS:]
+
+
+@dataclass
+class ContactRecord:
+    """The fields of a contact used for matching."""
+
+    email: str
+    first_name: str = ""
+    last_name: str = ""
+    phone: str | None = None
+    domain: str = field(init=False)
+    local: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Derive the domain and normalized local part from the email."""
+        self.domain = self.email.rsplit("@", 1)[-1]
+        self.local = normalize_local_part(self.email)
+
+    @classmethod
+    def from_contact(cls, contact: dict[str, Any]) -> "ContactRecord | None":
+        """
+        Build a record from a contact dict as extracted by ContactConsolidation.
+
+        Names are taken from first_name/last_name, then full_name, then the
+        display name in the email field.
+
+        Returns
+        -------
+            The record, or None if the contact has no usable email.
+
+        """
+        email = canonical_email(contact.get("email"))
+        if not email:
+            return None
+        first = normalize_name(contact.get("first_name"))
+        last = normalize_name(contact.get("last_name"))
+        if not (first or last):
+            display_name, _ = parseaddr(contact.get("email") or "")
+            parts = normalize_name(contact.get("full_name") or display_name).split()
+            if parts:
+                first, last = parts[0], " ".join(parts[1:])
+        return cls(email, first, last, phone_suffix(contact.get("phone")))
+
+    @property
+    def name(self) -> str:
+        """Normalized full name."""
+        return f"{self.first_name} {self.last_name}".strip()
+
+    def block_keys(self) -> set[str]:
+        """Keys of the blocks this record is compared within."""
+        keys = set()
+        if self.domain not in FREE_MAIL_DOMAINS:
+            keys.add(f"domain:{self.domain}")
+        if len(self.local) >= 4:
+            keys.add(f"local:{self.local}")
+        if self.first_name and self.last_name:
+            keys.add(f"name:{soundex(self.first_name)}:{soundex(self.last_name)}")
+        elif self.name:
+            keys.add(f"name:{soundex(self.name)}")
+        if self.phone:
+            keys.add(f"phone:{self.phone}")
+        return keys
+
+
+class UnionFind:
+    """Disjoint sets where the earliest added member of a set is its root."""
+
+    def __init__(self) -> None:
+        """Start with no sets."""
+        self.parent: dict[str, str] = {}
+        self.order: dict[str, int] = {}
+
+    def add(self, item: str, root: str | None = None) -> None:
+        """Add an item, optionally into the set rooted at root."""
+        for key in (root, item):
+            if key is not None and key not in self.parent:
+                self.parent[key] = key
+                self.order[key] = len(self.order)
+        if root is not None:
+            self.union(item, root)
+
+    def find(self, item: str) -> str:
+        """Root of the item's set."""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: str, b: str) -> str:
+        """Join the sets of a and b and return the new root."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.order[root_b] < self.order[root_a]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        return root_a
+
+
+def bigram_vectors(strings: list[str]) -> np.ndarray:
+    """
+    Count the character bigrams of each string.
+
+    Args:
+    ----
+        strings: Normalized strings; characters outside a-z, 0-9 and space
+            are ignored.
+
+    Returns:
+    -------
+        A ``(len(strings), 1369)`` array of bigram counts.
+
+    """
+    vectors = np.zeros((len(strings), _DIM), dtype=np.uint16)
+    for row, value in enumerate(strings):
+        indexes = [_CHAR_INDEX[char] for char in f" {value} " if char in _CHAR_INDEX]
+        if len(indexes) < 3:
+            continue
+        codes = np.asarray(indexes[:-1]) * len(_ALPHABET) + np.asarray(indexes[1:])
+        np.add.at(vectors[row], codes, 1)
+    return vectors
+
+
+def dice_similarity(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Row-wise Dice coefficient of two equally shaped bigram count arrays."""
+    overlap = np.minimum(left, right).sum(axis=1, dtype=np.float32)
+    total = left.sum(axis=1, dtype=np.float32) + right.sum(axis=1, dtype=np.float32)
+    return np.divide(
+        2 * overlap, total, out=np.zeros_like(total), where=total > 0,
+    )
+
+
+class EntityResolver:
+    """Incrementally clusters contact records that refer to the same person."""
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        max_block_size: int = 1000,
+        name_weight: float = 0.6,
+        local_weight: float = 0.25,
+        domain_weight: float = 0.15,
+        phone_bonus: float = 0.3,
+    ):
+        """
+        Initialize the resolver.
+
+        A pair's score is the weighted sum of its name similarity, email
+        local-part similarity and whether the domains are equal, plus a
+        bonus when the phone suffixes match.
+
+        Args:
+        ----
+            threshold: Minimum score for two records to be merged.
+            max_block_size: Blocks with more members are skipped, since
+                keys that common (a large employer's domain) say little.
+            name_weight: Weight of the name similarity.
+            local_weight: Weight of the local-part similarity.
+            domain_weight: Weight of an exact domain match.
+            phone_bonus: Added when both records have the same phone suffix.
+
+        """
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.name_weight = name_weight
+        self.local_weight = local_weight
+        self.domain_weight = domain_weight
+        self.phone_bonus = phone_bonus
+        self.records: dict[str, ContactRecord] = {}
+        self.blocks: dict[str, list[str]] = defaultdict(list)
+        self.clusters = UnionFind()
+
+    def seed(self, record: ContactRecord, entity: str) -> None:
+        """
+        Add an already resolved record without comparing it.
+
+        Args:
+        ----
+            record: Record resolved in an earlier run.
+            entity: Email of the entity it belongs to.
+
+        """
+        if record.email in self.records:
+            return
+        self.records[record.email] = record
+        self.clusters.add(record.email, entity)
+        for key in record.block_keys():
+            self.blocks[key].append(record.email)
+
+    def add(self, records: Iterable[ContactRecord]) -> list[tuple[str, str, float]]:
+        """
+        Add new records and merge them into matching entities.
+
+        Args:
+        ----
+            records: Records not yet resolved.
+
+        Returns:
+        -------
+            The matched pairs with their scores.
+
+        """
+        pairs = set()
+        for record in records:
+            if record.email in self.records:
+                continue
+            self.records[record.email] = record
+            self.clusters.add(record.email)
+            for key in record.block_keys():
+                members = self.blocks[key]
+                if len(members) < self.max_block_size:
+                    pairs.update((other, record.email) for other in members)
+                members.append(record.email)
+
+        matches = []
+        pairs = sorted(pairs)
+        for start in range(0, len(pairs), _PAIR_CHUNK):
+            chunk = pairs[start : start + _PAIR_CHUNK]
+            scores = self.score(
+                [self.records[a] for a, _ in chunk],
+                [self.records[b] for _, b in chunk],
+            )
+            for (a, b), score in zip(chunk, scores, strict=True):
+                if score >= self.threshold:
+                    self.clusters.union(a, b)
+                    matches.append((a, b, float(score)))
+        logger.debug(f"Scored {len(pairs)} candidate pairs, {len(matches)} matched")
+        return matches
+
+    def score(
+        self, left: list[ContactRecord], right: list[ContactRecord],
+    ) -> np.ndarray:
+        """Scores of the record pairs ``(left[i], right[i])``."""
+        name_similarity = dice_similarity(
+            bigram_vectors([record.name for record in left]),
+            bigram_vectors([record.name for record in right]),
+        )
+        local_similarity = dice_similarity(
+            bigram_vectors([record.local for record in left]),
+            bigram_vectors([record.local for record in right]),
+        )
+        same_domain = np.array(
+            [a.domain == b.domain for a, b in zip(left, right, strict=True)],
+        )
+        same_phone = np.array(
+            [
+                a.phone is not None and a.phone == b.phone
+                for a, b in zip(left, right, strict=True)
+            ],
+        )
+        return (
+            self.name_weight * name_similarity
+            + self.local_weight * local_similarity
+            + self.domain_weight * same_domain
+            + self.phone_bonus * same_phone
+        )
+
+    def entity(self, email: str) -> str:
+        """Email of the entity a record belongs to."""
+        return self.clusters.find(email)
+
+    def entities(self) -> dict[str, str]:
+        """Entity email of every record."""
+        return {email: self.clusters.find(email) for email in self.records}
@@ -8,13 +8,12 @@ import os
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from psycopg2 import Error as PsycopgError
+from psycopg2.extras import Json
 
 from dewey.core.base_script import BaseScript
-from dewey.core.db.connection import db_manager
-from dewey.core.db.models import ClientCommunicationsIndex, Emails
 from dewey.core.exceptions import DatabaseConnectionError
+from dewey.utils.database import fetch_all, get_db_cursor, insert_many
 
 
 class GmailImporter(BaseScript):
@@ -81,9 +80,12 @@ class GmailImporter(BaseScript):
             self.logger.error(f"Failed to load credentials: {e}")
             raise
 
-    def _email_exists(self, session: Session, msg_id: str) -> bool:
-        """Check if email already exists in database."""
-        return session.query(Emails).get(msg_id) is not None
+    def _existing_msg_ids(self, msg_ids: list[str]) -> set[str]:
+        """Return the subset of message IDs already stored in the database."""
+        if not msg_ids:
+            return set()
+        rows = fetch_all("SELECT msg_id FROM emails WHERE msg_id = ANY(%s)", [msg_ids])
+        return {row[0] for row in rows}
 
     def _transform_email(self, message: dict) -> dict:
         """Transform Gmail API response to database model format."""
@@ -136,41 +138,45 @@ class GmailImporter(BaseScript):
             return "\n".join(self._decode_part(p) for p in part["parts"])
         return ""
 
-    def _process_batch(self, session: Session, messages: list[dict]) -> None:
+    def _process_batch(self, messages: list[dict]) -> None:
         """Process a batch of emails with idempotent inserts."""
-        new_emails = 0
+        existing = self._existing_msg_ids([message["id"] for message in messages])
         skipped = 0
+        emails = []
+        index_entries = []
 
         for message in messages:
             msg_id = message["id"]
-            if self._email_exists(session, msg_id):
+            if msg_id in existing:
                 skipped += 1
                 continue
 
             try:
                 email_data = self._transform_email(message)
-                email = Emails(**email_data)
-                session.add(email)
-                new_emails += 1
-
-                # Create ClientCommunicationsIndex entry
-                cci = ClientCommunicationsIndex(
-                    thread_id=email.thread_id,
-                    client_email=email.from_address,
-                    subject=email.subject,
-                    client_message=email.body_text,
-                    client_msg_id=email.msg_id,
-                )
-                session.add(cci)
-
             except Exception as e:
                 self.logger.error(f"Failed to process email {msg_id}: {e}")
+                continue
+
+            emails.append({**email_data, "raw_data": Json(email_data["raw_data"])})
+            index_entries.append(
+                {
+                    "thread_id": email_data["thread_id"],
+                    "client_email": email_data["from_address"],
+                    "subject": email_data["subject"],
+                    "client_message": email_data["body_text"],
+                    "client_msg_id": email_data["msg_id"],
+                },
+            )
 
         try:
-            session.commit()
+            # Both tables are written in one transaction, a page at a time
+            with get_db_cursor(commit=True) as cursor:
+                new_emails = insert_many(
+                    "emails", emails, conflict_target=["msg_id"], cursor=cursor,
+                )
+                insert_many("client_communications_index", index_entries, cursor=cursor)
             self.logger.info(f"Batch processed - New: {new_emails}, Skipped: {skipped}")
-        except SQLAlchemyError as e:
-            session.rollback()
+        except PsycopgError as e:
             self.logger.error(f"Batch commit failed: {e}")
             raise DatabaseConnectionError("Failed to commit email batch")
 
@@ -182,10 +188,9 @@ class GmailImporter(BaseScript):
             self._init_gmail_client()
             messages = self._fetch_emails(args.max_results, args.label)
 
-            with db_manager.get_session() as session:
-                for i in range(0, len(messages), args.batch_size):
-                    batch = messages[i : i + args.batch_size]
-                    self._process_batch(session, batch)
+            for i in range(0, len(messages), args.batch_size):
+                batch = messages[i : i + args.batch_size]
+                self._process_batch(batch)
 
             self.logger.info("Email import completed successfully")
 
@@ -1,20 +1,26 @@
 import argparse
-import email
 import imaplib
 import json
 import os
-import re
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from email.header import decode_header
 from email.message import Message
+from functools import partial
 from typing import Any
 
 import duckdb
 from dotenv import load_dotenv
 
 from dewey.core.base_script import BaseScript
+from dewey.core.crm.email.imap_pipeline import FetchedMessage, IMAPPipeline
+from dewey.core.crm.email.mime_message import (
+    BlobStore,
+    ParsedMessage,
+    decode_email_header,
+    decode_payload,
+    get_message_structure,
+)
+from dewey.core.crm.message_dedupe import DuckDBIDSource, MessageDedupe
 
 # Load environment variables from .env file
 load_dotenv()
@@ -65,6 +71,103 @@ def safe_json_dumps(data: Any, encoder: json.JSONEncoder | None = None) -> str:
             )
 
 
+def parse_email_message(
+    email_data: bytes, blob_store: BlobStore | None = None,
+) -> dict[str, Any]:
+    """
+    Parse email message data into a structured dictionary.
+
+    Args:
+    ----
+        email_data: Raw email data
+        blob_store: Where attachment content is written; attachments are
+            only hashed without one
+
+    Returns:
+    -------
+        Dictionary containing parsed email data
+
+    """
+    msg = ParsedMessage(email_data, blob_store)
+    from_addr = msg.from_address
+    date_obj = msg.date
+    body_text = msg.body_text
+    body_html = msg.body_html
+
+    # Define from_name with a helper function to improve readability
+    def extract_name(addr):
+        return addr.split("<")[0].strip() if "<" in addr else ""
+
+    # Process list of addresses with a helper function
+    def extract_addresses(header_value):
+        if not header_value:
+            return []
+        return [addr.strip() for addr in header_value.split(",") if addr.strip()]
+
+    # Prepare metadata (store to_addresses, cc_addresses, bcc_addresses here)
+    metadata = {
+        "from_name": extract_name(from_addr),
+        "to_addresses": extract_addresses(msg.to),
+        "cc_addresses": extract_addresses(msg.headers["Cc"]),
+        "bcc_addresses": extract_addresses(msg.headers["Bcc"]),
+        "received_date": date_obj.isoformat() if date_obj else None,
+        "body_text": body_text,
+        "body_html": body_html,
+        "message_id": msg.message_id,
+    }
+
+    # Calculate internal_date as Unix timestamp if available
+    internal_date = int(date_obj.timestamp() * 1000) if date_obj else None
+
+    # Store message parts as JSON for compatibility
+    message_parts = {"text": body_text, "html": body_html}
+
+    # Return structured email data matching MotherDuck schema
+    return {
+        "msg_id": msg.message_id,  # Will be replaced with Gmail ID
+        "thread_id": None,  # Will be replaced with Gmail thread ID
+        "subject": msg.subject,
+        "from_address": from_addr,
+        "analysis_date": datetime.now().isoformat(),
+        "raw_analysis": safe_json_dumps(
+            {"headers": msg.header_items(), "structure": msg.structure()},
+        ),
+        "metadata": safe_json_dumps(metadata),
+        "snippet": body_text[:500] if body_text else "",
+        "internal_date": internal_date,
+        "size_estimate": len(email_data),
+        "message_parts": safe_json_dumps(message_parts),
+        "attachments": safe_json_dumps(msg.attachments),
+        "status": "new",
+    }
+
+
+def parse_fetched_message(
+    message: FetchedMessage, blob_store: BlobStore | None = None,
+) -> dict[str, Any]:
+    """
+    Parse one message from a UID FETCH into an ``emails`` row.
+
+    Runs in the importer's process pool, so it is a module-level function.
+
+    Args:
+    ----
+        message: Message with its Gmail ids and RFC822 source.
+        blob_store: Where attachment content is written.
+
+    Returns:
+    -------
+        Row dict keyed by Gmail message id when the server provides one.
+
+    """
+    email_data = parse_email_message(message.raw, blob_store)
+    email_data["msg_id"] = (
+        message.gmail_msgid or email_data["msg_id"] or f"uid:{message.uid}"
+    )
+    email_data["thread_id"] = message.gmail_thrid
+    return email_data
+
+
 class UnifiedIMAPImporter(BaseScript):
     """Unified IMAP importer supporting both database and MotherDuck."""
 
@@ -179,7 +282,10 @@ class UnifiedIMAPImporter(BaseScript):
             "--max", type=int, default=1000, help="Maximum emails to import",
         )
         parser.add_argument(
-            "--batch-size", type=int, default=10, help="Batch size for processing",
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of UIDs per FETCH command and database INSERT",
         )
         parser.add_argument(
             "--historical", action="store_true", help="Import all historical emails",
@@ -190,7 +296,16 @@ class UnifiedIMAPImporter(BaseScript):
             "--workers",
             type=int,
             default=4,
-            help="Number of worker threads for parallel processing",
+            help="Number of processes parsing messages (0 parses inline)",
+        )
+        parser.add_argument(
+            "--blob-dir",
+            help="Directory for attachment files (default: ~/.dewey/blobs)",
+        )
+        parser.add_argument(
+            "--rescan",
+            action="store_true",
+            help="Ignore the UID checkpoint and search the whole date range",
         )
         return parser
 
@@ -307,434 +422,121 @@ class UnifiedIMAPImporter(BaseScript):
                 raise
 
     def _decode_email_header(self, header: str) -> str:
-        """
-        Decode email header properly handling various encodings.
-
-        Args:
-        ----
-            header: Raw email header
-
-        Returns:
-        -------
-            Decoded header string
-
-        """
-        if not header:
-            return ""
-
-        decoded_parts = []
-        for part, encoding in decode_header(header):
-            if isinstance(part, bytes):
-                try:
-                    if encoding:
-                        decoded_parts.append(part.decode(encoding))
-                    else:
-                        decoded_parts.append(part.decode())
-                except Exception:  # Replacing bare except with Exception
-                    decoded_parts.append(part.decode("utf-8", "ignore"))
-            else:
-                decoded_parts.append(str(part))
-        return " ".join(decoded_parts)
+        """Decode an email header; see decode_email_header."""
+        return decode_email_header(header)
 
     def _decode_payload(self, payload: bytes, charset: str | None = None) -> str:
-        """
-        Decode email payload bytes to string.
-
-        Args:
-        ----
-            payload: The binary payload data
-            charset: Character set to use for decoding
-
-        Returns:
-        -------
-            Decoded string
-
-        """
-        if not payload:
-            return ""
-
-        if not charset:
-            charset = "utf-8"  # Default to UTF-8
-
-        try:
-            return payload.decode(charset)
-        except (UnicodeDecodeError, LookupError):
-            # If the specified charset fails, try some fallbacks
-            try:
-                return payload.decode("utf-8", errors="replace")
-            except UnicodeDecodeError:
-                try:
-                    return payload.decode("latin1", errors="replace")
-                except UnicodeDecodeError:
-                    return payload.decode("ascii", errors="replace")
+        """Decode payload bytes to a string; see decode_payload."""
+        return decode_payload(payload, charset)
 
     def _get_message_structure(self, msg: Message) -> dict[str, Any]:
-        """
-        Extract the structure of an email message for analysis.
-
-        Args:
-        ----
-            msg: The email message object
-
-        Returns:
-        -------
-            Dictionary with message structure information
-
-        """
-        if msg.is_multipart():
-            parts = []
-            for i, part in enumerate(msg.get_payload()):
-                part_info = {
-                    "part_index": i,
-                    "content_type": part.get_content_type(),
-                    "charset": part.get_content_charset(),
-                    "content_disposition": part.get("Content-Disposition", ""),
-                    "filename": part.get_filename(),
-                    "size": (len(part.as_bytes()) if hasattr(part, "as_bytes") else 0),
-                }
-
-                if part.is_multipart():
-                    part_info["subparts"] = self._get_message_structure(part)
-
-                parts.append(part_info)
-
-            return {"multipart": True, "parts": parts}
-        return {
-            "multipart": False,
-            "content_type": msg.get_content_type(),
-            "charset": msg.get_content_charset(),
-            "content_disposition": msg.get("Content-Disposition", ""),
-            "filename": msg.get_filename(),
-            "size": (len(msg.as_bytes()) if hasattr(msg, "as_bytes") else 0),
-        }
+        """Describe the MIME structure of a message; see get_message_structure."""
+        return get_message_structure(msg)
 
     def _parse_email_message(self, email_data: bytes) -> dict[str, Any]:
-        """
-        Parse email message data into a structured dictionary.
-
-        Args:
-        ----
-            email_data: Raw email data
-
-        Returns:
-        -------
-            Dictionary containing parsed email data
-
-        """
-        # Parse the email message
-        msg = email.message_from_bytes(email_data)
-
-        # Get basic headers
-        subject = self._decode_email_header(msg["Subject"])
-        from_addr = self._decode_email_header(msg["From"])
-        to_addr = self._decode_email_header(msg["To"])
-        date_str = msg["Date"]
-
-        # Try to parse the date
-        date_obj = None
-        if date_str:
-            try:
-                date_tuple = email.utils.parsedate_tz(date_str)
-                if date_tuple:
-                    timestamp = email.utils.mktime_tz(date_tuple)
-                    date_obj = datetime.fromtimestamp(timestamp)
-            except Exception:
-                pass
-
-        # Get message ID
-        message_id = msg["Message-ID"]
-
-        # Extract email body (both text and HTML)
-        body_text = ""
-        body_html = ""
-        attachments = []
-
-        if msg.is_multipart():
-            for part in msg.walk():
-                content_type = part.get_content_type()
-                content_disposition = str(part.get("Content-Disposition"))
-
-                # Skip any multipart/* parts
-                if content_type.startswith("multipart"):
-                    continue
-
-                # Handle attachments
-                if "attachment" in content_disposition:
-                    filename = part.get_filename()
-                    if filename:
-                        # Get attachment data
-                        payload = part.get_payload(decode=True)
-                        attachments.append(
-                            {
-                                "filename": filename,
-                                "content_type": content_type,
-                                "size": len(payload) if payload else 0,
-                            },
-                        )
-                    continue
-
-                # Try to get the payload
-                payload = part.get_payload(decode=True)
-                if payload:
-                    charset = part.get_content_charset()
-                    payload_str = self._decode_payload(payload, charset)
-
-                    if content_type == "text/plain":
-                        body_text += payload_str
-                    elif content_type == "text/html":
-                        body_html += payload_str
-        else:
-            # Not multipart - get the payload directly
-            payload = msg.get_payload(decode=True)
-            if payload:
-                charset = msg.get_content_charset()
-                payload_str = self._decode_payload(payload, charset)
-                content_type = msg.get_content_type()
-
-                if content_type == "text/plain":
-                    body_text = payload_str
-                elif content_type == "text/html":
-                    body_html = payload_str
-
-        # Get all headers for raw analysis
-        all_headers = {}
-        for key in msg.keys():
-            all_headers[key] = msg[key]
-
-        # Define from_name with a helper function to improve readability
-        def extract_name(addr):
-            return addr.split("<")[0].strip() if "<" in addr else ""
-
-        # Process list of addresses with a helper function
-        def extract_addresses(header_value):
-            if not header_value:
-                return []
-            return [addr.strip() for addr in header_value.split(",") if addr.strip()]
-
-        # Prepare metadata (store to_addresses, cc_addresses, bcc_addresses here)
-        metadata = {
-            "from_name": extract_name(from_addr),
-            "to_addresses": extract_addresses(to_addr),
-            "cc_addresses": extract_addresses(msg["Cc"]),
-            "bcc_addresses": extract_addresses(msg["Bcc"]),
-            "received_date": date_obj.isoformat() if date_obj else None,
-            "body_text": body_text,
-            "body_html": body_html,
-            "message_id": message_id,
-        }
-
-        # Calculate internal_date as Unix timestamp if available
-        internal_date = int(date_obj.timestamp() * 1000) if date_obj else None
-
-        # Store message parts as JSON for compatibility
-        message_parts = {"text": body_text, "html": body_html}
-
-        # Return structured email data matching MotherDuck schema
-        return {
-            "msg_id": message_id,  # Will be replaced with Gmail ID
-            "thread_id": None,  # Will be replaced with Gmail thread ID
-            "subject": subject,
-            "from_address": from_addr,
-            "analysis_date": datetime.now().isoformat(),
-            "raw_analysis": safe_json_dumps(
-                {"headers": all_headers, "structure": self._get_message_structure(msg)},
-            ),
-            "metadata": safe_json_dumps(metadata),
-            "snippet": body_text[:500] if body_text else "",
-            "internal_date": internal_date,
-            "size_estimate": len(email_data),
-            "message_parts": safe_json_dumps(message_parts),
-            "attachments": safe_json_dumps(attachments),
-            "status": "new",
-        }
+        """Parse raw message bytes into a row dict; see parse_email_message."""
+        return parse_email_message(email_data)
 
     def _fetch_emails(
         self,
         imap: imaplib.IMAP4_SSL,
         days_back: int = 7,
         max_emails: int = 100,
-        batch_size: int = 10,
+        batch_size: int = 500,
         historical: bool = False,
         start_date: str | None = None,
         end_date: str | None = None,
-        num_workers: int = 4,  # Number of worker threads
+        num_workers: int = 4,
+        rescan: bool = False,
+        mailbox: str = '"[Gmail]/All Mail"',
+        blob_dir: str | None = None,
     ) -> None:
         """
-        Fetch emails from Gmail using IMAP with parallel processing.
+        Fetch emails from Gmail using pipelined UID FETCH commands.
+
+        Runs over all mail or over the last ``days_back`` days resume after
+        the mailbox's UID checkpoint when it covers that window. A wider
+        window than the checkpoint's (e.g. ``historical`` after runs over
+        the last week) is searched in full, and a fixed
+        ``start_date``/``end_date`` window is a backfill that neither uses
+        nor advances the checkpoint. Runs that do not resume recognize
+        stored messages with the dedupe filter before downloading their
+        bodies, and ``max_emails`` keeps the newest matches.
 
         Args:
         ----
-            imap: IMAP connection
+            imap: IMAP connection with the mailbox selected
             days_back: Number of days back to fetch
             max_emails: Maximum number of emails to fetch
-            batch_size: Number of emails to process in each batch
+            batch_size: Number of UIDs per FETCH command and INSERT
             historical: Whether to fetch all emails or just recent ones
             start_date: Optional start date in format YYYY-MM-DD
             end_date: Optional end date in format YYYY-MM-DD
-            num_workers: Number of worker threads for parallel processing
+            num_workers: Number of processes parsing messages
+            rescan: Ignore the UID checkpoint
+            mailbox: Selected mailbox, used to key the checkpoint
+            blob_dir: Directory attachments are written to by content hash
 
         """
         try:
-            # Get existing message IDs from database
-            existing_ids = self._get_existing_ids()
-
-            # Search for emails based on parameters
+            backfill = bool(start_date and end_date) and not historical
+            since = None
             if historical:
-                _, message_numbers = imap.search(None, "ALL")
-                num_msgs = len(message_numbers[0].split())
-                self.logger.debug("Found %d total messages", num_msgs)
-            elif start_date and end_date:
+                search_criteria = "ALL"
+            elif backfill:
                 # Format dates as DD-MMM-YYYY for IMAP
                 start_fmt = datetime.strptime(start_date, "%Y-%m-%d").strftime(
                     "%d-%b-%Y",
                 )
-
                 end_fmt = datetime.strptime(end_date, "%Y-%m-%d").strftime("%d-%b-%Y")
-
-                search_criteria = f"(SINCE {start_fmt} BEFORE {end_fmt})"
-                self.logger.info("Searching with criteria: %s", search_criteria)
-
-                _, message_numbers = imap.search(None, search_criteria)
-                num_msgs = len(message_numbers[0].split())
-
-                self.logger.debug(
-                    "Found %d messages between %s and %s", num_msgs, start_fmt, end_fmt,
-                )
+                search_criteria = f"SINCE {start_fmt} BEFORE {end_fmt}"
             else:
-                date_fmt = (datetime.now() - timedelta(days=days_back)).strftime(
-                    "%d-%b-%Y",
+                since = (datetime.now() - timedelta(days=days_back)).date()
+                search_criteria = f"SINCE {since.strftime('%d-%b-%Y')}"
+
+            pipeline = IMAPPipeline(
+                imap,
+                self.db_conn,
+                mailbox=mailbox,
+                parse=partial(parse_fetched_message, blob_store=BlobStore(blob_dir)),
+                batch_size=batch_size,
+                workers=num_workers,
+                use_checkpoint=not (rescan or backfill),
+                extra_columns={
+                    "batch_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
+                },
+            )
+            self.logger.info("Searching with criteria: %s", search_criteria)
+            uids = pipeline.pending_uids(search_criteria, since=since, limit=max_emails)
+            dedupe = None
+            if not pipeline.resumed:
+                dedupe = pipeline.dedupe = MessageDedupe(
+                    DuckDBIDSource(self.db_conn, "emails"),
                 )
-
-                _, message_numbers = imap.search(None, f"SINCE {date_fmt}")
-                num_msgs = len(message_numbers[0].split())
-
-                self.logger.debug("Found %d messages since %s", num_msgs, date_fmt)
-
-            message_numbers = [int(num) for num in message_numbers[0].split()]
-
-            # Reverse the list to process newest emails first
-            message_numbers.reverse()
-
-            total_processed = 0
-            batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-            processed_count = min(len(message_numbers), max_emails)
             self.logger.info(
-                "Processing %d emails in batches of %d with %d worker threads",
-                processed_count,
+                "Importing %d emails in batches of %d with %d parser processes",
+                len(uids),
                 batch_size,
                 num_workers,
             )
 
-            # Process in batches using multiple threads
-            max_to_process = min(len(message_numbers), max_emails)
-
-            # Create multiple IMAP connections for the worker threads
-            imap_connections = self._create_imap_connections(num_workers)
-
-            for i in range(0, max_to_process, batch_size):
-                batch = message_numbers[i : i + batch_size]
-                batch_num = i // batch_size + 1
-
-                self.logger.debug(
-                    "Processing batch %d of %d messages", batch_num, len(batch),
-                )
-
-                try:
-                    # Process each batch with parallel workers
-                    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-                        # Create tasks for each message in the batch
-                        futures = []
-                        for idx, msg_num in enumerate(batch):
-                            # Distribute connections among workers
-                            conn_idx = idx % len(imap_connections)
-                            conn = imap_connections[conn_idx]
-
-                            futures.append(
-                                executor.submit(
-                                    self._process_single_email,
-                                    conn,
-                                    msg_num,
-                                    existing_ids,
-                                    batch_id,
-                                ),
-                            )
-
-                        # Process results as they complete
-                        for future in as_completed(futures):
-                            try:
-                                result = future.result()
-                                if result:
-                                    total_processed += 1
-                                    if total_processed % 10 == 0:
-                                        self.logger.info(
-                                            "Progress: %d/%d emails processed",
-                                            total_processed,
-                                            max_to_process,
-                                        )
-                            except Exception as e:
-                                self.logger.error("Worker thread error: %s", str(e))
-
-                    self.logger.info(
-                        "Completed batch %d. Total processed: %d",
-                        batch_num,
-                        total_processed,
-                    )
-
-                except Exception as e:
-                    self.logger.error("Batch processing error: %s", str(e))
-
-                if total_processed >= max_emails:
-                    break
-
-                # Small delay between batches
-                time.sleep(1)
-
-            # Close the extra IMAP connections
-            for conn in imap_connections:
-                try:
-                    conn.close()
-                    conn.logout()
-                except Exception:
-                    pass
-
+            stats = pipeline.run(uids)
+            if dedupe is not None:
+                dedupe.save()
             self.logger.info(
-                "Import completed. Total emails processed: %d", total_processed,
+                "Import completed. Stored %d of %d fetched emails in %d FETCH "
+                "commands (%d already stored, %d errors)",
+                stats.stored,
+                stats.fetched,
+                stats.fetch_commands,
+                stats.skipped,
+                stats.errors,
             )
 
         except Exception as e:
             self.logger.error("Error in fetch_emails: %s", str(e))
             raise
 
-    def _create_imap_connections(self, num_connections: int) -> list[imaplib.IMAP4_SSL]:
-        """
-        Create multiple IMAP connections for parallel processing.
-
-        Args:
-        ----
-            num_connections: Number of connections to create
-
-        Returns:
-        -------
-            List of IMAP connections
-
-        """
-        connections = []
-        config = self._get_imap_config()
-
-        for i in range(num_connections):
-            try:
-                self.logger.debug(f"Creating IMAP connection {i + 1}/{num_connections}")
-                conn = self._connect_imap(config)
-                connections.append(conn)
-            except Exception as e:
-                self.logger.error(f"Failed to create IMAP connection {i + 1}: {e}")
-
-        if not connections:
-            raise ValueError("Failed to create any IMAP connections")
-
-        return connections
-
     def _get_imap_config(self) -> dict:
         """Get IMAP configuration from environment variables or args."""
         username = self.args.username
@@ -754,148 +556,6 @@ class UnifiedIMAPImporter(BaseScript):
             "mailbox": '"[Gmail]/All Mail"',
         }
 
-    def _process_single_email(
-        self,
-        imap: imaplib.IMAP4_SSL,
-        msg_num: int,
-        existing_ids: set[str],
-        batch_id: str,
-    ) -> bool:
-        """
-        Process a single email message in a worker thread.
-
-        Args:
-        ----
-            imap: IMAP connection to use
-            msg_num: Message number to process
-            existing_ids: Set of existing message IDs
-            batch_id: Current batch ID
-
-        Returns:
-        -------
-            True if email was processed successfully
-
-        """
-        try:
-            # First fetch Gmail-specific IDs
-            self.logger.debug("Fetching Gmail IDs for message %d", msg_num)
-            _, msg_data = imap.fetch(str(msg_num), "(X-GM-MSGID X-GM-THRID)")
-
-            if not msg_data or not msg_data[0]:
-                self.logger.error("No Gmail ID data for message %d", msg_num)
-                return False
-
-            # Parse Gmail IDs from response
-            response = (
-                msg_data[0].decode("utf-8")
-                if isinstance(msg_data[0], bytes)
-                else str(msg_data[0])
-            )
-
-            # Extract Gmail IDs using regex
-            msgid_match = re.search(r"X-GM-MSGID\s+(\d+)", response)
-            thrid_match = re.search(r"X-GM-THRID\s+(\d+)", response)
-
-            if not msgid_match or not thrid_match:
-                self.logger.error("Failed to extract Gmail IDs: %s", response)
-                return False
-
-            gmail_msgid = msgid_match.group(1)
-            gmail_thrid = thrid_match.group(1)
-
-            # Skip if message already exists
-            if gmail_msgid in existing_ids:
-                self.logger.debug("Message %s already exists, skipping", gmail_msgid)
-                return False
-
-            # Now fetch the full message
-            self.logger.debug("Fetching full message %d", msg_num)
-            _, msg_data = imap.fetch(str(msg_num), "(RFC822)")
-
-            if not msg_data or not msg_data[0]:
-                self.logger.error("No message data for %d", msg_num)
-                return False
-
-            # Extract and store message data
-            raw_data = msg_data[0][1]
-            email_data = self._parse_email_message(raw_data)
-            email_data["msg_id"] = gmail_msgid
-            email_data["thread_id"] = gmail_thrid
-
-            return self._store_email(email_data, batch_id)
-
-        except Exception as e:
-            self.logger.error("Error processing message %d: %s", msg_num, str(e))
-            return False
-
-    def _store_email(self, email_data: dict[str, Any], batch_id: str) -> bool:
-        """
-        Store email in the database.
-
-        Args:
-        ----
-            email_data: Parsed email data
-            batch_id: Batch identifier
-
-        Returns:
-        -------
-            True if successful
-
-        """
-        try:
-            # Add batch ID to email data
-            email_data["batch_id"] = batch_id
-
-            # SQL reserved keywords that need escaping
-            escaped_columns = []
-            escaped_values = []
-
-            # Prepare columns with proper escaping
-            for col, val in email_data.items():
-                if col.lower() in self.SQL_RESERVED:
-                    escaped_columns.append(f'"{col}"')
-                else:
-                    escaped_columns.append(col)
-                escaped_values.append(val)
-
-            columns = ", ".join(escaped_columns)
-            placeholders = ", ".join(["?" for _ in email_data])
-
-            # Insert into database
-            query = f"""
-                INSERT INTO emails ({columns})
-                VALUES ({placeholders})
-            """
-            self.db_conn.execute(query, escaped_values)
-
-            self.logger.debug("Stored email %s", email_data["msg_id"])
-            return True
-
-        except Exception as e:
-            self.logger.error("Error storing email: %s", e)
-            return False
-
-    def _get_existing_ids(self) -> set[str]:
-        """
-        Get existing message IDs from database.
-
-        Returns
-        -------
-            Set of existing message IDs
-
-        """
-        existing_ids = set()
-        try:
-            query = "SELECT msg_id FROM emails"
-            result = self.db_conn.execute(query).fetchall()
-            existing_ids = {str(row[0]) for row in result}
-            self.logger.info(
-                "Found %d existing messages in database", len(existing_ids),
-            )
-        except Exception as e:
-            self.logger.error("Error getting existing message IDs: %s", e)
-        return existing_ids
-
     def execute(self) -> None:
         """Main execution method."""
         try:
@@ -919,6 +579,9 @@ class UnifiedIMAPImporter(BaseScript):
                     start_date=args.start_date,
                     end_date=args.end_date,
                     num_workers=num_workers,
+                    rescan=args.rescan,
+                    mailbox=imap_config["mailbox"],
+                    blob_dir=args.blob_dir,
                 )
 
             self.logger.info("IMAP sync completed successfully")
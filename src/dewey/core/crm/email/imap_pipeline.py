@@ -0,0 +1,468 @@
+"""
+Pipelined IMAP import.
+
+Messages are fetched by UID range, one ``UID FETCH`` command per batch that
+returns the Gmail ids and the full RFC822 source together. Batches are
+parsed in a process pool, since MIME decoding is CPU-bound. One writer
+thread stores each batch with a single multi-row INSERT. In the same
+transaction it advances a per-mailbox (UIDVALIDITY, last UID) checkpoint,
+together with the start of the date window it covers. A resumed run over
+the same or a narrower window therefore starts after the last stored UID
+instead of loading every stored msg_id; a wider window is searched in full.
+Fetching batch N+1, parsing batch N and writing batch N-1 overlap.
+"""
+
+import imaplib
+import logging
+import math
+import queue
+import re
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from functools import partial
+from typing import Any
+
+from dewey.core.crm.message_dedupe import MessageDedupe
+
+logger = logging.getLogger(__name__)
+
+FETCH_ITEMS = "(UID X-GM-MSGID X-GM-THRID RFC822)"
+
+CHECKPOINT_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS imap_sync_state (
+        mailbox VARCHAR PRIMARY KEY,
+        uidvalidity BIGINT NOT NULL,
+        last_uid BIGINT NOT NULL,
+        since DATE,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+_FETCH_ATTRIBUTE = re.compile(rb"\b(UID|X-GM-MSGID|X-GM-THRID) (\d+)")
+_UIDVALIDITY = re.compile(rb"UIDVALIDITY (\d+)")
+
+
+@dataclass
+class FetchedMessage:
+    """One message from a UID FETCH response."""
+
+    uid: int
+    raw: bytes
+    gmail_msgid: str | None = None
+    gmail_thrid: str | None = None
+
+
+@dataclass
+class ImportStats:
+    """Counters for one import run."""
+
+    fetched: int = 0
+    stored: int = 0
+    skipped: int = 0
+    errors: int = 0
+    fetch_commands: int = 0
+    last_uid: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Counters as a plain dict."""
+        return dict(self.__dict__)
+
+
+def uid_set(uids: Sequence[int]) -> str:
+    """
+    Compress sorted UIDs into an IMAP sequence set.
+
+    Args:
+    ----
+        uids: Ascending UIDs.
+
+    Returns:
+    -------
+        A set such as ``"1000:1500,1502,1510:1512"``.
+
+    """
+    ranges = []
+    start = previous = uids[0]
+    for uid in uids[1:]:
+        if uid != previous + 1:
+            ranges.append(f"{start}:{previous}" if previous > start else str(start))
+            start = uid
+        previous = uid
+    ranges.append(f"{start}:{previous}" if previous > start else str(start))
+    return ",".join(ranges)
+
+
+def parse_uid_fetch(data: list) -> list[FetchedMessage]:
+    """
+    Split an imaplib UID FETCH response into messages.
+
+    imaplib returns one ``(header, literal)`` tuple per message, followed by
+    the bytes after the literal (``b")"``, or more attributes when the server
+    sends them after RFC822).
+
+    Args:
+    ----
+        data: Response data from ``imap.uid("FETCH", ...)``.
+
+    Returns:
+    -------
+        Messages that carried a UID and an RFC822 literal.
+
+    """
+    parts: list[list[bytes]] = []
+    for item in data:
+        if isinstance(item, tuple):
+            parts.append([item[0], item[1]])
+        elif isinstance(item, bytes) and parts:
+            parts[-1][0] += item
+
+    messages = []
+    for header, raw in parts:
+        attributes = dict(_FETCH_ATTRIBUTE.findall(header))
+        if b"UID" not in attributes:
+            logger.warning(f"Skipping FETCH response without UID: {header[:80]!r}")
+            continue
+        messages.append(
+            FetchedMessage(
+                uid=int(attributes[b"UID"]),
+                raw=raw,
+                gmail_msgid=(attributes.get(b"X-GM-MSGID") or b"").decode() or None,
+                gmail_thrid=(attributes.get(b"X-GM-THRID") or b"").decode() or None,
+            ),
+        )
+    return messages
+
+
+def _parse_safely(
+    parse: Callable[[FetchedMessage], dict[str, Any]], message: FetchedMessage,
+) -> tuple[int, dict[str, Any] | None, str | None]:
+    """Run parse in a pool worker, returning errors instead of raising."""
+    try:
+        return message.uid, parse(message), None
+    except Exception as e:
+        return message.uid, None, str(e)
+
+
+class IMAPCheckpoint:
+    """Per-mailbox (UIDVALIDITY, last UID) checkpoint stored in the database."""
+
+    def __init__(self, db_conn: Any, mailbox: str):
+        """
+        Create the checkpoint table if needed.
+
+        Args:
+        ----
+            db_conn: DuckDB-style connection using ``?`` placeholders.
+            mailbox: Mailbox the checkpoint belongs to.
+
+        """
+        self.db_conn = db_conn
+        self.mailbox = mailbox
+        self.db_conn.execute(CHECKPOINT_SCHEMA)
+
+    def resume_point(
+        self, uidvalidity: int, since: date | None = None,
+    ) -> tuple[int, date | None]:
+        """
+        Where a run over mail since a date can resume.
+
+        A changed UIDVALIDITY means the server renumbered the mailbox, and a
+        checkpoint saved by runs over a later window says nothing about the
+        older mail, so in both cases the old checkpoint does not apply.
+
+        Args:
+        ----
+            uidvalidity: Current UIDVALIDITY of the mailbox.
+            since: First day of the searched window, or None for all mail.
+
+        Returns:
+        -------
+            The highest UID already imported (0 to search the whole window)
+            and the first day the checkpoint will cover after the run.
+
+        """
+        row = self.db_conn.execute(
+            "SELECT uidvalidity, last_uid, since FROM imap_sync_state "
+            "WHERE mailbox = ?",
+            [self.mailbox],
+        ).fetchone()
+        if not row:
+            return 0, since
+        if row[0] != uidvalidity:
+            logger.warning(
+                f"UIDVALIDITY of {self.mailbox} changed from {row[0]} to "
+                f"{uidvalidity}; rescanning the mailbox",
+            )
+            return 0, since
+        if row[2] is not None and (since is None or since < row[2]):
+            logger.info(
+                f"Checkpoint of {self.mailbox} covers mail since {row[2]}; "
+                "searching the wider window in full",
+            )
+            return 0, since
+        return row[1], row[2]
+
+    def save(self, uidvalidity: int, last_uid: int, since: date | None = None) -> None:
+        """Record that every UID up to last_uid in mail since a date has been stored."""
+        self.db_conn.execute(
+            """
+            INSERT INTO imap_sync_state
+                (mailbox, uidvalidity, last_uid, since, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (mailbox) DO UPDATE SET
+                uidvalidity = excluded.uidvalidity,
+                last_uid = excluded.last_uid,
+                since = excluded.since,
+                updated_at = excluded.updated_at
+            """,
+            [self.mailbox, uidvalidity, last_uid, since],
+        )
+
+
+class IMAPPipeline:
+    """Fetch by UID range -> parse in a process pool -> single writer."""
+
+    def __init__(
+        self,
+        imap: imaplib.IMAP4,
+        db_conn: Any,
+        mailbox: str,
+        parse: Callable[[FetchedMessage], dict[str, Any]],
+        table: str = "emails",
+        batch_size: int = 500,
+        workers: int = 4,
+        use_checkpoint: bool = True,
+        prefetch: int = 2,
+        extra_columns: dict[str, Any] | None = None,
+        dedupe: MessageDedupe | None = None,
+    ):
+        """
+        Initialize the pipeline for a selected mailbox.
+
+        Args:
+        ----
+            imap: Connection with ``mailbox`` selected.
+            db_conn: DuckDB-style connection, used only by the writer thread
+                while the pipeline runs.
+            mailbox: Mailbox name, as passed to SELECT.
+            parse: Module-level function turning a FetchedMessage into a row
+                dict; it runs in the process pool, so it must be picklable.
+            table: Table the rows are inserted into.
+            batch_size: UIDs per FETCH command and per INSERT.
+            workers: Parser processes; 0 parses on the fetching thread.
+            use_checkpoint: Skip UIDs at or below the checkpoint when it
+                covers the searched window, and advance it as batches are
+                stored.
+            prefetch: Batches fetched ahead of the writer.
+            extra_columns: Constant values added to every row.
+            dedupe: Stored message IDs. Runs that do not resume from the
+                checkpoint fetch each batch's Gmail ids first and skip the
+                RFC822 download of stored messages; stored rows are added
+                to it.
+
+        """
+        self.imap = imap
+        self.db_conn = db_conn
+        self.mailbox = mailbox
+        self.parse = parse
+        self.table = table
+        self.batch_size = batch_size
+        self.workers = workers
+        self.use_checkpoint = use_checkpoint
+        self.prefetch = prefetch
+        self.extra_columns = extra_columns or {}
+        self.dedupe = dedupe
+        self.checkpoint = IMAPCheckpoint(db_conn, mailbox)
+        self.uidvalidity = self._uidvalidity()
+        self.stats = ImportStats()
+        self.resumed = False
+        self._checkpoint_valid = True
+        self._covered_since: date | None = None
+
+    def _uidvalidity(self) -> int:
+        typ, data = self.imap.status(self.mailbox, "(UIDVALIDITY)")
+        match = _UIDVALIDITY.search(data[0] or b"") if typ == "OK" else None
+        if not match:
+            raise imaplib.IMAP4.error(f"No UIDVALIDITY for {self.mailbox}: {data}")
+        return int(match.group(1))
+
+    def pending_uids(
+        self,
+        criteria: str = "ALL",
+        since: date | None = None,
+        limit: int | None = None,
+    ) -> list[int]:
+        """
+        UIDs matching a SEARCH criteria that still need importing.
+
+        UIDs at or below the checkpoint are skipped only if the checkpoint
+        covers the window, i.e. it was saved by runs over mail since
+        ``since`` or earlier. An import of all mail after runs over the
+        last week therefore still finds the older mail.
+
+        Args:
+        ----
+            criteria: IMAP SEARCH criteria, e.g. ``"SINCE 01-Jan-2024"``.
+            since: First day the criteria matches, or None for all mail.
+            limit: Most UIDs to return. A resumed run takes the oldest, so
+                its checkpoint advances and the next run continues from
+                there; any other run takes the newest and leaves the
+                checkpoint where it is.
+
+        Returns:
+        -------
+            Matching UIDs in ascending order.
+
+        """
+        last_uid, self._covered_since = 0, since
+        if self.use_checkpoint:
+            last_uid, self._covered_since = self.checkpoint.resume_point(
+                self.uidvalidity, since,
+            )
+        self.resumed = bool(last_uid)
+        if last_uid:
+            criteria = f"UID {last_uid + 1}:* {criteria}"
+            logger.info(f"Resuming {self.mailbox} after UID {last_uid}")
+        typ, data = self.imap.uid("SEARCH", None, criteria)
+        if typ != "OK":
+            raise imaplib.IMAP4.error(f"UID SEARCH {criteria} failed: {data}")
+        # "n:*" always matches the newest message, even when its UID is below n
+        uids = sorted(uid for uid in map(int, data[0].split()) if uid > last_uid)
+        if limit is None or len(uids) <= limit:
+            return uids
+        logger.info(f"{len(uids) - limit} more messages match {criteria}")
+        if self.resumed:
+            return uids[:limit]
+        # Older matches are left out, so the checkpoint cannot move past them
+        self._checkpoint_valid = False
+        return uids[len(uids) - limit :]
+
+    def _fetch(self, uids: Sequence[int]) -> list[FetchedMessage]:
+        typ, data = self.imap.uid("FETCH", uid_set(uids), FETCH_ITEMS)
+        self.stats.fetch_commands += 1
+        if typ != "OK":
+            raise imaplib.IMAP4.error(f"UID FETCH failed: {data}")
+        return parse_uid_fetch(data)
+
+    def _unseen(self, uids: Sequence[int]) -> list[int]:
+        typ, data = self.imap.uid("FETCH", uid_set(uids), "(UID X-GM-MSGID)")
+        self.stats.fetch_commands += 1
+        if typ != "OK":
+            raise imaplib.IMAP4.error(f"UID FETCH failed: {data}")
+        gmail_ids = {}
+        for item in data:
+            attributes = dict(_FETCH_ATTRIBUTE.findall(item or b""))
+            if b"UID" in attributes and b"X-GM-MSGID" in attributes:
+                gmail_ids[int(attributes[b"UID"])] = attributes[b"X-GM-MSGID"].decode()
+        stored = self.dedupe.check_many(gmail_ids.values())
+        unseen = [uid for uid in uids if gmail_ids.get(uid) not in stored]
+        self.stats.skipped += len(uids) - len(unseen)
+        return unseen
+
+    def _insert(self, rows: list[dict[str, Any]]) -> int:
+        columns = list(rows[0])
+        placeholders = "(" + ", ".join("?" for _ in columns) + ")"
+        params = [row.get(column) for row in rows for column in columns]
+        result = self.db_conn.execute(
+            f"""
+            INSERT INTO {self.table} ({", ".join(f'"{c}"' for c in columns)})
+            VALUES {", ".join(placeholders for _ in rows)}
+            ON CONFLICT DO NOTHING
+            """,
+            params,
+        )
+        count = result.fetchone() if result is not None else None
+        return count[0] if count else len(rows)
+
+    def _write_batch(self, last_uid: int, parsed: Iterator[tuple]) -> None:
+        rows = []
+        failed = []
+        for uid, row, error in parsed:
+            if error is not None:
+                logger.error(f"Failed to parse UID {uid}: {error}")
+                self.stats.errors += 1
+                failed.append(uid)
+            else:
+                rows.append({**row, **self.extra_columns})
+
+        self.db_conn.execute("BEGIN TRANSACTION")
+        try:
+            stored = self._insert(rows) if rows else 0
+            if self.use_checkpoint and self._checkpoint_valid:
+                # Stop short of the first unparsed message so it is fetched again
+                checkpoint_uid = min(failed) - 1 if failed else last_uid
+                self.checkpoint.save(
+                    self.uidvalidity, checkpoint_uid, self._covered_since,
+                )
+            self.db_conn.execute("COMMIT")
+        except Exception:
+            self.db_conn.execute("ROLLBACK")
+            raise
+        if failed:
+            self._checkpoint_valid = False
+        if self.dedupe is not None:
+            self.dedupe.add((row["msg_id"] for row in rows), stored=stored)
+        self.stats.stored += stored
+        self.stats.last_uid = last_uid
+        logger.info(
+            f"Stored {stored} of {len(rows)} messages up to UID {last_uid} "
+            f"({self.stats.stored} total)",
+        )
+
+    def _write(self, batches: queue.Queue) -> None:
+        while (item := batches.get()) is not None:
+            last_uid, parsed = item
+            try:
+                self._write_batch(last_uid, parsed)
+            except Exception as e:
+                # Later batches are still stored, but the checkpoint must not
+                # move past the failed one
+                logger.error(f"Failed to store batch ending at UID {last_uid}: {e}")
+                self.stats.errors += 1
+                self._checkpoint_valid = False
+
+    def run(self, uids: Sequence[int]) -> ImportStats:
+        """
+        Import the given UIDs.
+
+        Args:
+        ----
+            uids: Ascending UIDs, usually from pending_uids().
+
+        Returns:
+        -------
+            Counters for the run.
+
+        """
+        batches: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        writer = threading.Thread(
+            target=self._write, args=(batches,), name="imap-writer", daemon=True,
+        )
+        pool: Executor | None = (
+            ProcessPoolExecutor(max_workers=self.workers) if self.workers else None
+        )
+        parse = partial(_parse_safely, self.parse)
+        writer.start()
+        try:
+            for start in range(0, len(uids), self.batch_size):
+                batch = uids[start : start + self.batch_size]
+                unseen = batch
+                if self.dedupe is not None and not self.resumed:
+                    unseen = self._unseen(batch)
+                messages = self._fetch(unseen) if unseen else []
+                self.stats.fetched += len(messages)
+                if pool is None:
+                    parsed = iter([parse(message) for message in messages])
+                else:
+                    chunksize = max(1, math.ceil(len(messages) / self.workers))
+                    parsed = pool.map(parse, messages, chunksize=chunksize)
+                batches.put((batch[-1], parsed))
+        finally:
+            batches.put(None)
+            writer.join()
+            if pool is not None:
+                pool.shutdown()
+        return self.stats
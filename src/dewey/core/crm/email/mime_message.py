@@ -0,0 +1,518 @@
+"""
+Shared email message model with lazy body and attachment decoding.
+
+The importers used to decode every part of a message up front, attachments
+included, and re-serialize each part just to report its size. ParsedMessage
+parses only the header block when it is created. Text bodies are decoded
+the first time they are read. Attachments are decoded in chunks, hashed,
+and, when a BlobStore is given, written to a content-addressed file. Only
+their metadata and SHA-256 reach the database.
+
+Attachments are not streamed from the source. imaplib returns each message
+as a single bytes object, and reading a body or an attachment parses that
+source into a full MIME tree. While the message is being processed, the
+encoded attachments are therefore held in memory twice. Decoding and
+writing them is what happens in chunks.
+
+GmailPayload gives the same view of a Gmail API ``format=full`` payload.
+"""
+
+import base64
+import binascii
+import email
+import email.utils
+import hashlib
+import os
+import re
+import tempfile
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from email.header import decode_header
+from email.message import Message
+from email.parser import BytesParser
+from email.policy import compat32
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+DEFAULT_BLOB_DIR = "~/.dewey/blobs"
+
+# Encoded base64 lines decoded per attachment chunk (about 230 KB)
+_BASE64_LINES = 4096
+
+_NOT_BASE64 = re.compile(r"[^A-Za-z0-9+/]")
+
+
+def decode_email_header(header: str) -> str:
+    """
+    Decode email header properly handling various encodings.
+
+    Args:
+    ----
+        header: Raw email header
+
+    Returns:
+    -------
+        Decoded header string
+
+    """
+    if not header:
+        return ""
+
+    decoded_parts = []
+    for part, encoding in decode_header(header):
+        if isinstance(part, bytes):
+            try:
+                if encoding:
+                    decoded_parts.append(part.decode(encoding))
+                else:
+                    decoded_parts.append(part.decode())
+            except Exception:
+                decoded_parts.append(part.decode("utf-8", "ignore"))
+        else:
+            decoded_parts.append(str(part))
+    return " ".join(decoded_parts)
+
+
+def decode_payload(payload: bytes, charset: str | None = None) -> str:
+    """
+    Decode email payload bytes to string.
+
+    Args:
+    ----
+        payload: The binary payload data
+        charset: Character set to use for decoding
+
+    Returns:
+    -------
+        Decoded string
+
+    """
+    if not payload:
+        return ""
+
+    if not charset:
+        charset = "utf-8"  # Default to UTF-8
+
+    try:
+        return payload.decode(charset)
+    except (UnicodeDecodeError, LookupError):
+        # If the specified charset fails, try some fallbacks
+        try:
+            return payload.decode("utf-8", errors="replace")
+        except UnicodeDecodeError:
+            try:
+                return payload.decode("latin1", errors="replace")
+            except UnicodeDecodeError:
+                return payload.decode("ascii", errors="replace")
+
+
+def _encoded_size(part: Message) -> int:
+    payload = part.get_payload()
+    if isinstance(payload, str):
+        return len(payload)
+    if isinstance(payload, list):
+        return sum(_encoded_size(subpart) for subpart in payload)
+    return 0
+
+
+def get_message_structure(msg: Message) -> dict[str, Any]:
+    """
+    Extract the structure of an email message for analysis.
+
+    Sizes are those of the encoded part bodies, so no part is serialized
+    or decoded to describe it.
+
+    Args:
+    ----
+        msg: The email message object
+
+    Returns:
+    -------
+        Dictionary with message structure information
+
+    """
+    if msg.is_multipart():
+        parts = []
+        for i, part in enumerate(msg.get_payload()):
+            part_info = {
+                "part_index": i,
+                "content_type": part.get_content_type(),
+                "charset": part.get_content_charset(),
+                "content_disposition": part.get("Content-Disposition", ""),
+                "filename": part.get_filename(),
+                "size": _encoded_size(part),
+            }
+
+            if part.is_multipart():
+                part_info["subparts"] = get_message_structure(part)
+
+            parts.append(part_info)
+
+        return {"multipart": True, "parts": parts}
+    return {
+        "multipart": False,
+        "content_type": msg.get_content_type(),
+        "charset": msg.get_content_charset(),
+        "content_disposition": msg.get("Content-Disposition", ""),
+        "filename": msg.get_filename(),
+        "size": _encoded_size(msg),
+    }
+
+
+class BlobStore:
+    """Directory of files named by the SHA-256 of their content."""
+
+    def __init__(self, root: str | Path | None = None):
+        """
+        Initialize the store.
+
+        Args:
+        ----
+            root: Directory holding the blobs; defaults to ``~/.dewey/blobs``.
+
+        """
+        self.root = Path(root or Path(DEFAULT_BLOB_DIR).expanduser())
+
+    def path_for(self, digest: str) -> Path:
+        """Where the blob with this SHA-256 hex digest is stored."""
+        return self.root / digest[:2] / digest
+
+    def __contains__(self, digest: str) -> bool:
+        """Whether a blob is stored."""
+        return self.path_for(digest).exists()
+
+    def write(self, chunks: Iterable[bytes]) -> tuple[str, int]:
+        """
+        Stream content into the store.
+
+        The content is written to a temporary file while it is hashed and
+        then renamed into place, so concurrent writers of the same content
+        are safe and partial files are never visible.
+
+        Args:
+        ----
+            chunks: Content in pieces.
+
+        Returns:
+        -------
+            The SHA-256 hex digest and the size in bytes.
+
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        sha256 = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            digest = sha256.hexdigest()
+            path = self.path_for(digest)
+            if path.exists():
+                os.unlink(tmp_name)
+            else:
+                path.parent.mkdir(exist_ok=True)
+                os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return digest, size
+
+    def read(self, digest: str) -> bytes:
+        """Return a stored blob's content."""
+        return self.path_for(digest).read_bytes()
+
+
+def _hash_chunks(chunks: Iterable[bytes]) -> tuple[str, int]:
+    sha256 = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        sha256.update(chunk)
+        size += len(chunk)
+    return sha256.hexdigest(), size
+
+
+def iter_decoded(part: Message) -> Iterator[bytes]:
+    """
+    Decode a non-multipart part's body in chunks.
+
+    Base64 bodies, which is how nearly all attachments are sent, are
+    decoded a block of lines at a time. Other encodings are small in
+    practice and are decoded in one piece.
+
+    Args:
+    ----
+        part: Leaf MIME part.
+
+    Yields:
+    ------
+        Decoded content.
+
+    """
+    encoding = str(part.get("Content-Transfer-Encoding", "")).strip().lower()
+    payload = part.get_payload()
+    if encoding != "base64" or not isinstance(payload, str):
+        decoded = part.get_payload(decode=True)
+        if decoded:
+            yield decoded
+        return
+
+    lines = payload.splitlines()
+    pending = ""
+    for start in range(0, len(lines), _BASE64_LINES):
+        block = pending + _NOT_BASE64.sub(
+            "", "".join(lines[start : start + _BASE64_LINES]),
+        )
+        usable = len(block) - len(block) % 4
+        pending = block[usable:]
+        if usable:
+            yield binascii.a2b_base64(block[:usable])
+    # Unpadded tail; a single leftover character carries no whole byte
+    if len(pending) > 1:
+        yield binascii.a2b_base64(pending + "=" * (-len(pending) % 4))
+
+
+def _split_headers(raw: bytes) -> bytes:
+    for separator in (b"\r\n\r\n", b"\n\n"):
+        end = raw.find(separator)
+        if end != -1:
+            return raw[: end + len(separator)]
+    return raw
+
+
+class ParsedMessage:
+    """An RFC 822 message with eager headers and lazily decoded content."""
+
+    def __init__(self, raw: bytes, blob_store: BlobStore | None = None):
+        """
+        Parse the message headers.
+
+        Args:
+        ----
+            raw: Message source.
+            blob_store: Where attachment content is written; if None,
+                attachments are only hashed.
+
+        """
+        self.raw = raw
+        self.blob_store = blob_store
+        self.headers = BytesParser(policy=compat32).parsebytes(
+            _split_headers(raw), headersonly=True,
+        )
+
+    @cached_property
+    def subject(self) -> str:
+        """Decoded Subject header."""
+        return decode_email_header(self.headers["Subject"])
+
+    @cached_property
+    def from_address(self) -> str:
+        """Decoded From header."""
+        return decode_email_header(self.headers["From"])
+
+    @cached_property
+    def to(self) -> str:
+        """Decoded To header."""
+        return decode_email_header(self.headers["To"])
+
+    @property
+    def message_id(self) -> str | None:
+        """Message-ID header."""
+        return self.headers["Message-ID"]
+
+    @cached_property
+    def date(self) -> datetime | None:
+        """Date header as a local datetime, or None if missing or invalid."""
+        date_str = self.headers["Date"]
+        if not date_str:
+            return None
+        try:
+            date_tuple = email.utils.parsedate_tz(date_str)
+            if date_tuple:
+                return datetime.fromtimestamp(email.utils.mktime_tz(date_tuple))
+        except Exception:
+            pass
+        return None
+
+    def header_items(self) -> dict[str, Any]:
+        """All headers by name, the last value winning for repeated names."""
+        return {key: self.headers[key] for key in self.headers.keys()}
+
+    @cached_property
+    def tree(self) -> Message:
+        """
+        The full MIME tree, parsed on first use.
+
+        The tree holds every part's encoded payload, attachments included,
+        alongside ``raw``.
+        """
+        return email.message_from_bytes(self.raw)
+
+    def _leaf_parts(self) -> Iterator[Message]:
+        for part in self.tree.walk():
+            if not part.get_content_type().startswith("multipart"):
+                yield part
+
+    @staticmethod
+    def _is_attachment(part: Message) -> bool:
+        return "attachment" in str(part.get("Content-Disposition"))
+
+    def _body(self, content_type: str) -> str:
+        text = ""
+        for part in self._leaf_parts():
+            if part.get_content_type() == content_type and not self._is_attachment(
+                part,
+            ):
+                payload = part.get_payload(decode=True)
+                if payload:
+                    text += decode_payload(payload, part.get_content_charset())
+        return text
+
+    @cached_property
+    def body_text(self) -> str:
+        """Concatenated text/plain parts that are not attachments."""
+        return self._body("text/plain")
+
+    @cached_property
+    def body_html(self) -> str:
+        """Concatenated text/html parts that are not attachments."""
+        return self._body("text/html")
+
+    @cached_property
+    def attachments(self) -> list[dict[str, Any]]:
+        """
+        Metadata of named attachments.
+
+        Each attachment is decoded in chunks and hashed; its content is
+        written to the blob store if there is one and otherwise discarded.
+        """
+        attachments = []
+        for part in self._leaf_parts():
+            filename = part.get_filename()
+            if not (self._is_attachment(part) and filename):
+                continue
+            chunks = iter_decoded(part)
+            if self.blob_store is None:
+                digest, size = _hash_chunks(chunks)
+            else:
+                digest, size = self.blob_store.write(chunks)
+            attachments.append(
+                {
+                    "filename": decode_email_header(filename),
+                    "content_type": part.get_content_type(),
+                    "size": size,
+                    "sha256": digest,
+                },
+            )
+        return attachments
+
+    def structure(self) -> dict[str, Any]:
+        """MIME structure; see get_message_structure."""
+        return get_message_structure(self.tree)
+
+
+class GmailPayload:
+    """A Gmail API ``format=full`` payload with lazily decoded bodies."""
+
+    def __init__(self, payload: dict, blob_store: BlobStore | None = None):
+        """
+        Index the payload headers.
+
+        Args:
+        ----
+            payload: The message's ``payload`` object.
+            blob_store: Where inline attachment data is written.
+
+        """
+        self.payload = payload or {}
+        self.blob_store = blob_store
+        self.headers = {
+            header["name"].lower(): header["value"]
+            for header in self.payload.get("headers", [])
+        }
+
+    def _parts(self, part: dict | None = None) -> Iterator[dict]:
+        part = self.payload if part is None else part
+        yield part
+        for subpart in part.get("parts", []):
+            yield from self._parts(subpart)
+
+    @staticmethod
+    def _charset(part: dict) -> str | None:
+        for header in part.get("headers", []):
+            if header["name"].lower() == "content-type":
+                params = Message()
+                params["Content-Type"] = header["value"]
+                return params.get_content_charset()
+        return None
+
+    def _body(self, mime_type: str) -> str:
+        for part in self._parts():
+            if part.get("mimeType") != mime_type or part.get("filename"):
+                continue
+            data = part.get("body", {}).get("data")
+            if data:
+                try:
+                    content = base64.urlsafe_b64decode(data)
+                except (binascii.Error, ValueError):
+                    return ""
+                return decode_payload(content, self._charset(part))
+        return ""
+
+    @cached_property
+    def body_text(self) -> str:
+        """First text/plain body part."""
+        return self._body("text/plain")
+
+    @cached_property
+    def body_html(self) -> str:
+        """First text/html body part."""
+        return self._body("text/html")
+
+    @cached_property
+    def attachments(self) -> list[dict[str, Any]]:
+        """
+        Metadata of attachments.
+
+        Gmail normally returns an ``attachmentId`` instead of the content;
+        attachments that do come inline are hashed and, if there is a blob
+        store, written to it.
+        """
+        attachments = []
+        for part in self._parts():
+            if not part.get("filename"):
+                continue
+            body = part.get("body", {})
+            attachment = {
+                "filename": part["filename"],
+                "mimeType": part.get("mimeType", ""),
+                "size": body.get("size", 0),
+                "attachmentId": body.get("attachmentId", ""),
+            }
+            if body.get("data"):
+                chunks = [base64.urlsafe_b64decode(body["data"])]
+                if self.blob_store is None:
+                    attachment["sha256"], _ = _hash_chunks(chunks)
+                else:
+                    attachment["sha256"], _ = self.blob_store.write(chunks)
+            attachments.append(attachment)
+        return attachments
+
+    def without_attachment_data(self) -> dict:
+        """A copy of the payload with inline attachment content removed."""
+
+        def strip(part: dict) -> dict:
+            part = dict(part)
+            if part.get("filename") and "data" in part.get("body", {}):
+                part["body"] = {
+                    key: value for key, value in part["body"].items() if key != "data"
+                }
+            if "parts" in part:
+                part["parts"] = [strip(subpart) for subpart in part["parts"]]
+            return part
+
+        return strip(self.payload)
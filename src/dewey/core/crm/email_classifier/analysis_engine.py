@@ -0,0 +1,378 @@
+"""
+Concurrent LLM analysis engine for the email classifier.
+
+Emails are analyzed by a fixed number of asyncio workers, so up to
+``concurrency`` LLM requests are in flight at once instead of one round trip
+after another. Requests to a provider draw from a shared token bucket, so
+raising the concurrency never pushes a provider past its request rate.
+Transient failures (rate limits, timeouts, 5xx responses) are retried with
+full-jitter exponential backoff. Results stream to a single writer that
+stores them in batches, one transaction per batch.
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import requests
+from dewey.llm.exceptions import (
+    LLMConnectionError,
+    LLMRateLimitError,
+    LLMTimeoutError,
+)
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+_DONE = object()
+
+
+class TokenBucket:
+    """Token bucket shared by every engine that talks to one provider."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        """
+        Initialize the bucket full.
+
+        Args:
+        ----
+            rate: Tokens added per second, i.e. the sustained request rate.
+            capacity: Largest burst allowed; defaults to one second of rate.
+
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # A thread lock rather than an asyncio one: separate event loops
+        # (e.g. two engines run from different threads) may share a bucket
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens now, returning how long to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            # Going negative queues the caller behind earlier reservations
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until the requested tokens are available."""
+        delay = self._reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str, rate: float, capacity: float | None = None,
+) -> TokenBucket:
+    """
+    Return the process-wide token bucket for a provider.
+
+    The first caller's rate and capacity define the bucket; later callers
+    share it.
+
+    Args:
+    ----
+        provider: Provider name, e.g. "deepinfra".
+        rate: Requests per second allowed for the provider.
+        capacity: Largest burst allowed.
+
+    Returns:
+    -------
+        The provider's bucket.
+
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(provider)
+        if bucket is None:
+            bucket = _buckets[provider] = TokenBucket(rate, capacity)
+        return bucket
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Whether a failed LLM request is worth retrying."""
+    if isinstance(
+        error,
+        (
+            LLMRateLimitError,
+            LLMConnectionError,
+            LLMTimeoutError,
+            ConnectionError,
+            TimeoutError,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ),
+    ):
+        return True
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(
+        response, "status_code", None,
+    )
+    return status in TRANSIENT_STATUS_CODES
+
+
+def _retry_after(error: BaseException) -> float | None:
+    """Seconds a provider asked us to wait, from a Retry-After header."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class EngineStats:
+    """Counters for one engine run."""
+
+    submitted: int = 0
+    analyzed: int = 0
+    failed: int = 0
+    retries: int = 0
+    stored: int = 0
+    write_errors: int = 0
+    batches: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters plus elapsed time and analysis throughput."""
+        elapsed = time.perf_counter() - self.started
+        return {
+            "submitted": self.submitted,
+            "analyzed": self.analyzed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "stored": self.stored,
+            "write_errors": self.write_errors,
+            "batches": self.batches,
+            "elapsed_seconds": round(elapsed, 3),
+            "analyses_per_second": round(self.analyzed / elapsed, 1)
+            if elapsed > 0
+            else 0.0,
+        }
+
+
+class AnalysisEngine:
+    """Runs LLM analyses concurrently and stores the results in batches."""
+
+    def __init__(
+        self,
+        analyze: Callable[[Any], Any],
+        write_batch: Callable[[list], Any],
+        concurrency: int = 8,
+        rate_limiter: TokenBucket | None = None,
+        max_attempts: int = 4,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 30.0,
+        write_batch_size: int = 50,
+        flush_interval: float = 2.0,
+        on_error: Callable[[Any, Exception], Any] | None = None,
+        is_transient: Callable[[BaseException], bool] = is_transient_error,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+        ----
+            analyze: Turns one item into a result, or None to drop it. May be a
+                coroutine function; plain functions run in a thread pool.
+            write_batch: Stores a list of results; called from one thread at a
+                time.
+            concurrency: Maximum number of analyses in flight.
+            rate_limiter: Bucket each analysis attempt draws a token from.
+            max_attempts: Attempts per item before giving up on it.
+            retry_base_delay: Backoff ceiling for the first retry, in seconds.
+            retry_max_delay: Largest backoff ceiling, in seconds.
+            write_batch_size: Results per write_batch call.
+            flush_interval: Seconds before a partial batch is written anyway.
+            on_error: Called with the item and final exception once retries
+                are exhausted; a non-None return value is stored in place of
+                the failed result.
+            is_transient: Decides whether an exception is retried.
+
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.analyze = analyze
+        self.write_batch = write_batch
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.write_batch_size = write_batch_size
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.is_transient = is_transient
+        self.stats = EngineStats()
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        """Full-jitter delay before retry number ``attempt``."""
+        ceiling = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1))
+        delay = random.uniform(0, ceiling)
+        retry_after = _retry_after(error)
+        return max(delay, retry_after) if retry_after else delay
+
+    async def _call(self, item: Any, executor: ThreadPoolExecutor) -> Any:
+        if inspect.iscoroutinefunction(self.analyze):
+            return await self.analyze(item)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.analyze, item)
+
+    async def _analyze_with_retry(
+        self, item: Any, executor: ThreadPoolExecutor,
+    ) -> Any:
+        attempt = 1
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            try:
+                return await self._call(item, executor)
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.is_transient(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                logger.warning(
+                    f"Transient analysis error (attempt {attempt}/"
+                    f"{self.max_attempts}), retrying in {delay:.1f}s: {e}",
+                )
+                self.stats.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _work(
+        self,
+        work: asyncio.Queue,
+        results: asyncio.Queue,
+        executor: ThreadPoolExecutor,
+    ) -> None:
+        while (item := await work.get()) is not _DONE:
+            try:
+                result = await self._analyze_with_retry(item, executor)
+            except Exception as e:
+                self.stats.failed += 1
+                logger.error(f"Analysis failed for {item!r:.80}: {e}")
+                result = None
+                if self.on_error:
+                    try:
+                        result = self.on_error(item, e)
+                    except Exception as hook_error:
+                        logger.error(f"Analysis error hook failed: {hook_error}")
+            else:
+                self.stats.analyzed += 1
+            if result is not None:
+                await results.put(result)
+        await results.put(_DONE)
+
+    async def _flush(self, batch: list, writer: ThreadPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(writer, self.write_batch, batch)
+        except Exception as e:
+            logger.error(f"Storing {len(batch)} analyses failed: {e}")
+            self.stats.write_errors += len(batch)
+            return
+        self.stats.stored += len(batch)
+        self.stats.batches += 1
+
+    async def _write(self, results: asyncio.Queue) -> None:
+        batch: list = []
+        deadline = None
+        remaining_workers = self.concurrency
+        with ThreadPoolExecutor(1, thread_name_prefix="analysis-writer") as writer:
+            while remaining_workers:
+                timeout = (
+                    None if deadline is None else max(0, deadline - time.monotonic())
+                )
+                try:
+                    result = await asyncio.wait_for(results.get(), timeout)
+                except TimeoutError:
+                    result = None
+                else:
+                    if result is _DONE:
+                        remaining_workers -= 1
+                        continue
+                    batch.append(result)
+                    deadline = deadline or time.monotonic() + self.flush_interval
+
+                if batch and (
+                    len(batch) >= self.write_batch_size
+                    or time.monotonic() >= deadline
+                ):
+                    await self._flush(batch, writer)
+                    batch, deadline = [], None
+            if batch:
+                await self._flush(batch, writer)
+
+    async def _feed(self, items: Iterable, work: asyncio.Queue) -> None:
+        # The source may block (e.g. fetching each email), so it is iterated
+        # on its own thread while analyses already run
+        loop = asyncio.get_running_loop()
+        iterator = iter(items)
+        try:
+            with ThreadPoolExecutor(1, thread_name_prefix="analysis-source") as pool:
+                while (
+                    item := await loop.run_in_executor(pool, next, iterator, _DONE)
+                ) is not _DONE:
+                    self.stats.submitted += 1
+                    await work.put(item)
+        finally:
+            for _ in range(self.concurrency):
+                await work.put(_DONE)
+
+    async def run_async(self, items: Iterable) -> dict[str, Any]:
+        """
+        Analyze and store every item.
+
+        Args:
+        ----
+            items: Work items; iterated lazily on a background thread.
+
+        Returns:
+        -------
+            Final stats for the run.
+
+        """
+        self.stats = EngineStats()
+        work: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.write_batch_size * 2)
+        with ThreadPoolExecutor(
+            self.concurrency, thread_name_prefix="analysis-worker",
+        ) as executor:
+            tasks = [asyncio.create_task(self._feed(items, work))]
+            tasks += [
+                asyncio.create_task(self._work(work, results, executor))
+                for _ in range(self.concurrency)
+            ]
+            tasks.append(asyncio.create_task(self._write(results)))
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+        return self.stats.as_dict()
+
+    def run(self, items: Iterable) -> dict[str, Any]:
+        """Synchronous wrapper around run_async()."""
+        return asyncio.run(self.run_async(items))
@@ -13,6 +13,12 @@ import google.auth.exceptions
 import google.auth.transport.requests
 import requests
 from dewey.core.base_script import BaseScript
+from dewey.core.crm.email_classifier.analysis_engine import (
+    AnalysisEngine,
+    get_rate_limiter,
+)
+from dewey.core.crm.email_classifier.priority_rules import get_priority_matcher
+from dewey.core.crm.message_dedupe import DuckDBIDSource, MessageDedupe
 from dewey.core.db.connection import get_connection
 from dewey.llm.llm_utils import call_llm
 from dotenv import load_dotenv
@@ -119,34 +125,104 @@ class EmailClassifier(BaseScript):
                 .get(userId=user_id, id=msg_id, format="full")
                 .execute()
             )
-            payload = message["payload"]
-
-            if "parts" in payload:
-                parts = payload["parts"]
-                body = ""
-                for part in parts:
-                    if "data" in part["body"]:
-                        if part["mimeType"] == "text/html":
-                            body = base64.urlsafe_b64decode(
-                                part["body"]["data"],
-                            ).decode("utf-8", "ignore")
-                            break
-                        if part["mimeType"] == "text/plain" and not body:
-                            body = base64.urlsafe_b64decode(
-                                part["body"]["data"],
-                            ).decode("utf-8", "ignore")
-                return body
-            if "body" in payload and "data" in payload["body"]:
-                return base64.urlsafe_b64decode(payload["body"]["data"]).decode(
-                    "utf-8", "ignore",
-                )
-
-            return ""
+            return self.extract_message_body(message["payload"])
 
         except HttpError as error:
             self.logger.error(f"An error occurred: {error}")
             return ""
 
+    def extract_message_body(self, payload: dict) -> str:
+        """
+        Extracts the message body from a full-format message payload.
+
+        HTML parts are preferred over plain text ones.
+
+        Args:
+        ----
+            payload: The message payload.
+
+        Returns:
+        -------
+            The message body as a string.
+
+        """
+        if "parts" in payload:
+            parts = payload["parts"]
+            body = ""
+            for part in parts:
+                if "data" in part["body"]:
+                    if part["mimeType"] == "text/html":
+                        body = base64.urlsafe_b64decode(
+                            part["body"]["data"],
+                        ).decode("utf-8", "ignore")
+                        break
+                    if part["mimeType"] == "text/plain" and not body:
+                        body = base64.urlsafe_b64decode(
+                            part["body"]["data"],
+                        ).decode("utf-8", "ignore")
+            return body
+        if "body" in payload and "data" in payload["body"]:
+            return base64.urlsafe_b64decode(payload["body"]["data"]).decode(
+                "utf-8", "ignore",
+            )
+
+        return ""
+
+    def request_email_analysis(
+        self, message_body: str, subject: str, from_header: str, prompt: str,
+    ) -> dict:
+        """
+        Requests an analysis from the LLM, raising on any failure.
+
+        Used directly by the concurrent analysis engine, which needs the
+        exceptions to decide whether to retry.
+
+        Args:
+        ----
+            message_body: The email message body.
+            subject: The email subject.
+            from_header: The email from header.
+            prompt: The prompt for the LLM.
+
+        Returns:
+        -------
+            A dictionary containing the analysis results.
+
+        Raises:
+        ------
+            ValueError: If the response lacks the scores or metadata sections.
+
+        """
+        messages = [
+            {
+                "role": "system",
+                "content": "You are a helpful assistant that responds with valid JSON",
+            },
+            {
+                "role": "user",
+                "content": f"{prompt}\n\nEmail Content:\nSubject: {subject}\nFrom: {from_header}\nBody: {message_body}",
+            },
+        ]
+        result = call_llm(
+            self.llm_client, messages, response_format={"type": "json_object"},
+        )
+
+        # Validate required structure
+        if not all(key in result for key in ("scores", "metadata")):
+            raise ValueError("Missing required 'scores' or 'metadata' fields")
+
+        # Add debug logging of valid result
+        self.logger.debug("🔍 Analysis results for message:")
+        self.logger.debug(f"   Priority: {result.get('priority', 'N/A')}")
+        self.logger.debug(
+            f"   Scores: { {k: v['score'] for k, v in result['scores'].items()} }",
+        )
+        self.logger.debug(
+            f"   Source: {result['metadata'].get('source', 'Unknown')}",
+        )
+
+        return result
+
     def analyze_email_with_deepinfra(
         self, message_body: str, subject: str, from_header: str, prompt: str,
     ) -> dict:
@@ -162,46 +238,15 @@ class EmailClassifier(BaseScript):
 
         Returns:
         -------
-            A dictionary containing the analysis results.
+            A dictionary containing the analysis results, or an empty
+            dictionary if the analysis failed.
 
         """
         try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that responds with valid JSON",
-                },
-                {
-                    "role": "user",
-                    "content": f"{prompt}\n\nEmail Content:\nSubject: {subject}\nFrom: {from_header}\nBody: {message_body}",
-                },
-            ]
-            result = call_llm(
-                self.llm_client, messages, response_format={"type": "json_object"},
+            return self.request_email_analysis(
+                message_body, subject, from_header, prompt,
             )
 
-            # Validate required structure
-            if not all(key in result for key in ("scores", "metadata")):
-                raise ValueError("Missing required 'scores' or 'metadata' fields")
-
-            # Validate and normalize scoring values
-            for category in ["scores", "metadata"]:
-                if category not in result:
-                    self.logger.warning(f"Validation error: Missing {category} section")
-                    return {}
-
-            # Add debug logging of valid result
-            self.logger.debug("🔍 Analysis results for message:")
-            self.logger.debug(f"   Priority: {result.get('priority', 'N/A')}")
-            self.logger.debug(
-                f"   Scores: { {k: v['score'] for k, v in result['scores'].items()} }",
-            )
-            self.logger.debug(
-                f"   Source: {result['metadata'].get('source', 'Unknown')}",
-            )
-
-            return result
-
         except requests.exceptions.RequestException as e:
             self.logger.error(f"API Request Error: {e!s}")
             if hasattr(e, "response") and e.response is not None:
@@ -330,38 +375,10 @@ class EmailClassifier(BaseScript):
         scores = analysis_result["scores"]
         metadata = analysis_result["metadata"]
 
-        for rule in preferences.get("override_rules", []):
-            for keyword in rule["keywords"]:
-                if (
-                    keyword.lower() in metadata.get("topics", [])
-                    or keyword.lower() in metadata.get("source", "").lower()
-                ):
-                    return rule["min_priority"]
-
-        for source in preferences.get("high_priority_sources", []):
-            for keyword in source["keywords"]:
-                if (
-                    keyword.lower() in metadata.get("topics", [])
-                    or keyword.lower() in metadata.get("source", "").lower()
-                ):
-                    return source["min_priority"]
-
-        for source in preferences.get("low_priority_sources", []):
-            for keyword in source["keywords"]:
-                if (keyword.lower() in metadata.get("topics", [])) or (
-                    keyword.lower() in metadata.get("source", "").lower()
-                ):
-                    return source["max_priority"]
-
-        for newsletter_name, newsletter_details in preferences.get(
-            "newsletter_defaults", {},
-        ).items():
-            for keyword in newsletter_details["keywords"]:
-                if (
-                    keyword.lower() in metadata.get("topics", [])
-                    or keyword.lower() in metadata.get("source", "").lower()
-                ):
-                    return newsletter_details["default_priority"]
+        # Rules are compiled once per preferences object
+        rule_priority = get_priority_matcher(preferences).match(metadata)
+        if rule_priority is not None:
+            return rule_priority
 
         weighted_average = (
             (1 - scores["automation_score"]["score"]) * 0.1
@@ -405,6 +422,71 @@ class EmailClassifier(BaseScript):
         )
         return created_label["id"]
 
+    def _analysis_row(
+        self,
+        msg_id: str,
+        subject: str,
+        from_address: str,
+        analysis_result: dict,
+        priority: int,
+        message_full: dict,
+    ) -> tuple:
+        """Converts one analysis into an email_analyses row."""
+        return (
+            msg_id,
+            message_full.get("threadId"),
+            subject,
+            from_address,
+            datetime.now(UTC).isoformat(),  # ISO format for timestamp
+            json.dumps(analysis_result),
+            float(
+                analysis_result.get("scores", {})
+                .get("automation_score", {})
+                .get("score", 0.0),
+            ),
+            float(
+                analysis_result.get("scores", {})
+                .get("content_value", {})
+                .get("score", 0.0),
+            ),
+            float(
+                analysis_result.get("scores", {})
+                .get("human_interaction", {})
+                .get("score", 0.0),
+            ),
+            float(
+                analysis_result.get("scores", {})
+                .get("time_value", {})
+                .get("score", 0.0),
+            ),
+            float(
+                analysis_result.get("scores", {})
+                .get("business_impact", {})
+                .get("score", 0.0),
+            ),
+            float(
+                self._calculate_uncertainty(analysis_result.get("scores", {})),
+            ),
+            json.dumps(analysis_result.get("metadata", {})),
+            int(priority),
+            json.dumps(message_full.get("labelIds", [])),
+            message_full.get("snippet", ""),
+            int(message_full.get("internalDate", 0)),
+            int(message_full.get("sizeEstimate", 0)),
+            json.dumps(
+                self.extract_message_parts(message_full.get("payload", {})),
+            ),
+            message_full.get(
+                "draftId",
+            ),  # NULL as None is handled automatically
+            json.dumps(message_full.get("draftMessage"))
+            if message_full.get("draftMessage")
+            else None,
+            json.dumps(
+                self.extract_attachments(message_full.get("payload", {})),
+            ),
+        )
+
     def store_analysis_result(
         self,
         msg_id: str,
@@ -415,7 +497,7 @@ class EmailClassifier(BaseScript):
         message_full: dict,
     ):
         """
-        Stores analysis results in DuckDB using batch insertion.
+        Stores one analysis result in DuckDB.
 
         Args:
         ----
@@ -427,97 +509,73 @@ class EmailClassifier(BaseScript):
             message_full: The full message dictionary.
 
         """
-        try:
-            # Get fresh connection from pool
-            with get_connection().cursor() as cursor:  # Use context manager
-                # Convert all values to database types explicitly
-                params = (
-                    msg_id,
-                    message_full.get("threadId"),
-                    subject,
-                    from_address,
-                    datetime.now(UTC).isoformat(),  # ISO format for timestamp
-                    json.dumps(analysis_result),
-                    float(
-                        analysis_result.get("scores", {})
-                        .get("automation_score", {})
-                        .get("score", 0.0),
-                    ),
-                    float(
-                        analysis_result.get("scores", {})
-                        .get("content_value", {})
-                        .get("score", 0.0),
-                    ),
-                    float(
-                        analysis_result.get("scores", {})
-                        .get("human_interaction", {})
-                        .get("score", 0.0),
-                    ),
-                    float(
-                        analysis_result.get("scores", {})
-                        .get("time_value", {})
-                        .get("score", 0.0),
-                    ),
-                    float(
-                        analysis_result.get("scores", {})
-                        .get("business_impact", {})
-                        .get("score", 0.0),
-                    ),
-                    float(
-                        self._calculate_uncertainty(analysis_result.get("scores", {})),
-                    ),
-                    json.dumps(analysis_result.get("metadata", {})),
-                    int(priority),
-                    json.dumps(message_full.get("labelIds", [])),
-                    message_full.get("snippet", ""),
-                    int(message_full.get("internalDate", 0)),
-                    int(message_full.get("sizeEstimate", 0)),
-                    json.dumps(
-                        self.extract_message_parts(message_full.get("payload", {})),
-                    ),
-                    message_full.get(
-                        "draftId",
-                    ),  # NULL as None is handled automatically
-                    json.dumps(message_full.get("draftMessage"))
-                    if message_full.get("draftMessage")
-                    else None,
-                    json.dumps(
-                        self.extract_attachments(message_full.get("payload", {})),
-                    ),
-                )
+        self.store_analysis_results(
+            [
+                {
+                    "msg_id": msg_id,
+                    "subject": subject,
+                    "from_address": from_address,
+                    "analysis_result": analysis_result,
+                    "priority": priority,
+                    "message_full": message_full,
+                },
+            ],
+        )
 
-                # Use proper parameter binding (21 parameters now)
-                cursor.execute(
-                    """
-                    INSERT INTO email_analyses
-                    (msg_id, thread_id, subject, from_address, analysis_date, raw_analysis,
-                     automation_score, content_value, human_interaction, time_value, business_impact,
-                     uncertainty_score, metadata, priority, label_ids, snippet, internal_date,
-                     size_estimate, message_parts, draft_id, draft_message, attachments)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT (msg_id) DO UPDATE SET
-                        subject = EXCLUDED.subject,
-                        from_address = EXCLUDED.from_address,
-                        analysis_date = EXCLUDED.analysis_date,
-                        raw_analysis = EXCLUDED.raw_analysis,
-                        automation_score = EXCLUDED.automation_score,
-                        content_value = EXCLUDED.content_value,
-                        human_interaction = EXCLUDED.human_interaction,
-                        time_value = EXCLUDED.time_value,
-                        business_impact = EXCLUDED.business_impact,
-                        uncertainty_score = EXCLUDED.uncertainty_score,
-                        metadata = EXCLUDED.metadata,
-                        priority = EXCLUDED.priority
-                """,
-                    params,
-                )
+    def store_analysis_results(self, records: list[dict]) -> None:
+        """
+        Stores a batch of analysis results in DuckDB in one transaction.
+
+        Args:
+        ----
+            records: Dictionaries with the msg_id, subject, from_address,
+                analysis_result, priority and message_full of each email.
 
-            self.logger.info(f"Successfully stored analysis for {msg_id} in DuckDB")
+        """
+        if not records:
+            return
+        rows = [self._analysis_row(**record) for record in records]
+        conn = get_connection()
+        try:
+            # Use proper parameter binding (22 parameters per row)
+            with conn.cursor() as cursor:
+                cursor.execute("BEGIN TRANSACTION")
+                try:
+                    cursor.executemany(
+                        """
+                        INSERT INTO email_analyses
+                        (msg_id, thread_id, subject, from_address, analysis_date, raw_analysis,
+                         automation_score, content_value, human_interaction, time_value, business_impact,
+                         uncertainty_score, metadata, priority, label_ids, snippet, internal_date,
+                         size_estimate, message_parts, draft_id, draft_message, attachments)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (msg_id) DO UPDATE SET
+                            subject = EXCLUDED.subject,
+                            from_address = EXCLUDED.from_address,
+                            analysis_date = EXCLUDED.analysis_date,
+                            raw_analysis = EXCLUDED.raw_analysis,
+                            automation_score = EXCLUDED.automation_score,
+                            content_value = EXCLUDED.content_value,
+                            human_interaction = EXCLUDED.human_interaction,
+                            time_value = EXCLUDED.time_value,
+                            business_impact = EXCLUDED.business_impact,
+                            uncertainty_score = EXCLUDED.uncertainty_score,
+                            metadata = EXCLUDED.metadata,
+                            priority = EXCLUDED.priority
+                    """,
+                        rows,
+                    )
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
+
+            self.logger.info(f"Successfully stored {len(rows)} analyses in DuckDB")
         except duckdb.Error as e:
-            self.logger.error(f"Database error storing analysis: {e!s}")
+            self.logger.error(f"Database error storing analyses: {e!s}")
             raise
         except Exception as e:
-            self.logger.error(f"Unexpected error storing analysis: {e!s}")
+            self.logger.error(f"Unexpected error storing analyses: {e!s}")
             raise
 
     def get_critical_emails(self, conn, limit: int = 10) -> list[dict]:
@@ -697,6 +755,101 @@ Guidelines:
                 f.seek(0)  # rewind
                 json.dump(data, f, indent=4)
 
+    def _fetch_emails(self, service, messages: list[dict], existing_ids: set):
+        """
+        Yields the unprocessed messages with the fields needed for analysis.
+
+        Args:
+        ----
+            service: The Gmail service object.
+            messages: Message stubs from the list call.
+            existing_ids: IDs of messages already analyzed.
+
+        Yields:
+        ------
+            Dictionaries with msg_id, subject, from_address, body and
+            message_full.
+
+        """
+        for message in messages:
+            msg_id = message["id"]
+            if msg_id in existing_ids:
+                self.logger.info(f"Skipping already processed message {msg_id}")
+                continue
+            try:
+                message_full = (
+                    service.users()
+                    .messages()
+                    .get(userId="me", id=msg_id, format="full")
+                    .execute()
+                )
+            except HttpError as error:
+                self.logger.error(f"Could not fetch message {msg_id}: {error}")
+                continue
+
+            headers = message_full["payload"]["headers"]
+            body = self.extract_message_body(message_full["payload"])
+            if not body:
+                self.logger.info(f"Skipping message {msg_id} - no body found.")
+                continue
+            yield {
+                "msg_id": msg_id,
+                "subject": next(
+                    (h["value"] for h in headers if h["name"] == "Subject"), "",
+                ),
+                "from_address": next(
+                    (h["value"] for h in headers if h["name"] == "From"), "",
+                ),
+                "body": body,
+                "message_full": message_full,
+            }
+
+    def _with_priority(
+        self, email: dict, analysis_result: dict, preferences: dict,
+    ) -> dict:
+        """Builds a storable record, calculating the priority if missing."""
+        # Calculate priority even if missing from analysis result
+        if "priority" not in analysis_result:
+            self.logger.info(
+                f"Calculating priority locally for {email['msg_id']} "
+                "(missing in analysis)",
+            )
+            analysis_result["priority"] = self.calculate_priority(
+                analysis_result, preferences,
+            )
+        return {
+            "msg_id": email["msg_id"],
+            "subject": email["subject"],
+            "from_address": email["from_address"],
+            "analysis_result": analysis_result,
+            "priority": analysis_result["priority"],
+            "message_full": email["message_full"],
+        }
+
+    def _analyze_fetched_email(
+        self, email: dict, prompt: str, preferences: dict,
+    ) -> dict:
+        """Analyzes one fetched email; errors propagate so they can be retried."""
+        analysis_result = self.request_email_analysis(
+            email["body"], email["subject"], email["from_address"], prompt,
+        )
+        return self._with_priority(email, analysis_result, preferences)
+
+    def _fallback_record(self, email: dict, preferences: dict) -> dict:
+        """Builds a minimal viable record for an email whose analysis failed."""
+        self.logger.warning(f"Using fallback analysis for {email['msg_id']}")
+        analysis_result = {
+            "scores": {
+                "automation_score": {"score": 0.5},
+                "content_value": {"score": 0.5},
+                "human_interaction": {"score": 0.5},
+                "time_value": {"score": 0.5},
+                "business_impact": {"score": 0.5},
+            },
+            "metadata": {"source": "Analysis Failed", "error": True},
+        }
+        return self._with_priority(email, analysis_result, preferences)
+
     def run(self):
         """Main function to process emails."""
         # Parse command line arguments
@@ -712,6 +865,12 @@ Guidelines:
             action="store_true",
             help="Generate draft responses for critical emails",
         )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=self.get_config_value("llm_concurrency", 8),
+            help="Maximum number of LLM analyses in flight",
+        )
         args = parser.parse_args()
 
         # Ensure output directory exists
@@ -733,76 +892,46 @@ Guidelines:
         if not messages:
             self.logger.info("No messages found.")
             return
+        # Check for existing messages first, without loading every stored ID
+        dedupe = MessageDedupe(DuckDBIDSource(self.db_conn, "email_analyses"))
+        existing_ids = dedupe.check_many(message["id"] for message in messages)
+
+        # Messages are fetched on one thread while up to `concurrency` LLM
+        # analyses run; labels are applied from the writer, which needs its
+        # own Gmail service since the client is not thread-safe
+        label_service = self.get_gmail_service()
         feedback_entries = []  # list to store feedback entries
-        # Check for existing messages first
-        existing_ids = {
-            row[0]
-            for row in self.db_conn.execute(
-                "SELECT msg_id FROM email_analyses",
-            ).fetchall()
-        }
-
-        for message in messages:
-            msg_id = message["id"]
-            if msg_id in existing_ids:
-                self.logger.info(f"Skipping already processed message {msg_id}")
-                continue
-            message_full = (
-                service.users()
-                .messages()
-                .get(userId="me", id=msg_id, format="full")
-                .execute()
-            )
-
-            headers = message_full["payload"]["headers"]
-            subject = next(
-                (header["value"] for header in headers if header["name"] == "Subject"),
-                "",
-            )
-            from_header = next(
-                (header["value"] for header in headers if header["name"] == "From"), "",
-            )
 
-            body = self.get_message_body(service, "me", msg_id)
-            if not body:
-                self.logger.info(f"Skipping message {msg_id} - no body found.")
-                continue
-            analysis_result = self.analyze_email_with_deepinfra(
-                body, subject, from_header, analysis_prompt,
-            )
-
-            # Create minimal viable result if analysis failed
-            if not analysis_result:
-                self.logger.warning(f"Using fallback analysis for {msg_id}")
-                analysis_result = {
-                    "scores": {
-                        "automation_score": {"score": 0.5},
-                        "content_value": {"score": 0.5},
-                        "human_interaction": {"score": 0.5},
-                        "time_value": {"score": 0.5},
-                        "business_impact": {"score": 0.5},
-                    },
-                    "metadata": {"source": "Analysis Failed", "error": True},
-                }
-
-            # Calculate priority even if missing from analysis result
-            if "priority" not in analysis_result:
-                self.logger.info(
-                    f"Calculating priority locally for {msg_id} (missing in analysis)",
-                )
-                analysis_result["priority"] = self.calculate_priority(
-                    analysis_result, preferences,
+        def write_batch(records: list[dict]) -> None:
+            self.store_analysis_results(records)
+            dedupe.add(record["msg_id"] for record in records)
+            for record in records:
+                self.apply_labels(label_service, record["msg_id"], record["priority"])
+                feedback_entries.append(
+                    self.initialize_feedback_entry(
+                        record["msg_id"], record["subject"], record["priority"],
+                    ),
                 )
 
-            priority = analysis_result["priority"]
-            self.apply_labels(service, msg_id, priority)
-            self.store_analysis_result(
-                msg_id, subject, from_header, analysis_result, priority, message_full,
-            )
-
-            # Initialize a feedback entry and add to list
-            feedback_entry = self.initialize_feedback_entry(msg_id, subject, priority)
-            feedback_entries.append(feedback_entry)
+        provider = self.get_config_value("llm_provider", "deepinfra")
+        engine = AnalysisEngine(
+            analyze=lambda email: self._analyze_fetched_email(
+                email, analysis_prompt, preferences,
+            ),
+            write_batch=write_batch,
+            concurrency=args.concurrency,
+            rate_limiter=get_rate_limiter(
+                provider,
+                rate=self.get_config_value("llm_requests_per_second", 5.0),
+                capacity=self.get_config_value("llm_burst", None),
+            ),
+            max_attempts=self.get_config_value("llm_max_attempts", 4),
+            write_batch_size=self.get_config_value("store_batch_size", 50),
+            on_error=lambda email, e: self._fallback_record(email, preferences),
+        )
+        stats = engine.run(self._fetch_emails(service, messages, existing_ids))
+        dedupe.save()
+        self.logger.info(f"Analysis complete: {stats}")
 
         # Save feedback file
         if feedback_entries:
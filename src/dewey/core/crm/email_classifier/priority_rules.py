@@ -0,0 +1,178 @@
+"""
+Compiled priority rules for the email classifier.
+
+The preference rules (override rules, high/low priority sources and
+newsletter defaults) are compiled once into a topic index and an
+Aho-Corasick automaton over the lowercased keywords, so matching an email
+costs one pass over its source string instead of a scan of every keyword of
+every rule. Rule precedence is kept by ranking each rule by its position:
+the matching rule with the lowest rank wins, exactly as the first match did
+when the rules were walked in order.
+"""
+
+import threading
+from typing import Any
+
+# Preference sections in precedence order, with the key holding each rule's
+# priority
+RULE_SECTIONS = (
+    ("override_rules", "min_priority"),
+    ("high_priority_sources", "min_priority"),
+    ("low_priority_sources", "max_priority"),
+    ("newsletter_defaults", "default_priority"),
+)
+
+_NO_MATCH = float("inf")
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting the best rank of any keyword in a text."""
+
+    def __init__(self):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._best: list[float] = [_NO_MATCH]
+
+    def add(self, keyword: str, rank: int) -> None:
+        """Add a keyword; the lowest rank of overlapping keywords is kept."""
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(_NO_MATCH)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._best[state] = min(self._best[state], rank)
+
+    def build(self) -> None:
+        """Compute failure links once all keywords are added."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # A state also matches every keyword that is a suffix of it
+                inherited = self._best[self._fail[child]]
+                self._best[child] = min(self._best[child], inherited)
+                queue.append(child)
+
+    def search(self, text: str) -> float:
+        """Return the lowest rank of any keyword occurring in text."""
+        goto, fail, best_at = self._goto, self._fail, self._best
+        state = 0
+        best = _NO_MATCH
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best_at[state] < best:
+                best = best_at[state]
+        return best
+
+
+class PriorityRuleMatcher:
+    """Preference rules compiled for matching email metadata."""
+
+    def __init__(self, preferences: dict):
+        """
+        Compile the rule sections of a preferences dictionary.
+
+        Args:
+        ----
+            preferences: The email preferences dictionary.
+
+        """
+        self._rules: list[tuple[dict, str]] = []
+        self._topics: dict[str, int] = {}
+        self._always = _NO_MATCH
+        self._automaton = KeywordAutomaton()
+
+        for section, priority_key in RULE_SECTIONS:
+            rules = preferences.get(section, [])
+            if isinstance(rules, dict):
+                rules = rules.values()
+            for rule in rules:
+                rank = len(self._rules)
+                self._rules.append((rule, priority_key))
+                for keyword in rule["keywords"]:
+                    keyword = keyword.lower()
+                    self._topics.setdefault(keyword, rank)
+                    if keyword:
+                        self._automaton.add(keyword, rank)
+                    else:
+                        # The empty string is a substring of every source
+                        self._always = min(self._always, rank)
+        self._automaton.build()
+
+    def match(self, metadata: dict) -> int | None:
+        """
+        Find the priority set by the highest-precedence matching rule.
+
+        A rule matches when one of its keywords equals a topic or occurs in
+        the lowercased source.
+
+        Args:
+        ----
+            metadata: The metadata of an analysis result.
+
+        Returns:
+        -------
+            The rule's priority, or None if no rule matches.
+
+        """
+        best = self._always
+        for topic in metadata.get("topics", []):
+            if isinstance(topic, str):
+                best = min(best, self._topics.get(topic, _NO_MATCH))
+        source = metadata.get("source") or ""
+        best = min(best, self._automaton.search(source.lower()))
+
+        if best == _NO_MATCH:
+            return None
+        rule, priority_key = self._rules[int(best)]
+        return rule[priority_key]
+
+
+_cache_lock = threading.Lock()
+_cached: tuple[Any, int, PriorityRuleMatcher] | None = None
+_generation = 0
+
+
+def get_priority_matcher(preferences: dict) -> PriorityRuleMatcher:
+    """
+    Return the compiled matcher for a preferences dictionary.
+
+    The matcher is compiled once per preferences object and reused until
+    invalidate_priority_matchers() is called.
+
+    Args:
+    ----
+        preferences: The email preferences dictionary.
+
+    Returns:
+    -------
+        The compiled matcher.
+
+    """
+    global _cached
+    with _cache_lock:
+        if _cached and _cached[0] is preferences and _cached[1] == _generation:
+            return _cached[2]
+        generation = _generation
+
+    matcher = PriorityRuleMatcher(preferences)
+    with _cache_lock:
+        _cached = (preferences, generation, matcher)
+    return matcher
+
+
+def invalidate_priority_matchers() -> None:
+    """Discard compiled matchers after the preferences have changed."""
+    global _generation
+    with _cache_lock:
+        _generation += 1
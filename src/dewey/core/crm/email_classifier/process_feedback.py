@@ -15,6 +15,7 @@ import pandas as pd
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from dewey.core.crm.email_classifier.priority_rules import invalidate_priority_matchers
 from dewey.core.db.connection import DatabaseConnection, get_motherduck_connection
 
 # Try to import OpenAI with fallback if package is not installed
@@ -466,6 +467,7 @@ def save_preferences(conn: DatabaseConnection, preferences: dict[str, Any]) -> N
               {sender_history_weight}, '{priority_map.replace("'", "''")}', '{timestamp}')
         """,
         )
+        invalidate_priority_matchers()
     except Exception as e:
         print(f"Error saving preferences: {e}")
         raise
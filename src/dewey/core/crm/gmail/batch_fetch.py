@@ -0,0 +1,314 @@
+"""
+Gmail batch fetch module.
+
+Fetches full messages through the Gmail batch endpoint, which accepts up to
+100 ``messages.get`` calls in one multipart HTTP request. A small worker pool
+keeps several batches in flight, and calls throttled by Gmail (HTTP 429, or
+403 with a rate/quota reason) are retried with a shrinking batch size and an
+exponential backoff that relaxes again once requests succeed.
+"""
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.parser import BytesParser
+
+logger = logging.getLogger(__name__)
+
+GMAIL_BATCH_URL = "https://gmail.googleapis.com/batch/gmail/v1"
+MAX_BATCH_SIZE = 100
+THROTTLE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "quotaExceeded"}
+
+_CONTENT_ID = re.compile(r"(\d+)>?$")
+_BLANK_LINE = re.compile(rb"\r?\n\r?\n")
+
+
+def _is_throttled(status: int, body: dict) -> bool:
+    """Whether a response means the caller should slow down."""
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+    errors = body.get("error", {}).get("errors", []) if isinstance(body, dict) else []
+    return any(error.get("reason") in THROTTLE_REASONS for error in errors)
+
+
+def _is_retryable(status: int, body: dict) -> bool:
+    """Whether a failed call is worth sending again."""
+    return status >= 500 or _is_throttled(status, body)
+
+
+class AdaptiveThrottle:
+    """
+    Batch size and backoff shared by all fetch workers.
+
+    Each throttled batch halves the batch size and doubles the delay before
+    the next request; each clean batch grows the batch size by a tenth of
+    the maximum and halves the delay until it drops back to zero.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        min_batch_size: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 64.0,
+    ):
+        self.max_batch_size = max_batch_size
+        self.min_batch_size = min_batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batch_size = max_batch_size
+        self.delay = 0.0
+        self.throttle_count = 0
+        self._lock = threading.Lock()
+
+    def throttled(self) -> None:
+        """Back off after Gmail rejected calls for rate or quota reasons."""
+        with self._lock:
+            self.throttle_count += 1
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+            self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+        logger.warning(
+            f"Gmail throttled the request, batch size {self.batch_size}, "
+            f"waiting {self.delay:.1f}s",
+        )
+
+    def succeeded(self) -> None:
+        """Relax the backoff after a batch went through unthrottled."""
+        with self._lock:
+            step = max(1, self.max_batch_size // 10)
+            self.batch_size = min(self.max_batch_size, self.batch_size + step)
+            self.delay = self.delay / 2 if self.delay > self.base_delay else 0.0
+
+    def wait(self) -> None:
+        """Sleep for the current backoff, with jitter so workers spread out."""
+        delay = self.delay
+        if delay:
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+class GmailBatchFetcher:
+    """Fetch Gmail messages concurrently through the batch HTTP endpoint."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], object],
+        batch_url: str = GMAIL_BATCH_URL,
+        user_id: str = "me",
+        message_format: str = "full",
+        max_workers: int = 4,
+        max_attempts: int = 5,
+        throttle: AdaptiveThrottle | None = None,
+        timeout: float = 120.0,
+    ):
+        """
+        Initialize the fetcher.
+
+        Args:
+        ----
+            session_factory: Returns a requests-compatible session that adds
+                authorization, e.g. ``lambda: AuthorizedSession(creds)``.
+                Each worker thread gets its own session.
+            batch_url: Batch endpoint to POST to.
+            user_id: Gmail user whose messages are fetched.
+            message_format: Format passed to ``messages.get``.
+            max_workers: Maximum number of batch requests in flight.
+            max_attempts: Attempts per message before it is given up on.
+            throttle: Shared batch size and backoff state.
+            timeout: Seconds to wait for each batch response.
+
+        """
+        self.session_factory = session_factory
+        self.batch_url = batch_url
+        self.user_id = user_id
+        self.message_format = message_format
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.throttle = throttle or AdaptiveThrottle()
+        self.timeout = timeout
+        self.stats = dict.fromkeys(
+            ("requests", "fetched", "missing", "failed", "retried"), 0,
+        )
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+    def _session(self):
+        """Return this thread's HTTP session."""
+        if not hasattr(self._local, "session"):
+            self._local.session = self.session_factory()
+        return self._local.session
+
+    def _build_body(self, msg_ids: list[str]) -> tuple[str, bytes]:
+        """Render one multipart/mixed request holding a GET per message."""
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for index, msg_id in enumerate(msg_ids):
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <item{index}>\r\n\r\n"
+                f"GET /gmail/v1/users/{self.user_id}/messages/{msg_id}"
+                f"?format={self.message_format}\r\n\r\n",
+            )
+        parts.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", "".join(parts).encode()
+
+    @staticmethod
+    def _parse_response(content_type: str, content: bytes) -> dict[int, tuple]:
+        """
+        Split a batch response into its individual HTTP responses.
+
+        Args:
+        ----
+            content_type: Content-Type header of the batch response.
+            content: Raw body of the batch response.
+
+        Returns:
+        -------
+            Mapping of request index to (status, decoded JSON body).
+
+        """
+        envelope = BytesParser().parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + content,
+        )
+        results = {}
+        for part in envelope.get_payload():
+            match = _CONTENT_ID.search(part.get("Content-ID", ""))
+            if not match:
+                continue
+            payload = part.get_payload(decode=True) or b""
+            head, body = (_BLANK_LINE.split(payload, maxsplit=1) + [b""])[:2]
+            status = int(head.split(None, 2)[1])
+            try:
+                decoded = json.loads(body) if body.strip() else {}
+            except ValueError:
+                decoded = {}
+            results[int(match.group(1))] = (status, decoded)
+        return results
+
+    def _send(self, msg_ids: list[str]) -> tuple[list[dict], list[str], list[str]]:
+        """
+        Send one batch request.
+
+        Args:
+        ----
+            msg_ids: Message IDs to fetch, at most MAX_BATCH_SIZE.
+
+        Returns:
+        -------
+            Fetched messages, IDs to retry and IDs that failed permanently.
+
+        """
+        self.throttle.wait()
+        content_type, body = self._build_body(msg_ids)
+        response = self._session().post(
+            self.batch_url,
+            data=body,
+            headers={"Content-Type": content_type},
+            timeout=self.timeout,
+        )
+        with self._stats_lock:
+            self.stats["requests"] += 1
+
+        if response.status_code != 200:
+            try:
+                error = response.json()
+            except ValueError:
+                error = {}
+            if _is_throttled(response.status_code, error):
+                self.throttle.throttled()
+            if _is_retryable(response.status_code, error):
+                return [], list(msg_ids), []
+            logger.error(f"Gmail batch request failed with {response.status_code}")
+            return [], [], list(msg_ids)
+
+        results = self._parse_response(
+            response.headers["Content-Type"], response.content,
+        )
+        messages, retry, failed = [], [], []
+        throttled = False
+        missing = 0
+        for index, msg_id in enumerate(msg_ids):
+            status, payload = results.get(index, (500, {}))
+            if status == 200:
+                messages.append(payload)
+            elif status == 404:
+                # Deleted between listing and fetching
+                missing += 1
+            elif _is_retryable(status, payload):
+                throttled = throttled or _is_throttled(status, payload)
+                retry.append(msg_id)
+            else:
+                logger.error(f"Failed to fetch message {msg_id}: HTTP {status}")
+                failed.append(msg_id)
+
+        if throttled:
+            self.throttle.throttled()
+        else:
+            self.throttle.succeeded()
+        with self._stats_lock:
+            self.stats["missing"] += missing
+        return messages, retry, failed
+
+    def fetch(self, msg_ids: list[str]) -> Iterator[list[dict]]:
+        """
+        Fetch messages, yielding each batch's messages as soon as it arrives.
+
+        The caller can store one batch while the next ones are still in
+        flight. Messages that no longer exist are skipped, and messages that
+        keep failing are given up on after ``max_attempts`` tries.
+
+        Args:
+        ----
+            msg_ids: Message IDs to fetch.
+
+        Yields:
+        ------
+            Lists of message resources in Gmail API format.
+
+        """
+        pending = deque(dict.fromkeys(msg_ids))
+        attempts: dict[str, int] = {}
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or in_flight:
+                while pending and len(in_flight) < self.max_workers:
+                    size = min(self.throttle.batch_size, MAX_BATCH_SIZE, len(pending))
+                    batch = [pending.popleft() for _ in range(size)]
+                    in_flight[pool.submit(self._send, batch)] = batch
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = in_flight.pop(future)
+                    try:
+                        messages, retry, failed = future.result()
+                    except Exception as e:
+                        logger.warning(f"Gmail batch request error: {e}")
+                        self.throttle.throttled()
+                        messages, retry, failed = [], batch, []
+
+                    requeued = 0
+                    for msg_id in retry:
+                        attempts[msg_id] = attempts.get(msg_id, 1) + 1
+                        if attempts[msg_id] > self.max_attempts:
+                            logger.error(f"Giving up on message {msg_id}")
+                            failed.append(msg_id)
+                        else:
+                            pending.append(msg_id)
+                            requeued += 1
+
+                    with self._stats_lock:
+                        self.stats["fetched"] += len(messages)
+                        self.stats["failed"] += len(failed)
+                        self.stats["retried"] += requeued
+                    if messages:
+                        yield messages
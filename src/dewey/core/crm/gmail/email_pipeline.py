@@ -0,0 +1,242 @@
+"""
+Staged email processing pipeline.
+
+A reader thread pulls work items, a pool of workers analyzes them and a
+single writer thread stores the results in batches. The stages are joined
+by bounded queues, so a slow writer applies backpressure to the reader
+instead of letting results pile up in memory, and all database writes happen
+on one thread.
+
+Workers are threads, which suits I/O-bound processing. CPU-bound processing
+such as regex matching over email bodies holds the GIL, so with
+``processes=True`` each worker thread hands its items to a process pool
+instead; the process function and the items must then be picklable.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+
+    name: str
+    items: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        """Items handled per second of time spent working."""
+        return self.items / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+
+class EmailPipeline:
+    """Reader -> worker pool -> single writer, joined by bounded queues."""
+
+    def __init__(
+        self,
+        read_batches: Callable[[], Iterable[list]],
+        process: Callable[[Any], Any],
+        write_batch: Callable[[list], Any],
+        workers: int = 4,
+        queue_size: int = 500,
+        write_batch_size: int = 100,
+        flush_interval: float = 1.0,
+        on_error: Callable[[Any, Exception], None] | None = None,
+        processes: bool = False,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+        ----
+            read_batches: Yields lists of work items; runs on the reader thread.
+            process: Turns one work item into a result, or None to drop it.
+            write_batch: Stores a list of results; runs on the writer thread.
+            workers: Number of worker threads, and of processes with processes.
+            queue_size: Capacity of each inter-stage queue.
+            write_batch_size: Results per write_batch call.
+            flush_interval: Seconds before a partial batch is written anyway.
+            on_error: Called with the item and exception when process fails.
+            processes: Run process in a pool of worker processes; it must be
+                a module-level function (or a partial of one) so it pickles.
+
+        """
+        self.read_batches = read_batches
+        self.process = process
+        self.write_batch = write_batch
+        self.workers = workers
+        self.write_batch_size = write_batch_size
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.processes = processes
+        self._pool: ProcessPoolExecutor | None = None
+        self.work_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.result_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.reader_stats = StageStats("reader")
+        self.worker_stats = StageStats("workers")
+        self.writer_stats = StageStats("writer")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Stop reading new items; queued items are still processed and written."""
+        self._stop.set()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Snapshot of per-stage throughput and current queue depths.
+
+        Returns
+        -------
+            Mapping with one entry per stage plus the two queue depths.
+
+        """
+        with self._lock:
+            stages = {
+                stage.name: {
+                    "items": stage.items,
+                    "errors": stage.errors,
+                    "items_per_second": round(stage.items_per_second, 1),
+                }
+                for stage in (self.reader_stats, self.worker_stats, self.writer_stats)
+            }
+        stages["work_queue_depth"] = self.work_queue.qsize()
+        stages["result_queue_depth"] = self.result_queue.qsize()
+        return stages
+
+    def _record(self, stage: StageStats, items: int, started: float, errors=0):
+        with self._lock:
+            stage.items += items
+            stage.errors += errors
+            stage.busy_seconds += time.perf_counter() - started
+
+    def _read(self) -> None:
+        try:
+            batches = iter(self.read_batches())
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                self._record(self.reader_stats, len(batch), started)
+                for item in batch:
+                    self.work_queue.put(item)
+        except Exception as e:
+            logger.error(f"Pipeline reader failed: {e}", exc_info=True)
+            with self._lock:
+                self.reader_stats.errors += 1
+        finally:
+            for _ in range(self.workers):
+                self.work_queue.put(_DONE)
+
+    def _work(self) -> None:
+        while (item := self.work_queue.get()) is not _DONE:
+            started = time.perf_counter()
+            try:
+                if self._pool is not None:
+                    result = self._pool.submit(self.process, item).result()
+                else:
+                    result = self.process(item)
+            except Exception as e:
+                logger.error(f"Pipeline worker failed on {item!r:.80}: {e}")
+                self._record(self.worker_stats, 0, started, errors=1)
+                if self.on_error:
+                    try:
+                        self.on_error(item, e)
+                    except Exception as hook_error:
+                        logger.error(f"Pipeline error hook failed: {hook_error}")
+                continue
+            self._record(self.worker_stats, 1, started)
+            if result is not None:
+                self.result_queue.put(result)
+        self.result_queue.put(_DONE)
+
+    def _flush(self, batch: list) -> None:
+        started = time.perf_counter()
+        try:
+            self.write_batch(batch)
+        except Exception as e:
+            logger.error(f"Pipeline writer failed on {len(batch)} results: {e}")
+            self._record(self.writer_stats, 0, started, errors=len(batch))
+            return
+        self._record(self.writer_stats, len(batch), started)
+
+    def _write(self) -> None:
+        batch = []
+        deadline = None
+        remaining_workers = self.workers
+        while remaining_workers:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                result = self.result_queue.get(timeout=timeout)
+            except queue.Empty:
+                result = None
+            else:
+                if result is _DONE:
+                    remaining_workers -= 1
+                    continue
+                batch.append(result)
+                deadline = deadline or time.monotonic() + self.flush_interval
+
+            if batch and (
+                len(batch) >= self.write_batch_size or time.monotonic() >= deadline
+            ):
+                self._flush(batch)
+                batch, deadline = [], None
+        if batch:
+            self._flush(batch)
+
+    def run(
+        self,
+        progress: Callable[[dict[str, Any]], None] | None = None,
+        progress_interval: float = 10.0,
+    ) -> dict[str, Any]:
+        """
+        Run the pipeline until the reader is exhausted or stop() is called.
+
+        Args:
+        ----
+            progress: Called with stats() every progress_interval seconds.
+            progress_interval: Seconds between progress callbacks.
+
+        Returns:
+        -------
+            Final stats() snapshot.
+
+        """
+        if self.processes:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        threads = [threading.Thread(target=self._read, name="pipeline-reader")]
+        threads += [
+            threading.Thread(target=self._work, name=f"pipeline-worker-{i}")
+            for i in range(self.workers)
+        ]
+        writer = threading.Thread(target=self._write, name="pipeline-writer")
+        threads.append(writer)
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        while writer.is_alive():
+            writer.join(progress_interval)
+            if progress and writer.is_alive():
+                progress(self.stats())
+        for thread in threads:
+            thread.join()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        return self.stats()
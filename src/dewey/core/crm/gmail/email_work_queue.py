@@ -0,0 +1,273 @@
+"""
+Email work queue module.
+
+Tracks which raw emails still need analysis in a small ``email_work_queue``
+table, so processors no longer anti-join raw_emails against email_analyses
+on every batch. The queue only holds message IDs: whoever stores a raw email
+enqueues its ID, and a processor seeds an empty queue from the store it
+reads raw_emails from, so the queue never has to join tables living in
+another database. Work is claimed newest-first with keyset pagination and
+``FOR UPDATE SKIP LOCKED``: several processor instances can drain the
+backlog at once without claiming the same email, a crashed instance's
+leases expire and are picked up again, and emails that keep failing are
+parked as 'failed' after ``max_attempts``.
+"""
+
+import logging
+import os
+import socket
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from dewey.utils.database import fetch_all, fetch_one, get_db_cursor, insert_many
+
+logger = logging.getLogger(__name__)
+
+QUEUE_TABLE = "email_work_queue"
+
+# Queue date of raw emails without an internal_date, so the claim order and
+# keyset never compare against NULL; such emails are claimed last
+EPOCH = datetime(1970, 1, 1)
+
+QUEUE_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS {QUEUE_TABLE} (
+        message_id VARCHAR PRIMARY KEY,
+        internal_date TIMESTAMP NOT NULL DEFAULT 'epoch',
+        status VARCHAR NOT NULL DEFAULT 'pending',
+        lease_owner VARCHAR,
+        lease_expires_at TIMESTAMP,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        updated_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+"""
+
+# Tables created before internal_date was made non-null
+QUEUE_MIGRATION = f"""
+    UPDATE {QUEUE_TABLE} SET internal_date = 'epoch' WHERE internal_date IS NULL;
+    ALTER TABLE {QUEUE_TABLE}
+        ALTER COLUMN internal_date SET DEFAULT 'epoch',
+        ALTER COLUMN internal_date SET NOT NULL
+"""
+
+# Serves the claim query's ORDER BY and keyset predicate directly
+QUEUE_INDEX = f"""
+    CREATE INDEX IF NOT EXISTS idx_{QUEUE_TABLE}_claim
+    ON {QUEUE_TABLE} (internal_date DESC, message_id DESC)
+    WHERE status IN ('pending', 'leased')
+"""
+
+CLAIMABLE = """
+    (status = 'pending' OR (status = 'leased' AND lease_expires_at < now()))
+    AND attempts < %s
+"""
+
+
+class EmailWorkQueue:
+    """Lease-based queue of raw emails awaiting analysis."""
+
+    def __init__(
+        self,
+        owner: str | None = None,
+        lease_seconds: int = 600,
+        max_attempts: int = 3,
+    ):
+        """
+        Initialize the queue handle.
+
+        Args:
+        ----
+            owner: Lease owner name; defaults to host, pid and a random suffix.
+            lease_seconds: How long a claim is held before others may take it.
+            max_attempts: Claims per email before it is parked as failed.
+
+        """
+        self.owner = owner or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._cursor: tuple[datetime, str] | None = None
+
+    def ensure_table(self) -> None:
+        """Create the queue table and its claim index if missing."""
+        with get_db_cursor(commit=True) as cursor:
+            cursor.execute(QUEUE_SCHEMA)
+            cursor.execute(QUEUE_MIGRATION)
+            cursor.execute(QUEUE_INDEX)
+
+    def is_empty(self) -> bool:
+        """Whether no email has been queued yet."""
+        return fetch_one(f"SELECT 1 FROM {QUEUE_TABLE} LIMIT 1") is None
+
+    def enqueue(
+        self, emails: Iterable[tuple[str, datetime | None]], status: str = "pending",
+    ) -> int:
+        """
+        Add emails to the queue; ones already queued are left as they are.
+
+        Writers call this with the emails they just stored, so backfills,
+        historical imports and late Gmail batches are queued as soon as they
+        land, whatever their internal_date.
+
+        Args:
+        ----
+            emails: (message_id, internal_date) pairs; a missing date is
+                queued as EPOCH.
+            status: Initial status; 'done' records emails that were already
+                analysed when the queue is seeded.
+
+        Returns:
+        -------
+            Number of emails added to the queue.
+
+        """
+        added = insert_many(
+            QUEUE_TABLE,
+            ((message_id, date or EPOCH, status) for message_id, date in emails),
+            columns=["message_id", "internal_date", "status"],
+            conflict_target=["message_id"],
+        )
+        if added:
+            logger.info(f"Queued {added} emails as {status}")
+        return added
+
+    def claim(self, limit: int) -> list[str]:
+        """
+        Lease the next page of claimable emails, newest first.
+
+        Each call continues below the last email this handle claimed, so an
+        email that fails is not handed straight back in the same run. Rows
+        leased by other processors are skipped rather than waited on.
+
+        Args:
+        ----
+            limit: Maximum number of emails to claim.
+
+        Returns:
+        -------
+            Claimed message IDs in internal_date order, newest first.
+
+        """
+        keyset = "AND (internal_date, message_id) < (%s, %s)" if self._cursor else ""
+        params: list[Any] = [self.max_attempts, *(self._cursor or ()), limit]
+        params += [self.owner, self.lease_seconds]
+
+        with get_db_cursor(commit=True) as cursor:
+            cursor.execute(
+                f"""
+                WITH next_page AS (
+                    SELECT message_id FROM {QUEUE_TABLE}
+                    WHERE {CLAIMABLE} {keyset}
+                    ORDER BY internal_date DESC, message_id DESC
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE {QUEUE_TABLE} q
+                SET status = 'leased',
+                    lease_owner = %s,
+                    lease_expires_at = now() + %s * interval '1 second',
+                    attempts = q.attempts + 1,
+                    updated_at = now()
+                FROM next_page
+                WHERE q.message_id = next_page.message_id
+                RETURNING q.message_id, q.internal_date
+            """,
+                params,
+            )
+            rows = cursor.fetchall()
+
+        if not rows:
+            return []
+        rows.sort(key=lambda row: (row[1], row[0]), reverse=True)
+        self._cursor = (rows[-1][1], rows[-1][0])
+        return [row[0] for row in rows]
+
+    def complete(self, message_ids: list[str]) -> int:
+        """
+        Mark leased emails as done.
+
+        Args:
+        ----
+            message_ids: Emails this handle finished processing.
+
+        Returns:
+        -------
+            Number of queue rows updated.
+
+        """
+        if not message_ids:
+            return 0
+        with get_db_cursor(commit=True) as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {QUEUE_TABLE}
+                SET status = 'done', lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = NULL, updated_at = now()
+                WHERE message_id = ANY(%s) AND lease_owner = %s
+            """,
+                [list(message_ids), self.owner],
+            )
+            return max(cursor.rowcount, 0)
+
+    def fail(self, message_id: str, error: str) -> None:
+        """
+        Return a leased email to the queue, or park it once out of attempts.
+
+        Args:
+        ----
+            message_id: Email that failed.
+            error: Error to record for diagnosis.
+
+        """
+        with get_db_cursor(commit=True) as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {QUEUE_TABLE}
+                SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                    lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = %s, updated_at = now()
+                WHERE message_id = %s AND lease_owner = %s
+            """,
+                [self.max_attempts, error[:1000], message_id, self.owner],
+            )
+
+    def release(self) -> int:
+        """
+        Give back every lease this handle still holds, e.g. on shutdown.
+
+        Returns
+        -------
+            Number of leases released.
+
+        """
+        with get_db_cursor(commit=True) as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {QUEUE_TABLE}
+                SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL,
+                    attempts = GREATEST(attempts - 1, 0), updated_at = now()
+                WHERE status = 'leased' AND lease_owner = %s
+            """,
+                [self.owner],
+            )
+            return max(cursor.rowcount, 0)
+
+    def reset_cursor(self) -> None:
+        """Start the next claim from the newest email again."""
+        self._cursor = None
+
+    def counts(self) -> dict[str, int]:
+        """
+        Count queue rows by status.
+
+        Returns
+        -------
+            Mapping of status to number of emails.
+
+        """
+        rows = fetch_all(f"SELECT status, COUNT(*) FROM {QUEUE_TABLE} GROUP BY status")
+        return {status: count for status, count in rows}
+
@@ -5,21 +5,33 @@ import json
 import logging
 import os
 import random
-import time
 from datetime import datetime
 
 import duckdb
 from dotenv import load_dotenv
+from google.auth.transport.requests import AuthorizedSession
 
 # Import directly from dewey module
+from src.dewey.core.crm.gmail.batch_fetch import GmailBatchFetcher
 from src.dewey.core.crm.gmail.gmail_utils import OAuthGmailClient
 
 
 class GmailSync:
     """Gmail synchronization handler with MotherDuck integration."""
 
-    def __init__(self, credentials_file, db_path: str = "md:dewey", token_file=None):
+    def __init__(
+        self,
+        credentials_file,
+        db_path: str = "md:dewey",
+        token_file=None,
+        fetch_workers: int = 4,
+        work_queue=None,
+    ):
         self.gmail_client = OAuthGmailClient(credentials_file=credentials_file, token_file=token_file)
+        self.fetch_workers = fetch_workers
+        # EmailWorkQueue that stored messages are handed to for analysis
+        self.work_queue = work_queue
+        self._batch_fetcher = None
         # Set up MotherDuck connection
         load_dotenv()  # Load environment variables from .env file
         self.db_path = db_path
@@ -368,42 +380,43 @@ class GmailSync:
             f"✅ Incremental sync completed. Processed {total_processed} messages",
         )
 
+    def _get_batch_fetcher(self) -> GmailBatchFetcher:
+        """Get the batch fetcher, authenticating the Gmail client if needed."""
+        if self._batch_fetcher is None:
+            if self.gmail_client.creds is None and not self.gmail_client.authenticate():
+                raise RuntimeError("Failed to authenticate with Gmail API")
+            creds = self.gmail_client.creds
+            self._batch_fetcher = GmailBatchFetcher(
+                session_factory=lambda: AuthorizedSession(creds),
+                max_workers=self.fetch_workers,
+            )
+        return self._batch_fetcher
+
     def _process_message_batch(self, messages: list[dict]):
-        """Process a batch of messages with retry logic, getting complete data."""
+        """Fetch a page of messages through batch requests and store them."""
+        fetcher = self._get_batch_fetcher()
+        emoji = random.choice(self.email_emojis)
+        failed_before = fetcher.stats["failed"]
         success_count = 0
-        for idx, msg in enumerate(messages):
-            emoji = random.choice(self.email_emojis)
-            for attempt in range(3):
-                try:
-                    msg_id = msg["id"]
-                    # Only log every 10th message to reduce noise
-                    if idx % 10 == 0:
-                        self.logger.info(
-                            f"{emoji} Processing message {idx + 1}/{len(messages)}: {msg_id[:8]}...",
-                        )
 
-                    try:
-                        full_msg = self.gmail_client.get_message(msg_id, format="full")
-                    except Exception as e:
-                        self.logger.error(f"Error getting message: {e}")
-                        continue
-                    if full_msg:
-                        parsed = self._parse_message(full_msg)
-                        self._store_message(parsed)
-                        success_count += 1
-                    else:
-                        self.logger.warning(f"⚠️ Could not retrieve message {msg_id}")
-                    break
+        # Each HTTP batch is stored while the following ones are in flight
+        for fetched in fetcher.fetch([msg["id"] for msg in messages]):
+            parsed = []
+            for full_msg in fetched:
+                try:
+                    parsed.append(self._parse_message(full_msg))
                 except Exception as e:
-                    if attempt == 2:
-                        self.logger.error(f"❌ Failed to process message {msg_id}: {e}")
-                    else:
-                        backoff_time = 2**attempt
-                        self.logger.warning(
-                            f"⏱️ Retry {attempt + 1} for message {msg_id}: {e}. Waiting {backoff_time}s...",
-                        )
-                        time.sleep(backoff_time)  # Exponential backoff
+                    self.logger.error(
+                        f"❌ Failed to parse message {full_msg.get('id')}: {e}",
+                    )
+            success_count += self._store_messages(parsed)
+            self.logger.info(
+                f"{emoji} Stored {success_count}/{len(messages)} messages...",
+            )
 
+        failed = fetcher.stats["failed"] - failed_before
+        if failed:
+            self.logger.warning(f"⚠️ Could not retrieve {failed} messages")
         self.logger.info(
             f"✅ Successfully processed {success_count}/{len(messages)} messages in batch",
         )
@@ -480,35 +493,53 @@ class GmailSync:
 
         return attachments
 
-    def _store_message(self, message: dict):
-        """Upsert message into database using raw_emails table."""
+    def _message_row(self, message: dict) -> list:
+        """Convert a parsed message to a raw_emails row."""
+        return [
+            message["message_id"],
+            message["thread_id"],
+            message["internal_date"],
+            message["labels"],  # Arrays should work with DuckDB
+            message["subject"],
+            message["sender"],
+            message["recipient"],
+            message["body"],
+            json.dumps(message["headers"]),  # JSON string instead of map
+            message["attachments"],  # Arrays should work with DuckDB
+            message["history_id"],
+            message.get("raw_data", ""),
+            message.get("snippet", ""),
+        ]
+
+    def _store_messages(self, messages: list[dict]) -> int:
+        """Upsert parsed messages into raw_emails in a single transaction."""
+        if not messages:
+            return 0
+
         conn = self._get_connection()
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO raw_emails
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                [self._message_row(message) for message in messages],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if self.work_queue is not None:
+            self.work_queue.enqueue(
+                (message["message_id"], message["internal_date"])
+                for message in messages
+            )
+        return len(messages)
 
-        # Convert headers to JSON string
-        headers_json = json.dumps(message["headers"])
-
-        # Use the new raw_emails table
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO raw_emails
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            [
-                message["message_id"],
-                message["thread_id"],
-                message["internal_date"],
-                message["labels"],  # Arrays should work with DuckDB
-                message["subject"],
-                message["sender"],
-                message["recipient"],
-                message["body"],
-                headers_json,  # JSON string instead of map
-                message["attachments"],  # Arrays should work with DuckDB
-                message["history_id"],
-                message.get("raw_data", ""),
-                message.get("snippet", ""),
-            ],
-        )
+    def _store_message(self, message: dict):
+        """Upsert message into database using raw_emails table."""
+        self._store_messages([message])
 
     def _update_sync_history(self):
         """Update sync history tracking."""
@@ -40,6 +40,7 @@ class OAuthGmailClient:
             "https://www.googleapis.com/auth/gmail.readonly",
             "https://www.googleapis.com/auth/gmail.modify",
         ]
+        self.creds = None
         self.service = None
         self.logger = logging.getLogger("gmail_client")
 
@@ -84,6 +85,7 @@ class OAuthGmailClient:
                     return None
 
         try:
+            self.creds = creds
             self.service = build("gmail", "v1", credentials=creds)
             self.logger.info("Successfully authenticated with Gmail API via OAuth")
             return self.service
@@ -6,7 +6,6 @@ Simple Gmail Email Import Script
 This script imports emails from Gmail using gcloud CLI authentication.
 """
 
-import base64
 import json
 import os
 import time
@@ -25,6 +24,7 @@ from googleapiclient.discovery import build
 from googleapiclient.discovery_cache.base import Cache
 
 from dewey.core.base_script import BaseScript
+from dewey.core.crm.email.mime_message import BlobStore, GmailPayload
 
 # from dewey.core.db.utils import create_table_if_not_exists # Removed direct schema operations
 # from dewey.llm.llm_utils import call_llm # Removed direct LLM calls
@@ -67,6 +67,7 @@ class GmailImporter(BaseScript):
             self.get_config_value("settings.oauth_token_uri")
             or "https://oauth2.googleapis.com/token"
         )
+        self.blob_store = BlobStore(self.get_config_value("paths.blob_dir"))
 
     def _create_emails_table(self, conn: duckdb.DuckDBPyConnection) -> None:
         """
@@ -508,13 +509,8 @@ class GmailImporter(BaseScript):
             Structured email data
 
         """
-        headers = {
-            header["name"].lower(): header["value"]
-            for header in message.get("payload", {}).get("headers", [])
-        }
-
-        # Extract body
-        body = self.extract_body(message.get("payload", {}))
+        payload = GmailPayload(message.get("payload", {}), self.blob_store)
+        headers = payload.headers
 
         # Extract email data
         email_data = {
@@ -529,8 +525,8 @@ class GmailImporter(BaseScript):
             "labelIds": message.get("labelIds", []),
             "internalDate": message.get("internalDate", ""),
             "sizeEstimate": message.get("sizeEstimate", 0),
-            "body": {"text": body["text"], "html": body["html"]},
-            "attachments": self.extract_attachments(message.get("payload", {})),
+            "body": {"text": payload.body_text, "html": payload.body_html},
+            "attachments": payload.attachments,
         }
 
         return email_data
@@ -548,37 +544,8 @@ class GmailImporter(BaseScript):
             Dictionary with 'text' and 'html' versions of the body
 
         """
-        result = {"text": "", "html": ""}
-
-        if not payload:
-            return result
-
-        def decode_part(part):
-            if "body" in part and "data" in part["body"]:
-                try:
-                    data = part["body"]["data"]
-                    return base64.urlsafe_b64decode(data).decode("utf-8")
-                except Exception as e:
-                    self.logger.warning("Failed to decode email part: %s", str(e))
-                    return ""
-            return ""
-
-        def process_part(part):
-            mime_type = part.get("mimeType", "")
-            if mime_type == "text/plain":
-                if not result["text"]:  # Only set if not already set
-                    result["text"] = decode_part(part)
-            elif mime_type == "text/html":
-                if not result["html"]:  # Only set if not already set
-                    result["html"] = decode_part(part)
-            elif "parts" in part:
-                for subpart in part["parts"]:
-                    process_part(subpart)
-
-        # Process the main payload
-        process_part(payload)
-
-        return result
+        message = GmailPayload(payload)
+        return {"text": message.body_text, "html": message.body_html}
 
     def extract_attachments(self, payload: dict) -> list[dict[str, Any]]:
         """
@@ -590,31 +557,11 @@ class GmailImporter(BaseScript):
 
         Returns:
         -------
-            List of attachment metadata
+            List of attachment metadata; inline attachment content is
+            written to the blob store and recorded by its SHA-256
 
         """
-        attachments = []
-
-        if not payload:
-            return attachments
-
-        # Check if this part is an attachment
-        if payload.get("filename"):
-            attachments.append(
-                {
-                    "filename": payload["filename"],
-                    "mimeType": payload.get("mimeType", ""),
-                    "size": payload.get("body", {}).get("size", 0),
-                    "attachmentId": payload.get("body", {}).get("attachmentId", ""),
-                },
-            )
-
-        # Check for multipart
-        if "parts" in payload:
-            for part in payload["parts"]:
-                attachments.extend(self.extract_attachments(part))
-
-        return attachments
+        return GmailPayload(payload, self.blob_store).attachments
 
     def store_emails_batch(self, conn, email_batch, batch_id: str):
         """
@@ -745,10 +692,8 @@ class GmailImporter(BaseScript):
                 self.logger.error("Invalid payload type: %s", type(payload))
                 return False
 
-            headers = {
-                header["name"].lower(): header["value"]
-                for header in payload.get("headers", [])
-            }
+            message = GmailPayload(payload, self.blob_store)
+            headers = message.headers
 
             # Parse addresses
             from_str = headers.get("from", "")
@@ -768,11 +713,8 @@ class GmailImporter(BaseScript):
                 self.logger.info("Email %s already exists, skipping", msg_id)
                 return False
 
-            # Extract body and attachments
-            body = self.extract_body(
-                payload,
-            )  # Now returns a dict with 'text' and 'html'
-            attachments = self.extract_attachments(payload)
+            # Inline attachment content is stored as a blob, not in the row
+            stripped_payload = message.without_attachment_data()
 
             # Parse email date
             try:
@@ -790,7 +732,7 @@ class GmailImporter(BaseScript):
                 "subject": headers.get("subject", ""),
                 "from_address": from_email,
                 "analysis_date": datetime.now().isoformat(),
-                "raw_analysis": json.dumps(email_data),
+                "raw_analysis": json.dumps({**email_data, "payload": stripped_payload}),
                 "automation_score": 0.0,  # Will be set by enrichment
                 "content_value": 0.0,  # Will be set by enrichment
                 "human_interaction": 0.0,  # Will be set by enrichment
@@ -816,8 +758,8 @@ class GmailImporter(BaseScript):
                             if addr.strip()
                         ],
                         "received_date": received_date.isoformat(),
-                        "body_text": body["text"],
-                        "body_html": body["html"],
+                        "body_text": message.body_text,
+                        "body_html": message.body_html,
                     },
                 ),
                 "priority": 0,  # Will be set by enrichment
@@ -825,10 +767,10 @@ class GmailImporter(BaseScript):
                 "snippet": email_data.get("snippet", ""),
                 "internal_date": int(email_data.get("internalDate", 0)),
                 "size_estimate": email_data.get("sizeEstimate", 0),
-                "message_parts": json.dumps(payload),
+                "message_parts": json.dumps(stripped_payload),
                 "draft_id": None,  # Will be set if this is a draft
                 "draft_message": None,  # Will be set if this is a draft
-                "attachments": json.dumps(attachments),
+                "attachments": json.dumps(message.attachments),
                 "status": "new",
                 "error_message": None,
                 "batch_id": batch_id,
@@ -1,17 +1,111 @@
 #!/usr/bin/env python3
 
 import json
+import logging
 import os
+import re
 import time
+from collections.abc import Iterator
+from functools import partial
 from datetime import datetime
 from typing import Any
 
 from dotenv import load_dotenv
 
 from src.dewey.core.base_script import BaseScript
+from src.dewey.core.crm.gmail.email_pipeline import EmailPipeline
+from src.dewey.core.crm.gmail.email_work_queue import EmailWorkQueue
 from src.dewey.core.db.connection import db_manager
 from src.dewey.core.crm.gmail.gmail_utils import OAuthGmailClient
 
+logger = logging.getLogger(__name__)
+
+# Signature regexes compiled in this process, by patterns fingerprint
+_signature_regexes: dict[str, dict[str, re.Pattern]] = {}
+
+
+def compile_signature_patterns(patterns: dict[str, str]) -> dict[str, re.Pattern]:
+    """
+    Compile signature patterns once per process.
+
+    Args:
+    ----
+        patterns: Regex pattern for each contact field.
+
+    Returns:
+    -------
+        The compiled patterns; ones that fail to compile are logged and left out.
+
+    """
+    fingerprint = json.dumps(patterns, sort_keys=True)
+    if fingerprint not in _signature_regexes:
+        compiled = {}
+        for field, pattern in patterns.items():
+            try:
+                compiled[field] = re.compile(pattern, re.MULTILINE)
+            except re.error as e:
+                logger.warning(f"Could not compile regex pattern for {field}: {e}")
+        _signature_regexes[fingerprint] = compiled
+    return _signature_regexes[fingerprint]
+
+
+def extract_signature_info(
+    body: str, from_address: str, patterns: dict[str, str],
+) -> dict[str, Any]:
+    """Match signature patterns against an email body."""
+    contact_info = {}
+    for field, regex in compile_signature_patterns(patterns).items():
+        match = regex.search(body)
+        if match:
+            contact_info[field] = match.group(1 if regex.groups else 0).strip()
+
+    # Add the from address to the contact info
+    contact_info["email"] = from_address
+    return contact_info
+
+
+def score_priority(subject: str, body: str) -> float:
+    """Score an email's priority from keywords in its body and subject."""
+    body, subject = body.lower(), subject.lower()
+    priority_score = 0.0
+    if "urgent" in body or "important" in subject:
+        priority_score += 0.5
+    if "action required" in body or "action needed" in subject:
+        priority_score += 0.3
+    if "meeting" in body or "schedule" in subject:
+        priority_score += 0.2
+    return priority_score
+
+
+def analyze_email(row: tuple, signature_patterns: dict[str, str]) -> dict[str, Any]:
+    """
+    Extract contact info and a priority score from one raw email row.
+
+    A module-level function so the pipeline can run it in worker processes.
+
+    Args:
+    ----
+        row: (message_id, thread_id, internal_date, subject, sender, body).
+        signature_patterns: Regex pattern for each contact field.
+
+    Returns:
+    -------
+        The analysis stored in email_analyses.
+
+    """
+    message_id, thread_id, internal_date, subject, from_address, body = row
+    return {
+        "msg_id": message_id,
+        "thread_id": thread_id,
+        "internal_date": internal_date,
+        "subject": subject,
+        "from_address": from_address,
+        "contact_info": extract_signature_info(
+            body or "", from_address, signature_patterns,
+        ),
+        "priority_score": score_priority(subject or "", body or ""),
+    }
+
 
 class UnifiedEmailProcessor(BaseScript):
     """
@@ -31,6 +125,8 @@ class UnifiedEmailProcessor(BaseScript):
 
         # Initialize components
         self.gmail_sync = None
+        self.pipeline = None
+        self.email_queue = None
         self._interrupted = False
 
         # Configuration
@@ -171,7 +267,10 @@ class UnifiedEmailProcessor(BaseScript):
             # Initialize GmailSync with the authenticated client and MotherDuck path
             from src.dewey.core.crm.gmail.gmail_sync import GmailSync
             gmail_sync = GmailSync(
-                credentials_file=str(credentials_path), db_path=motherduck_db, token_file=str(token_path)
+                credentials_file=str(credentials_path),
+                db_path=motherduck_db,
+                token_file=str(token_path),
+                work_queue=self._get_email_queue(),
             )
 
             self.gmail_sync = gmail_sync
@@ -189,211 +288,175 @@ class UnifiedEmailProcessor(BaseScript):
         self.gmail_sync.run(initial=False, max_results=self.max_results_per_sync)
 
     def process_unprocessed_emails(self):
-        """Process all unprocessed emails in the database."""
+        """
+        Process unprocessed emails through a staged pipeline.
+
+        Emails are leased from the shared email work queue, so several
+        processor instances can run at once. A reader thread claims pages of
+        work, a pool of worker processes extracts contact info and scores
+        priority, and a single writer thread stores the analyses in batched
+        transactions. With every write on one thread there are no
+        write-write conflicts to pace around.
+        """
         self.logger.info("🔍 Finding unprocessed emails")
 
-        # Import here to allow connection refreshes
-        from dewey.core.db import db_manager
-
-        # Get batch size from config or use default
-        batch_size = self.get_config_value(
-            "batch_size", 100,
-        )  # Larger batch size for faster processing
+        batch_size = self.get_config_value("batch_size", 100)
         max_emails = self.get_config_value("max_emails", 1000)
 
-        # Add a small delay between write operations to reduce concurrent writes
-        write_delay = self.get_config_value(
-            "write_delay", 0.1,
-        )  # 100ms delay between writes
+        self._get_email_queue()
+        self._seed_email_queue(self.get_config_value("queue_full_scan", False))
+        self.logger.info("📨 Email work queue: %s", self.email_queue.counts())
+
+        self.pipeline = EmailPipeline(
+            read_batches=lambda: self._read_unprocessed_emails(batch_size, max_emails),
+            process=partial(analyze_email, signature_patterns=self.signature_patterns),
+            write_batch=self._store_email_analyses,
+            workers=self.get_config_value("pipeline_workers", 4),
+            queue_size=self.get_config_value("pipeline_queue_size", 500),
+            write_batch_size=batch_size,
+            on_error=lambda row, e: self.email_queue.fail(row[0], str(e)),
+            # Processes only pay for their pickling when there are cores to use
+            processes=self.get_config_value(
+                "pipeline_processes", (os.cpu_count() or 1) > 1,
+            ),
+        )
 
-        # Query once to get total count
+        start_time = time.time()
         try:
-            total_count_query = """
-                SELECT COUNT(*)
-                FROM raw_emails r
-                LEFT JOIN email_analyses e ON r.message_id = e.msg_id
-                WHERE e.msg_id IS NULL
-                   OR e.status = 'pending'
-                LIMIT ?
-            """
-            total_count_result = db_manager.execute_query(
-                total_count_query, [max_emails],
+            stats = self.pipeline.run(
+                progress=lambda stats: self.logger.info("📊 Pipeline: %s", stats),
             )
-            total_count = total_count_result[0][0] if total_count_result else 0
+        finally:
+            # Hand back anything claimed but not finished, e.g. on interrupt
+            self.email_queue.release()
+        total_time = time.time() - start_time
 
-            if total_count == 0:
-                self.logger.info("✅ No unprocessed emails found!")
-                return
+        written = stats["writer"]["items"]
+        failed = stats["workers"]["errors"] + stats["writer"]["errors"]
+        if not written and not failed:
+            self.logger.info("✅ No unprocessed emails found!")
+            return
 
-            self.logger.info(
-                "📨 Found %s emails to process (limiting to %s)",
-                total_count,
-                max_emails,
+        self.logger.info(
+            "🏁 Processing complete: %s emails stored, %s failed in %.1f seconds "
+            "(%.1f/s); stage throughput: %s",
+            written,
+            failed,
+            total_time,
+            written / total_time if total_time > 0 else 0.0,
+            stats,
+        )
+
+    def _get_email_queue(self) -> EmailWorkQueue:
+        """Open the email work queue, creating its table on first use."""
+        if self.email_queue is None:
+            self.email_queue = EmailWorkQueue(
+                lease_seconds=self.get_config_value("lease_seconds", 600),
+                max_attempts=self.get_config_value("max_attempts", 3),
             )
-        except Exception as e:
-            self.logger.error("❌ Error counting unprocessed emails: %s", e)
-            # Default to proceeding without knowing the count
-            total_count = None
+            self.email_queue.ensure_table()
+        return self.email_queue
 
-        # Process in batches to avoid memory issues and allow interruption
-        processed_count = 0
-        error_count = 0
-        start_time = time.time()
+    def _seed_email_queue(self, full_scan: bool = False) -> None:
+        """
+        Queue raw emails from the store the pipeline reads them from.
 
-        # Use a list to track recent processing rates for better estimation
-        recent_rates = []
-        max_rate_samples = 5  # Number of recent batches to average
+        GmailSync enqueues what it stores, so this only runs while the queue
+        is empty, or on request to pick up emails stored by other means.
+        Emails that already have a completed analysis are queued as 'done'.
 
-        # Track when we last released DB connections
-        last_db_release = time.time()
-        db_release_interval = 60  # Release DB connections every 60 seconds
+        Args:
+        ----
+            full_scan: Check every raw email even if the queue is not empty.
 
-        while processed_count < max_emails:
-            # Release database connections periodically
-            current_time = time.time()
-            if current_time - last_db_release > db_release_interval:
-                self._maybe_release_db_connections()
-                # Re-import after connection refresh
-                from dewey.core.db import db_manager
+        """
+        if not full_scan and not self.email_queue.is_empty():
+            return
+        rows = db_manager.execute_query(
+            """
+            SELECT r.message_id, r.internal_date,
+                e.msg_id IS NOT NULL AND e.status != 'pending' AS analysed
+            FROM raw_emails r
+            LEFT JOIN email_analyses e ON r.message_id = e.msg_id
+        """,
+        )
+        for done in (False, True):
+            self.email_queue.enqueue(
+                [(row[0], row[1]) for row in rows if bool(row[2]) is done],
+                status="done" if done else "pending",
+            )
 
-                last_db_release = current_time
+    def _read_unprocessed_emails(
+        self, batch_size: int, max_emails: int,
+    ) -> Iterator[list[tuple]]:
+        """Claim pages of queued emails, newest first, and load their rows."""
+        read = 0
+        while read < max_emails and not self._interrupted:
+            message_ids = self.email_queue.claim(min(batch_size, max_emails - read))
+            if not message_ids:
+                return
+            read += len(message_ids)
 
-            try:
-                # Get a batch of emails to process
-                query = """
-                    SELECT message_id
-                    FROM raw_emails r
-                    LEFT JOIN email_analyses e ON r.message_id = e.msg_id
-                    WHERE e.msg_id IS NULL
-                       OR e.status = 'pending'
-                    ORDER BY r.internal_date DESC
-                    LIMIT ?
+            placeholders = ", ".join("?" for _ in message_ids)
+            rows = db_manager.execute_query(
+                f"""
+                SELECT message_id, thread_id, internal_date, subject, sender, body
+                FROM raw_emails WHERE message_id IN ({placeholders})
+            """,
+                message_ids,
+            )
+            by_id = {row[0]: row for row in rows}
+            for message_id in message_ids:
+                if message_id not in by_id:
+                    self.email_queue.fail(message_id, "not found in raw_emails")
+            yield [by_id[m] for m in message_ids if m in by_id]
+
+    def _store_email_analyses(self, analyses: list[dict[str, Any]]) -> None:
+        """Store a batch of analyses in one transaction, then enrich contacts."""
+        now = datetime.utcnow()
+        conn = db_manager.get_connection(for_write=True)
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.executemany(
                 """
-                new_emails = db_manager.execute_query(query, [batch_size])
-
-                if not new_emails:
-                    break  # No more emails to process
-
-                batch_count = len(new_emails)
-                batch_start_time = time.time()
-                self.logger.info("📧 Processing batch of %s emails", batch_count)
-
-                # Process the batch
-                batch_success = 0
-                batch_error = 0
-
-                # Process each email in the batch
-                for i, (email_id,) in enumerate(new_emails):
-                    try:
-                        # Add a small delay between emails to reduce concurrent write operations
-                        # Skip delay for the first email in the batch
-                        if i > 0 and write_delay > 0:
-                            time.sleep(write_delay)
-
-                        if self._process_single_email(email_id):
-                            batch_success += 1
-                        else:
-                            batch_error += 1
-
-                        # Release DB connections every 25 emails to prevent long-term locking
-                        if (i + 1) % 25 == 0:
-                            self._maybe_release_db_connections()
-                            # Re-import after connection refresh
-                            from dewey.core.db import db_manager
-
-                    except Exception as e:
-                        self.logger.error(
-                            "❌ Error processing email %s: %s",
-                            email_id,
-                            str(e),
-                            exc_info=True,
-                        )
-                        batch_error += 1
-
-                # Update counts
-                processed_count += batch_count
-                error_count += batch_error
-
-                # Calculate and show progress
-                batch_time = time.time() - batch_start_time
-                rate = batch_count / batch_time if batch_time > 0 else 0
-                recent_rates.append(rate)
-                if len(recent_rates) > max_rate_samples:
-                    recent_rates.pop(0)  # Keep only the most recent samples
-
-                avg_rate = sum(recent_rates) / len(recent_rates) if recent_rates else 0
-                elapsed_time = time.time() - start_time
-
-                # Estimate remaining time
-                remaining = total_count - processed_count if total_count else "unknown"
-                remaining_time = (
-                    (total_count - processed_count) / avg_rate
-                    if total_count and avg_rate > 0
-                    else "unknown"
-                )
-
-                if isinstance(remaining_time, str):
-                    eta_str = "unknown"
-                else:
-                    eta_str = f"{remaining_time:.1f} seconds"
-
-                self.logger.info(
-                    "✓ Processed %s/%s emails (%s/%s success in %.1fs, rate: %.1f/s, avg: %.1f/s, ETA: %s)",
-                    processed_count,
-                    total_count or "unknown",
-                    batch_success,
-                    batch_count,
-                    batch_time,
-                    rate,
-                    avg_rate,
-                    eta_str,
+                INSERT OR REPLACE INTO email_analyses (
+                    msg_id, thread_id, subject, from_address, analysis_date,
+                    priority, status, metadata, email_id, processed,
+                    priority_score, extracted_contacts, processed_timestamp,
+                    internal_date
                 )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                [
+                    [
+                        a["msg_id"],
+                        a["thread_id"],
+                        a["subject"],
+                        a["from_address"],
+                        now,
+                        0,
+                        "complete",
+                        "{}",
+                        a["msg_id"],
+                        True,
+                        a["priority_score"],
+                        json.dumps(a["contact_info"]),
+                        now,
+                        a["internal_date"],
+                    ]
+                    for a in analyses
+                ],
+            )
+            conn.execute("COMMIT")
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            for a in analyses:
+                self.email_queue.fail(a["msg_id"], str(e))
+            raise
 
-                # Adaptive delay - if we're getting write conflicts, slow down
-                # Check if we have logs from the last processing indicating write conflicts
-                write_conflicts = False
-                try:
-                    # Simple check - better implementation would be to analyze logs
-                    if (
-                        hasattr(self, "had_write_conflicts")
-                        and self.had_write_conflicts
-                    ):
-                        write_conflicts = True
-                        # Reset the flag
-                        self.had_write_conflicts = False
-                except Exception:
-                    pass
-
-                # If we detected write conflicts, increase the delay
-                if write_conflicts and write_delay < 0.5:  # Cap at 500ms
-                    old_delay = write_delay
-                    write_delay = min(
-                        write_delay * 1.5, 0.5,
-                    )  # Increase by 50% up to 500ms
-                    self.logger.info(
-                        f"Write conflicts detected, increasing delay from {old_delay:.2f}s to {write_delay:.2f}s",
-                    )
-
-            except Exception as e:
-                self.logger.error(f"❌ Error processing batch: {e}", exc_info=True)
-                error_count += batch_count
-                processed_count += batch_count  # Count as processed even if errors
-
-                # Set the conflicts flag
-                self.had_write_conflicts = "write-write conflict" in str(e)
-
-        # Done processing
-        total_time = time.time() - start_time
-        success_count = processed_count - error_count
-
-        self.logger.info(
-            "🏁 Processing complete: %s/%s emails processed successfully "
-            "in {:.1f} seconds ({:.1f}/s)",
-            success_count,
-            processed_count,
-            total_time,
-            processed_count / total_time,
-        )
+        self.email_queue.complete([a["msg_id"] for a in analyses])
+        for a in analyses:
+            self._enrich_contact_from_email(a["msg_id"], a["contact_info"])
 
     def _setup_database_tables(self):
         """Ensure we have the necessary database tables and columns."""
@@ -421,7 +484,8 @@ class UnifiedEmailProcessor(BaseScript):
                         processed BOOLEAN DEFAULT FALSE,
                         priority_score FLOAT,
                         extracted_contacts JSON,
-                        processed_timestamp TIMESTAMP
+                        processed_timestamp TIMESTAMP,
+                        internal_date TIMESTAMP
                     )
                 """,
                     for_write=True,
@@ -483,6 +547,7 @@ class UnifiedEmailProcessor(BaseScript):
                     "priority_score": "FLOAT",
                     "extracted_contacts": "JSON",
                     "processed_timestamp": "TIMESTAMP",
+                    "internal_date": "TIMESTAMP",
                 }
 
                 # Add missing columns
@@ -497,7 +562,8 @@ class UnifiedEmailProcessor(BaseScript):
                                 default_value = "DEFAULT FALSE"
                             elif col_type == "INTEGER" or col_type == "FLOAT":
                                 default_value = "DEFAULT 0"
-                            elif col_type == "TIMESTAMP":
+                            elif col_type == "TIMESTAMP" and col_name != "internal_date":
+                                # internal_date comes from the email, not the clock
                                 default_value = "DEFAULT CURRENT_TIMESTAMP"
 
                             db_manager.execute_query(
@@ -627,36 +693,15 @@ class UnifiedEmailProcessor(BaseScript):
                 self.logger.warning("⚠️ Email %s not found in raw_emails", email_id)
                 return {}
 
-            body = email_result[0][0]
-
-            # Extract contact information from the email signature
-            contact_info = {}
-            for field, pattern in self.signature_patterns.items():
-                match = None
-                try:
-                    import re
-
-                    match = re.search(pattern, body, re.MULTILINE)
-                except Exception as e:
-                    self.logger.warning(
-                        "Could not compile regex pattern for %s: %s", field, e,
-                    )
-                    continue
-
-                if match:
-                    contact_info[field] = match.group(1).strip()
-                    self.logger.debug(
-                        "Extracted %s: %s from email %s", field, contact_info[field], email_id,
-                    )
-
-            # Add the from address to the contact info
-            contact_info["email"] = from_address
-
-            return contact_info
+            return self._extract_signature_info(email_result[0][0], from_address)
         except Exception as e:
             self.logger.error("❌ Error extracting contact info: %s", e)
             return {}
 
+    def _extract_signature_info(self, body: str, from_address: str) -> dict[str, Any]:
+        """Match the configured signature patterns against an email body."""
+        return extract_signature_info(body, from_address, self.signature_patterns)
+
     def _get_column_names(self, table_name: str) -> list[str]:
         """Get a list of column names for a given table."""
         try:
@@ -883,15 +928,7 @@ class UnifiedEmailProcessor(BaseScript):
                 return
 
             body, subject = email_result[0]
-
-            # Calculate the priority score based on the email body and subject
-            priority_score = 0.0
-            if "urgent" in body.lower() or "important" in subject.lower():
-                priority_score += 0.5
-            if "action required" in body.lower() or "action needed" in subject.lower():
-                priority_score += 0.3
-            if "meeting" in body.lower() or "schedule" in subject.lower():
-                priority_score += 0.2
+            priority_score = self._score_priority(subject, body)
 
             # Update the priority score in the email_analyses table
             self._update_field(email_id, "priority_score", priority_score)
@@ -901,6 +938,10 @@ class UnifiedEmailProcessor(BaseScript):
         except Exception as e:
             self.logger.error("❌ Error calculating priority score: %s", e)
 
+    def _score_priority(self, subject: str, body: str) -> float:
+        """Score an email's priority from keywords in its body and subject."""
+        return score_priority(subject, body)
+
     def _cleanup(self) -> None:
         """Clean up resources."""
         self.logger.info("Cleaning up resources")
@@ -928,244 +969,6 @@ class UnifiedEmailProcessor(BaseScript):
             self.logger.error("Could not release database connections: %s", e)
 
 
-                    )
-                    contact_exists = existing and existing[0][0] > 0
-                except Exception as e2:
-                    self.logger.warning(f"Backup check for contact failed: {e2}")
-
-            if contact_exists:
-                # Just update the incrementable fields with minimal SQL to avoid errors
-                # Use a more defensive update query with better error handling
-                try:
-                    db_manager.execute_query(
-                        """
-                        UPDATE contacts
-                        SET last_updated = ?,
-                            email_count = COALESCE(email_count, 0) + 1,
-                            confidence_score = ?
-                        WHERE email = ?
-                    """,
-                        [
-                            now_str,
-                            simple_contact["confidence_score"],
-                            simple_contact["email"],
-                        ],
-                        for_write=True,
-                    )
-                    self.logger.debug(
-                        "Updated existing contact: %s", simple_contact["email"],
-                    )
-                except Exception as e:
-                    self.logger.warning("Error updating contact: %s", e)
-                    # Try a simpler update as fallback
-                    try:
-                        db_manager.execute_query(
-                            """
-                            UPDATE contacts
-                            SET last_updated = ?
-                            WHERE email = ?
-                        """,
-                            [now_str, simple_contact["email"]],
-                            for_write=True,
-                        )
-                    except Exception as e2:
-                        self.logger.error(
-                            "Both update attempts failed for contact %s: %s",
-                            simple_contact["email"],
-                            e2,
-                        )
-            else:
-                # Insert new contact with minimal required fields
-                try:
-                    # Use a more defensive query with fewer required fields
-                    insert_query = """
-                        INSERT INTO contacts (
-                            email, is_client, confidence_score, created_at, last_updated
-                        ) VALUES (
-                            ?, ?, ?, ?, ?
-                        )
-                    """
-                    db_manager.execute_query(
-                        insert_query,
-                        [
-                            simple_contact["email"],
-                            simple_contact.get("is_client", False),
-                            simple_contact.get("confidence_score", 0.0),
-                            now_str,
-                            now_str,
-                        ],
-                        for_write=True,
-                    )
-                    self.logger.debug(
-                        f"Inserted new contact: {simple_contact['email']}",
-                    )
-
-                    # Try to update with additional fields if they exist
-                    if simple_contact.get("first_name") or simple_contact.get(
-                        "last_name",
-                    ):
-                        try:
-                            update_query = """
-                                UPDATE contacts
-                                SET first_name = ?,
-                                    last_name = ?,
-                                    full_name = ?,
-                                    company = ?,
-                                    job_title = ?
-                                WHERE email = ?
-                            """
-                            db_manager.execute_query(
-                                update_query,
-                                [
-                                    simple_contact.get("first_name"),
-                                    simple_contact.get("last_name"),
-                                    simple_contact.get("full_name"),
-                                    simple_contact.get("company"),
-                                    simple_contact.get("job_title"),
-                                    simple_contact["email"],
-                                ],
-                                for_write=True,
-                            )
-                        except Exception as e:
-                            self.logger.warning(
-                                "Could not update additional contact info: %s", e,
-                            )
-                except Exception as e:
-                    self.logger.warning("Error inserting contact: %s", e)
-                    # Try an absolutely minimal insert as last resort
-                    try:
-                        # Use plain INSERT instead of INSERT OR IGNORE
-                        # First check if it exists again to be extra safe
-                        exists_check = db_manager.execute_query(
-                            """
-                            SELECT COUNT(*) FROM contacts WHERE email = ?
-                        """,
-                            [simple_contact["email"]],
-                        )
-
-                        if not exists_check or exists_check[0][0] == 0:
-                            db_manager.execute_query(
-                                """
-                                INSERT INTO contacts (
-                                    email, created_at, last_updated
-                                ) VALUES (
-                                    ?, ?, ?
-                                )
-                            """,
-                                [simple_contact["email"], now_str, now_str],
-                                for_write=True,
-                            )
-                    except Exception as e2:
-                        self.logger.error(
-                            "All insert attempts failed for %s: %s",
-                            simple_contact["email"],
-                            e2,
-                        )
-        except Exception as e:
-            self.logger.error(
-                "Error enriching contact from email: %s", e, exc_info=True,
-            )
-
-    def _calculate_priority_score(
-        self, contact_info: dict[str, Any], body: str,
-    ) -> float:
-        """Calculate priority score based on contact and email content."""
-        # Get priority weights from config
-        priority_weights = self.get_config_value(
-            "crm.enrichment.priority_weights",
-            {
-                "is_client": 0.5,
-                "title_match": 0.2,
-                "company_match": 0.1,
-                "urgent_keywords": 0.2,
-                "opportunity_keywords": 0.2,
-            },
-        )
-
-        score = 0.0
-
-        # Client status is highest priority factor
-        if contact_info.get("is_client"):
-            score += priority_weights.get("is_client", 0.5)
-
-        # Contact-based scoring
-        if contact_info.get("company"):
-            score += priority_weights.get("company_match", 0.1)
-
-        if contact_info.get("title"):
-            if any(
-                word in contact_info["title"].lower()
-                for word in ["ceo", "founder", "director", "vp", "president"]
-            ):
-                score += priority_weights.get("title_match", 0.2)
-            else:
-                score += priority_weights.get("title_match", 0.2) / 2
-
-        # Content-based scoring
-        urgent_keywords = ["urgent", "asap", "emergency", "deadline", "important"]
-        opportunity_keywords = [
-            "opportunity",
-            "proposal",
-            "contract",
-            "deal",
-            "partnership",
-        ]
-
-        if any(keyword in body.lower() for keyword in urgent_keywords):
-            score += priority_weights.get("urgent_keywords", 0.2)
-
-        if any(keyword in body.lower() for keyword in opportunity_keywords):
-            score += priority_weights.get("opportunity_keywords", 0.2)
-
-        # Ensure score is between 0 and 1
-        return min(1.0, score)
-
-    def _cleanup(self) -> None:
-        """Clean up resources before exit."""
-        super()._cleanup()
-
-        if self.gmail_sync:
-            try:
-                self.logger.info("Closing Gmail sync connections...")
-                self.gmail_sync.close_connection()
-            except Exception as e:
-                self.logger.warning("Error closing Gmail sync connection: %s", e)
-
-        # Ensure db_manager connections are closed
-        try:
-            self.logger.info("Closing database connections...")
-            db_manager.close()
-        except Exception as e:
-            self.logger.warning("Error closing database connections: %s", e)
-
-    def __signal_handler(self, sig, frame):
-        """Handle signals like CTRL+C to allow clean shutdown."""
-        if not hasattr(self, "_interrupted"):
-            self._interrupted = True
-            self.logger.info(
-                "⏹️ Received interrupt signal, finishing current email before shutdown...",
-            )
-        else:
-            # Second interrupt, exit immediately
-            self.logger.warning("⏹️ Forced exit due to second interrupt")
-            import sys
-
-            sys.exit(1)
-
-    def _maybe_release_db_connections(self):
-        """Periodically release database connections to avoid long locks."""
-        try:
-            # Import here to avoid circular imports
-            from dewey.core.db import db_manager
-
-            # If the db_manager has a close method, call it to release connections
-            if hasattr(db_manager, "close"):
-                db_manager.close()
-                self.logger.debug("Released database connections")
-        except Exception as e:
-            self.logger.warning(f"Error releasing database connections: {e}")
-
-
 def main():
     """Main entry point for the unified email processor."""
     try:
@@ -0,0 +1,403 @@
+"""
+Message ID deduplication without loading every stored ID.
+
+Importers and the email classifier need to know which message IDs are
+already stored. Instead of reading every ID into a Python set,
+MessageDedupe keeps a Bloom filter of the stored IDs on disk (about 1.8 MB
+per million IDs at a 0.1% false-positive rate). For stores with an exact
+lookup, IDs the filter reports as present are confirmed with one batched
+query, so a false positive never causes a message to be skipped. Stores
+without one, such as a CSV file, trust filter hits: each new ID is then
+reported as stored, and its message skipped, with probability error_rate,
+so callers pick a rate they can accept.
+
+The filter is updated as messages are stored and saved with the store's
+row count at that moment. If the count no longer matches when it is next
+opened, another writer has changed the store, and the filter is rebuilt by
+streaming IDs from the store.
+"""
+
+import csv
+import hashlib
+import logging
+import math
+import struct
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = "~/.dewey/dedupe"
+
+# IDs per exact-check query and per fetch while rebuilding
+_CHUNK = 1000
+
+_HEADER = struct.Struct("<4sBQBQqd")
+_MAGIC = b"DWBF"
+_VERSION = 1
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over string keys."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Size the filter for an expected number of keys.
+
+        Args:
+        ----
+            capacity: Number of keys the filter is sized for.
+            error_rate: False-positive rate at capacity.
+
+        """
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.num_bits = math.ceil(
+            -self.capacity * math.log(error_rate) / math.log(2) ** 2,
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        """Add a key."""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        """True if the key may have been added; False if it certainly was not."""
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    @property
+    def saturated(self) -> bool:
+        """Whether more keys were added than the filter was sized for."""
+        return self.count > self.capacity
+
+    def save(self, path: Path, source_count: int) -> None:
+        """
+        Write the filter atomically.
+
+        Args:
+        ----
+            path: Destination file.
+            source_count: Store row count the filter corresponds to, or -1
+                to force a rebuild when it is next opened.
+
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    _VERSION,
+                    self.capacity,
+                    self.num_hashes,
+                    self.count,
+                    source_count,
+                    self.error_rate,
+                ),
+            )
+            f.write(self.bits)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> tuple["BloomFilter", int] | None:
+        """
+        Read a filter written by save().
+
+        Returns
+        -------
+            The filter and its source count, or None if the file is missing
+            or unreadable.
+
+        """
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+                magic, version, capacity, num_hashes, count, source_count, rate = (
+                    _HEADER.unpack(header)
+                )
+                if magic != _MAGIC or version != _VERSION:
+                    return None
+                bloom = cls(capacity, rate)
+                bits = f.read()
+        except (OSError, struct.error):
+            return None
+        if len(bits) != len(bloom.bits) or num_hashes != bloom.num_hashes:
+            return None
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        return bloom, source_count
+
+
+class IDSource(Protocol):
+    """Where the stored message IDs live."""
+
+    name: str
+    exact: bool
+
+    def count(self) -> int:
+        """Cheap fingerprint that changes whenever IDs are stored."""
+
+    def iter_ids(self) -> Iterator[str]:
+        """Stream every stored ID."""
+
+    def lookup(self, ids: list[str]) -> set[str]:
+        """Return which of the ids are stored; only used if exact is True."""
+
+
+class DuckDBIDSource:
+    """Message IDs in a DuckDB table column."""
+
+    exact = True
+
+    def __init__(self, conn: Any, table: str, column: str = "msg_id"):
+        """
+        Initialize the source.
+
+        Args:
+        ----
+            conn: DuckDB connection. Queries run on their own cursors so the
+                source can be used from a thread other than the writer's.
+            table: Table holding the IDs.
+            column: Column holding the IDs.
+
+        """
+        self.conn = conn
+        self.table = table
+        self.column = column
+        self.name = f"{table}.{column}"
+
+    def count(self) -> int:
+        """Number of rows in the table."""
+        return self.conn.cursor().execute(
+            f"SELECT count(*) FROM {self.table}",
+        ).fetchone()[0]
+
+    def iter_ids(self) -> Iterator[str]:
+        """Stream the IDs in chunks without materializing them."""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {self.column} FROM {self.table}")
+        while rows := cursor.fetchmany(_CHUNK * 10):
+            for (msg_id,) in rows:
+                yield str(msg_id)
+
+    def lookup(self, ids: list[str]) -> set[str]:
+        """Which of the ids are in the table."""
+        cursor = self.conn.cursor()
+        found = set()
+        for start in range(0, len(ids), _CHUNK):
+            chunk = ids[start : start + _CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = cursor.execute(
+                f"SELECT {self.column} FROM {self.table} "
+                f"WHERE {self.column} IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            found.update(str(row[0]) for row in rows)
+        return found
+
+
+class CSVIDSource:
+    """
+    Message IDs in a column of an append-only CSV file.
+
+    Exact checks would mean scanning the file, so filter hits are trusted:
+    a false positive skips a new message. MessageDedupe sizes the filter
+    with a lower error rate instead.
+    """
+
+    exact = False
+
+    def __init__(self, path: str | Path, column: str = "msg_id"):
+        """
+        Initialize the source.
+
+        Args:
+        ----
+            path: CSV file; it may not exist yet.
+            column: Column holding the IDs.
+
+        """
+        self.path = Path(path)
+        self.column = column
+        self.name = f"{self.path.name}.{column}"
+
+    def count(self) -> int:
+        """Number of lines after the header, counted without parsing them."""
+        if not self.path.exists():
+            return 0
+        lines = 0
+        with open(self.path, "rb") as f:
+            while block := f.read(1 << 20):
+                lines += block.count(b"\n")
+        return max(lines - 1, 0)
+
+    def iter_ids(self) -> Iterator[str]:
+        """Stream the IDs row by row."""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                if row.get(self.column):
+                    yield row[self.column]
+
+
+class MessageDedupe:
+    """Persisted Bloom filter over stored message IDs with exact confirmation."""
+
+    def __init__(
+        self,
+        source: IDSource,
+        path: str | Path | None = None,
+        capacity: int = 1_000_000,
+        error_rate: float | None = None,
+    ):
+        """
+        Open the filter for a source, rebuilding it if it is stale.
+
+        Args:
+        ----
+            source: Store the IDs are checked against.
+            path: Filter file; defaults to ``~/.dewey/dedupe/<source>.bloom``.
+            capacity: Minimum number of IDs a new filter is sized for.
+            error_rate: False-positive rate; defaults to 0.1%, or one in a
+                million for sources without an exact lookup, where it is the
+                chance that a new message is skipped. A saved filter built
+                for a higher rate is rebuilt.
+
+        """
+        self.source = source
+        self.path = Path(
+            path or Path(DEFAULT_DIR).expanduser() / f"{source.name}.bloom",
+        )
+        self.capacity = capacity
+        self.error_rate = error_rate
+        if error_rate is None:
+            self.error_rate = 0.001 if source.exact else 1e-6
+        self.checked = 0
+        self.filter_hits = 0
+        self.confirmed = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        source_count = source.count()
+        loaded = BloomFilter.load(self.path)
+        if (
+            loaded
+            and loaded[1] == source_count
+            and not loaded[0].saturated
+            and loaded[0].error_rate <= self.error_rate
+        ):
+            self.bloom = loaded[0]
+            logger.debug(f"Loaded {self.bloom.count} IDs for {source.name}")
+        else:
+            self.bloom = self._rebuild(source_count)
+        self._expected_count = source_count
+
+    def _rebuild(self, source_count: int) -> BloomFilter:
+        bloom = BloomFilter(max(self.capacity, 2 * source_count), self.error_rate)
+        for msg_id in self.source.iter_ids():
+            bloom.add(msg_id)
+        logger.info(f"Rebuilt dedupe filter for {self.source.name}: {bloom.count} IDs")
+        self._dirty = True
+        return bloom
+
+    def check_many(self, ids: Iterable[str]) -> set[str]:
+        """
+        Find which IDs are already stored.
+
+        Args:
+        ----
+            ids: Candidate message IDs.
+
+        Returns:
+        -------
+            The subset of ids that are stored.
+
+        """
+        ids = list(ids)
+        candidates = [msg_id for msg_id in ids if msg_id in self.bloom]
+        confirmed = set(candidates)
+        if candidates and self.source.exact:
+            confirmed = self.source.lookup(candidates)
+        with self._lock:
+            self.checked += len(ids)
+            self.filter_hits += len(candidates)
+            self.confirmed += len(confirmed)
+        return confirmed
+
+    def __contains__(self, msg_id: str) -> bool:
+        """Whether a single ID is stored."""
+        return bool(self.check_many([msg_id]))
+
+    def add(self, ids: Iterable[str], stored: int | None = None) -> None:
+        """
+        Record IDs that were just stored.
+
+        Args:
+        ----
+            ids: Message IDs written to the store.
+            stored: How many rows the write added to the store, if it may
+                differ from the number of ids (e.g. conflicting inserts).
+
+        """
+        ids = list(ids)
+        with self._lock:
+            for msg_id in ids:
+                self.bloom.add(msg_id)
+            self._expected_count += len(ids) if stored is None else stored
+            self._dirty = True
+
+    def save(self) -> None:
+        """
+        Persist the filter if it changed.
+
+        If the store holds rows this filter did not see being added, the
+        file is marked stale so the next open rebuilds it.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            source_count = self.source.count()
+            if source_count != self._expected_count:
+                logger.info(
+                    f"{self.source.name} changed outside this process; "
+                    "the dedupe filter will be rebuilt on next use",
+                )
+                source_count = -1
+            self.bloom.save(self.path, source_count)
+            self._dirty = False
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for checks made through this instance."""
+        with self._lock:
+            return {
+                "ids": self.bloom.count,
+                "filter_bytes": len(self.bloom.bits),
+                "checked": self.checked,
+                "filter_hits": self.filter_hits,
+                "confirmed": self.confirmed,
+            }
+
+    def __enter__(self) -> "MessageDedupe":
+        """Use the dedupe as a context manager that saves on exit."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Save the filter."""
+        self.save()
@@ -143,20 +143,24 @@ class TestCsvContactIntegration:
         mock_get_connection.return_value = mock_db
         integration.db_conn = mock_db
 
-        # Mock the insert_contact method
-        integration.insert_contact = MagicMock()
+        # Mock the insert_contacts method
+        integration.insert_contacts = MagicMock()
 
         # Execute
         integration.process_csv(mock_csv_file)
 
-        # Verify
-        assert integration.insert_contact.call_count == 2  # Two rows in test CSV
+        # Verify all rows are inserted in a single batch
+        integration.insert_contacts.assert_called_once()
+        contacts = integration.insert_contacts.call_args.args[0]
+        assert len(contacts) == 2  # Two rows in test CSV
+        assert contacts[0]["email"] == "test1@example.com"
 
-    def test_insert_contact(self) -> None:
+    @patch("dewey.core.crm.contacts.csv_contact_integration.insert_many")
+    def test_insert_contact(self, mock_insert_many) -> None:
         """Test inserting a contact into the database."""
         # Setup
         integration = CsvContactIntegration()
-        integration.db_conn = MagicMock()
+        mock_insert_many.return_value = 1
 
         contact_data = {
             "email": "test@example.com",
@@ -169,7 +173,8 @@ class TestCsvContactIntegration:
         integration.insert_contact(contact_data)
 
         # Verify
-        integration.db_conn.execute.assert_called_once()
+        mock_insert_many.assert_called_once()
+        assert mock_insert_many.call_args.args[:2] == ("contacts", [contact_data])
 
     def test_insert_contact_validation_error(self) -> None:
         """Test validation error when inserting invalid contact data."""
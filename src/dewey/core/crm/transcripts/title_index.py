@@ -0,0 +1,130 @@
+"""
+Character-trigram index for fuzzy title lookup.
+
+Scoring a transcript file name against every episode title with
+SequenceMatcher is quadratic in Python calls. TitleIndex keeps an inverted
+index from trigrams to titles. A lookup counts shared trigrams for all
+titles at once with numpy, and only the top-k candidates by trigram Dice
+similarity are scored with the exact similarity function.
+
+Trigrams are taken with spaces removed, so a file name whose separators
+were stripped ("mytitletxt") still shares trigrams with "my title".
+"""
+
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from difflib import SequenceMatcher
+
+import numpy as np
+
+# Posting lists this short are always counted, however common the trigram
+_MIN_DF_LIMIT = 1000
+
+
+def sequence_ratio(a: str, b: str) -> float:
+    """SequenceMatcher similarity of two strings."""
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams of the text with whitespace removed, padded at both ends."""
+    compact = f"  {''.join(text.split())} "
+    return {compact[i : i + 3] for i in range(len(compact) - 2)}
+
+
+class TitleIndex:
+    """Inverted trigram index over a fixed list of titles."""
+
+    def __init__(
+        self,
+        titles: Sequence[str],
+        similarity: Callable[[str, str], float] = sequence_ratio,
+        max_df: float = 0.2,
+    ):
+        """
+        Index the titles.
+
+        Args:
+        ----
+            titles: Cleaned titles; a title's position is its id.
+            similarity: Exact score used to rank the candidates.
+            max_df: Trigrams in more than this fraction of titles (and
+                more than 1000 of them) are ignored when gathering
+                candidates, unless the query has no rarer ones.
+
+        """
+        self.titles = list(titles)
+        self.similarity = similarity
+        self.max_df = max_df
+        postings: dict[str, list[int]] = defaultdict(list)
+        sizes = np.zeros(len(self.titles), dtype=np.int32)
+        for title_id, title in enumerate(self.titles):
+            grams = trigrams(title) if title else set()
+            sizes[title_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(title_id)
+        self.postings = {
+            gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()
+        }
+        self.sizes = sizes
+
+    def __len__(self) -> int:
+        """Number of indexed titles."""
+        return len(self.titles)
+
+    def candidates(self, query: str, k: int = 10) -> list[int]:
+        """
+        Ids of the k titles sharing the most trigrams with the query.
+
+        Args:
+        ----
+            query: Cleaned query text.
+            k: Number of candidates.
+
+        Returns:
+        -------
+            Title ids ordered by trigram Dice similarity, best first.
+
+        """
+        grams = trigrams(query)
+        lists = [self.postings[g] for g in grams if g in self.postings]
+        if not lists:
+            return []
+        limit = max(_MIN_DF_LIMIT, int(self.max_df * len(self.titles)))
+        selective = [ids for ids in lists if len(ids) <= limit]
+        shared = np.bincount(
+            np.concatenate(selective or lists), minlength=len(self.titles),
+        )
+        hits = np.flatnonzero(shared)
+        dice = 2 * shared[hits] / (self.sizes[hits] + len(grams))
+        if len(hits) > k:
+            top = np.argpartition(-dice, k - 1)[:k]
+            hits, dice = hits[top], dice[top]
+        return hits[np.argsort(-dice, kind="stable")].tolist()
+
+    def best_match(self, query: str, k: int = 10) -> tuple[int | None, float]:
+        """
+        The indexed title most similar to the query.
+
+        Only the top-k trigram candidates are scored with the exact
+        similarity; ties keep the lowest title id.
+
+        Args:
+        ----
+            query: Cleaned query text.
+            k: Number of candidates scored exactly.
+
+        Returns:
+        -------
+            The title id and its similarity, or (None, 0.0) if no title
+            shares a trigram with the query.
+
+        """
+        scored = (
+            (self.similarity(self.titles[title_id], query), -title_id)
+            for title_id in self.candidates(query, k)
+        )
+        best = max(scored, default=None)
+        if best is None:
+            return None, 0.0
+        return -best[1], best[0]
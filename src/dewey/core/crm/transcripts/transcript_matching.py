@@ -7,9 +7,7 @@ from difflib import SequenceMatcher
 from pathlib import Path
 
 from dewey.core.base_script import BaseScript
-from dewey.core.db.utils import execute_query
-
-# Define a type alias for database connection
+from dewey.core.crm.transcripts.title_index import TitleIndex
 
 
 class TranscriptMatcher(BaseScript):
@@ -19,7 +17,7 @@ class TranscriptMatcher(BaseScript):
         """Initializes the TranscriptMatcher with CRM configuration."""
         super().__init__(config_section="crm")
 
-    def run(self) -> None:
+    def execute(self) -> None:
         """Executes the transcript matching process."""
         database_path = self.get_config_value("database_path")
         transcript_directory = self.get_config_value("transcript_directory")
@@ -32,6 +30,7 @@ class TranscriptMatcher(BaseScript):
         encoding = self.get_config_value("encoding", "utf-8")
         similarity_threshold = self.get_config_value("similarity_threshold", 0.7)
         max_matches = self.get_config_value("max_matches", 5)
+        candidates = self.get_config_value("candidates", 10)
         unmatched_limit = self.get_config_value("unmatched_limit", 5)
         update_db = self.get_config_value("update_db", True)
 
@@ -49,6 +48,7 @@ class TranscriptMatcher(BaseScript):
             max_matches=max_matches,
             unmatched_limit=unmatched_limit,
             update_db=update_db,
+            candidates=candidates,
         )
 
         self.logger.info(f"Matched {len(matches)} transcripts.")
@@ -69,10 +69,15 @@ class TranscriptMatcher(BaseScript):
         max_matches: int = 5,
         unmatched_limit: int = 5,
         update_db: bool = True,
+        candidates: int = 10,
     ) -> tuple[list[dict[str, str | float]], list[str]]:
         """
         Matches transcript files to episode entries in a database.
 
+        Cleaned episode titles are put in a trigram index, and each file name
+        is only scored against its ``candidates`` closest titles by shared
+        trigrams. All matched file paths are written in one UPDATE.
+
         Args:
         ----
             database_path: The path to the SQLite database file.
@@ -88,6 +93,7 @@ class TranscriptMatcher(BaseScript):
             max_matches: The maximum number of matches to return for each transcript.
             unmatched_limit: The maximum number of unmatched files to return.
             update_db: Whether to update the database with the matched file paths.
+            candidates: Number of episodes per file scored with similarity_score.
 
         Returns:
         -------
@@ -116,7 +122,7 @@ class TranscriptMatcher(BaseScript):
 
                 # Fetch all episodes from the database
                 query = f"SELECT {title_column}, {file_column}, {transcript_column}, {link_column}, {publish_column} FROM {episode_table_name}"
-                episodes = execute_query(cursor, query)
+                episodes = cursor.execute(query).fetchall()
                 episode_data = [
                     {
                         "title": row[0],
@@ -127,9 +133,17 @@ class TranscriptMatcher(BaseScript):
                     }
                     for row in episodes
                 ]
+                # Episodes with empty titles have no trigrams and never match
+                index = TitleIndex(
+                    [
+                        self.clean_title(episode["title"]) if episode["title"] else ""
+                        for episode in episode_data
+                    ],
+                    similarity=self.similarity_score,
+                )
 
                 # Iterate through transcript files
-                for file_name in os.listdir(transcript_directory):
+                for file_name in sorted(os.listdir(transcript_directory)):
                     if not file_name.endswith(
                         (".txt", ".srt", ".vtt"),
                     ):  # Consider common transcript extensions
@@ -137,59 +151,39 @@ class TranscriptMatcher(BaseScript):
 
                     file_path = transcript_directory / file_name
                     try:
+                        # Only readable files are matched; the text is unused
                         with open(file_path, encoding=encoding) as transcript_file:
-                            transcript = transcript_file.read()
+                            transcript_file.read()
                     except (OSError, UnicodeDecodeError) as e:
                         self.logger.error(f"Error reading {file_name}: {e}")
                         unmatched_files.append(str(file_path))
                         continue
 
-                    best_match: dict[str, str | float] | None = None
-                    best_score: float = 0.0
-
                     # Find the best match for the current transcript
-                    for episode in episode_data:
-                        if not episode["title"]:
-                            continue  # Skip episodes with empty titles
-
-                        title = episode["title"]
-                        clean_title_episode = self.clean_title(title)
-                        clean_title_file = self.clean_title(file_name)
-
-                        score = self.similarity_score(
-                            clean_title_episode, clean_title_file,
-                        )
-                        if score > best_score:
-                            best_score = score
-                            best_match = episode
-                            best_match["file"] = str(file_path)  # Store the file path
+                    episode_id, best_score = index.best_match(
+                        self.clean_title(file_name), k=candidates,
+                    )
 
                     # Handle the match
-                    if best_match and best_score >= similarity_threshold:
-                        match = {
-                            "title": best_match["title"],
-                            "file": str(file_path),
-                            "score": best_score,
-                            "link": best_match["link"],
-                            "publish_date": best_match["publish_date"],
-                        }
-                        matches.append(match)
-
-                        if update_db:
-                            try:
-                                # Update the database with the file path
-                                update_query = f"UPDATE {episode_table_name} SET {file_column} = ? WHERE {title_column} = ?"
-                                cursor.execute(
-                                    update_query, (str(file_path), best_match["title"]),
-                                )
-                                con.commit()
-                            except sqlite3.Error as e:
-                                self.logger.error(
-                                    f"Error updating database for {best_match['title']}: {e}",
-                                )
+                    if episode_id is not None and best_score >= similarity_threshold:
+                        best_match = episode_data[episode_id]
+                        matches.append(
+                            {
+                                "title": best_match["title"],
+                                "file": str(file_path),
+                                "score": best_score,
+                                "link": best_match["link"],
+                                "publish_date": best_match["publish_date"],
+                            },
+                        )
                     else:
                         unmatched_files.append(str(file_path))
 
+                if update_db and matches:
+                    self.update_episode_files(
+                        con, matches, episode_table_name, title_column, file_column,
+                    )
+
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {e}")
             return [], []  # Return empty lists on database error
@@ -202,6 +196,57 @@ class TranscriptMatcher(BaseScript):
 
         return matches[:max_matches], unmatched_files[:unmatched_limit]
 
+    def update_episode_files(
+        self,
+        con: sqlite3.Connection,
+        matches: list[dict[str, str | float]],
+        episode_table_name: str,
+        title_column: str,
+        file_column: str,
+    ) -> None:
+        """
+        Write the matched file paths to the episode table in one UPDATE.
+
+        The matches are loaded into a temporary table that the UPDATE reads
+        from, all in a single transaction. If two files match the same
+        title, the later one wins, as when each match was its own UPDATE.
+
+        Args:
+        ----
+            con: SQLite connection.
+            matches: Matches with "title" and "file" keys.
+            episode_table_name: The name of the table containing episode data.
+            title_column: The name of the column containing the episode title.
+            file_column: The name of the column containing the episode file path.
+
+        """
+        files_by_title = {match["title"]: match["file"] for match in matches}
+        try:
+            con.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS transcript_matches "
+                "(title TEXT PRIMARY KEY, file TEXT)",
+            )
+            con.execute("DELETE FROM transcript_matches")
+            con.executemany(
+                "INSERT INTO transcript_matches VALUES (?, ?)",
+                list(files_by_title.items()),
+            )
+            con.execute(
+                f"""
+                UPDATE {episode_table_name}
+                SET {file_column} = (
+                    SELECT file FROM transcript_matches
+                    WHERE transcript_matches.title = {episode_table_name}.{title_column}
+                )
+                WHERE {title_column} IN (SELECT title FROM transcript_matches)
+                """,
+            )
+            con.execute("DROP TABLE transcript_matches")
+            con.commit()
+        except sqlite3.Error as e:
+            con.rollback()
+            self.logger.error(f"Error updating database with {len(matches)} matches: {e}")
+
     def clean_title(self, title: str) -> str:
         """
         Cleans the title by removing special characters and converting to lowercase.
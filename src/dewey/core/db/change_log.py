@@ -0,0 +1,207 @@
+"""
+Change log maintenance module.
+
+This module keeps the change_log table small enough for sync_table to read
+cheaply. Compaction folds repeated changes to one record into their net
+effect, and retention drops entries that precede the last successful sync
+of their own table.
+"""
+
+import json
+import logging
+from datetime import datetime
+
+from .connection import db_manager
+from .schema import CHANGE_LOG_COLUMNS
+from .sync import compact_changes
+
+logger = logging.getLogger(__name__)
+
+
+def compact_change_log(
+    table_name: str, since: datetime, local_only: bool = True,
+) -> int:
+    """
+    Fold repeated changes to a record into a single change_log entry.
+
+    Only entries at or after ``since`` are touched, so changes that were
+    already synced are never rewritten. The newest entry of each record is
+    kept and rewritten with the net operation and merged details.
+
+    Args:
+    ----
+        table_name: Table whose change_log entries are compacted
+        since: Timestamp of the last successful sync
+        local_only: Whether to compact the local database
+
+    Returns:
+    -------
+        Number of change_log entries removed
+
+    """
+    rows = db_manager.execute_query(
+        f"""
+        SELECT {", ".join(CHANGE_LOG_COLUMNS)} FROM change_log
+        WHERE table_name = ? AND changed_at >= ?
+        AND record_id IN (
+            SELECT record_id FROM change_log
+            WHERE table_name = ? AND changed_at >= ?
+            GROUP BY record_id HAVING COUNT(*) > 1
+        )
+        ORDER BY changed_at ASC, id ASC
+    """,
+        [table_name, since, table_name, since],
+        local_only=local_only,
+    )
+    if not rows:
+        return 0
+
+    net_changes = compact_changes(
+        [dict(zip(CHANGE_LOG_COLUMNS, row, strict=False)) for row in rows],
+    )
+
+    conn = db_manager.get_connection(for_write=True, local_only=local_only)
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.executemany(
+            "UPDATE change_log SET operation = ?, details = ? WHERE id = ?",
+            [
+                [c["operation"], json.dumps(c["details"], default=str), c["id"]]
+                for c in net_changes
+            ],
+        )
+        conn.execute(
+            "CREATE OR REPLACE TEMP TABLE _change_log_keep "
+            "(record_id VARCHAR, keep_id BIGINT)",
+        )
+        conn.executemany(
+            "INSERT INTO _change_log_keep VALUES (?, ?)",
+            [[c["record_id"], c["id"]] for c in net_changes],
+        )
+        conn.execute(
+            """
+            DELETE FROM change_log USING _change_log_keep AS k
+            WHERE change_log.table_name = ?
+            AND change_log.changed_at >= ?
+            AND change_log.record_id = k.record_id
+            AND change_log.id <> k.keep_id
+        """,
+            [table_name, since],
+        )
+        conn.execute("DROP TABLE IF EXISTS _change_log_keep")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    removed = len(rows) - len(net_changes)
+    logger.info(f"Compacted {removed} change_log entries for {table_name}")
+    return removed
+
+
+def prune_change_log(
+    before: datetime, local_only: bool = True, table_name: str | None = None,
+) -> int:
+    """
+    Delete change_log entries older than the given timestamp.
+
+    Args:
+    ----
+        before: Entries changed strictly before this time are removed
+        local_only: Whether to prune the local database
+        table_name: Only prune this table's entries
+
+    Returns:
+    -------
+        Number of change_log entries removed
+
+    """
+    where = "changed_at < ?"
+    params: list = [before]
+    if table_name is not None:
+        where += " AND table_name = ?"
+        params.append(table_name)
+    result = db_manager.execute_query(
+        f"SELECT COUNT(*) FROM change_log WHERE {where}",
+        params,
+        local_only=local_only,
+    )
+    count = result[0][0] if result else 0
+    if count:
+        db_manager.execute_query(
+            f"DELETE FROM change_log WHERE {where}",
+            params,
+            for_write=True,
+            local_only=local_only,
+        )
+        scope = f" of {table_name}" if table_name is not None else ""
+        logger.info(f"Pruned {count} change_log entries{scope} older than {before}")
+    return count
+
+
+def get_table_sync_times(local_only: bool = True) -> dict[str, datetime]:
+    """
+    Get the time of each table's last successful sync.
+
+    Args:
+    ----
+        local_only: Whether to read the local database
+
+    Returns:
+    -------
+        Mapping of table name to its last successful sync; tables that
+        never synced successfully are missing
+
+    """
+    rows = db_manager.execute_query(
+        """
+        SELECT table_name, MAX(created_at) FROM sync_status
+        WHERE status = 'success'
+        GROUP BY table_name
+    """,
+        local_only=local_only,
+    )
+    return {table_name: synced_at for table_name, synced_at in rows or []}
+
+
+def run_change_log_maintenance(local_only: bool = True) -> dict[str, int]:
+    """
+    Compact every table's pending changes and prune already-synced entries.
+
+    Each table is compacted and pruned against its own last successful
+    sync, so a table whose sync failed or has not run yet keeps every
+    entry it still has to send. Tables that never synced are left alone.
+
+    Args:
+    ----
+        local_only: Whether to maintain the local database
+
+    Returns:
+    -------
+        Mapping of table name to entries compacted, plus a "pruned" total
+
+    """
+    results = {}
+    try:
+        sync_times = get_table_sync_times(local_only=local_only)
+        if not sync_times:
+            logger.info("No successful sync recorded, skipping change_log maintenance")
+            return {}
+
+        pruned = 0
+        for table_name, last_sync in sorted(sync_times.items()):
+            results[table_name] = compact_change_log(table_name, last_sync, local_only)
+            pruned += prune_change_log(last_sync, local_only, table_name)
+        results["pruned"] = pruned
+    except Exception as e:
+        logger.error(f"Change log maintenance failed: {e}")
+
+    return results
+
+
+__all__ = [
+    "compact_change_log",
+    "get_table_sync_times",
+    "prune_change_log",
+    "run_change_log_maintenance",
+]
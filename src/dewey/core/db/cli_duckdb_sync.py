@@ -13,7 +13,13 @@ import time
 from pathlib import Path
 
 from dewey.core.base_script import BaseScript
-from dewey.core.db.sync import get_duckdb_sync
+from dewey.core.db.change_log import run_change_log_maintenance
+from dewey.core.db.sync import (
+    TableSyncStats,
+    direct_copy_all_tables,
+    get_duckdb_sync,
+    sync_table,
+)
 
 
 class SyncDuckDBScript(BaseScript):
@@ -90,6 +96,43 @@ class SyncDuckDBScript(BaseScript):
             type=int,
         )
 
+        parser.add_argument(
+            "--bulk",
+            help="Apply logged changes set-wise, one transaction per table",
+            action="store_true",
+        )
+
+        parser.add_argument(
+            "--repair",
+            help="After syncing, checksum-diff each table and repair drifted rows",
+            action="store_true",
+        )
+
+        parser.add_argument(
+            "--compact-log",
+            help="After syncing, compact pending change_log entries and prune synced ones",
+            action="store_true",
+        )
+
+        parser.add_argument(
+            "--direct-copy",
+            help="Full-refresh copy of every table instead of a change-log sync",
+            action="store_true",
+        )
+
+        parser.add_argument(
+            "--incremental",
+            help="With --direct-copy, copy only rows past each table's watermark",
+            action="store_true",
+        )
+
+        parser.add_argument(
+            "--workers",
+            help="Number of tables copied concurrently with --direct-copy",
+            default=4,
+            type=int,
+        )
+
         parser.add_argument(
             "--verbose", help="Enable verbose logging", action="store_true",
         )
@@ -238,6 +281,12 @@ class SyncDuckDBScript(BaseScript):
         if exclude is None:
             exclude = []
 
+        if self.args.direct_copy:
+            return self._run_direct_copy(direction)
+
+        if self.args.bulk or self.args.repair or self.args.compact_log:
+            return self._run_changelog_sync(direction, tables, exclude)
+
         if direction in ("down", "both"):
             self.logger.info("Syncing from MotherDuck to local...")
 
@@ -314,6 +363,110 @@ class SyncDuckDBScript(BaseScript):
 
         return success
 
+    def _run_changelog_sync(
+        self, direction: str, tables: list[str] | None, exclude: list[str],
+    ) -> bool:
+        """
+        Run a change-log sync with bulk apply and/or drift repair.
+
+        Args:
+        ----
+            direction: Sync direction ('up', 'down', or 'both')
+            tables: Specific tables to sync, or None for all tables
+            exclude: Tables to exclude from sync
+
+        Returns:
+        -------
+            True if every table synced successfully, False otherwise
+
+        """
+        if not tables:
+            source_conn = (
+                self.sync.local_conn if direction == "up" else self.sync.motherduck_conn
+            )
+            tables = [
+                t
+                for t in self.sync.list_tables(source_conn)
+                if not (t.startswith("sqlite_") or t.startswith("dewey_sync_"))
+            ]
+
+        success = True
+        stats: list[TableSyncStats] = []
+        for table in tables:
+            if table in exclude:
+                self.logger.info(f"Skipping excluded table: {table}")
+                continue
+
+            self.logger.info(f"Syncing table {table} ({direction})")
+            if not sync_table(
+                table,
+                direction,
+                bulk=self.args.bulk,
+                stats=stats,
+                repair=self.args.repair,
+            ):
+                self.logger.error(f"Failed to sync table {table}")
+                success = False
+
+        self._report_table_stats(stats)
+
+        if self.args.compact_log:
+            for local_only in (True, False):
+                results = run_change_log_maintenance(local_only=local_only)
+                self.logger.info(
+                    f"Change log maintenance ({'local' if local_only else 'MotherDuck'}): "
+                    f"{results}",
+                )
+        return success
+
+    def _run_direct_copy(self, direction: str) -> bool:
+        """
+        Copy all tables with the parallel direct-copy scheduler.
+
+        Args:
+        ----
+            direction: 'up' copies local to MotherDuck, anything else copies down
+
+        Returns:
+        -------
+            True if every table copied successfully, False otherwise
+
+        """
+        to_local = direction != "up"
+        stats: list[TableSyncStats] = []
+        success = direct_copy_all_tables(
+            source_local=not to_local,
+            target_local=to_local,
+            max_workers=self.args.workers,
+            stats=stats,
+            incremental=self.args.incremental,
+        )
+        self._report_table_stats(sorted(stats, key=lambda s: s.seconds, reverse=True))
+        return success
+
+    def _report_table_stats(self, stats: list[TableSyncStats]) -> None:
+        """
+        Log rows applied and throughput for each synced table.
+
+        Args:
+        ----
+            stats: Per-table, per-direction sync statistics
+
+        """
+        if not stats:
+            self.logger.info("No changes applied")
+            return
+
+        self.logger.info(
+            f"{'Table':<40} {'Dir':<5} {'Rows':>10} {'Seconds':>9} {'Rows/s':>12}",
+        )
+        for stat in stats:
+            status = "" if stat.success else "  FAILED"
+            self.logger.info(
+                f"{stat.table_name:<40} {stat.direction:<5} {stat.rows:>10} "
+                f"{stat.seconds:>9.2f} {stat.rows_per_second:>12.1f}{status}",
+            )
+
     def _run_monitor_mode(
         self, tables: list[str] | None = None, exclude: list[str] | None = None,
     ) -> None:
@@ -27,6 +27,10 @@ PG_DBNAME = os.getenv("PG_DBNAME", "dewey_db")
 DEFAULT_POOL_SIZE = int(os.getenv("DEWEY_DB_POOL_SIZE", "5"))
 MAX_RETRIES = int(os.getenv("DEWEY_DB_MAX_RETRIES", "3"))
 RETRY_DELAY = int(os.getenv("DEWEY_DB_RETRY_DELAY", "1"))
+POOL_TIMEOUT = float(os.getenv("DEWEY_DB_POOL_TIMEOUT", "30"))  # seconds
+POOL_MAX_LIFETIME = int(os.getenv("DEWEY_DB_POOL_MAX_LIFETIME", "3600"))  # seconds
+POOL_HEALTH_CHECK_INTERVAL = int(os.getenv("DEWEY_DB_POOL_HEALTH_CHECK", "30"))
+STATEMENT_TIMEOUT = int(os.getenv("DEWEY_DB_STATEMENT_TIMEOUT", "0"))  # ms, 0 = off
 
 # Sync configuration (keep if still relevant, otherwise remove)
 SYNC_INTERVAL = int(os.getenv("DEWEY_SYNC_INTERVAL", "21600"))  # 6 hours in seconds
@@ -61,6 +65,16 @@ def get_db_config() -> dict:
         "pool_size": int(os.getenv("DEWEY_DB_POOL_SIZE", str(DEFAULT_POOL_SIZE))),
         "max_retries": int(os.getenv("DEWEY_DB_MAX_RETRIES", str(MAX_RETRIES))),
         "retry_delay": int(os.getenv("DEWEY_DB_RETRY_DELAY", str(RETRY_DELAY))),
+        "pool_timeout": float(os.getenv("DEWEY_DB_POOL_TIMEOUT", str(POOL_TIMEOUT))),
+        "pool_max_lifetime": int(
+            os.getenv("DEWEY_DB_POOL_MAX_LIFETIME", str(POOL_MAX_LIFETIME)),
+        ),
+        "pool_health_check_interval": int(
+            os.getenv("DEWEY_DB_POOL_HEALTH_CHECK", str(POOL_HEALTH_CHECK_INTERVAL)),
+        ),
+        "statement_timeout": int(
+            os.getenv("DEWEY_DB_STATEMENT_TIMEOUT", str(STATEMENT_TIMEOUT)),
+        ),
         "sync_interval": int(os.getenv("DEWEY_SYNC_INTERVAL", str(SYNC_INTERVAL))),
         "max_sync_age": int(os.getenv("DEWEY_MAX_SYNC_AGE", str(MAX_SYNC_AGE))),
         "backup_dir": os.getenv("DEWEY_BACKUP_DIR", BACKUP_DIR),
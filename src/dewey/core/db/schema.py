@@ -53,6 +53,22 @@ CREATE TABLE IF NOT EXISTS change_log (
 )
 """
 
+CHANGE_LOG_COLUMNS = (
+    "id",
+    "table_name",
+    "operation",
+    "record_id",
+    "changed_at",
+    "user_id",
+    "details",
+)
+
+# Serves get_changes_since and change_log retention
+CHANGE_LOG_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_change_log_table_changed_at
+ON change_log (table_name, changed_at)
+"""
+
 SYNC_STATUS_TABLE = """
 CREATE TABLE IF NOT EXISTS sync_status (
     id SERIAL PRIMARY KEY,
@@ -203,6 +219,7 @@ def initialize_schema():
 
         # Create change tracking tables
         db_manager.execute_query(CHANGE_LOG_TABLE)
+        db_manager.execute_query(CHANGE_LOG_INDEX)
         db_manager.execute_query(SYNC_STATUS_TABLE)
         db_manager.execute_query(SYNC_CONFLICTS_TABLE)
         logger.info("Change tracking tables initialized")
@@ -380,6 +397,7 @@ def verify_schema_consistency():
 
 
 __all__ = [
+    "CHANGE_LOG_COLUMNS",
     "TABLES",
     "apply_migration",
     "get_current_version",
@@ -5,27 +5,49 @@ This module handles data synchronization between local DuckDB and MotherDuck clo
 It implements conflict detection, resolution, and change tracking.
 """
 
+import hashlib
 import json
 import logging
 import os
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 
 # Remove the top-level import to break the circular dependency
 # from dewey.utils.database import execute_query
 from .connection import db_manager
-from .operations import get_column_names
-from .schema import TABLES
+from .schema import CHANGE_LOG_COLUMNS, TABLES
 
 logger = logging.getLogger(__name__)
 
+# Candidate high-water mark columns for incremental copies, in order of preference
+WATERMARK_COLUMNS = ("updated_at", "created_at", "id")
+
 
 class SyncError(Exception):
     """Exception raised for synchronization errors."""
 
 
+@dataclass
+class TableSyncStats:
+    """Throughput of one table sync in one direction."""
+
+    table_name: str
+    direction: str
+    rows: int = 0
+    seconds: float = 0.0
+    success: bool = True
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows applied per second of wall time."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
 def get_last_sync_time(local_only: bool = False) -> datetime | None:
     """
     Get the timestamp of the last successful sync.
@@ -57,7 +79,7 @@ def get_last_sync_time(local_only: bool = False) -> datetime | None:
 
 
 def get_changes_since(
-    table_name: str, since: datetime, local_only: bool = False,
+    table_name: str, since: datetime, local_only: bool = False, compact: bool = True,
 ) -> list[dict]:
     """
     Get changes made to a table since the given timestamp.
@@ -67,6 +89,7 @@ def get_changes_since(
         table_name: Name of the table to check
         since: Timestamp to check changes from
         local_only: Whether to only check local database
+        compact: Fold repeated changes to one record into their net effect
 
     Returns:
     -------
@@ -75,21 +98,18 @@ def get_changes_since(
     """
     try:
         changes = db_manager.execute_query(
-            """
-            SELECT * FROM change_log
+            f"""
+            SELECT {", ".join(CHANGE_LOG_COLUMNS)} FROM change_log
             WHERE table_name = ?
             AND changed_at >= ?
-            ORDER BY changed_at ASC
+            ORDER BY changed_at ASC, id ASC
         """,
             [table_name, since],
             local_only=local_only,
         )
 
-        # Get the column names from the change_log table
-        columns = get_column_names("change_log", local_only=local_only)
-
-        # Create dictionaries with proper column mapping
-        return [dict(zip(columns, row, strict=False)) for row in changes]
+        rows = [dict(zip(CHANGE_LOG_COLUMNS, row, strict=False)) for row in changes]
+        return compact_changes(rows) if compact else rows
     except Exception as e:
         logger.error(f"Failed to get changes for {table_name}: {e}")
         return []
@@ -194,9 +214,176 @@ def resolve_conflicts(conflicts: list[dict]) -> None:
         logger.error(f"Failed to record conflicts: {e}")
 
 
+def _quote_ident(name: str) -> str:
+    """Quote an SQL identifier, escaping embedded double quotes."""
+    escaped = name.replace('"', '""')
+    return f'"{escaped}"'
+
+
+def _change_details(change: dict) -> dict:
+    """Return the details payload of a change as a dictionary."""
+    details = change.get("details") or {}
+    if isinstance(details, str):
+        try:
+            details = json.loads(details)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring malformed details for {change.get('record_id')}")
+            details = {}
+    return dict(details)
+
+
+def compact_changes(changes: list[dict]) -> list[dict]:
+    """
+    Fold a sequence of changes into the net effect per record.
+
+    Changes must be ordered by ``changed_at``. Repeated updates to one record
+    are merged into a single change, an INSERT followed by UPDATEs becomes one
+    INSERT carrying the final values, and anything followed by a DELETE
+    becomes a DELETE.
+
+    Args:
+    ----
+        changes: Ordered list of changes for a single table
+
+    Returns:
+    -------
+        List with at most one change per record_id, in first-seen order
+
+    """
+    net: dict = {}
+    for change in changes:
+        record_id = change.get("record_id", change.get("id"))
+        if record_id is None:
+            continue
+        operation = change.get("operation")
+        details = _change_details(change)
+        previous = net.get(record_id)
+
+        if previous is None or operation == "DELETE":
+            merged_op = operation
+            merged_details = details
+        elif previous["operation"] == "DELETE":
+            # A record re-created after deletion is applied as a fresh insert
+            merged_op = "INSERT" if operation == "INSERT" else operation
+            merged_details = details
+        else:
+            merged_op = "INSERT" if previous["operation"] == "INSERT" else operation
+            merged_details = {**previous["details"], **details}
+
+        net[record_id] = {
+            **change,
+            "record_id": record_id,
+            "operation": merged_op,
+            "details": merged_details,
+        }
+
+    return list(net.values())
+
+
+def _apply_changes_bulk(table_name: str, changes: list[dict], target_local: bool) -> int:
+    """
+    Apply changes set-wise, one statement per operation and column set.
+
+    Changes are compacted, grouped by operation and column set, staged in a
+    temporary table and applied with ``DELETE ... USING`` plus
+    ``INSERT ... SELECT`` (inserts replace any row with the same id),
+    ``UPDATE ... FROM`` and ``DELETE ... USING`` inside one transaction.
+
+    Args:
+    ----
+        table_name: Name of the table to update
+        changes: List of changes to apply
+        target_local: Whether to apply to local database (True) or MotherDuck (False)
+
+    Returns:
+    -------
+        Number of records written
+
+    """
+    net_changes = compact_changes(changes)
+    if not net_changes:
+        return 0
+
+    groups: dict[tuple[str, tuple[str, ...]], list[dict]] = {}
+    for change in net_changes:
+        operation = change["operation"]
+        if operation not in ("INSERT", "UPDATE", "DELETE"):
+            logger.warning(f"Unknown operation '{operation}' for {table_name}")
+            continue
+        details = change["details"]
+        details.pop("id", None)
+        columns = () if operation == "DELETE" else tuple(sorted(details))
+        groups.setdefault((operation, columns), []).append(change)
+
+    conn = db_manager.get_connection(for_write=True, local_only=target_local)
+    table = _quote_ident(table_name)
+    applied = 0
+
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        for index, ((operation, columns), group) in enumerate(groups.items()):
+            stage = _quote_ident(f"_sync_stage_{table_name}_{index}")
+            all_columns = ("id", *columns)
+            column_list = ", ".join(_quote_ident(c) for c in all_columns)
+            placeholders = ", ".join("?" for _ in all_columns)
+
+            conn.execute(
+                f"CREATE OR REPLACE TEMP TABLE {stage} AS "
+                f"SELECT {column_list} FROM {table} LIMIT 0",
+            )
+            conn.executemany(
+                f"INSERT INTO {stage} VALUES ({placeholders})",
+                [
+                    [c["record_id"], *(c["details"].get(col) for col in columns)]
+                    for c in group
+                ],
+            )
+
+            if operation == "INSERT":
+                # Tables made by direct copy have no key on id, so replace
+                # existing rows instead of relying on ON CONFLICT
+                conn.execute(
+                    f"DELETE FROM {table} USING {stage} AS s WHERE {table}.id = s.id",
+                )
+                conn.execute(
+                    f"INSERT INTO {table} ({column_list}) "
+                    f"SELECT {column_list} FROM {stage}",
+                )
+            elif operation == "UPDATE":
+                if columns:
+                    updates = ", ".join(
+                        f"{_quote_ident(c)} = s.{_quote_ident(c)}" for c in columns
+                    )
+                    conn.execute(
+                        f"UPDATE {table} SET {updates} "
+                        f"FROM {stage} AS s WHERE {table}.id = s.id",
+                    )
+            else:
+                conn.execute(
+                    f"DELETE FROM {table} USING {stage} AS s WHERE {table}.id = s.id",
+                )
+
+            conn.execute(f"DROP TABLE IF EXISTS {stage}")
+            applied += len(group)
+            logger.debug(f"Applied {len(group)} x {operation} to {table_name}")
+
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    logger.info(
+        f"Bulk applied {applied} net changes ({len(changes)} logged) to {table_name}",
+    )
+    return applied
+
+
 def apply_changes(
-    table_name: str, changes: list[dict], target_local: bool = True,
-) -> None:
+    table_name: str,
+    changes: list[dict],
+    target_local: bool = True,
+    bulk: bool = False,
+) -> int:
     """
     Apply changes to the target database.
 
@@ -205,13 +392,30 @@ def apply_changes(
         table_name: Name of the table to update
         changes: List of changes to apply
         target_local: Whether to apply to local database (True) or MotherDuck (False)
+        bulk: Apply set-wise in one transaction instead of one statement per change
+
+    Returns:
+    -------
+        Number of changes applied
+
+    Raises:
+    ------
+        Exception: If a bulk apply fails; its transaction is rolled back.
 
     """
+    if bulk:
+        try:
+            return _apply_changes_bulk(table_name, changes, target_local)
+        except Exception as e:
+            logger.error(f"Failed to bulk apply changes for {table_name}: {e}")
+            raise
+
+    applied = 0
     try:
         for change in changes:
             operation = change["operation"]
             record_id = change["record_id"]
-            details = change.get("details", {})
+            details = _change_details(change)
 
             if operation == "INSERT":
                 columns = ", ".join(details.keys())
@@ -256,14 +460,24 @@ def apply_changes(
 
             else:
                 logger.warning(f"Unknown operation '{operation}' for {table_name}")
+                continue
 
+            applied += 1
             logger.info(f"Applied {operation} to {table_name}.{record_id}")
 
     except Exception as e:
         logger.error(f"Failed to apply changes for {table_name}: {e}")
 
+    return applied
+
 
-def sync_table(table_name: str, direction: str = "both") -> bool:
+def sync_table(
+    table_name: str,
+    direction: str = "both",
+    bulk: bool = False,
+    stats: list[TableSyncStats] | None = None,
+    repair: bool = False,
+) -> bool:
     """
     Synchronize a single table between local and remote databases.
 
@@ -271,6 +485,10 @@ def sync_table(table_name: str, direction: str = "both") -> bool:
     ----
         table_name: The name of the table to synchronize.
         direction: 'up', 'down', or 'both'
+        bulk: Apply changes set-wise, one transaction per table and direction
+        stats: Optional list that receives a TableSyncStats per direction applied
+        repair: After applying changes, checksum-diff the table and repair only
+            the rows that still differ
 
     Returns:
     -------
@@ -300,7 +518,7 @@ def sync_table(table_name: str, direction: str = "both") -> bool:
         table_name, effective_last_sync, local_only=False,
     )
 
-    if not local_changes and not remote_changes:
+    if not local_changes and not remote_changes and not repair:
         logger.info(f"No changes detected for {table_name} since {effective_last_sync}")
         # Update sync status only if there were no previous errors
         # record_sync_status(table_name, "success") # Consider if needed
@@ -317,19 +535,35 @@ def sync_table(table_name: str, direction: str = "both") -> bool:
         success = False # Indicate sync failure due to conflicts
 
     # Apply changes based on direction (avoiding conflicts)
+    conflict_ids = {co["record_id"] for co in conflicts}
+    passes = []
     if direction in ("down", "both"):
-        apply_changes(
-            table_name,
-            [c for c in remote_changes if c["record_id"] not in {co["record_id"] for co in conflicts}],
-            target_local=True,
-        )
-
+        passes.append(("down", remote_changes, True))
     if direction in ("up", "both"):
-        apply_changes(
-            table_name,
-            [c for c in local_changes if c["record_id"] not in {co["record_id"] for co in conflicts}],
-            target_local=False,
-        )
+        passes.append(("up", local_changes, False))
+
+    for pass_direction, changes, target_local in passes:
+        started = time.perf_counter()
+        try:
+            rows = apply_changes(
+                table_name,
+                [c for c in changes if c["record_id"] not in conflict_ids],
+                target_local=target_local,
+                bulk=bulk,
+            )
+        except Exception as e:
+            record_sync_status(table_name, "failed", f"{pass_direction}: {e}")
+            logger.error(f"Sync failed for table {table_name}: {e}")
+            return False
+        if stats is not None:
+            stats.append(
+                TableSyncStats(
+                    table_name, pass_direction, rows, time.perf_counter() - started,
+                ),
+            )
+
+    if repair and success:
+        success = _repair_drift(table_name, direction)
 
     # Record final sync status
     if success:
@@ -341,8 +575,41 @@ def sync_table(table_name: str, direction: str = "both") -> bool:
     return success
 
 
+def _repair_drift(table_name: str, direction: str) -> bool:
+    """
+    Repair rows that still differ after a sync using a checksum diff.
+
+    Args:
+    ----
+        table_name: The table to check
+        direction: 'up' repairs MotherDuck from local, 'down' the reverse;
+            'both' repairs local from MotherDuck
+
+    Returns:
+    -------
+        True if the table is consistent afterwards, False otherwise
+
+    """
+    from .table_diff import diff_table, repair_table
+
+    to_local = direction != "up"
+    source_conn = db_manager.get_connection(local_only=not to_local)
+    target_conn = db_manager.get_connection(local_only=to_local)
+    try:
+        diff = diff_table(table_name, source_conn, target_conn)
+        if not diff.is_clean:
+            repair_table(source_conn, target_conn, diff)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to repair drift in {table_name}: {e}")
+        return False
+
+
 def record_sync_status(
-    table_name: str, status: str, error_message: str | None = None,
+    table_name: str,
+    status: str,
+    error_message: str | None = None,
+    details: dict | None = None,
 ) -> None:
     """
     Record the status of a synchronization attempt.
@@ -350,18 +617,26 @@ def record_sync_status(
     Args:
     ----
         table_name: The table being synced
-        status: 'success', 'failed', 'conflict'
+        status: 'success', 'failed', 'conflict', 'watermark'
         error_message: Optional message if status is failed or conflict
+        details: Optional JSON-serialisable payload, e.g. a copy watermark
 
     """
     try:
         # Record in local db only for now
         db_manager.execute_query(
             """
-            INSERT INTO sync_status (table_name, status, error_message, created_at)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            INSERT INTO sync_status (
+                table_name, status, error_message, details, created_at
+            )
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
         """,
-            [table_name, status, error_message],
+            [
+                table_name,
+                status,
+                error_message,
+                json.dumps(details, default=str) if details is not None else None,
+            ],
             for_write=True,
             local_only=True,
         )
@@ -369,16 +644,194 @@ def record_sync_status(
         logger.error(f"Failed to record sync status for {table_name}: {e}")
 
 
+def get_copy_watermark(table_name: str, target_local: bool) -> dict | None:
+    """
+    Get the high-water mark of the last incremental copy of a table.
+
+    Args:
+    ----
+        table_name: The table that was copied
+        target_local: Direction of the copy (True when copying to local)
+
+    Returns:
+    -------
+        Watermark details or None if the table was never copied incrementally
+
+    """
+    try:
+        rows = db_manager.execute_query(
+            """
+            SELECT details FROM sync_status
+            WHERE table_name = ? AND status = 'watermark'
+            ORDER BY created_at DESC
+            LIMIT 10
+        """,
+            [table_name],
+            local_only=True,
+        )
+    except Exception as e:
+        logger.error(f"Failed to get watermark for {table_name}: {e}")
+        return None
+
+    for (details,) in rows or []:
+        watermark = json.loads(details) if isinstance(details, str) else details
+        if watermark and watermark.get("target_local") == target_local:
+            return watermark
+    return None
+
+
+def _schema_signature(schema_result: list) -> str:
+    """Hash column names and types so schema changes can be detected."""
+    described = ",".join(f"{col[0]}:{col[1]}" for col in schema_result)
+    return hashlib.sha256(described.encode()).hexdigest()
+
+
+def _table_checksum(
+    conn, table_name: str, columns: list[str], where: str = "", params=None,
+) -> tuple[int, int]:
+    """
+    Compute an order-independent (row count, hash) checksum of a table.
+
+    Args:
+    ----
+        conn: Connection to run the aggregate on
+        table_name: Table to checksum
+        columns: Columns included in the row hash
+        where: Optional SQL predicate restricting the rows
+        params: Parameters for the predicate
+
+    Returns:
+    -------
+        Tuple of row count and XOR of the per-row hashes
+
+    """
+    hashed = ", ".join(_quote_ident(c) for c in columns)
+    query = (
+        f"SELECT COUNT(*), COALESCE(bit_xor(hash({hashed})), 0) FROM {table_name}"
+    )
+    if where:
+        query += f" WHERE {where}"
+    count, checksum = conn.execute(query, params or []).fetchone()
+    return int(count), int(checksum)
+
+
+def _incremental_copy(
+    table_name: str, source_conn, target_conn, schema_result: list, target_local: bool,
+) -> int | None:
+    """
+    Copy only rows at or past the stored watermark and upsert them by id.
+
+    Args:
+    ----
+        table_name: The table to copy
+        source_conn: Connection to read from
+        target_conn: Connection to write to
+        schema_result: DESCRIBE output of the source table
+        target_local: Direction of the copy (True when copying to local)
+
+    Returns:
+    -------
+        Number of delta rows copied, or None when a full refresh is required
+
+    """
+    columns = {col[0]: col[1] for col in schema_result}
+    watermark = get_copy_watermark(table_name, target_local)
+    if not watermark:
+        logger.info(f"No watermark for {table_name}, full refresh required")
+        return None
+    if watermark.get("schema") != _schema_signature(schema_result):
+        logger.info(f"Schema of {table_name} changed, full refresh required")
+        return None
+    column = watermark.get("column")
+    if column not in columns or "id" not in columns:
+        return None
+
+    quoted = _quote_ident(column)
+    predicate = f"{quoted} >= CAST(? AS {columns[column]})"
+    new_value = source_conn.execute(
+        f"SELECT MAX({quoted}) FROM {table_name}",
+    ).fetchone()[0]
+
+    stage = _quote_ident(f"_delta_{table_name}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_path = Path(temp_dir) / f"{table_name}_delta.csv"
+        source_conn.execute(
+            f"COPY (SELECT * FROM {table_name} WHERE {predicate}) "
+            f"TO '{csv_path}' (HEADER, DELIMITER ',')",
+            [watermark["value"]],
+        )
+
+        target_conn.execute("BEGIN TRANSACTION")
+        try:
+            target_conn.execute(
+                f"CREATE OR REPLACE TEMP TABLE {stage} AS "
+                f"SELECT * FROM {table_name} LIMIT 0",
+            )
+            target_conn.execute(
+                f"COPY {stage} FROM ? (HEADER, DELIMITER ',')", [str(csv_path)],
+            )
+            delta_rows = target_conn.execute(
+                f"SELECT COUNT(*) FROM {stage}",
+            ).fetchone()[0]
+            target_conn.execute(
+                f"DELETE FROM {table_name} USING {stage} AS s "
+                f"WHERE {table_name}.id = s.id",
+            )
+            target_conn.execute(f"INSERT INTO {table_name} SELECT * FROM {stage}")
+            target_conn.execute(f"DROP TABLE IF EXISTS {stage}")
+            target_conn.execute("COMMIT")
+        except Exception:
+            target_conn.execute("ROLLBACK")
+            raise
+
+    # Deletes and updates below the watermark are invisible to the delta, so
+    # a checksum mismatch falls back to a full refresh.
+    column_names = list(columns)
+    if _table_checksum(source_conn, table_name, column_names) != _table_checksum(
+        target_conn, table_name, column_names,
+    ):
+        logger.warning(f"Checksum mismatch for {table_name} after incremental copy")
+        return None
+
+    _record_watermark(table_name, schema_result, column, new_value, target_local)
+    return delta_rows
+
+
+def _record_watermark(
+    table_name: str, schema_result: list, column: str | None, value, target_local: bool,
+) -> None:
+    """Store the high-water mark reached by a copy of a table."""
+    if column is None or value is None:
+        return
+    record_sync_status(
+        table_name,
+        "watermark",
+        details={
+            "column": column,
+            "value": value,
+            "schema": _schema_signature(schema_result),
+            "target_local": target_local,
+        },
+    )
+
+
 def direct_copy_table(
     table_name: str,
     source_local: bool = False,
     target_local: bool = True,
     create_table: bool = True,
+    source_conn=None,
+    target_conn=None,
+    stats: list[TableSyncStats] | None = None,
+    incremental: bool = False,
 ) -> bool:
     """
     Directly copies a table between databases using CSV export/import.
 
-    This performs a full refresh, dropping the target table if it exists.
+    By default this performs a full refresh, dropping the target table if it
+    exists. With ``incremental`` only rows at or past the high-water mark
+    stored in sync_status are copied and upserted; a full refresh happens
+    only on the first run, a schema change or a checksum mismatch.
 
     Args:
     ----
@@ -386,6 +839,10 @@ def direct_copy_table(
         source_local: If True, copy from local DB. If False, copy from MotherDuck.
         target_local: If True, copy to local DB. If False, copy to MotherDuck.
         create_table: If True, create the table in the target if it doesn't exist.
+        source_conn: Connection to read from instead of the shared source connection.
+        target_conn: Connection to write to instead of the shared target connection.
+        stats: Optional list that receives a TableSyncStats for this copy.
+        incremental: Copy only the delta since the last watermark.
 
     Returns:
     -------
@@ -397,8 +854,15 @@ def direct_copy_table(
         f"(source_local={source_local}, target_local={target_local})",
     )
 
-    source_conn = db_manager.get_connection(local_only=source_local)
-    target_conn = db_manager.get_connection(local_only=target_local)
+    if source_conn is None:
+        source_conn = db_manager.get_connection(local_only=source_local)
+    if target_conn is None:
+        target_conn = db_manager.get_connection(local_only=target_local)
+    if stats is not None:
+        table_stats = TableSyncStats(
+            table_name, "down" if target_local else "up", success=False,
+        )
+        stats.append(table_stats)
 
     if not source_conn or not target_conn:
         logger.error(f"Failed to get database connections for table {table_name}")
@@ -432,6 +896,39 @@ def direct_copy_table(
             logger.error(f"Failed to get schema for {table_name}: {e}")
             return False
 
+        if incremental:
+            try:
+                delta_rows = _incremental_copy(
+                    table_name, source_conn, target_conn, schema_result, target_local,
+                )
+            except Exception as e:
+                logger.warning(f"Incremental copy of {table_name} failed: {e}")
+                delta_rows = None
+
+            if delta_rows is not None:
+                duration = time.time() - start_time
+                logger.info(
+                    f"Incremental copy of {delta_rows} rows for {table_name} "
+                    f"completed in {duration:.2f} seconds.",
+                )
+                if stats is not None:
+                    table_stats.rows = delta_rows
+                    table_stats.success = True
+                return True
+
+            logger.info(f"Performing full refresh of {table_name}")
+            column_names = {col[0] for col in schema_result}
+            watermark_column = next(
+                (c for c in WATERMARK_COLUMNS if c in column_names), None,
+            )
+            watermark_value = (
+                source_conn.execute(
+                    f"SELECT MAX({_quote_ident(watermark_column)}) FROM {table_name}",
+                ).fetchone()[0]
+                if watermark_column
+                else None
+            )
+
         # 3. Export source to temporary CSV
         with tempfile.TemporaryDirectory() as temp_dir:
             csv_path = Path(temp_dir) / f"{table_name}.csv"
@@ -504,8 +1001,16 @@ def direct_copy_table(
         except Exception as e:
             logger.warning(f"Failed to verify row count for {table_name}: {e}")
 
+        if incremental:
+            _record_watermark(
+                table_name, schema_result, watermark_column, watermark_value, target_local,
+            )
+
         duration = time.time() - start_time
         logger.info(f"Direct copy for {table_name} completed in {duration:.2f} seconds.")
+        if stats is not None:
+            table_stats.rows = source_row_count
+            table_stats.success = True
         return True
 
     except Exception as e:
@@ -514,33 +1019,72 @@ def direct_copy_table(
     finally:
         # Ensure connections are released/closed if managed outside db_manager
         # If db_manager handles connections, this might not be needed
-        pass
+        if stats is not None:
+            table_stats.seconds = time.time() - start_time
+
+
+def _table_row_counts(conn, tables: list[str]) -> dict[str, int]:
+    """
+    Count rows per table so the largest tables can be scheduled first.
+
+    Args:
+    ----
+        conn: Connection to the database holding the tables
+        tables: Table names to count
+
+    Returns:
+    -------
+        Mapping of table name to row count (0 when the count fails)
+
+    """
+    counts = {}
+    for table_name in tables:
+        try:
+            counts[table_name] = conn.execute(
+                f"SELECT COUNT(*) FROM {table_name}",
+            ).fetchone()[0]
+        except Exception as e:
+            logger.warning(f"Failed to count rows in {table_name}: {e}")
+            counts[table_name] = 0
+    return counts
 
 
 def direct_copy_all_tables(
     source_local: bool = False,
     target_local: bool = True,
     exclude_prefix: list[str] | None = None,
+    max_workers: int = 1,
+    stats: list[TableSyncStats] | None = None,
+    incremental: bool = False,
 ) -> bool:
     """
     Copies all tables from source to target using the direct copy method.
 
+    Tables are scheduled largest first across ``max_workers`` threads. Each
+    worker copies over its own source/target connection pair so one large
+    table does not hold up the small ones.
+
     Args:
     ----
         source_local: If True, copy from local DB. If False, copy from MotherDuck.
         target_local: If True, copy to local DB. If False, copy to MotherDuck.
         exclude_prefix: List of prefixes for tables to exclude (e.g., ['sqlite_', 'tmp_'])
+        max_workers: Number of tables copied concurrently
+        stats: Optional list that receives a TableSyncStats per table
+        incremental: Copy only the delta since each table's last watermark
 
     Returns:
     -------
         True if all tables copied successfully, False otherwise.
     """
     logger.info(
-        f"Starting direct copy for ALL tables (source_local={source_local}, target_local={target_local})",
+        f"Starting direct copy for ALL tables (source_local={source_local}, "
+        f"target_local={target_local}, workers={max_workers})",
     )
     source_conn = db_manager.get_connection(local_only=source_local)
-    if not source_conn:
-        logger.error("Failed to get source database connection.")
+    target_conn = db_manager.get_connection(local_only=target_local)
+    if not source_conn or not target_conn:
+        logger.error("Failed to get database connections.")
         return False
 
     if exclude_prefix is None:
@@ -555,27 +1099,60 @@ def direct_copy_all_tables(
             for t in all_tables
             if not any(t.startswith(prefix) for prefix in exclude_prefix)
         ]
-
-        logger.info(f"Found {len(tables_to_copy)} tables to copy.")
-
-        overall_success = True
-        for table_name in tables_to_copy:
-            success = direct_copy_table(
-                table_name, source_local=source_local, target_local=target_local,
-            )
-            if not success:
-                logger.error(f"Failed to copy table: {table_name}")
-                overall_success = False
-                # Decide whether to continue or stop on first error
-                # break # Uncomment to stop on first error
-
-        logger.info("Finished direct copy for all tables.")
-        return overall_success
-
     except Exception as e:
         logger.exception(f"Error getting table list for direct copy: {e}")
         return False
 
+    row_counts = _table_row_counts(source_conn, tables_to_copy)
+    tables_to_copy.sort(key=lambda t: row_counts[t], reverse=True)
+    logger.info(f"Found {len(tables_to_copy)} tables to copy.")
+
+    # DuckDB connections are not safe to share between threads; cursor()
+    # opens an independent connection to the same database per worker.
+    worker_local = threading.local()
+    worker_conns = []
+    conns_lock = threading.Lock()
+
+    def copy_one(table_name: str) -> bool:
+        if not hasattr(worker_local, "source"):
+            worker_local.source = source_conn.cursor()
+            worker_local.target = target_conn.cursor()
+            with conns_lock:
+                worker_conns.extend([worker_local.source, worker_local.target])
+        return direct_copy_table(
+            table_name,
+            source_local=source_local,
+            target_local=target_local,
+            source_conn=worker_local.source,
+            target_conn=worker_local.target,
+            stats=stats,
+            incremental=incremental,
+        )
+
+    overall_success = True
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(copy_one, t): t for t in tables_to_copy}
+            for future in as_completed(futures):
+                table_name = futures[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    logger.exception(f"Error copying table {table_name}: {e}")
+                    success = False
+                if not success:
+                    logger.error(f"Failed to copy table: {table_name}")
+                    overall_success = False
+    finally:
+        for conn in worker_conns:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug(f"Failed to close worker connection: {e}")
+
+    logger.info("Finished direct copy for all tables.")
+    return overall_success
+
 # Placeholder for the main sync function if needed
 # def run_sync(direction='both', tables=None, exclude=None):
 #     pass
@@ -0,0 +1,220 @@
+"""
+Table drift detection module.
+
+This module finds rows that diverged between two copies of a table (local
+DuckDB and MotherDuck) without moving the whole table. Rows are bucketed by
+``hash(key) % modulus`` and each bucket is summarised by a row count and an
+XOR of row hashes. Only buckets whose summaries differ are split further,
+Merkle-tree style, until they are small enough to compare row by row.
+Bucketing on the key hash rather than raw key ranges keeps the split even
+for VARCHAR and ULID primary keys.
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+from .sync import _quote_ident
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TableDiff:
+    """Keys that differ between a source and a target table."""
+
+    table_name: str
+    key: str
+    missing: list = field(default_factory=list)
+    extra: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    buckets_compared: int = 0
+
+    @property
+    def is_clean(self) -> bool:
+        """Whether the two tables hold identical rows."""
+        return not (self.missing or self.extra or self.changed)
+
+    @property
+    def total(self) -> int:
+        """Number of diverged rows."""
+        return len(self.missing) + len(self.extra) + len(self.changed)
+
+
+def _bucket_filter(key: str, modulus: int | None, buckets: list[int] | None) -> str:
+    """Build a predicate selecting rows in the given buckets."""
+    if modulus is None or buckets is None:
+        return ""
+    bucket_list = ", ".join(str(int(b)) for b in buckets)
+    return f"WHERE hash({_quote_ident(key)}) % {modulus} IN ({bucket_list})"
+
+
+def _bucket_checksums(
+    conn,
+    table_name: str,
+    key: str,
+    columns: list[str],
+    modulus: int,
+    parent_modulus: int | None = None,
+    parents: list[int] | None = None,
+) -> dict[int, tuple[int, int]]:
+    """
+    Summarise a table as (row count, XOR of row hashes) per key-hash bucket.
+
+    Args:
+    ----
+        conn: Connection holding the table
+        table_name: Table to summarise
+        key: Primary key column
+        columns: Columns included in the row hash
+        modulus: Number of buckets at this level
+        parent_modulus: Number of buckets at the previous level
+        parents: Differing buckets of the previous level to descend into
+
+    Returns:
+    -------
+        Mapping of bucket number to (row count, checksum)
+
+    """
+    hashed = ", ".join(_quote_ident(c) for c in columns)
+    rows = conn.execute(
+        f"SELECT hash({_quote_ident(key)}) % {modulus} AS bucket, COUNT(*), "
+        f"bit_xor(hash({hashed})) FROM {table_name} "
+        f"{_bucket_filter(key, parent_modulus, parents)} GROUP BY bucket",
+    ).fetchall()
+    return {int(bucket): (int(count), int(checksum)) for bucket, count, checksum in rows}
+
+
+def _row_hashes(
+    conn, table_name: str, key: str, columns: list[str], modulus: int, buckets: list[int],
+) -> dict:
+    """Return a mapping of key to row hash for every row in the given buckets."""
+    hashed = ", ".join(_quote_ident(c) for c in columns)
+    rows = conn.execute(
+        f"SELECT {_quote_ident(key)}, hash({hashed}) FROM {table_name} "
+        f"{_bucket_filter(key, modulus, buckets)}",
+    ).fetchall()
+    return dict(rows)
+
+
+def diff_table(
+    table_name: str,
+    source_conn,
+    target_conn,
+    key: str = "id",
+    fanout: int = 16,
+    leaf_rows: int = 1000,
+    max_depth: int = 6,
+) -> TableDiff:
+    """
+    Find the exact rows that differ between two copies of a table.
+
+    Args:
+    ----
+        table_name: Table present on both connections with the same columns
+        source_conn: Connection holding the authoritative copy
+        target_conn: Connection holding the copy to check
+        key: Primary key column
+        fanout: Number of child buckets each differing bucket is split into
+        leaf_rows: Bucket size at which rows are compared individually
+        max_depth: Maximum number of split levels before comparing rows
+
+    Returns:
+    -------
+        TableDiff listing missing, extra and changed keys in the target
+
+    """
+    columns = [col[0] for col in source_conn.execute(f"DESCRIBE {table_name}").fetchall()]
+    diff = TableDiff(table_name, key)
+
+    modulus, parent_modulus, parents = fanout, None, None
+    for depth in range(1, max_depth + 1):
+        source = _bucket_checksums(
+            source_conn, table_name, key, columns, modulus, parent_modulus, parents,
+        )
+        target = _bucket_checksums(
+            target_conn, table_name, key, columns, modulus, parent_modulus, parents,
+        )
+        buckets = source.keys() | target.keys()
+        diff.buckets_compared += len(buckets)
+        differing = sorted(b for b in buckets if source.get(b) != target.get(b))
+        logger.debug(
+            f"{table_name}: level {depth}, {len(differing)}/{len(buckets)} buckets differ",
+        )
+        if not differing:
+            return diff
+
+        largest = max(
+            max(source.get(b, (0, 0))[0], target.get(b, (0, 0))[0]) for b in differing
+        )
+        if largest <= leaf_rows or depth == max_depth:
+            break
+        modulus, parent_modulus, parents = modulus * fanout, modulus, differing
+
+    source_rows = _row_hashes(source_conn, table_name, key, columns, modulus, differing)
+    target_rows = _row_hashes(target_conn, table_name, key, columns, modulus, differing)
+    diff.missing = [k for k in source_rows if k not in target_rows]
+    diff.extra = [k for k in target_rows if k not in source_rows]
+    diff.changed = [
+        k for k, h in source_rows.items() if k in target_rows and target_rows[k] != h
+    ]
+    logger.info(
+        f"{table_name}: {len(diff.missing)} missing, {len(diff.extra)} extra, "
+        f"{len(diff.changed)} changed rows ({diff.buckets_compared} buckets compared)",
+    )
+    return diff
+
+
+def repair_table(
+    source_conn, target_conn, diff: TableDiff, batch_size: int = 1000,
+) -> int:
+    """
+    Make the target match the source for the rows listed in a diff.
+
+    Args:
+    ----
+        source_conn: Connection holding the authoritative copy
+        target_conn: Connection holding the copy to repair
+        diff: Result of diff_table for the two connections
+        batch_size: Keys per DELETE/SELECT statement
+
+    Returns:
+    -------
+        Number of rows deleted or rewritten in the target
+
+    """
+    if diff.is_clean:
+        return 0
+
+    table_name = diff.table_name
+    key = _quote_ident(diff.key)
+    stale = diff.extra + diff.changed
+    fetch = diff.missing + diff.changed
+
+    target_conn.execute("BEGIN TRANSACTION")
+    try:
+        for start in range(0, len(stale), batch_size):
+            batch = stale[start : start + batch_size]
+            placeholders = ", ".join("?" for _ in batch)
+            target_conn.execute(
+                f"DELETE FROM {table_name} WHERE {key} IN ({placeholders})", batch,
+            )
+
+        for start in range(0, len(fetch), batch_size):
+            batch = fetch[start : start + batch_size]
+            placeholders = ", ".join("?" for _ in batch)
+            rows = source_conn.execute(
+                f"SELECT * FROM {table_name} WHERE {key} IN ({placeholders})", batch,
+            ).fetchall()
+            if rows:
+                values = ", ".join("?" for _ in rows[0])
+                target_conn.executemany(
+                    f"INSERT INTO {table_name} VALUES ({values})", rows,
+                )
+
+        target_conn.execute("COMMIT")
+    except Exception:
+        target_conn.execute("ROLLBACK")
+        raise
+
+    logger.info(f"Repaired {diff.total} rows in {table_name}")
+    return diff.total
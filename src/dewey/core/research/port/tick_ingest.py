@@ -0,0 +1,435 @@
+"""
+Concurrent Polygon trade ingestion into partitioned Parquet.
+
+Trades are fetched from the Polygon v3 trades endpoint for many ticker/day
+pairs at once, following the `next_url` cursor of each response. Response
+bodies go to DuckDB as text: its JSON reader unnests the results and one
+SQL statement converts and writes them, so no trade becomes a Python object
+and the work runs outside the GIL. Each page becomes one file:
+
+    <root>/ticker=AAPL/date=2024-01-02/part-00000.parquet
+
+Files are zstd-compressed and laid out as Hive partitions, so a DuckDB view
+over the tree prunes whole ticker and date directories from a range scan
+before any file is opened. A day is written to a hidden staging directory
+and renamed into place once complete, so readers never see half of one.
+Re-ingesting a day first renames the old partition aside and deletes it
+only after the new one is in place. A reader in between finds the day
+missing, and after a crash there the old copy is still on disk.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import product
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import pandas as pd
+import requests
+
+logger = logging.getLogger(__name__)
+
+POLYGON_BASE_URL = "https://api.polygon.io"
+TRADES_PATH = "/v3/trades/{ticker}"
+PAGE_LIMIT = 50000
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Types of the v3 trade fields that are stored
+TRADE_STRUCT = json.dumps(
+    [
+        {
+            "id": "VARCHAR",
+            "sip_timestamp": "BIGINT",
+            "price": "DOUBLE",
+            "size": "DOUBLE",
+            "conditions": "INTEGER[]",
+            "sequence_number": "BIGINT",
+            "exchange": "INTEGER",
+        },
+    ],
+)
+
+# Ticks of one response body, passed as the $page parameter
+TRANSFORM_SQL = (
+    """
+    WITH trades AS (
+        SELECT unnest(from_json(json_extract($page, '$.results'), '"""
+    + TRADE_STRUCT
+    + """')) AS t
+    )
+    SELECT
+        t.id AS trade_id,
+        make_timestamp(t.sip_timestamp // 1000) AS timestamp,
+        t.price AS price,
+        t.size AS size,
+        array_to_string(t.conditions, ',') AS conditions,
+        t.sequence_number AS sequence_number,
+        t.exchange AS exchange
+    FROM trades
+    ORDER BY t.sip_timestamp, t.sequence_number
+"""
+)
+
+_NEXT_URL_RE = re.compile(r'"next_url"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+def _sql_string(value: Any) -> str:
+    """A SQL string literal; COPY and view targets cannot be parameters."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class PolygonClient:
+    """Paginated reader of the Polygon v3 trades endpoint."""
+
+    def __init__(
+        self,
+        api_key: str | None,
+        base_url: str = POLYGON_BASE_URL,
+        limit: int = PAGE_LIMIT,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        timeout: float = 30.0,
+    ) -> None:
+        """
+        Initialize the client.
+
+        Args:
+        ----
+            api_key: Polygon API key, sent with every request.
+            base_url: API root; point it at a local server in tests.
+            limit: Trades per page.
+            max_retries: Retries of a rate-limited or failed request.
+            backoff: First retry delay in seconds, doubled on each retry.
+            timeout: Seconds to wait for a response.
+
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.limit = limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        """A keep-alive session per worker thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _get(self, url: str, params: dict[str, Any]) -> str:
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            response = self._session().get(url, params=params, timeout=self.timeout)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            retry_after = response.headers.get("Retry-After", "")
+            wait = float(retry_after) if retry_after.isdigit() else delay
+            logger.warning(f"Polygon returned {response.status_code}, retrying in {wait}s")
+            time.sleep(wait)
+            delay *= 2
+        response.raise_for_status()
+        return response.text
+
+    def iter_trade_pages(self, ticker: str, day: date) -> Iterator[str]:
+        """
+        Yield the trades of a ticker on one day, a response body at a time.
+
+        Args:
+        ----
+            ticker: Stock ticker symbol, e.g. "AAPL".
+            day: Trading day.
+
+        Yields:
+        ------
+            JSON response bodies with a "results" list of trades.
+
+        Raises:
+        ------
+            requests.exceptions.RequestException: If a request fails.
+
+        """
+        url: str | None = self.base_url + TRADES_PATH.format(ticker=ticker)
+        params: dict[str, Any] = {
+            "timestamp": day.isoformat(),
+            "order": "asc",
+            "sort": "timestamp",
+            "limit": self.limit,
+            "apiKey": self.api_key,
+        }
+        while url:
+            page = self._get(url, params)
+            yield page
+            # The cursor URL carries every query parameter except the key
+            url = next_url(page)
+            params = {"apiKey": self.api_key}
+
+
+def next_url(page: str) -> str | None:
+    """
+    The pagination cursor URL of a response body, without decoding the trades.
+
+    Args:
+    ----
+        page: JSON response body.
+
+    Returns:
+    -------
+        The next_url value, or None on the last page.
+
+    """
+    match = _NEXT_URL_RE.search(page)
+    return json.loads(match.group(1)) if match else None
+
+
+def transform_page(con: duckdb.DuckDBPyConnection, page: str) -> pd.DataFrame:
+    """
+    Transform a response body into the stored tick schema.
+
+    Args:
+    ----
+        con: DuckDB connection that runs the transform.
+        page: JSON response body from iter_trade_pages.
+
+    Returns:
+    -------
+        Ticks with trade_id, timestamp (UTC), price, size, conditions
+        (comma separated codes), sequence_number and exchange columns.
+
+    """
+    return con.execute(TRANSFORM_SQL, {"page": page}).df()
+
+
+class TickStore:
+    """Hive-partitioned Parquet tree of ticks, one directory per ticker and day."""
+
+    def __init__(self, root: str | Path, compression: str = "zstd") -> None:
+        """
+        Initialize the store.
+
+        Args:
+        ----
+            root: Directory holding the ticker=/date= partitions.
+            compression: Parquet compression codec.
+
+        """
+        self.root = Path(root)
+        self.compression = compression
+
+    def partition(self, ticker: str, day: date) -> Path:
+        """Directory holding the ticks of a ticker on one day."""
+        return self.root / f"ticker={ticker}" / f"date={day.isoformat()}"
+
+    @property
+    def glob(self) -> str:
+        """Pattern matching every stored Parquet file."""
+        return str(self.root / "ticker=*" / "date=*" / "*.parquet")
+
+    def write_day(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        ticker: str,
+        day: date,
+        pages: Iterable[str],
+    ) -> int:
+        """
+        Replace the stored ticks of a ticker on one day.
+
+        Each page is transformed and written as its own Parquet file in a
+        staging directory, which replaces the day's partition at the end.
+
+        Args:
+        ----
+            con: DuckDB connection used for the transform and write.
+            ticker: Stock ticker symbol.
+            day: Trading day.
+            pages: JSON response bodies from iter_trade_pages.
+
+        Returns:
+        -------
+            Number of ticks written; 0 leaves the partition untouched.
+
+        """
+        final = self.partition(ticker, day)
+        staging = final.with_name(f".{final.name}.{threading.get_ident()}")
+        previous = final.with_name(f".{final.name}.{threading.get_ident()}.old")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        count = 0
+        try:
+            for number, page in enumerate(pages):
+                target = staging / f"part-{number:05d}.parquet"
+                (written,) = con.execute(
+                    f"COPY ({TRANSFORM_SQL}) TO {_sql_string(target)} "
+                    f"(FORMAT parquet, COMPRESSION {self.compression})",
+                    {"page": page},
+                ).fetchone()
+                if not written:
+                    target.unlink()
+                count += written
+            if count:
+                if final.exists():
+                    os.replace(final, previous)
+                try:
+                    os.replace(staging, final)
+                except OSError:
+                    if previous.exists():
+                        os.replace(previous, final)
+                    raise
+                shutil.rmtree(previous, ignore_errors=True)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return count
+
+    def create_view(
+        self, con: duckdb.DuckDBPyConnection, name: str = "stock_ticks",
+    ) -> bool:
+        """
+        Create or replace a view over every stored tick.
+
+        The ticker and date partition columns come from the directory names,
+        so filters on them skip the files of other tickers and days.
+
+        Args:
+        ----
+            con: Connection to create the view in.
+            name: View name.
+
+        Returns:
+        -------
+            False if the store is still empty and no view was created.
+
+        """
+        if not any(self.root.glob("ticker=*/date=*/*.parquet")):
+            return False
+        con.execute(
+            f"""
+            CREATE OR REPLACE VIEW {name} AS
+            SELECT * FROM read_parquet(
+                {_sql_string(self.glob)},
+                hive_partitioning = true,
+                hive_types = {{'ticker': VARCHAR, 'date': DATE}}
+            )
+            """,
+        )
+        return True
+
+    def scan(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        ticker: str,
+        start: date,
+        end: date,
+        view: str = "stock_ticks",
+    ) -> pd.DataFrame:
+        """
+        Ticks of one ticker between two days, inclusive, in time order.
+
+        Args:
+        ----
+            con: Connection holding the view from create_view.
+            ticker: Stock ticker symbol.
+            start: First day.
+            end: Last day.
+            view: View name.
+
+        Returns:
+        -------
+            The matching ticks.
+
+        """
+        return con.execute(
+            f"SELECT * FROM {view} WHERE ticker = ? AND date BETWEEN ? AND ? "
+            "ORDER BY timestamp, sequence_number",
+            [ticker, start, end],
+        ).df()
+
+
+def trading_days(start: date, end: date) -> list[date]:
+    """Weekdays from start to end, inclusive."""
+    days = (start + timedelta(days=n) for n in range((end - start).days + 1))
+    return [day for day in days if day.weekday() < 5]
+
+
+class TickIngestor:
+    """Fetches and stores many ticker/day pairs concurrently."""
+
+    def __init__(self, client: PolygonClient, store: TickStore, workers: int = 8) -> None:
+        """
+        Initialize the ingestor.
+
+        Args:
+        ----
+            client: Source of trade pages.
+            store: Destination Parquet tree.
+            workers: Ticker/day pairs fetched at the same time.
+
+        """
+        self.client = client
+        self.store = store
+        self.workers = workers
+        self._con = duckdb.connect()
+
+    def ingest_day(self, ticker: str, day: date) -> int:
+        """
+        Fetch and store the ticks of a ticker on one day.
+
+        Returns
+        -------
+            Number of ticks stored.
+
+        """
+        with self._con.cursor() as con:
+            count = self.store.write_day(
+                con, ticker, day, self.client.iter_trade_pages(ticker, day),
+            )
+        logger.info(f"Stored {count} ticks for {ticker} on {day}")
+        return count
+
+    def ingest(
+        self, tickers: Iterable[str], days: Iterable[date],
+    ) -> dict[tuple[str, date], int]:
+        """
+        Ingest every combination of tickers and days.
+
+        A failed pair is logged and left out of the result; the others
+        still complete.
+
+        Args:
+        ----
+            tickers: Stock ticker symbols.
+            days: Trading days.
+
+        Returns:
+        -------
+            Ticks stored per (ticker, day) that succeeded.
+
+        """
+        tasks = list(product(tickers, days))
+
+        def run(task: tuple[str, date]) -> int | None:
+            try:
+                return self.ingest_day(*task)
+            except (requests.exceptions.RequestException, duckdb.Error, OSError) as e:
+                logger.error(f"Tick ingestion failed for {task[0]} on {task[1]}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(tasks)))) as pool:
+            counts = list(pool.map(run, tasks))
+        return {
+            task: count for task, count in zip(tasks, counts, strict=True) if count is not None
+        }
+
+    def close(self) -> None:
+        """Close the DuckDB connection used for transforms."""
+        self._con.close()
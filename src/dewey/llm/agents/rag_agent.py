@@ -5,6 +5,8 @@ from typing import Any
 from smolagents import Tool
 
 from dewey.llm.agents.base_agent import BaseAgent
+from dewey.utils.vector_db import DEFAULT_INDEX_PATH, embed_texts
+from dewey.utils.vector_index import VectorIndex
 
 
 class RAGAgent(BaseAgent):
@@ -22,6 +24,7 @@ class RAGAgent(BaseAgent):
     def __init__(self) -> None:
         """Initializes the RAGAgent with search capabilities."""
         super().__init__(config_section="rag_agent")
+        self._index: VectorIndex | None = None
         self.add_tools(
             [
                 Tool.from_function(
@@ -49,13 +52,30 @@ class RAGAgent(BaseAgent):
 
         """
         self.logger.info(f"Searching knowledge base for: {query}")
-        prompt = f"""
-        Search the knowledge base for: {query}
-        Content Type: {content_type or "any"}
-        Limit: {limit}
-        """
-        result = self.run(prompt)
-        return result
+        if self._index is None:
+            self._index = VectorIndex(
+                self.get_config_value("index_path", DEFAULT_INDEX_PATH),
+                nprobe=self.get_config_value("nprobe", 8),
+            )
+        if not len(self._index):
+            self.logger.warning("Knowledge base index is empty")
+            return {"results": []}
+
+        vector = embed_texts(
+            self.llm_client, [query], self.get_config_value("embedding_model"),
+        )[0]
+        hits = self._index.search(vector, k=limit, content_type=content_type)
+        return {
+            "results": [
+                {
+                    "doc_id": hit.doc_id,
+                    "score": hit.score,
+                    "content_type": hit.content_type,
+                    "metadata": hit.metadata,
+                }
+                for hit in hits
+            ],
+        }
 
     def run(self, prompt: str) -> dict[str, Any]:
         """
@@ -71,6 +91,4 @@ class RAGAgent(BaseAgent):
 
         """
         self.logger.info(f"Executing RAG agent with prompt: {prompt}")
-        # TODO: Implement RAG agent logic here, e.g., using self.get_config_value()
-        # and self.logger.
-        return {"results": []}  # Placeholder for actual results
+        return self.search(prompt)
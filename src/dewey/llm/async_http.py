@@ -0,0 +1,221 @@
+"""
+Pooled async HTTP transport for OpenAI-compatible LLM providers.
+
+LiteLLMClient's async API talks to OpenAI-compatible chat completion
+endpoints (DeepInfra, OpenAI, or any configured base URL) directly over
+httpx, keeping one keep-alive client per provider and event loop so
+concurrent calls share warm connections, and negotiating HTTP/2 when the
+optional ``h2`` package is installed. Streaming responses are parsed from
+server-sent events as they arrive.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from dewey.llm.exceptions import (
+    LLMAuthenticationError,
+    LLMConnectionError,
+    LLMRateLimitError,
+    LLMResponseError,
+    LLMTimeoutError,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEEPINFRA_API_BASE = "https://api.deepinfra.com/v1/openai"
+OPENAI_API_BASE = "https://api.openai.com/v1"
+
+# Providers litellm routes through its own, non-OpenAI request formats
+_NATIVE_PREFIXES = ("gemini", "anthropic/", "claude", "vertex_ai/", "bedrock/")
+
+
+@dataclass(frozen=True)
+class ProviderEndpoint:
+    """Where and how to send an OpenAI-compatible request."""
+
+    provider: str
+    base_url: str
+    api_key: str | None
+    model: str
+
+
+def resolve_endpoint(
+    model_name: str,
+    base_url: str | None = None,
+    api_key: str | None = None,
+    provider: str | None = None,
+) -> ProviderEndpoint | None:
+    """
+    Find the OpenAI-compatible endpoint serving a model.
+
+    Args:
+    ----
+        model_name: Model name as given to litellm, e.g. "deepinfra/...".
+        base_url: Configured API base URL, if any.
+        api_key: Configured API key, if any.
+        provider: Configured litellm provider, if any.
+
+    Returns:
+    -------
+        The endpoint, or None if the model needs litellm's native handling.
+
+    """
+    if model_name.startswith("deepinfra/") or provider == "deepinfra":
+        return ProviderEndpoint(
+            provider="deepinfra",
+            base_url=base_url or DEEPINFRA_API_BASE,
+            api_key=api_key or os.environ.get("DEEPINFRA_API_KEY"),
+            model=model_name.removeprefix("deepinfra/"),
+        )
+    if model_name.startswith(_NATIVE_PREFIXES) or provider == "gemini":
+        return None
+    if "/" in model_name and not model_name.startswith("openai/"):
+        return None
+    return ProviderEndpoint(
+        provider="openai",
+        base_url=base_url or os.environ.get("OPENAI_API_BASE") or OPENAI_API_BASE,
+        api_key=api_key or os.environ.get("OPENAI_API_KEY"),
+        model=model_name.removeprefix("openai/"),
+    )
+
+
+class AsyncHTTPPool:
+    """One keep-alive httpx client per provider, base URL and event loop."""
+
+    def __init__(
+        self,
+        timeout: float = 60,
+        max_connections: int = 100,
+        keepalive_expiry: float = 60,
+    ):
+        """
+        Initialize an empty pool.
+
+        Args:
+        ----
+            timeout: Read timeout in seconds; connecting times out sooner.
+            max_connections: Connections per client.
+            keepalive_expiry: Seconds an idle connection is kept open.
+
+        """
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 10))
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._clients: dict[tuple, httpx.AsyncClient] = {}
+
+    def get(self, endpoint: ProviderEndpoint) -> httpx.AsyncClient:
+        """Return the shared client for an endpoint, creating it on first use."""
+        # httpx connections belong to the loop that opened them
+        key = (endpoint.provider, endpoint.base_url, id(asyncio.get_running_loop()))
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            headers = {"Content-Type": "application/json"}
+            if endpoint.api_key:
+                headers["Authorization"] = f"Bearer {endpoint.api_key}"
+            client = httpx.AsyncClient(
+                base_url=endpoint.base_url.rstrip("/"),
+                headers=headers,
+                http2=HTTP2_AVAILABLE,
+                limits=self.limits,
+                timeout=self.timeout,
+            )
+            self._clients[key] = client
+            logger.debug(
+                f"Opened {'HTTP/2' if HTTP2_AVAILABLE else 'HTTP/1.1'} client "
+                f"for {endpoint.provider} at {endpoint.base_url}",
+            )
+        return client
+
+    async def aclose(self) -> None:
+        """Close every client opened from the running event loop."""
+        loop_id = id(asyncio.get_running_loop())
+        for key in [key for key in self._clients if key[2] == loop_id]:
+            await self._clients.pop(key).aclose()
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        error = response.json().get("error", {})
+        message = error.get("message") if isinstance(error, dict) else error
+    except (ValueError, AttributeError):
+        message = None
+    return message or response.text[:200]
+
+
+async def raise_for_status(response: httpx.Response) -> None:
+    """Raise the dewey LLM exception matching an error response."""
+    if response.status_code < 400:
+        return
+    await response.aread()
+    message = f"HTTP {response.status_code}: {_error_message(response)}"
+    if response.status_code == 429:
+        raise LLMRateLimitError(f"Rate limit exceeded: {message}")
+    if response.status_code in (401, 403):
+        raise LLMAuthenticationError(f"Authentication error: {message}")
+    if response.status_code in (408, 504):
+        raise LLMTimeoutError(f"Request timed out: {message}")
+    if response.status_code >= 500:
+        raise LLMConnectionError(f"Provider error: {message}")
+    raise LLMResponseError(f"Bad request: {message}")
+
+
+def decode_json(text: str) -> Any:
+    """Parse a response body, raising LLMResponseError if it is not JSON."""
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        raise LLMResponseError(f"Invalid JSON from provider: {text[:200]!r}") from e
+
+
+def translate_transport_error(error: httpx.HTTPError) -> Exception:
+    """Map an httpx transport error to a dewey LLM exception."""
+    if isinstance(error, httpx.TimeoutException):
+        return LLMTimeoutError(f"Request timed out: {error}")
+    return LLMConnectionError(f"Connection error: {error}")
+
+
+async def iter_sse_chunks(response: httpx.Response) -> AsyncIterator[dict[str, Any]]:
+    """
+    Parse the chunks of a streamed chat completion.
+
+    Args:
+    ----
+        response: Streaming response from a chat completions endpoint.
+
+    Yields:
+    ------
+        Each ``chat.completion.chunk`` object until ``[DONE]``.
+
+    Raises:
+    ------
+        LLMResponseError: If a ``data:`` line is not JSON.
+
+    """
+    done = False
+    # Read to the end of the body even after [DONE], so the connection goes
+    # back to the pool instead of being discarded
+    async for line in response.aiter_lines():
+        if done or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            done = True
+        elif data:
+            yield decode_json(data)
@@ -5,22 +5,38 @@ This module provides a unified interface for interacting with different
 LLM providers using the LiteLLM library.
 """
 
+import asyncio
 import logging
 import os
+import random
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 import time
 
 import litellm
+import httpx
 from litellm import (
+    EmbeddingResponse,
     ModelResponse,
+    acompletion,
     completion,
     completion_cost,
     embedding,
     get_model_info,
 )
 
+from dewey.llm.async_http import (
+    DEEPINFRA_API_BASE,
+    AsyncHTTPPool,
+    ProviderEndpoint,
+    decode_json,
+    iter_sse_chunks,
+    raise_for_status,
+    resolve_endpoint,
+    translate_transport_error,
+)
 from dewey.llm.exceptions import (
     LLMAuthenticationError,
     LLMConnectionError,
@@ -28,6 +44,11 @@ from dewey.llm.exceptions import (
     LLMResponseError,
     LLMTimeoutError,
 )
+from dewey.llm.response_cache import (
+    ResponseCache,
+    make_cache_key,
+    normalize_messages,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +67,42 @@ class Message:
     name: str | None = None  # For "tool" roles
 
 
+def message_dicts(messages: list["Message | dict[str, Any]"]) -> list[dict[str, Any]]:
+    """
+    Convert messages to the dictionaries sent to providers.
+
+    Dictionaries are passed through unchanged, so callers sending the same
+    prompt repeatedly can build them once.
+
+    Args:
+    ----
+        messages: Message objects or ready-made message dictionaries.
+
+    Returns:
+    -------
+        Message dictionaries.
+
+    """
+    return [
+        msg
+        if isinstance(msg, dict)
+        else {
+            "role": msg.role,
+            "content": msg.content,
+            **({"name": msg.name} if msg.name else {}),
+        }
+        for msg in messages
+    ]
+
+
+def without_nul(message: dict[str, Any]) -> dict[str, Any]:
+    """Return the message without NUL characters, which break provider JSON."""
+    content = message.get("content")
+    if isinstance(content, str) and "\x00" in content:
+        return {**message, "content": content.replace("\x00", "")}
+    return message
+
+
 @dataclass
 class LiteLLMConfig:
     """Configuration for LiteLLM client."""
@@ -60,6 +117,9 @@ class LiteLLMConfig:
     proxy: str | None = None
     cache: bool = False
     cache_folder: str = ".litellm_cache"
+    cache_ttl: int | None = None
+    cache_max_bytes: int = 512 * 1024 * 1024
+    cache_memory_entries: int = 256
     verbose: bool = False
     metadata: dict[str, Any] = field(default_factory=dict)
     litellm_provider: str | None = None
@@ -136,13 +196,23 @@ class LiteLLMClient:
 
         logger.info(f"Initialized LiteLLM client with model: {self.config.model}")
 
+        # Keep-alive HTTP clients for the async API, one per provider and loop
+        self._http_pool = AsyncHTTPPool(timeout=self.config.timeout)
+
         # Set OpenAI API key if available
         if self.config.api_key:
             litellm.api_key = self.config.api_key
 
         # Set up litellm parameters
+        self.response_cache: ResponseCache | None = None
         if self.config.cache:
             os.environ["LITELLM_CACHE_FOLDER"] = self.config.cache_folder
+            self.response_cache = ResponseCache(
+                Path(self.config.cache_folder) / "responses.sqlite",
+                ttl_seconds=self.config.cache_ttl,
+                max_bytes=self.config.cache_max_bytes,
+                memory_entries=self.config.cache_memory_entries,
+            )
             logger.debug(f"Enabled caching in {self.config.cache_folder}")
 
         # Set up proxy if specified
@@ -199,6 +269,9 @@ class LiteLLMClient:
                 proxy=llm_config.get("proxy"),
                 cache=llm_config.get("cache", False),
                 cache_folder=llm_config.get("cache_folder", ".litellm_cache"),
+                cache_ttl=llm_config.get("cache_ttl"),
+                cache_max_bytes=llm_config.get("cache_max_bytes", 512 * 1024 * 1024),
+                cache_memory_entries=llm_config.get("cache_memory_entries", 256),
                 verbose=llm_config.get("verbose", False),
                 litellm_provider=llm_config.get("provider"),
             )
@@ -214,6 +287,11 @@ class LiteLLMClient:
                 proxy=getattr(dewey_config, "proxy", None),
                 cache=getattr(dewey_config, "cache", False),
                 cache_folder=getattr(dewey_config, "cache_folder", ".litellm_cache"),
+                cache_ttl=getattr(dewey_config, "cache_ttl", None),
+                cache_max_bytes=getattr(
+                    dewey_config, "cache_max_bytes", 512 * 1024 * 1024,
+                ),
+                cache_memory_entries=getattr(dewey_config, "cache_memory_entries", 256),
                 verbose=getattr(dewey_config, "verbose", False),
                 litellm_provider=getattr(dewey_config, "provider", None),
             )
@@ -365,7 +443,7 @@ class LiteLLMClient:
 
     def generate_completion(
         self,
-        messages: list[Message],
+        messages: list[Message | dict[str, Any]],
         model: str | None = None,
         temperature: float = 0.7,
         max_tokens: int | None = None,
@@ -376,13 +454,14 @@ class LiteLLMClient:
         user: str | None = None,
         functions: list[dict[str, Any]] | None = None,
         function_call: str | dict[str, Any] | None = None,
+        bypass_cache: bool = False,
     ) -> ModelResponse:
         """
         Generate a completion from messages.
 
         Args:
         ----
-            messages: List of Message objects
+            messages: List of Message objects or message dictionaries
             model: Model to use, defaults to config model
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
@@ -393,6 +472,8 @@ class LiteLLMClient:
             user: User identifier
             functions: Function schemas for function calling
             function_call: Function call configuration
+            bypass_cache: Skip the response cache lookup; the fresh response
+                still replaces the cached one
 
         Returns:
         -------
@@ -409,18 +490,31 @@ class LiteLLMClient:
         """
         try:
             # Convert Message objects to dictionaries
-            messages_dict = [
-                {
-                    "role": msg.role,
-                    "content": msg.content,
-                    **({"name": msg.name} if msg.name else {}),
-                }
-                for msg in messages
-            ]
+            messages_dict = message_dicts(messages)
 
             # Use model from parameters or config
             model_name = model or self.config.model
 
+            cache_key = None
+            if self.response_cache:
+                cache_key = make_cache_key(
+                    "completion",
+                    model_name,
+                    normalize_messages(messages_dict),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=top_p,
+                    frequency_penalty=frequency_penalty,
+                    presence_penalty=presence_penalty,
+                    stop=stop,
+                    functions=functions,
+                    function_call=function_call,
+                )
+                cached = None if bypass_cache else self._cache_get(cache_key)
+                if cached is not None:
+                    logger.debug(f"Serving completion for {model_name} from cache")
+                    return ModelResponse(**cached)
+
             # Log the request if verbose
             if self.verbose:
                 logger.debug(
@@ -428,27 +522,22 @@ class LiteLLMClient:
                     f"{len(messages)} messages, temperature={temperature}",
                 )
 
+            provider_kwargs: dict[str, Any] = {}
+
             # Special handling for DeepInfra models
             if model_name.startswith("deepinfra/") or self.config.litellm_provider == "deepinfra":
                 logger.debug("Using DeepInfra-specific configuration")
 
-                # Ensure API key is set
+                # Pass the key and the OpenAI-compatible endpoint with the request
+                # instead of rewriting os.environ on every call
+                if not self.config.base_url:
+                    self.config.base_url = DEEPINFRA_API_BASE
+                provider_kwargs["api_base"] = self.config.base_url
                 if self.config.api_key:
-                    os.environ["DEEPINFRA_API_KEY"] = self.config.api_key
-
-                # Set the base URL if provided - ensure it's the correct OpenAI-compatible endpoint
-                if self.config.base_url:
-                    os.environ["DEEPINFRA_API_BASE"] = self.config.base_url
-                else:
-                    # Make sure we're using the correct endpoint according to docs
-                    os.environ["DEEPINFRA_API_BASE"] = "https://api.deepinfra.com/v1/openai"
-                    self.config.base_url = "https://api.deepinfra.com/v1/openai"
+                    provider_kwargs["api_key"] = self.config.api_key
 
                 # Clean up any problematic characters in messages
-                for msg in messages_dict:
-                    if isinstance(msg["content"], str):
-                        # Replace any characters that might cause JSON issues
-                        msg["content"] = msg["content"].replace("\x00", "")
+                messages_dict = [without_nul(msg) for msg in messages_dict]
 
                 # Add model metadata to help with debugging
                 metadata = {
@@ -459,7 +548,7 @@ class LiteLLMClient:
                 
                 # log detailed information for debugging
                 logger.debug(f"DeepInfra API Key: {'Set' if self.config.api_key else 'Not set'}")
-                logger.debug(f"DeepInfra API Base: {os.environ.get('DEEPINFRA_API_BASE')}")
+                logger.debug(f"DeepInfra API Base: {self.config.base_url}")
                 logger.debug(f"Using model: {model_name}")
                 logger.debug(f"Number of messages: {len(messages_dict)}")
                 logger.debug(f"First message role: {messages_dict[0]['role'] if messages_dict else 'No messages'}")
@@ -470,13 +559,10 @@ class LiteLLMClient:
 
                 # Ensure API key is set
                 if self.config.api_key:
-                    os.environ["GEMINI_API_KEY"] = self.config.api_key
+                    provider_kwargs["api_key"] = self.config.api_key
 
                 # Clean up any problematic characters in messages
-                for msg in messages_dict:
-                    if isinstance(msg["content"], str):
-                        # Replace any characters that might cause JSON issues
-                        msg["content"] = msg["content"].replace("\x00", "")
+                messages_dict = [without_nul(msg) for msg in messages_dict]
 
                 # Add model metadata to help with debugging
                 metadata = {
@@ -507,10 +593,13 @@ class LiteLLMClient:
                     timeout=self.config.timeout,
                     max_retries=self.config.max_retries,
                     metadata=metadata,
+                    **provider_kwargs,
                 )
 
                 # Log successful API call
                 logger.debug(f"Successfully received response from {model_name}")
+                if cache_key:
+                    self._cache_put(cache_key, response, "completion", model_name)
 
                 # Calculate cost for logging
                 try:
@@ -570,6 +659,324 @@ class LiteLLMClient:
                 logger.error(traceback.format_exc())
             raise LLMResponseError(f"Failed to generate completion: {e}")
 
+    def _endpoint(self, model_name: str) -> ProviderEndpoint | None:
+        """OpenAI-compatible endpoint for a model, or None to go through litellm."""
+        return resolve_endpoint(
+            model_name,
+            base_url=self.config.base_url,
+            api_key=self.config.api_key,
+            provider=self.config.litellm_provider,
+        )
+
+    def _completion_request(
+        self,
+        messages: list[Message | dict[str, Any]],
+        model: str | None,
+        bypass_cache: bool,
+        **params: Any,
+    ) -> tuple[str, list[dict[str, Any]], str | None, dict[str, Any] | None]:
+        """Shared setup of the async calls: messages, cache key and cache hit."""
+        model_name = model or self.config.model
+        messages_dict = [without_nul(msg) for msg in message_dicts(messages)]
+        cache_key = cached = None
+        if self.response_cache:
+            cache_key = make_cache_key(
+                "completion", model_name, normalize_messages(messages_dict), **params,
+            )
+            cached = None if bypass_cache else self._cache_get(cache_key)
+        return model_name, messages_dict, cache_key, cached
+
+    async def _retrying(self, attempt_call):
+        """Run an async call, retrying transient provider errors with jitter."""
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                return await attempt_call()
+            except (LLMRateLimitError, LLMConnectionError, LLMTimeoutError) as e:
+                if attempt >= self.config.max_retries:
+                    raise
+                delay = random.uniform(0, min(30, 0.5 * 2**attempt))
+                logger.warning(f"{e}; retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def agenerate_completion(
+        self,
+        messages: list[Message | dict[str, Any]],
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int | None = None,
+        top_p: float = 1.0,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        stop: str | list[str] | None = None,
+        user: str | None = None,
+        response_format: dict[str, Any] | None = None,
+        bypass_cache: bool = False,
+    ) -> ModelResponse:
+        """
+        Generate a completion without blocking the event loop.
+
+        OpenAI-compatible providers are called over a shared keep-alive
+        connection pool; other providers go through litellm's async API.
+
+        Args:
+        ----
+            messages: List of Message objects or message dictionaries
+            model: Model to use, defaults to config model
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            top_p: Nucleus sampling parameter
+            frequency_penalty: Penalize repeat tokens
+            presence_penalty: Penalize repeat topics
+            stop: Stop sequences
+            user: User identifier
+            response_format: Response format, e.g. {"type": "json_object"}
+            bypass_cache: Skip the response cache lookup
+
+        Returns:
+        -------
+            LiteLLM ModelResponse
+
+        Raises:
+        ------
+            LLMResponseError: For general response errors
+            LLMConnectionError: For connection issues
+            LLMAuthenticationError: For authentication issues
+            LLMRateLimitError: For rate limiting issues
+            LLMTimeoutError: For timeout issues
+
+        """
+        params = {
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": top_p,
+            "frequency_penalty": frequency_penalty,
+            "presence_penalty": presence_penalty,
+            "stop": stop,
+            "response_format": response_format,
+        }
+        model_name, messages_dict, cache_key, cached = self._completion_request(
+            messages, model, bypass_cache, **params,
+        )
+        if cached is not None:
+            logger.debug(f"Serving completion for {model_name} from cache")
+            return ModelResponse(**cached)
+
+        params = {name: value for name, value in params.items() if value is not None}
+        endpoint = self._endpoint(model_name)
+
+        async def call() -> ModelResponse:
+            if endpoint is None:
+                return await self._alitellm_completion(
+                    model_name, messages_dict, user=user, **params,
+                )
+            client = self._http_pool.get(endpoint)
+            body = {
+                "model": endpoint.model,
+                "messages": messages_dict,
+                **params,
+                **({"user": user} if user else {}),
+            }
+            try:
+                response = await client.post("/chat/completions", json=body)
+            except httpx.HTTPError as e:
+                raise translate_transport_error(e) from e
+            await raise_for_status(response)
+            return ModelResponse(**decode_json(response.text))
+
+        response = await self._retrying(call)
+        logger.debug(f"Successfully received response from {model_name}")
+        if cache_key:
+            self._cache_put(cache_key, response, "completion", model_name)
+        return response
+
+    async def astream_completion(
+        self,
+        messages: list[Message | dict[str, Any]],
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int | None = None,
+        top_p: float = 1.0,
+        stop: str | list[str] | None = None,
+        user: str | None = None,
+        bypass_cache: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion, yielding text as the provider produces it.
+
+        A cached response is yielded as a single piece; a completed stream is
+        cached as a whole. Connection failures are retried only until the
+        first token has arrived.
+
+        Args:
+        ----
+            messages: List of Message objects or message dictionaries
+            model: Model to use, defaults to config model
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            top_p: Nucleus sampling parameter
+            stop: Stop sequences
+            user: User identifier
+            bypass_cache: Skip the response cache lookup
+
+        Yields:
+        ------
+            Text deltas of the assistant message.
+
+        Raises:
+        ------
+            LLMResponseError: For general response errors
+            LLMConnectionError: For connection issues
+            LLMAuthenticationError: For authentication issues
+            LLMRateLimitError: For rate limiting issues
+            LLMTimeoutError: For timeout issues
+
+        """
+        params = {
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": top_p,
+            "stop": stop,
+        }
+        model_name, messages_dict, cache_key, cached = self._completion_request(
+            messages, model, bypass_cache, **params,
+        )
+        if cached is not None:
+            logger.debug(f"Serving streamed completion for {model_name} from cache")
+            content = cached["choices"][0]["message"].get("content") or ""
+            if content:
+                yield content
+            return
+
+        params = {name: value for name, value in params.items() if value is not None}
+        endpoint = self._endpoint(model_name)
+        if endpoint is None:
+            chunks = self._alitellm_stream(model_name, messages_dict, user, **params)
+        else:
+            chunks = self._ahttp_stream(endpoint, messages_dict, user, **params)
+
+        parts = []
+        finish_reason = None
+        async for chunk in chunks:
+            choices = chunk.get("choices") or [{}]
+            finish_reason = choices[0].get("finish_reason") or finish_reason
+            delta = (choices[0].get("delta") or {}).get("content")
+            if delta:
+                parts.append(delta)
+                yield delta
+
+        if cache_key:
+            self._cache_put(
+                cache_key,
+                {
+                    "object": "chat.completion",
+                    "model": model_name,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": finish_reason,
+                            "message": {"role": "assistant", "content": "".join(parts)},
+                        },
+                    ],
+                },
+                "completion",
+                model_name,
+            )
+
+    async def _ahttp_stream(
+        self,
+        endpoint: ProviderEndpoint,
+        messages_dict: list[dict[str, Any]],
+        user: str | None,
+        **params: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream chunks from an OpenAI-compatible endpoint over the shared pool."""
+        body = {
+            "model": endpoint.model,
+            "messages": messages_dict,
+            "stream": True,
+            **params,
+            **({"user": user} if user else {}),
+        }
+        for attempt in range(self.config.max_retries + 1):
+            started = False
+            try:
+                client = self._http_pool.get(endpoint)
+                async with client.stream("POST", "/chat/completions", json=body) as r:
+                    await raise_for_status(r)
+                    async for chunk in iter_sse_chunks(r):
+                        started = True
+                        yield chunk
+                return
+            except httpx.HTTPError as e:
+                error = translate_transport_error(e)
+            except (LLMRateLimitError, LLMConnectionError, LLMTimeoutError) as e:
+                error = e
+            if started or attempt >= self.config.max_retries:
+                raise error
+            delay = random.uniform(0, min(30, 0.5 * 2**attempt))
+            logger.warning(f"{error}; retrying stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _alitellm_completion(
+        self, model_name: str, messages_dict: list[dict[str, Any]], **params: Any,
+    ) -> ModelResponse:
+        """Async completion through litellm for providers without an HTTP path."""
+        try:
+            return await acompletion(
+                model=model_name,
+                messages=messages_dict,
+                timeout=self.config.timeout,
+                api_key=self.config.api_key,
+                **params,
+            )
+        except Exception as e:
+            raise self._translate_litellm_error(e) from e
+
+    async def _alitellm_stream(
+        self,
+        model_name: str,
+        messages_dict: list[dict[str, Any]],
+        user: str | None,
+        **params: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream chunks through litellm for providers without an HTTP path."""
+        try:
+            stream = await acompletion(
+                model=model_name,
+                messages=messages_dict,
+                stream=True,
+                timeout=self.config.timeout,
+                api_key=self.config.api_key,
+                user=user,
+                **params,
+            )
+            async for chunk in stream:
+                yield chunk.model_dump() if hasattr(chunk, "model_dump") else chunk
+        except Exception as e:
+            raise self._translate_litellm_error(e) from e
+
+    def _translate_litellm_error(self, error: Exception) -> Exception:
+        """Map a litellm exception to the matching dewey LLM exception."""
+        if isinstance(error, litellm.exceptions.RateLimitError):
+            return LLMRateLimitError(f"Rate limit exceeded: {error}")
+        if isinstance(error, litellm.exceptions.AuthenticationError):
+            return LLMAuthenticationError(f"Authentication error: {error}")
+        if isinstance(error, litellm.exceptions.APIConnectionError):
+            return LLMConnectionError(f"Connection error: {error}")
+        if isinstance(error, litellm.exceptions.APITimeoutError):
+            return LLMTimeoutError(f"Request timed out: {error}")
+        return LLMResponseError(f"Failed to generate completion: {error}")
+
+    async def aclose(self) -> None:
+        """Close the async HTTP clients opened from the running event loop."""
+        await self._http_pool.aclose()
+
+    async def __aenter__(self) -> "LiteLLMClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
     def generate_embedding(
         self,
         input_text: str | list[str],
@@ -577,6 +984,7 @@ class LiteLLMClient:
         encoding_format: str = "float",
         dimensions: int | None = None,
         user: str | None = None,
+        bypass_cache: bool = False,
     ) -> dict[str, Any]:
         """
         Generate embeddings for input text.
@@ -588,6 +996,8 @@ class LiteLLMClient:
             encoding_format: Encoding format for vectors
             dimensions: Dimensionality of output vectors
             user: User identifier
+            bypass_cache: Skip the response cache lookup; the fresh response
+                still replaces the cached one
 
         Returns:
         -------
@@ -620,6 +1030,20 @@ class LiteLLMClient:
                     f"input length {input_len}",
                 )
 
+            cache_key = None
+            if self.response_cache:
+                cache_key = make_cache_key(
+                    "embedding",
+                    model_name,
+                    input_text,
+                    encoding_format=encoding_format,
+                    dimensions=dimensions,
+                )
+                cached = None if bypass_cache else self._cache_get(cache_key)
+                if cached is not None:
+                    logger.debug(f"Serving embedding for {model_name} from cache")
+                    return EmbeddingResponse(**cached)
+
             # Call litellm embedding
             response = embedding(
                 model=model_name,
@@ -631,6 +1055,8 @@ class LiteLLMClient:
                 max_retries=self.config.max_retries,
             )
 
+            if cache_key:
+                self._cache_put(cache_key, response, "embedding", model_name)
             return response
 
         except litellm.exceptions.RateLimitError as e:
@@ -649,6 +1075,41 @@ class LiteLLMClient:
             logger.error(f"Failed to generate embedding: {e}")
             raise LLMResponseError(f"Failed to generate embedding: {e}")
 
+    def _cache_get(self, key: str) -> dict[str, Any] | None:
+        """Look up a cached response; cache failures count as misses."""
+        try:
+            return self.response_cache.get(key)
+        except Exception as e:
+            logger.warning(f"LLM response cache lookup failed: {e}")
+            return None
+
+    def _cache_put(self, key: str, response: Any, kind: str, model: str) -> None:
+        """Cache a provider response; cache failures never fail the call."""
+        try:
+            if isinstance(response, dict):
+                value = response
+            else:
+                value = response.model_dump()
+            self.response_cache.put(key, value, kind=kind, model=model)
+        except Exception as e:
+            logger.warning(f"Could not cache LLM response: {e}")
+
+    def cache_stats(self) -> dict[str, Any]:
+        """
+        Report response cache hits, misses and bytes saved.
+
+        Returns
+        -------
+            Cache counters, or an empty dictionary if caching is disabled.
+
+        """
+        if not self.response_cache:
+            return {}
+        return {
+            **self.response_cache.stats.as_dict(),
+            "size_bytes": self.response_cache.size_bytes,
+        }
+
     def get_model_details(self, model: str | None = None) -> dict[str, Any]:
         """
         Get details about a specific model.
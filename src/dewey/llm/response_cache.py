@@ -0,0 +1,344 @@
+"""
+Content-addressed cache of LLM responses.
+
+Responses are keyed by a SHA-256 of the request kind, model, normalized
+messages (or embedding input) and the parameters that affect the output, so
+an identical request is answered without calling the provider again: after
+a crash, when feedback suggestions are regenerated, or when a classification
+is retried. Entries live in a SQLite file with a small in-memory LRU tier in
+front, expire after an optional TTL and are evicted least-recently-used once
+the file grows past its size budget.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS llm_responses (
+        key TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        model TEXT NOT NULL,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_access REAL NOT NULL,
+        expires_at REAL
+    )
+"""
+
+CACHE_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_llm_responses_last_access
+    ON llm_responses (last_access)
+"""
+
+# Request parameters that do not change the response and so stay out of keys
+_UNKEYED_PARAMS = {"user", "metadata", "timeout", "max_retries"}
+
+
+def normalize_messages(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Normalize chat messages so equivalent prompts hash identically.
+
+    Line endings are unified, NUL characters removed and surrounding
+    whitespace stripped from string content; empty names are dropped.
+
+    Args:
+    ----
+        messages: Chat messages as role/content(/name) dictionaries.
+
+    Returns:
+    -------
+        The normalized messages.
+
+    """
+    normalized = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            content = content.replace("\r\n", "\n").replace("\x00", "").strip()
+        entry = {"role": message["role"], "content": content}
+        if message.get("name"):
+            entry["name"] = message["name"]
+        normalized.append(entry)
+    return normalized
+
+
+def make_cache_key(kind: str, model: str, payload: Any, **params: Any) -> str:
+    """
+    Hash a request into a cache key.
+
+    Args:
+    ----
+        kind: Request kind, e.g. "completion" or "embedding".
+        model: Model name.
+        payload: Normalized messages or embedding input.
+        **params: Request parameters; None values and parameters that do not
+            affect the output are ignored.
+
+    Returns:
+    -------
+        Hex SHA-256 digest of the canonical request.
+
+    """
+    keyed = {
+        name: value
+        for name, value in params.items()
+        if value is not None and name not in _UNKEYED_PARAMS
+    }
+    canonical = json.dumps(
+        {"kind": kind, "model": model, "payload": payload, "params": keyed},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how much the cache saved."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    expired: int = 0
+    bytes_saved: int = 0
+
+    @property
+    def hits(self) -> int:
+        """Hits from either tier."""
+        return self.memory_hits + self.disk_hits
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters plus the overall hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            **asdict(self),
+            "hits": self.hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ResponseCache:
+    """SQLite-backed response cache with an in-memory LRU tier."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float | None = None,
+        max_bytes: int = 512 * 1024 * 1024,
+        memory_entries: int = 256,
+        touch_interval: float = 30.0,
+    ):
+        """
+        Open or create the cache.
+
+        Args:
+        ----
+            path: SQLite file holding the cache; ":memory:" keeps it in memory.
+            ttl_seconds: Lifetime of an entry; None keeps entries until evicted.
+            max_bytes: Total size of stored responses before the least
+                recently used ones are evicted.
+            memory_entries: Number of responses kept in the in-memory tier.
+            touch_interval: Seconds between writes of the access times of
+                in-memory hits to SQLite; they are also written before an
+                eviction and on close.
+
+        """
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.touch_interval = touch_interval
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, tuple[str, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Access times of in-memory hits not yet written to last_access
+        self._touched: dict[str, float] = {}
+        self._last_flush = time.time()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(CACHE_SCHEMA)
+        self._conn.execute(CACHE_INDEX)
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM llm_responses",
+        ).fetchone()[0]
+
+    def _remember(self, key: str, value: str, expires_at: float | None) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute(
+            "DELETE FROM llm_responses WHERE key = ? RETURNING size", (key,),
+        ).fetchone()
+        if row:
+            self._total_bytes -= row[0]
+        self._memory.pop(key, None)
+        self._touched.pop(key, None)
+
+    def _flush_touched(self) -> None:
+        """Write the access times of in-memory hits so LRU eviction sees them."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE llm_responses SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+        self._last_flush = time.time()
+
+    def get(self, key: str) -> Any | None:
+        """
+        Look up a cached response.
+
+        Args:
+        ----
+            key: Key from make_cache_key().
+
+        Returns:
+        -------
+            The decoded response, or None on a miss or expired entry.
+
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                value, expires_at = cached
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._touched[key] = now
+                    if now - self._last_flush >= self.touch_interval:
+                        self._flush_touched()
+                        self._conn.commit()
+                    self.stats.memory_hits += 1
+                    self.stats.bytes_saved += len(value)
+                    return json.loads(value)
+
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,),
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._delete(key)
+                self._conn.commit()
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key),
+            )
+            self._conn.commit()
+            self._remember(key, value, expires_at)
+            self.stats.disk_hits += 1
+            self.stats.bytes_saved += len(value)
+        return json.loads(value)
+
+    def put(self, key: str, value: Any, kind: str = "", model: str = "") -> None:
+        """
+        Store a response, evicting old entries if over the size budget.
+
+        Args:
+        ----
+            key: Key from make_cache_key().
+            value: JSON-serializable response.
+            kind: Request kind, kept for inspection.
+            model: Model name, kept for inspection.
+
+        """
+        encoded = json.dumps(value, separators=(",", ":"), default=str)
+        size = len(encoded)
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                """
+                INSERT INTO llm_responses
+                (key, kind, model, value, size, created_at, last_access, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (key, kind, model, encoded, size, now, now, expires_at),
+            )
+            self._total_bytes += size
+            self.stats.writes += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+            self._remember(key, encoded, expires_at)
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones, to fit max_bytes."""
+        self._flush_touched()
+        expired = self._conn.execute(
+            "DELETE FROM llm_responses WHERE expires_at <= ? RETURNING key, size",
+            (time.time(),),
+        ).fetchall()
+        # Free a tenth of the budget at once so eviction is not run every put
+        target = self.max_bytes * 0.9
+        evicted = []
+        if self._total_bytes - sum(size for _, size in expired) > target:
+            freed = sum(size for _, size in expired)
+            for key, size in self._conn.execute(
+                "SELECT key, size FROM llm_responses ORDER BY last_access",
+            ).fetchall():
+                if self._total_bytes - freed <= target:
+                    break
+                evicted.append((key, size))
+                freed += size
+            self._conn.executemany(
+                "DELETE FROM llm_responses WHERE key = ?",
+                [(key,) for key, _ in evicted],
+            )
+        for key, size in expired + evicted:
+            self._total_bytes -= size
+            self._memory.pop(key, None)
+        self.stats.expired += len(expired)
+        self.stats.evictions += len(evicted)
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} cached LLM responses")
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+            self._memory.clear()
+            self._touched.clear()
+            self._total_bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the stored responses."""
+        return self._total_bytes
+
+    def close(self) -> None:
+        """Write pending access times and close the SQLite connection."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
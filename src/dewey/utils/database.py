@@ -2,11 +2,20 @@
 Database utility functions for PostgreSQL.
 
 This module provides utility functions for database operations using psycopg2
-and a connection pool.
+and a thread-safe, bounded connection pool.
 """
 
+import csv
+import io
+import json
 import logging
-from contextlib import contextmanager
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager, nullcontext
+from itertools import chain, islice
 from typing import Any
 
 import psycopg2
@@ -18,14 +27,162 @@ from dewey.core.db.config import get_db_config
 
 logger = logging.getLogger(__name__)
 
+
+class PoolTimeoutError(psycopg2.pool.PoolError):
+    """Raised when no pooled connection frees up within the acquire timeout."""
+
+
+class BoundedConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """
+    Thread-safe connection pool that waits for a free connection.
+
+    ThreadedConnectionPool raises as soon as ``maxconn`` connections are
+    checked out. This pool instead blocks callers for up to ``timeout``
+    seconds, recycles connections that are broken or older than
+    ``max_lifetime``, pings connections that sat idle longer than
+    ``health_check_interval`` and keeps checkout counters for monitoring.
+    """
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        *args: Any,
+        timeout: float = 30.0,
+        max_lifetime: float = 3600,
+        health_check_interval: float = 30,
+        **kwargs: Any,
+    ):
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._created: dict[int, float] = {}
+        self._returned: dict[int, float] = {}
+        self._metrics_lock = threading.Lock()
+        self._acquire_latencies: deque[float] = deque(maxlen=1000)
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.recycled = 0
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def _connect(self, key=None):
+        """Create a connection and remember when it was opened."""
+        conn = super()._connect(key)
+        self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def _forget(self, conn) -> None:
+        self._created.pop(id(conn), None)
+        self._returned.pop(id(conn), None)
+
+    def _is_healthy(self, conn) -> bool:
+        """Check a connection before handing it out."""
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if self.max_lifetime and now - self._created.get(id(conn), now) > self.max_lifetime:
+            return False
+        idle = now - self._returned.get(id(conn), now)
+        if self.health_check_interval and idle > self.health_check_interval:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def getconn(self, key=None):
+        """
+        Check out a healthy connection, waiting up to ``timeout`` seconds.
+
+        Raises
+        ------
+            PoolTimeoutError: If no connection frees up in time.
+
+        """
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._metrics_lock:
+                self.waits += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._metrics_lock:
+                    self.timeouts += 1
+                raise PoolTimeoutError(
+                    f"No database connection available within {self.timeout}s",
+                )
+
+        try:
+            while True:
+                conn = super().getconn(key)
+                if self._is_healthy(conn):
+                    break
+                logger.debug(f"Recycling pooled connection {id(conn)}")
+                with self._metrics_lock:
+                    self.recycled += 1
+                self._forget(conn)
+                super().putconn(conn, key=key, close=True)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._metrics_lock:
+            self.checkouts += 1
+            self._acquire_latencies.append(time.monotonic() - started)
+        return conn
+
+    def putconn(self, conn, key=None, close=False):
+        """Return a connection, closing it if it outlived ``max_lifetime``."""
+        now = time.monotonic()
+        if self.max_lifetime and now - self._created.get(id(conn), now) > self.max_lifetime:
+            close = True
+        if close or conn.closed:
+            self._forget(conn)
+        else:
+            self._returned[id(conn)] = now
+        try:
+            super().putconn(conn, key=key, close=close)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return pool counters.
+
+        Returns
+        -------
+            Dictionary with checkouts, waits, timeouts, recycled, in_use,
+            idle, max and p95_acquire_ms
+
+        """
+        with self._metrics_lock:
+            latencies = sorted(self._acquire_latencies)
+            p95 = latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "recycled": self.recycled,
+                "in_use": len(self._used),
+                "idle": len(self._pool),
+                "max": self.maxconn,
+                "p95_acquire_ms": p95 * 1000,
+            }
+
+
 # Global connection pool variable
-_connection_pool: psycopg2.pool.SimpleConnectionPool | None = None
+_connection_pool: BoundedConnectionPool | None = None
+_pool_lock = threading.Lock()
 
 
 def initialize_pool():
     """Initialize the PostgreSQL connection pool."""
     global _connection_pool
-    if _connection_pool is None:
+    with _pool_lock:
+        if _connection_pool is not None:
+            return
         try:
             config = get_db_config()
             # Construct DSN from config for the pool
@@ -36,10 +193,21 @@ def initialize_pool():
                 f"host={config['pg_host']} "
                 f"port={config['pg_port']}"
             )
+            connect_kwargs = {}
+            if config.get("statement_timeout"):
+                connect_kwargs["options"] = (
+                    f"-c statement_timeout={config['statement_timeout']}"
+                )
             min_conn = 1
             max_conn = config.get("pool_size", 5)
-            _connection_pool = psycopg2.pool.SimpleConnectionPool(
-                minconn=min_conn, maxconn=max_conn, dsn=dsn,
+            _connection_pool = BoundedConnectionPool(
+                min_conn,
+                max_conn,
+                dsn=dsn,
+                timeout=config.get("pool_timeout", 30.0),
+                max_lifetime=config.get("pool_max_lifetime", 3600),
+                health_check_interval=config.get("pool_health_check_interval", 30),
+                **connect_kwargs,
             )
             logger.info(
                 f"Database connection pool initialized (min={min_conn}, max={max_conn})",
@@ -50,7 +218,7 @@ def initialize_pool():
             raise  # Re-raise the exception to signal failure
 
 
-def _get_pool() -> psycopg2.pool.SimpleConnectionPool:
+def _get_pool() -> BoundedConnectionPool:
     """Get the connection pool, initializing it if necessary."""
     if _connection_pool is None:
         initialize_pool()
@@ -59,8 +227,26 @@ def _get_pool() -> psycopg2.pool.SimpleConnectionPool:
     return _connection_pool
 
 
+def get_pool_stats() -> dict[str, Any]:
+    """
+    Get connection pool counters.
+
+    Returns
+    -------
+        Pool statistics, or an empty dict if the pool is not initialized.
+
+    """
+    return _connection_pool.stats() if _connection_pool else {}
+
+
+def _set_statement_timeout(cursor, statement_timeout: int | None) -> None:
+    """Apply a per-transaction statement timeout in milliseconds."""
+    if statement_timeout is not None:
+        cursor.execute("SET LOCAL statement_timeout = %s", [int(statement_timeout)])
+
+
 @contextmanager
-def get_db_cursor(commit: bool = False):
+def get_db_cursor(commit: bool = False, statement_timeout: int | None = None):
     """
     Provide a database cursor from the connection pool.
 
@@ -72,6 +258,8 @@ def get_db_cursor(commit: bool = False):
         commit: If True, commit the transaction upon successful exit.
                 If False, the block is treated as read-only (no commit/rollback needed
                 unless an error occurs).
+        statement_timeout: Optional timeout in milliseconds for statements in
+                this block, overriding the pool-wide default.
 
     Yields:
     ------
@@ -80,6 +268,7 @@ def get_db_cursor(commit: bool = False):
     Raises:
     ------
         RuntimeError: If the pool is not initialized.
+        PoolTimeoutError: If no connection frees up within the pool timeout.
         Exception: Propagates exceptions from database operations.
 
     """
@@ -91,6 +280,7 @@ def get_db_cursor(commit: bool = False):
         # Use DictCursor for easy row access by column name, if desired
         # cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         cursor = conn.cursor()
+        _set_statement_timeout(cursor, statement_timeout)
         yield cursor
         if commit:
             conn.commit()
@@ -117,6 +307,52 @@ def get_db_cursor(commit: bool = False):
                 logger.error(f"Error returning connection to pool: {pc_err}")
 
 
+@contextmanager
+def get_streaming_cursor(
+    name: str | None = None,
+    itersize: int = 2000,
+    statement_timeout: int | None = None,
+):
+    """
+    Provide a server-side named cursor for streaming large result sets.
+
+    Rows are fetched from the server ``itersize`` at a time while iterating,
+    so the full result never has to fit in memory. The cursor is read-only;
+    its transaction is rolled back when the connection returns to the pool.
+
+    Args:
+    ----
+        name: Cursor name; a unique one is generated if omitted.
+        itersize: Rows fetched per network round trip while iterating.
+        statement_timeout: Optional timeout in milliseconds for the query.
+
+    Yields:
+    ------
+        psycopg2.extensions.cursor: The named (server-side) cursor.
+
+    """
+    pool = _get_pool()
+    conn = pool.getconn()
+    cursor = None
+    try:
+        with conn.cursor() as setup_cursor:
+            _set_statement_timeout(setup_cursor, statement_timeout)
+        cursor = conn.cursor(name=name or f"dewey_stream_{uuid.uuid4().hex[:12]}")
+        cursor.itersize = itersize
+        yield cursor
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except psycopg2.Error as cur_err:
+                logger.error(f"Error closing cursor: {cur_err}")
+        try:
+            # putconn rolls back the open read transaction
+            pool.putconn(conn)
+        except psycopg2.Error as pc_err:
+            logger.error(f"Error returning connection to pool: {pc_err}")
+
+
 def close_pool():
     """Close all connections in the pool."""
     global _connection_pool
@@ -284,6 +520,229 @@ def update_row(
     execute_query(query, params)
 
 
+# --- Bulk Utility Functions ---
+
+
+def _rows_as_tuples(
+    rows: Iterable[dict[str, Any] | Sequence[Any]], columns: Sequence[str] | None,
+) -> tuple[list[str], Iterator[tuple[Any, ...]]]:
+    """
+    Normalise an iterable of dicts or tuples into column names and tuples.
+
+    Args:
+    ----
+        rows: Rows as dictionaries or positional sequences.
+        columns: Column names; taken from the first dict when omitted.
+
+    Returns:
+    -------
+        The column names and a lazy iterator of value tuples.
+
+    Raises:
+    ------
+        ValueError: If columns are omitted and the rows are not dicts.
+
+    """
+    iterator = iter(rows)
+    first = next(iterator, None)
+    if first is None:
+        return list(columns or []), iter(())
+    if columns is None:
+        if not isinstance(first, dict):
+            raise ValueError("columns are required when rows are not dictionaries")
+        columns = list(first.keys())
+    columns = list(columns)
+
+    def to_tuple(row):
+        if isinstance(row, dict):
+            return tuple(row.get(column) for column in columns)
+        return tuple(row)
+
+    return columns, (to_tuple(row) for row in chain([first], iterator))
+
+
+def _pages(rows: Iterator[tuple[Any, ...]], page_size: int) -> Iterator[list]:
+    """Yield successive lists of at most page_size rows."""
+    while page := list(islice(rows, page_size)):
+        yield page
+
+
+def _execute_values_paged(
+    query: str, rows: Iterator[tuple[Any, ...]], page_size: int, cursor=None,
+) -> int:
+    """Run execute_values page by page in one transaction, summing rowcounts."""
+    affected = 0
+    context = nullcontext(cursor) if cursor is not None else get_db_cursor(commit=True)
+    with context as cur:
+        for page in _pages(rows, page_size):
+            psycopg2.extras.execute_values(cur, query, page, page_size=len(page))
+            affected += max(cur.rowcount, 0)
+    return affected
+
+
+def insert_many(
+    table_name: str,
+    rows: Iterable[dict[str, Any] | Sequence[Any]],
+    columns: Sequence[str] | None = None,
+    page_size: int = 1000,
+    conflict_target: Sequence[str] | None = None,
+    cursor=None,
+) -> int:
+    """
+    Insert many rows with multi-row INSERT statements.
+
+    Args:
+    ----
+        table_name: The name of the table.
+        rows: Rows as dictionaries or tuples (tuples require ``columns``).
+        columns: Column names; taken from the first dict when omitted.
+        page_size: Rows per INSERT statement.
+        conflict_target: If given, rows conflicting on these columns are
+            skipped (ON CONFLICT ... DO NOTHING).
+        cursor: Optional cursor to join the caller's transaction; by default
+            all pages are committed together in a new transaction.
+
+    Returns:
+    -------
+        Number of rows inserted.
+
+    """
+    columns, tuples = _rows_as_tuples(rows, columns)
+    if not columns:
+        return 0
+    query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES %s"
+    if conflict_target:
+        query += f" ON CONFLICT ({', '.join(conflict_target)}) DO NOTHING"
+    return _execute_values_paged(query, tuples, page_size, cursor)
+
+
+def upsert_many(
+    table_name: str,
+    rows: Iterable[dict[str, Any] | Sequence[Any]],
+    conflict_target: Sequence[str],
+    columns: Sequence[str] | None = None,
+    update_columns: Sequence[str] | None = None,
+    page_size: int = 1000,
+    cursor=None,
+) -> int:
+    """
+    Insert or update many rows with INSERT ... ON CONFLICT DO UPDATE.
+
+    Args:
+    ----
+        table_name: The name of the table.
+        rows: Rows as dictionaries or tuples (tuples require ``columns``).
+        conflict_target: Columns of the unique constraint to upsert on.
+        columns: Column names; taken from the first dict when omitted.
+        update_columns: Columns overwritten on conflict; defaults to every
+            column outside the conflict target.
+        page_size: Rows per statement.
+        cursor: Optional cursor to join the caller's transaction.
+
+    Returns:
+    -------
+        Number of rows inserted or updated.
+
+    """
+    columns, tuples = _rows_as_tuples(rows, columns)
+    if not columns:
+        return 0
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in conflict_target]
+    query = (
+        f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES %s "
+        f"ON CONFLICT ({', '.join(conflict_target)}) "
+    )
+    if update_columns:
+        query += "DO UPDATE SET " + ", ".join(
+            f"{column} = EXCLUDED.{column}" for column in update_columns
+        )
+    else:
+        query += "DO NOTHING"
+    return _execute_values_paged(query, tuples, page_size, cursor)
+
+
+class _CSVRowStream(io.TextIOBase):
+    """Read-only file object that renders rows as CSV on demand for COPY."""
+
+    NULL = "\\N"
+
+    def __init__(self, rows: Iterator[tuple[Any, ...]], page_size: int):
+        self._pages = _pages(rows, page_size)
+        self._buffer = ""
+        self.row_count = 0
+
+    def _value(self, value: Any) -> Any:
+        if value is None:
+            return self.NULL
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=str)
+        return value
+
+    def _render(self, page: list) -> str:
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        for row in page:
+            writer.writerow(self._value(value) for value in row)
+        self.row_count += len(page)
+        return out.getvalue()
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            page = next(self._pages, None)
+            if page is None:
+                break
+            self._buffer += self._render(page)
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def copy_from_iter(
+    table_name: str,
+    rows: Iterable[dict[str, Any] | Sequence[Any]],
+    columns: Sequence[str] | None = None,
+    page_size: int = 5000,
+    cursor=None,
+) -> int:
+    """
+    Stream rows into a table with COPY FROM STDIN.
+
+    Rows are rendered to CSV ``page_size`` at a time while PostgreSQL reads,
+    so arbitrarily large iterables load in constant memory. COPY has no
+    conflict handling; use upsert_many when rows may already exist.
+
+    Args:
+    ----
+        table_name: The name of the table.
+        rows: Rows as dictionaries or tuples (tuples require ``columns``).
+        columns: Column names; taken from the first dict when omitted.
+        page_size: Rows rendered per buffer refill.
+        cursor: Optional cursor to join the caller's transaction.
+
+    Returns:
+    -------
+        Number of rows copied.
+
+    """
+    columns, tuples = _rows_as_tuples(rows, columns)
+    if not columns:
+        return 0
+    stream = _CSVRowStream(tuples, page_size)
+    query = (
+        f"COPY {table_name} ({', '.join(columns)}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{_CSVRowStream.NULL}')"
+    )
+    context = nullcontext(cursor) if cursor is not None else get_db_cursor(commit=True)
+    with context as cur:
+        cur.copy_expert(query, stream)
+    return stream.row_count
+
+
 # Consider adding a function to fetch returning id after insert if needed
 # def insert_row_returning_id(table_name: str, data: Dict[str, Any], id_column: str = 'id') -> Optional[Any]:
 #    ...
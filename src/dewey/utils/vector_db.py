@@ -1,6 +1,66 @@
+from collections.abc import Iterator
+from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 from dewey.core.base_script import BaseScript
+from dewey.utils.database import fetch_all
+from dewey.utils.vector_index import SearchResult, VectorIndex
+
+DEFAULT_INDEX_PATH = "~/.dewey/vector_index"
+
+# Characters of a document sent for embedding; longer texts are truncated
+MAX_EMBED_CHARS = 8000
+
+# Content type -> keyset-paginated query returning (id, title, text, extra)
+SOURCES = {
+    "email": """
+        SELECT message_id, subject, body, sender FROM raw_emails
+        WHERE message_id > %s ORDER BY message_id LIMIT %s
+    """,
+    "transcript": """
+        SELECT CAST(id AS VARCHAR), title, transcript, link FROM podcast_episodes
+        WHERE transcript IS NOT NULL AND CAST(id AS VARCHAR) > %s
+        ORDER BY CAST(id AS VARCHAR) LIMIT %s
+    """,
+    "research": """
+        SELECT CAST(id AS VARCHAR), title, snippet, link FROM research_search_results
+        WHERE CAST(id AS VARCHAR) > %s ORDER BY CAST(id AS VARCHAR) LIMIT %s
+    """,
+}
+
+
+def embed_texts(llm_client: Any, texts: list[str], model: str | None = None):
+    """
+    Embed texts with LiteLLMClient.generate_embedding.
+
+    Args:
+    ----
+        llm_client: A LiteLLMClient.
+        texts: Texts to embed in one request.
+        model: Embedding model; defaults to the client's embedding model.
+
+    Returns:
+    -------
+        A float32 array with one row per text.
+
+    """
+    response = llm_client.generate_embedding(
+        [text[:MAX_EMBED_CHARS] for text in texts], model=model,
+    )
+    data = response["data"] if isinstance(response, dict) else response.data
+    data = sorted(
+        data,
+        key=lambda item: item["index"] if isinstance(item, dict) else item.index,
+    )
+    return np.array(
+        [
+            item["embedding"] if isinstance(item, dict) else item.embedding
+            for item in data
+        ],
+        dtype=np.float32,
+    )
 
 
 class VectorDB(BaseScript):
@@ -8,7 +68,9 @@ class VectorDB(BaseScript):
     A utility script for interacting with a vector database.
 
     Inherits from BaseScript for standardized configuration, logging,
-    and database connections.
+    and database connections. Emails, podcast transcripts and research
+    results are embedded with the configured LLM client and stored in a
+    local VectorIndex for semantic search.
     """
 
     def __init__(self, **kwargs: Any) -> None:
@@ -20,14 +82,96 @@ class VectorDB(BaseScript):
             **kwargs: Additional keyword arguments passed to BaseScript.
 
         """
+        kwargs.setdefault("enable_llm", True)
         super().__init__(config_section="vector_db", **kwargs)
+        self._index: VectorIndex | None = None
+
+    @property
+    def index(self) -> VectorIndex:
+        """The local vector index, opened on first use."""
+        if self._index is None:
+            self._index = VectorIndex(
+                Path(self.get_config_value("index_path", DEFAULT_INDEX_PATH)),
+                nprobe=self.get_config_value("nprobe", 8),
+            )
+        return self._index
+
+    def _documents(
+        self, content_type: str, page_size: int,
+    ) -> Iterator[list[tuple[str, str, dict[str, Any]]]]:
+        """Yield pages of (doc_id, text, metadata) for one source."""
+        last_id = ""
+        while rows := fetch_all(SOURCES[content_type], [last_id, page_size]):
+            last_id = rows[-1][0]
+            yield [
+                (
+                    f"{content_type}:{source_id}",
+                    f"{title or ''}\n\n{text or ''}".strip(),
+                    {"title": title, "source_id": source_id, "ref": extra},
+                )
+                for source_id, title, text, extra in rows
+            ]
+
+    def index_source(self, content_type: str, batch_size: int = 100) -> int:
+        """
+        Embed and index the documents of one source not yet in the index.
+
+        Args:
+        ----
+            content_type: A key of SOURCES.
+            batch_size: Documents per embedding request.
+
+        Returns:
+        -------
+            Number of documents added.
+
+        """
+        model = self.get_config_value("embedding_model")
+        added = 0
+        for page in self._documents(content_type, batch_size):
+            existing = self.index.existing_ids(doc_id for doc_id, _, _ in page)
+            page = [doc for doc in page if doc[0] not in existing and doc[1]]
+            if not page:
+                continue
+            texts = [text for _, text, _ in page]
+            vectors = embed_texts(self.llm_client, texts, model)
+            added += self.index.add(
+                [doc_id for doc_id, _, _ in page],
+                vectors,
+                content_type,
+                [meta for _, _, meta in page],
+            )
+            self.logger.info(f"Indexed {added} new {content_type} documents")
+        return added
+
+    def search(
+        self, query: str, content_type: str | None = None, limit: int = 5,
+    ) -> list[SearchResult]:
+        """
+        Semantic search over the indexed documents.
+
+        Args:
+        ----
+            query: Natural-language query.
+            content_type: Only return documents of this type.
+            limit: Maximum number of results.
+
+        Returns:
+        -------
+            Results ordered by decreasing similarity.
+
+        """
+        vector = embed_texts(
+            self.llm_client, [query], self.get_config_value("embedding_model"),
+        )[0]
+        return self.index.search(vector, k=limit, content_type=content_type)
 
     def execute(self) -> None:
         """
         Executes the main logic of the VectorDB script.
 
-        Retrieves configuration values, initializes the database and LLM,
-        and performs vector operations.
+        Embeds every configured source's documents that are not yet in the
+        local index.
 
         Raises
         ------
@@ -39,20 +183,26 @@ class VectorDB(BaseScript):
 
         """
         try:
-            db_url = self.get_config_value("vector_db_url")
-            llm_model = self.get_config_value("llm_model")
+            sources = self.get_config_value("sources", list(SOURCES))
+            batch_size = self.get_config_value("batch_size", 100)
+            self.logger.info(f"Updating vector index at {self.index.path}")
 
-            self.logger.info(f"Connecting to vector database: {db_url}")
-            self.logger.info(f"Using LLM model: {llm_model}")
+            for content_type in sources:
+                added = self.index_source(content_type, batch_size)
+                self.logger.info(f"Added {added} {content_type} documents")
 
-            # Simulate vector database operations
-            self.logger.info("Performing vector database operations...")
-            self.logger.info("Vector database operations completed successfully.")
+            self.logger.info(
+                f"Vector index holds {len(self.index)} documents",
+            )
 
         except Exception as e:
             self.logger.exception(
                 f"An error occurred during vector database operation: {e}",
             )
+        finally:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
 
     def run(self) -> None:
         """
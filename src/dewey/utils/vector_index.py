@@ -0,0 +1,470 @@
+"""
+Embedded vector index.
+
+An IVF (inverted file) index over float32 vectors for cosine similarity
+search without an external service. Vectors, their list assignments,
+content-type codes and tombstones live in memory-mapped files that grow in
+place, so the index opens instantly and only the pages a query touches are
+read. Document ids and metadata are kept in a small SQLite file alongside.
+
+Until ``train_threshold`` vectors have been added, searches are exact. After
+that, spherical k-means partitions the vectors into ``nlist`` lists and a
+query only scores the vectors in its ``nprobe`` nearest lists. The index is
+retrained automatically whenever it has grown fourfold since the last
+training.
+"""
+
+import json
+import logging
+import math
+import sqlite3
+import threading
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HEADER_FILE = "index.json"
+VECTORS_FILE = "vectors.f32"
+ASSIGN_FILE = "assign.i32"
+TYPES_FILE = "types.i16"
+ALIVE_FILE = "alive.u8"
+CENTROIDS_FILE = "centroids.npy"
+META_FILE = "meta.sqlite"
+
+# Rows scored at a time when assigning vectors or searching exactly
+_CHUNK = 16_384
+
+META_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS docs (
+        doc_id TEXT PRIMARY KEY,
+        slot INTEGER NOT NULL UNIQUE,
+        content_type TEXT,
+        metadata TEXT
+    );
+    CREATE TABLE IF NOT EXISTS content_types (
+        code INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+"""
+
+
+@dataclass
+class SearchResult:
+    """One search hit."""
+
+    doc_id: str
+    score: float
+    content_type: str | None
+    metadata: dict[str, Any]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class VectorIndex:
+    """IVF cosine-similarity index persisted in memory-mapped files."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        dim: int | None = None,
+        nprobe: int = 8,
+        train_threshold: int = 20_000,
+    ):
+        """
+        Open the index at path, creating it on the first add if missing.
+
+        Args:
+        ----
+            path: Directory holding the index files.
+            dim: Vector dimension; read from disk for an existing index and
+                otherwise taken from the first vectors added.
+            nprobe: Lists searched per query once the index is trained.
+            train_threshold: Vectors needed before the index is partitioned.
+
+        """
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self._lock = threading.RLock()
+
+        self._meta = sqlite3.connect(
+            str(self.path / META_FILE), check_same_thread=False,
+        )
+        self._meta.executescript(META_SCHEMA)
+
+        header_path = self.path / HEADER_FILE
+        header = json.loads(header_path.read_text()) if header_path.exists() else {}
+        self.dim: int | None = header.get("dim", dim)
+        self.size: int = header.get("size", 0)
+        self.capacity: int = header.get("capacity", 0)
+        self.trained_size: int = header.get("trained_size", 0)
+        self.centroids: np.ndarray | None = None
+        if (self.path / CENTROIDS_FILE).exists():
+            self.centroids = np.load(self.path / CENTROIDS_FILE)
+        self._type_codes = dict(
+            self._meta.execute("SELECT name, code FROM content_types").fetchall(),
+        )
+        if self.capacity:
+            self._map_arrays()
+
+    # -- storage -----------------------------------------------------------
+
+    def _map(self, name: str, dtype, shape) -> np.memmap:
+        return np.memmap(self.path / name, dtype=dtype, mode="r+", shape=shape)
+
+    def _map_arrays(self) -> None:
+        self._vectors = self._map(VECTORS_FILE, np.float32, (self.capacity, self.dim))
+        self._assign = self._map(ASSIGN_FILE, np.int32, (self.capacity,))
+        self._types = self._map(TYPES_FILE, np.int16, (self.capacity,))
+        self._alive = self._map(ALIVE_FILE, np.uint8, (self.capacity,))
+
+    def _grow(self, needed: int) -> None:
+        """Extend the memory-mapped files to hold at least needed slots."""
+        if needed <= self.capacity:
+            return
+        capacity = max(1024, self.capacity)
+        while capacity < needed:
+            capacity *= 2
+        if self.capacity:
+            self._flush_arrays()
+            del self._vectors, self._assign, self._types, self._alive
+        for name, itemsize in (
+            (VECTORS_FILE, 4 * self.dim),
+            (ASSIGN_FILE, 4),
+            (TYPES_FILE, 2),
+            (ALIVE_FILE, 1),
+        ):
+            with open(self.path / name, "ab") as f:
+                f.truncate(capacity * itemsize)
+        self.capacity = capacity
+        self._map_arrays()
+
+    def _flush_arrays(self) -> None:
+        for array in (self._vectors, self._assign, self._types, self._alive):
+            array.flush()
+
+    def flush(self) -> None:
+        """Write pending changes and the header to disk."""
+        with self._lock:
+            if self.capacity:
+                self._flush_arrays()
+            self._meta.commit()
+            header = {
+                "dim": self.dim,
+                "size": self.size,
+                "capacity": self.capacity,
+                "trained_size": self.trained_size,
+            }
+            tmp = self.path / f"{HEADER_FILE}.tmp"
+            tmp.write_text(json.dumps(header))
+            tmp.replace(self.path / HEADER_FILE)
+
+    def close(self) -> None:
+        """Flush and close the index."""
+        self.flush()
+        self._meta.close()
+
+    def __len__(self) -> int:
+        """Number of live vectors."""
+        return self._meta.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def __contains__(self, doc_id: str) -> bool:
+        """Whether a document is indexed."""
+        return bool(
+            self._meta.execute("SELECT 1 FROM docs WHERE doc_id = ?", (doc_id,))
+            .fetchone(),
+        )
+
+    def existing_ids(self, doc_ids: Iterable[str]) -> set[str]:
+        """
+        Return which of the given documents are already indexed.
+
+        Args:
+        ----
+            doc_ids: Document ids to check.
+
+        Returns:
+        -------
+            The subset that is indexed.
+
+        """
+        doc_ids = list(doc_ids)
+        found = set()
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(
+                row[0]
+                for row in self._meta.execute(
+                    f"SELECT doc_id FROM docs WHERE doc_id IN ({placeholders})", chunk,
+                )
+            )
+        return found
+
+    # -- writes ------------------------------------------------------------
+
+    def _type_code(self, content_type: str | None) -> int:
+        if content_type is None:
+            return -1
+        code = self._type_codes.get(content_type)
+        if code is None:
+            code = len(self._type_codes)
+            self._meta.execute(
+                "INSERT INTO content_types (code, name) VALUES (?, ?)",
+                (code, content_type),
+            )
+            self._type_codes[content_type] = code
+        return code
+
+    def _nearest_list(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def add(
+        self,
+        doc_ids: Sequence[str],
+        vectors: np.ndarray | Sequence[Sequence[float]],
+        content_types: str | Sequence[str | None] | None = None,
+        metadata: Sequence[dict[str, Any] | None] | None = None,
+    ) -> int:
+        """
+        Add or replace documents.
+
+        Args:
+        ----
+            doc_ids: Unique document ids; an existing id is replaced.
+            vectors: One embedding per document.
+            content_types: One content type for all documents, or one each.
+            metadata: JSON-serializable metadata per document.
+
+        Returns:
+        -------
+            Number of documents added.
+
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(doc_ids):
+            raise ValueError("vectors must be a 2-D array with one row per id")
+        if not len(doc_ids):
+            return 0
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-dimensional vectors")
+        if content_types is None or isinstance(content_types, str):
+            content_types = [content_types] * len(doc_ids)
+        metadata = metadata or [None] * len(doc_ids)
+
+        with self._lock:
+            self.delete(doc_ids, flush=False)
+            vectors = _normalize(vectors)
+            start, end = self.size, self.size + len(doc_ids)
+            self._grow(end)
+            self._vectors[start:end] = vectors
+            self._types[start:end] = [self._type_code(t) for t in content_types]
+            self._alive[start:end] = 1
+            self._assign[start:end] = (
+                self._nearest_list(vectors) if self.centroids is not None else -1
+            )
+            self._meta.executemany(
+                "INSERT INTO docs (doc_id, slot, content_type, metadata) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (doc_id, slot, content_type, json.dumps(meta or {}, default=str))
+                    for slot, doc_id, content_type, meta in zip(
+                        range(start, end), doc_ids, content_types, metadata, strict=True,
+                    )
+                ],
+            )
+            self.size = end
+
+            if self.centroids is None and self.size >= self.train_threshold:
+                self.train()
+            elif self.centroids is not None and self.size >= 4 * self.trained_size:
+                self.train()
+            self.flush()
+        return len(doc_ids)
+
+    def delete(self, doc_ids: Iterable[str], flush: bool = True) -> int:
+        """
+        Remove documents; their slots are reclaimed by compact().
+
+        Args:
+        ----
+            doc_ids: Document ids to remove.
+            flush: Write the change to disk immediately.
+
+        Returns:
+        -------
+            Number of documents removed.
+
+        """
+        doc_ids = list(doc_ids)
+        with self._lock:
+            slots = []
+            for start in range(0, len(doc_ids), 500):
+                chunk = doc_ids[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                slots += [
+                    row[0]
+                    for row in self._meta.execute(
+                        f"DELETE FROM docs WHERE doc_id IN ({placeholders}) "
+                        "RETURNING slot",
+                        chunk,
+                    )
+                ]
+            if slots:
+                self._alive[slots] = 0
+            if flush:
+                self.flush()
+        return len(slots)
+
+    def train(self, iterations: int = 10, sample_size: int = 100_000, seed: int = 0):
+        """
+        Partition the live vectors with spherical k-means and reassign them.
+
+        Args:
+        ----
+            iterations: k-means iterations.
+            sample_size: Vectors sampled to fit the centroids.
+            seed: Random seed for sampling and initialization.
+
+        """
+        with self._lock:
+            live = np.flatnonzero(self._alive[: self.size])
+            if not len(live):
+                return
+            nlist = max(1, int(math.sqrt(len(live))))
+            rng = np.random.default_rng(seed)
+            sample = self._vectors[
+                np.sort(rng.choice(live, min(sample_size, len(live)), replace=False))
+            ]
+            centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                empty = np.bincount(labels, minlength=nlist) == 0
+                # Reseed empty lists from random sample points
+                sums[empty] = sample[rng.choice(len(sample), empty.sum())]
+                centroids = _normalize(sums)
+
+            self.centroids = centroids
+            for start in range(0, self.size, _CHUNK):
+                end = min(start + _CHUNK, self.size)
+                self._assign[start:end] = self._nearest_list(self._vectors[start:end])
+            self.trained_size = len(live)
+            np.save(self.path / CENTROIDS_FILE, centroids)
+            self.flush()
+            logger.info(f"Trained vector index: {nlist} lists over {len(live)} vectors")
+
+    def compact(self) -> None:
+        """Rewrite the index without deleted slots."""
+        with self._lock:
+            live = np.flatnonzero(self._alive[: self.size])
+            if len(live) == self.size:
+                return
+            new_slot = np.full(self.size, -1, dtype=np.int64)
+            new_slot[live] = np.arange(len(live))
+            for start in range(0, len(live), _CHUNK):
+                rows = live[start : start + _CHUNK]
+                dest = slice(start, start + len(rows))
+                self._vectors[dest] = self._vectors[rows]
+                self._assign[dest] = self._assign[rows]
+                self._types[dest] = self._types[rows]
+            self._alive[: len(live)] = 1
+            self._alive[len(live) : self.size] = 0
+            # Two passes keep the UNIQUE constraint on slot satisfied
+            slots = self._meta.execute("SELECT doc_id, slot FROM docs").fetchall()
+            self._meta.execute("UPDATE docs SET slot = -slot - 1")
+            self._meta.executemany(
+                "UPDATE docs SET slot = ? WHERE doc_id = ?",
+                [(int(new_slot[slot]), doc_id) for doc_id, slot in slots],
+            )
+            self.size = len(live)
+            self.flush()
+
+    # -- reads -------------------------------------------------------------
+
+    def _candidates(self, query: np.ndarray, codes: list[int] | None, nprobe: int):
+        mask = self._alive[: self.size].view(bool).copy()
+        if self.centroids is not None:
+            nprobe = min(nprobe, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            mask &= np.isin(self._assign[: self.size], probe)
+        if codes is not None:
+            mask &= np.isin(self._types[: self.size], codes)
+        return np.flatnonzero(mask)
+
+    def search(
+        self,
+        query: np.ndarray | Sequence[float],
+        k: int = 10,
+        content_type: str | Sequence[str] | None = None,
+        nprobe: int | None = None,
+    ) -> list[SearchResult]:
+        """
+        Find the documents most similar to a query vector.
+
+        Args:
+        ----
+            query: Query embedding.
+            k: Number of results.
+            content_type: Only return documents of this type or these types.
+            nprobe: Lists to search; defaults to the index's nprobe.
+
+        Returns:
+        -------
+            Results ordered by decreasing cosine similarity.
+
+        """
+        if not self.size:
+            return []
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        codes = None
+        if content_type is not None:
+            names = [content_type] if isinstance(content_type, str) else content_type
+            codes = [self._type_codes[n] for n in names if n in self._type_codes]
+            if not codes:
+                return []
+
+        with self._lock:
+            candidates = self._candidates(query, codes, nprobe or self.nprobe)
+            if not len(candidates):
+                return []
+            scores = np.empty(len(candidates), dtype=np.float32)
+            for start in range(0, len(candidates), _CHUNK):
+                rows = candidates[start : start + _CHUNK]
+                scores[start : start + len(rows)] = self._vectors[rows] @ query
+            top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            slots = [int(candidates[i]) for i in top]
+
+            placeholders = ",".join("?" * len(slots))
+            rows = {
+                slot: (doc_id, content_type, metadata)
+                for doc_id, slot, content_type, metadata in self._meta.execute(
+                    "SELECT doc_id, slot, content_type, metadata FROM docs "
+                    f"WHERE slot IN ({placeholders})",
+                    slots,
+                )
+            }
+        return [
+            SearchResult(
+                doc_id=rows[slot][0],
+                score=float(scores[i]),
+                content_type=rows[slot][1],
+                metadata=json.loads(rows[slot][2] or "{}"),
+            )
+            for slot, i in zip(slots, top, strict=True)
+            if slot in rows
+        ]
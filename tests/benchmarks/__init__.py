@@ -0,0 +1,6 @@
+"""
+Benchmark test package.
+
+These benchmarks are marked slow; run them with ``pytest -m slow`` or
+execute a module directly to print its timings.
+"""
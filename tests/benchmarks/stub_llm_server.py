@@ -0,0 +1,151 @@
+"""
+Local stub of an OpenAI-compatible chat completions endpoint.
+
+Answers ``POST /v1/chat/completions`` with a canned email analysis after a
+fixed latency, and can reject a share of requests with 429 to exercise the
+retry path. Used by the email analysis benchmark; run it from the repository
+root to point a real client at it:
+
+    python -m tests.benchmarks.stub_llm_server --port 8765 --latency 0.2
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+from tests.benchmarks.synthetic import LocalHTTPServer
+
+ANALYSIS = {
+    "scores": {
+        "automation_score": {"score": 0.2},
+        "content_value": {"score": 0.7},
+        "human_interaction": {"score": 0.8},
+        "time_value": {"score": 0.4},
+        "business_impact": {"score": 0.6},
+    },
+    "metadata": {"source": "Stub Client", "topics": ["portfolio"]},
+    "priority": 2,
+}
+
+
+class StubLLMServer:
+    """Threaded HTTP server imitating an LLM provider's latency and limits."""
+
+    def __init__(
+        self,
+        latency: float = 0.1,
+        rate_limit_share: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+        ----
+            latency: Seconds each request takes to answer.
+            rate_limit_share: Fraction of requests answered with 429.
+            host: Interface to bind.
+            port: Port to bind; 0 picks a free one.
+            seed: Seed for choosing which requests are rate limited.
+
+        """
+        self.latency = latency
+        self.rate_limit_share = rate_limit_share
+        self.requests = 0
+        self.rejected = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = LocalHTTPServer(self._handler(), host, port)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the OpenAI-compatible API."""
+        return f"{self._server.base_url}/v1"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: dict) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._lock:
+                    server.requests += 1
+                    server._in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server._in_flight)
+                    limited = server._rng.random() < server.rate_limit_share
+                    server.rejected += limited
+                try:
+                    time.sleep(server.latency)
+                    if limited:
+                        self._reply(429, {"error": {"message": "Rate limit reached"}})
+                        return
+                    self._reply(
+                        200,
+                        {
+                            "object": "chat.completion",
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "finish_reason": "stop",
+                                    "message": {
+                                        "role": "assistant",
+                                        "content": json.dumps(ANALYSIS),
+                                    },
+                                },
+                            ],
+                        },
+                    )
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+        return Handler
+
+    def start(self) -> "StubLLMServer":
+        """Serve requests on a background thread."""
+        self._server.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.stop()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--rate-limit-share", type=float, default=0.0)
+    args = parser.parse_args()
+    server = StubLLMServer(args.latency, args.rate_limit_share, port=args.port)
+    print(f"Serving a stub LLM API at {server.url}")
+    try:
+        server.start()._server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,72 @@
+"""
+Synthetic data and local servers shared by the benchmarks.
+
+Every generator draws from the random.Random it is given, so a benchmark's
+data depends only on its seed.
+"""
+
+import threading
+from datetime import date
+from http.server import ThreadingHTTPServer
+
+SYLLABLES = "ka lo mi ra te su no vi pe da go lu be ze fo xi".split()
+
+EXPENSES = [f"expenses:category{i}" for i in range(40)]
+
+
+def made_up_word(rng, syllables=3):
+    """A pronounceable word of the given number of syllables."""
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables))
+
+
+def merchant_name(rng):
+    """A made-up two-word merchant name."""
+    return " ".join(made_up_word(rng, rng.randint(2, 3)) for _ in range(2))
+
+
+def journal_entry(day: date, payee, expense, amount, account):
+    """Lines of a two-posting hledger transaction, the account side elided."""
+    return [
+        f"{day.isoformat()} {payee}",
+        f"    {expense}    ${amount:,.2f}",
+        f"    {account}",
+        "",
+    ]
+
+
+class LocalHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server on localhost, served from a background thread."""
+
+    daemon_threads = True
+    # Room for a full burst of concurrent connections
+    request_queue_size = 256
+
+    def __init__(self, handler, host="127.0.0.1", port=0):
+        """Bind the handler; port 0 picks a free one."""
+        super().__init__((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        """http://host:port of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        """Start serving."""
+        return self.start()
+
+    def __exit__(self, *exc):
+        """Stop serving."""
+        self.stop()
@@ -0,0 +1,136 @@
+"""
+Benchmark for concurrent email analysis.
+
+Analyzes synthetic emails against the local stub LLM server, once one at a
+time as EmailClassifier.run used to and once through the AnalysisEngine, and
+stores the results in an in-memory DuckDB table in batches.
+"""
+
+import json
+import time
+
+import pytest
+import requests
+
+from src.dewey.core.crm.email_classifier.analysis_engine import (
+    AnalysisEngine,
+    TokenBucket,
+)
+from tests.benchmarks.stub_llm_server import StubLLMServer
+
+EMAILS = 400
+LATENCY = 0.1
+CONCURRENCY = 32
+REQUESTS_PER_SECOND = 200.0
+RATE_LIMIT_SHARE = 0.02
+
+
+class StubProviderError(Exception):
+    """HTTP error from the stub provider, carrying its status code."""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+def make_analyze(url, session):
+    """Build an analyze function posting one email to the stub server."""
+
+    def analyze(email):
+        response = session.post(
+            f"{url}/chat/completions",
+            json={
+                "model": "stub",
+                "messages": [{"role": "user", "content": email["body"]}],
+                "response_format": {"type": "json_object"},
+            },
+            timeout=10,
+        )
+        if response.status_code != 200:
+            raise StubProviderError(response)
+        content = response.json()["choices"][0]["message"]["content"]
+        return email["msg_id"], json.loads(content)
+
+    return analyze
+
+
+def make_store():
+    """Build a batch writer into an in-memory DuckDB table."""
+    duckdb = pytest.importorskip("duckdb")
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE email_analyses (msg_id VARCHAR, raw_analysis JSON)")
+
+    def store(batch):
+        conn.execute("BEGIN TRANSACTION")
+        conn.executemany(
+            "INSERT INTO email_analyses VALUES (?, ?)",
+            [(msg_id, json.dumps(result)) for msg_id, result in batch],
+        )
+        conn.execute("COMMIT")
+
+    return conn, store
+
+
+def emails():
+    """Synthetic fetched emails."""
+    return (
+        {"msg_id": f"msg-{i:05d}", "body": f"Quarterly update number {i}"}
+        for i in range(EMAILS)
+    )
+
+
+def run_benchmark():
+    """Time sequential and concurrent analysis against the stub server."""
+    with StubLLMServer(latency=LATENCY, rate_limit_share=RATE_LIMIT_SHARE) as server:
+        session = requests.Session()
+        session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=64))
+        analyze = make_analyze(server.url, session)
+
+        # A tenth of the emails is enough to time the old one-by-one loop
+        sequential = EMAILS // 10
+        started = time.perf_counter()
+        for email in list(emails())[:sequential]:
+            try:
+                analyze(email)
+            except StubProviderError:
+                pass
+        sequential_rate = sequential / (time.perf_counter() - started)
+
+        conn, store = make_store()
+        engine = AnalysisEngine(
+            analyze,
+            store,
+            concurrency=CONCURRENCY,
+            rate_limiter=TokenBucket(REQUESTS_PER_SECOND, CONCURRENCY),
+            retry_base_delay=0.05,
+            write_batch_size=50,
+        )
+        stats = engine.run(emails())
+        stored = conn.execute("SELECT COUNT(*) FROM email_analyses").fetchone()[0]
+
+        return {
+            "sequential_per_second": sequential_rate,
+            "concurrent_per_second": stats["analyses_per_second"],
+            "speedup": stats["analyses_per_second"] / sequential_rate,
+            "stored": stored,
+            "retries": stats["retries"],
+            "failed": stats["failed"],
+            "batches": stats["batches"],
+            "max_in_flight": server.max_in_flight,
+        }
+
+
+@pytest.mark.slow
+def test_concurrent_analysis_throughput():
+    """Concurrency multiplies throughput without losing or duplicating rows."""
+    results = run_benchmark()
+
+    assert results["stored"] + results["failed"] == EMAILS
+    assert results["max_in_flight"] <= CONCURRENCY
+    assert results["speedup"] > 5
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        shown = f"{value:,.2f}" if isinstance(value, float) else value
+        print(f"{name:>22}: {shown}")
@@ -0,0 +1,115 @@
+"""
+Benchmark for incremental, fingerprint-indexed import deduplication.
+
+Writes five years of monthly journals (100k transactions) and checks a
+month of bank rows for duplicates the way every import run would. The
+baseline rereads and fingerprints every journal file on each run, as
+_load_processed_hashes and find_ledger_files did; the index run reopens a
+persistent FingerprintIndex, which only stats the unchanged files.
+"""
+
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.dewey.core.bookkeeping.fingerprint_index import (
+    FingerprintIndex,
+    journal_fingerprints,
+    transaction_fingerprint,
+)
+from tests.benchmarks.synthetic import EXPENSES, journal_entry
+
+YEARS = range(2020, 2025)
+TRANSACTIONS_PER_MONTH = 1_700
+ACCOUNT = "assets:checking:mercury8542"
+
+
+def write_ledger(root, seed=6):
+    """Monthly journals, and bank rows half of which are already recorded."""
+    rng = random.Random(seed)
+    recorded = []
+    for year in YEARS:
+        for month in range(1, 13):
+            lines = []
+            start = date(year, month, 1)
+            for _ in range(TRANSACTIONS_PER_MONTH):
+                day = start + timedelta(days=rng.randrange(28))
+                payee = f"Payee {rng.randrange(5000)}"
+                amount = rng.randrange(-500_000, 500_000) / 100
+                recorded.append((day, amount, payee))
+                lines += journal_entry(
+                    day, payee, rng.choice(EXPENSES), -amount, ACCOUNT,
+                )
+            (root / f"{year}_{month:02d}.journal").write_text("\n".join(lines))
+    rows = rng.sample(recorded, 1_000) + [
+        (date(2025, 1, 1) + timedelta(days=i % 28), -12.5, f"New payee {i}")
+        for i in range(1_000)
+    ]
+    return [[transaction_fingerprint(day, amount, payee, ACCOUNT)] for day, amount, payee in rows]
+
+
+def rescan_and_check(root, batch):
+    """Reread every journal and count fingerprints in memory."""
+    counts = Counter()
+    for path in sorted(root.glob("*.journal")):
+        counts.update(fp for fp, _ in journal_fingerprints(path.read_text(), str(path)))
+    seen = Counter()
+    flags = []
+    for fingerprints in batch:
+        flags.append(all(counts[fp] <= seen[fp] for fp in fingerprints))
+        seen.update(fingerprints)
+    return flags
+
+
+def run_benchmark(runs=3):
+    """Check the same batch with both approaches over several import runs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        batch = write_ledger(root)
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            expected = rescan_and_check(root, batch)
+        rescan_seconds = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        FingerprintIndex.for_ledger(root).close()
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            with FingerprintIndex.for_ledger(root) as index:
+                flags = index.unseen(batch)
+        index_seconds = (time.perf_counter() - start) / runs
+
+    return {
+        "transactions": TRANSACTIONS_PER_MONTH * 12 * len(YEARS),
+        "batch": len(batch),
+        "new": sum(flags),
+        "rescan_seconds": rescan_seconds,
+        "first_build_seconds": build_seconds,
+        "index_seconds": index_seconds,
+        "speedup": rescan_seconds / index_seconds,
+        "agreement": sum(a == b for a, b in zip(flags, expected, strict=True)) / len(batch),
+    }
+
+
+@pytest.mark.slow
+def test_fingerprint_index_benchmark():
+    """The warm index gives the same answers as a rescan, much faster."""
+    results = run_benchmark()
+    print(results)
+
+    assert results["agreement"] == 1.0
+    assert results["speedup"] > 10
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        shown = f"{value:,.3f}" if isinstance(value, float) else value
+        print(f"{name:>20}: {shown}")
@@ -0,0 +1,134 @@
+"""
+Benchmark for in-process journal balances.
+
+Writes five years of synthetic journals (about 100k transactions) and answers
+the opening-balance queries HledgerUpdater makes, once with a JournalEngine
+loaded a single time and once the way the subprocess path does it: a
+separate `hledger bal` process per account and date. When hledger is not
+installed, the subprocess cost is approximated by reparsing the journal for
+every query.
+"""
+
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.dewey.core.bookkeeping.journal_engine import JournalEngine
+from tests.benchmarks.synthetic import EXPENSES, journal_entry
+
+YEARS = range(2020, 2025)
+TRANSACTIONS_PER_YEAR = 20_000
+ACCOUNTS = ["assets:checking:mercury8542", "assets:checking:mercury9281"]
+
+
+def write_journals(root, seed=5):
+    """Yearly journals with opening assignments, included from all.journal."""
+    rng = random.Random(seed)
+    for year in YEARS:
+        lines = [
+            f"{year}-01-01 Opening Balances",
+            f"    {ACCOUNTS[0]}    = $50,000.00",
+            f"    {ACCOUNTS[1]}    = $25,000.00",
+            "    equity:opening balances",
+            "",
+        ]
+        start = date(year, 1, 1)
+        for _ in range(TRANSACTIONS_PER_YEAR):
+            day = start + timedelta(days=rng.randrange(365))
+            cents = rng.randrange(-500_000, 500_000)
+            lines += journal_entry(
+                day,
+                f"Payee {rng.randrange(1000)}",
+                rng.choice(EXPENSES),
+                -cents / 100,
+                rng.choice(ACCOUNTS),
+            )
+        (root / f"{year}.journal").write_text("\n".join(lines))
+    (root / "all.journal").write_text(
+        "".join(f"include {year}.journal\n" for year in YEARS),
+    )
+    return root / "all.journal"
+
+
+def queries():
+    """The (account, date) pairs an opening-balance update asks for."""
+    return [(account, f"{year - 1}-12-31") for year in YEARS for account in ACCOUNTS]
+
+
+def hledger_balance(journal, account, end):
+    """The subprocess path: one hledger process per query."""
+    result = subprocess.run(
+        ["hledger", "-f", str(journal), "bal", account, "-e", end, "--depth", "1"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    match = re.search(r"\$([0-9,.()-]+)", result.stdout.strip().split("\n")[-1])
+    return match.group(0) if match else None
+
+
+def engine_balance(engine, account, end):
+    """The engine path, formatted like HledgerUpdater._engine_balance."""
+    value = engine.balance(account, end=end).get("$")
+    return None if value is None else engine.format_amount("$", value)
+
+
+def run_benchmark():
+    """Time both paths over the same queries and compare their answers."""
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = write_journals(Path(tmp))
+
+        start = time.perf_counter()
+        engine = JournalEngine.from_file(str(journal))
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        answers = [engine_balance(engine, a, d) for a, d in queries()]
+        query_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if shutil.which("hledger"):
+            baseline = "hledger"
+            expected = [hledger_balance(journal, a, d) for a, d in queries()]
+        else:
+            baseline = "reparse"
+            expected = [
+                engine_balance(JournalEngine.from_file(str(journal)), a, d)
+                for a, d in queries()
+            ]
+        baseline_seconds = time.perf_counter() - start
+
+    return {
+        "postings": len(engine),
+        "queries": len(answers),
+        "baseline": baseline,
+        "load_seconds": load_seconds,
+        "query_seconds": query_seconds,
+        "baseline_seconds": baseline_seconds,
+        "speedup": baseline_seconds / (load_seconds + query_seconds),
+        "agreement": sum(a == b for a, b in zip(answers, expected, strict=True))
+        / len(answers),
+    }
+
+
+@pytest.mark.slow
+def test_journal_engine_benchmark():
+    """One load answers every query, matching the per-query baseline."""
+    results = run_benchmark()
+    print(results)
+
+    assert results["agreement"] == 1.0
+    assert results["speedup"] > 5
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        shown = f"{value:,.2f}" if isinstance(value, float) else value
+        print(f"{name:>18}: {shown}")
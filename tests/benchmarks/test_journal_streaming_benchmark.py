@@ -0,0 +1,130 @@
+"""
+Benchmark for streaming, parallel journal categorization.
+
+Writes ten years of monthly JSON journals (240k transactions) and
+categorizes them twice: the original way (backup copy, json.load, a regex
+search per rule per transaction, json.dump) and with categorize_journal_file
+in a process pool. Both must produce identical files.
+"""
+
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from src.dewey.core.bookkeeping.journal_io import run_parallel
+from src.dewey.core.bookkeeping.transaction_categorizer import categorize_journal_file
+from tests.benchmarks.synthetic import made_up_word
+
+YEARS = range(2015, 2025)
+TRANSACTIONS_PER_FILE = 2_000
+RULES = 300
+
+
+def synthetic_books(root, seed=4):
+    """Year directories of monthly journals, and rules for their merchants."""
+    rng = random.Random(seed)
+    merchants = list(
+        dict.fromkeys(made_up_word(rng) for _ in range(RULES * 2)),
+    )
+    rules = {
+        "patterns": [
+            {"regex": name, "category": f"Expenses:Category{i % 30}"}
+            for i, name in enumerate(merchants[:RULES])
+        ],
+        "default_category": "Expenses:Uncategorized",
+    }
+    paths = []
+    for year in YEARS:
+        (root / str(year)).mkdir()
+        for month in range(1, 13):
+            path = root / str(year) / f"{month:02d}.json"
+            transactions = [
+                {
+                    "date": f"{year}-{month:02d}-{rng.randint(1, 28):02d}",
+                    "description": f"POS {rng.choice(merchants).upper()} #{rng.randint(1, 9999)}",
+                    "amount": rng.randint(-50_000, 50_000) / 100,
+                }
+                for _ in range(TRANSACTIONS_PER_FILE)
+            ]
+            path.write_text(json.dumps({"account": "checking", "transactions": transactions}))
+            paths.append(str(path))
+    return rules, paths
+
+
+def categorize_in_memory(path, rules):
+    """The original process_journal_file: backup, load, loop, dump."""
+    shutil.copy2(path, path + ".bak")
+    with open(path) as f:
+        journal = json.load(f)
+    for trans in journal["transactions"]:
+        if "category" not in trans:
+            description = trans["description"].lower()
+            category = rules["default_category"]
+            for pattern in rules["patterns"]:
+                if re.search(pattern["regex"], description):
+                    category = pattern["category"]
+                    break
+            trans["category"] = category
+    with open(path, "w") as f:
+        json.dump(journal, f, indent=4)
+
+
+def run_benchmark():
+    """Categorize the same books both ways and compare the results."""
+    with tempfile.TemporaryDirectory() as tmp:
+        original = Path(tmp) / "original"
+        original.mkdir()
+        rules, paths = synthetic_books(original)
+        streamed = Path(tmp) / "streamed"
+        shutil.copytree(original, streamed)
+
+        start = time.perf_counter()
+        for path in paths:
+            categorize_in_memory(path, rules)
+        in_memory_seconds = time.perf_counter() - start
+
+        streamed_paths = [p.replace(str(original), str(streamed)) for p in paths]
+        start = time.perf_counter()
+        changes = run_parallel(
+            partial(categorize_journal_file, rules=rules), streamed_paths, workers=0,
+        )
+        streaming_seconds = time.perf_counter() - start
+
+        identical = all(
+            Path(a).read_text() == Path(b).read_text()
+            for a, b in zip(paths, streamed_paths, strict=True)
+        )
+
+    return {
+        "files": len(paths),
+        "transactions": sum(len(c) for c in changes),
+        "cpus": os.cpu_count(),
+        "in_memory_seconds": in_memory_seconds,
+        "streaming_seconds": streaming_seconds,
+        "speedup": in_memory_seconds / streaming_seconds,
+        "identical": identical,
+    }
+
+
+@pytest.mark.slow
+def test_journal_streaming_benchmark():
+    """Streaming categorization matches the original output, faster."""
+    results = run_benchmark()
+    print(results)
+
+    assert results["identical"]
+    assert results["speedup"] > 2
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        shown = f"{value:,.2f}" if isinstance(value, float) else value
+        print(f"{name:>18}: {shown}")
@@ -0,0 +1,91 @@
+"""
+Benchmark for combined-regex transaction classification.
+
+Classifies 200k Mercury-style descriptions against 2,000 merchant rules,
+shaped like the escaped patterns RulesConverter produces, with the
+PatternClassifier and with the original search-every-pattern loop.
+"""
+
+import random
+import re
+import time
+
+import pytest
+
+from src.dewey.core.bookkeeping.pattern_classifier import PatternClassifier
+from tests.benchmarks.synthetic import merchant_name
+
+RULES = 2_000
+MERCHANTS = 6_000
+TRANSACTIONS = 200_000
+LOOP_SAMPLE = 2_000
+
+
+def synthetic_rules(seed=9):
+    """Merchant rules and descriptions, a third of which match no rule."""
+    rng = random.Random(seed)
+    names = list(dict.fromkeys(merchant_name(rng) for _ in range(MERCHANTS)))
+    rules = [
+        (re.escape(name).replace(r"\ ", r"\s+"), f"expenses:category{i % 40}")
+        for i, name in enumerate(names[:RULES])
+    ]
+    descriptions = [
+        f"{rng.choice(['POS', 'ACH', 'CARD'])} {rng.choice(names).upper()} "
+        f"{rng.randint(1000, 9999)}"
+        for _ in range(TRANSACTIONS)
+    ]
+    return rules, descriptions
+
+
+def search_loop(compiled, description):
+    """The original loop: try every compiled rule in order."""
+    for pattern, category in compiled:
+        if pattern.search(description):
+            return category
+    return None
+
+
+def run_benchmark():
+    """Time both classifiers and check they agree."""
+    rules, descriptions = synthetic_rules()
+
+    start = time.perf_counter()
+    classifier = PatternClassifier(rules)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = classifier.classify_many(descriptions)
+    classify_seconds = time.perf_counter() - start
+
+    compiled = [(re.compile(pattern, re.IGNORECASE), category) for pattern, category in rules]
+    start = time.perf_counter()
+    expected = [search_loop(compiled, d) for d in descriptions[:LOOP_SAMPLE]]
+    loop_seconds = (time.perf_counter() - start) / LOOP_SAMPLE * TRANSACTIONS
+
+    return {
+        "build_seconds": build_seconds,
+        "classify_seconds": classify_seconds,
+        "loop_seconds_estimated": loop_seconds,
+        "speedup": loop_seconds / (build_seconds + classify_seconds),
+        "matched": sum(r is not None for r in results) / TRANSACTIONS,
+        "agreement": sum(
+            a == b for a, b in zip(results[:LOOP_SAMPLE], expected, strict=True)
+        )
+        / LOOP_SAMPLE,
+    }
+
+
+@pytest.mark.slow
+def test_pattern_classifier_benchmark():
+    """The combined classifier agrees with the loop and is much faster."""
+    results = run_benchmark()
+    print(results)
+
+    assert results["agreement"] == 1.0
+    assert results["speedup"] > 5
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        shown = f"{value:,.2f}" if isinstance(value, float) else value
+        print(f"{name:>24}: {shown}")
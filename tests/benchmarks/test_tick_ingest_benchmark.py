@@ -0,0 +1,186 @@
+"""
+Benchmark for concurrent tick ingestion.
+
+Serves prebuilt synthetic trades from a local fake Polygon server that adds
+20 ms of latency per request, and ingests 8 tickers over 5 days (160 pages of 5,000
+trades) twice: the way TickProcessor used to, one ticker/day at a time with
+DataFrame.apply and a new DuckDB connection per insert into one table, and
+with TickIngestor writing partitioned Parquet from a thread pool. Then it
+times a one-ticker range scan of each result.
+"""
+
+import json
+import tempfile
+import time
+from datetime import date
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler
+from itertools import product
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import duckdb
+import pandas as pd
+import pytest
+import requests
+
+from src.dewey.core.research.port.tick_ingest import (
+    PolygonClient,
+    TickIngestor,
+    TickStore,
+    trading_days,
+)
+from tests.benchmarks.synthetic import LocalHTTPServer
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOG", "META", "TSLA", "AMD"]
+DAYS = trading_days(date(2024, 1, 2), date(2024, 1, 8))
+PAGE_SIZE = 5_000
+PAGES_PER_DAY = 4
+LATENCY = 0.02
+
+
+@lru_cache(maxsize=None)
+def page_body(ticker, day, cursor, host):
+    """One page of deterministic trades and the cursor to the next."""
+    base = int(time.mktime(date.fromisoformat(day).timetuple())) * 10**9
+    body = {
+        "status": "OK",
+        "results": [
+            {
+                "id": f"{i}",
+                "sip_timestamp": base + i * 1000,
+                "price": 100 + (i % 100) / 100,
+                "size": 100,
+                "conditions": [12, 37] if i % 3 else [],
+                "sequence_number": i,
+                "exchange": i % 20,
+            }
+            for i in range(cursor * PAGE_SIZE, (cursor + 1) * PAGE_SIZE)
+        ],
+    }
+    if cursor + 1 < PAGES_PER_DAY:
+        body["next_url"] = f"{host}/v3/trades/{ticker}?cursor={cursor + 1}&day={day}"
+    return json.dumps(body).encode()
+
+
+class SlowPolygon(BaseHTTPRequestHandler):
+    """Fake v3 trades endpoint with fixed latency."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        """Keep benchmark output quiet."""
+
+    def do_GET(self):
+        """Answer a trades request after the simulated latency."""
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        data = page_body(
+            url.path.rsplit("/", 1)[1],
+            query.get("day", query.get("timestamp")),
+            int(query.get("cursor", 0)),
+            self.server.base_url,
+        )
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def legacy_ingest(base_url, db_path):
+    """One ticker/day at a time, apply-joined, a connection per insert."""
+    with duckdb.connect(db_path) as con:
+        con.execute(
+            "CREATE TABLE stock_ticks (ticker VARCHAR, trade_id VARCHAR, timestamp TIMESTAMP, "
+            "price DOUBLE, size DOUBLE, conditions VARCHAR, sequence_number BIGINT)",
+        )
+    for ticker, day in product(TICKERS, DAYS):
+        url = f"{base_url}/v3/trades/{ticker}"
+        params = {"timestamp": day.isoformat(), "apiKey": "key"}
+        while url:
+            page = requests.get(url, params=params).json()
+            df = pd.DataFrame(page["results"])
+            df["ticker"] = ticker
+            df["timestamp"] = pd.to_datetime(df["sip_timestamp"], unit="ns")
+            df["conditions"] = df["conditions"].apply(lambda x: ",".join(map(str, x)))
+            df = df.rename(columns={"id": "trade_id"})
+            con = duckdb.connect(db_path)
+            con.register("tick_data", df)
+            con.execute(
+                "INSERT INTO stock_ticks SELECT ticker, trade_id, timestamp, price, size, "
+                "conditions, sequence_number FROM tick_data",
+            )
+            con.close()
+            url, params = page.get("next_url"), {"apiKey": "key"}
+
+
+def run_benchmark():
+    """Ingest the same trades both ways and time a one-ticker scan."""
+    with LocalHTTPServer(SlowPolygon) as server, tempfile.TemporaryDirectory() as tmp:
+        base_url = server.base_url
+        # Build every page up front so the server costs the same for both runs
+        for ticker, day, cursor in product(TICKERS, DAYS, range(PAGES_PER_DAY)):
+            page_body(ticker, day.isoformat(), cursor, base_url)
+        db_path = str(Path(tmp) / "ticks.duckdb")
+        start = time.perf_counter()
+        legacy_ingest(base_url, db_path)
+        legacy_seconds = time.perf_counter() - start
+
+        store = TickStore(Path(tmp) / "ticks")
+        ingestor = TickIngestor(PolygonClient("key", base_url=base_url), store, workers=16)
+        start = time.perf_counter()
+        counts = ingestor.ingest(TICKERS, DAYS)
+        ingest_seconds = time.perf_counter() - start
+        ingestor.close()
+
+        with duckdb.connect(db_path) as con:
+            start = time.perf_counter()
+            legacy_rows = con.execute(
+                "SELECT count(*), sum(price) FROM stock_ticks WHERE ticker = 'NVDA' "
+                "AND timestamp < '2024-01-04'",
+            ).fetchone()
+            legacy_scan_seconds = time.perf_counter() - start
+        with duckdb.connect() as con:
+            store.create_view(con)
+            start = time.perf_counter()
+            rows = con.execute(
+                "SELECT count(*), sum(price) FROM stock_ticks WHERE ticker = 'NVDA' "
+                "AND date < '2024-01-04'",
+            ).fetchone()
+            scan_seconds = time.perf_counter() - start
+            files = len(list(store.root.rglob("*.parquet")))
+
+    return {
+        "ticks": sum(counts.values()),
+        "files": files,
+        "legacy_ingest_seconds": legacy_seconds,
+        "ingest_seconds": ingest_seconds,
+        "ingest_speedup": legacy_seconds / ingest_seconds,
+        "legacy_scan_seconds": legacy_scan_seconds,
+        "scan_seconds": scan_seconds,
+        "same_scan_result": rows[0] == legacy_rows[0] and abs(rows[1] - legacy_rows[1]) < 1e-6,
+    }
+
+
+@pytest.mark.slow
+def test_tick_ingest_benchmark():
+    """
+    Concurrent ingestion stores the same ticks faster.
+
+    The fake server shares the machine with the DuckDB transforms, so the
+    bound is conservative enough to hold on a single core.
+    """
+    results = run_benchmark()
+    print(results)
+
+    assert results["ticks"] == len(TICKERS) * len(DAYS) * PAGE_SIZE * PAGES_PER_DAY
+    assert results["same_scan_result"]
+    assert results["ingest_speedup"] > 1.5
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        shown = f"{value:,.3f}" if isinstance(value, float) else value
+        print(f"{name:>22}: {shown}")
@@ -0,0 +1,116 @@
+"""
+Benchmark for trigram-indexed transcript title matching.
+
+Matches 10k transcript file names against 10k episode titles with the
+TitleIndex, and times the original all-pairs SequenceMatcher scan on a
+sample of files to extrapolate its cost over the full set.
+"""
+
+import random
+import re
+import time
+from difflib import SequenceMatcher
+
+import pytest
+
+from src.dewey.core.crm.transcripts.title_index import TitleIndex
+
+EPISODES = 10_000
+TRANSCRIPTS = 10_000
+SCAN_SAMPLE = 20
+THRESHOLD = 0.7
+
+WORDS = (
+    "impact investing climate risk bond markets future finance ethics "
+    "shareholder engagement governance carbon transition energy water "
+    "community lending housing labor rights supply chains biodiversity "
+    "stewardship proxy voting fossil fuels renewables policy inflation "
+    "portfolio fiduciary duty pensions endowments philanthropy venture "
+    "capital private equity credit emerging economies gender equity data"
+).split()
+
+
+def clean_title(title):
+    """TranscriptMatcher.clean_title."""
+    return re.sub(r"[^a-zA-Z0-9\s]", "", title).lower()
+
+
+def synthetic_titles(seed=11):
+    """Episode titles and perturbed transcript file names pointing at them."""
+    rng = random.Random(seed)
+    titles = [
+        f"{' '.join(rng.sample(WORDS, rng.randint(4, 7)))} part {i}"
+        for i in range(EPISODES)
+    ]
+    files, expected = [], []
+    for _ in range(TRANSCRIPTS):
+        target = rng.randrange(EPISODES)
+        words = titles[target].split()
+        if rng.random() < 0.5:
+            # Typo in one word
+            j = rng.randrange(len(words) - 2)
+            words[j] = words[j][:-1]
+        files.append("-".join(words) + rng.choice([".txt", ".srt", ".vtt"]))
+        expected.append(target)
+    return titles, files, expected
+
+
+def scan(cleaned_titles, cleaned_file):
+    """The original loop: score every title, keep the first best."""
+    best_id, best_score = None, 0.0
+    for title_id, title in enumerate(cleaned_titles):
+        score = SequenceMatcher(None, title, cleaned_file).ratio()
+        if score > best_score:
+            best_id, best_score = title_id, score
+    return best_id, best_score
+
+
+def run_benchmark():
+    """Index, match every file, and compare with the scan on a sample."""
+    titles, files, expected = synthetic_titles()
+    cleaned_titles = [clean_title(title) for title in titles]
+    cleaned_files = [clean_title(name) for name in files]
+
+    start = time.perf_counter()
+    index = TitleIndex(cleaned_titles)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [index.best_match(name) for name in cleaned_files]
+    match_seconds = time.perf_counter() - start
+    correct = sum(
+        title_id == target and score >= THRESHOLD
+        for (title_id, score), target in zip(results, expected, strict=True)
+    )
+
+    start = time.perf_counter()
+    agree = 0
+    for i in range(SCAN_SAMPLE):
+        agree += scan(cleaned_titles, cleaned_files[i]) == results[i]
+    scan_seconds = (time.perf_counter() - start) / SCAN_SAMPLE * TRANSCRIPTS
+
+    return {
+        "build_seconds": build_seconds,
+        "match_seconds": match_seconds,
+        "scan_seconds_estimated": scan_seconds,
+        "speedup": scan_seconds / (build_seconds + match_seconds),
+        "accuracy": correct / TRANSCRIPTS,
+        "scan_agreement": agree / SCAN_SAMPLE,
+    }
+
+
+@pytest.mark.slow
+def test_transcript_matching_benchmark():
+    """Indexed matching finds the same titles far faster than the scan."""
+    results = run_benchmark()
+    print(results)
+
+    assert results["accuracy"] >= 0.99
+    assert results["scan_agreement"] == 1.0
+    assert results["speedup"] > 20
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        shown = f"{value:,.2f}" if isinstance(value, float) else value
+        print(f"{name:>24}: {shown}")
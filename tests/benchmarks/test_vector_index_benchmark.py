@@ -0,0 +1,87 @@
+"""
+Benchmark for the embedded vector index.
+
+Indexes 200k synthetic 384-dimensional embeddings, the size of the email
+corpus, and compares IVF query latency and recall against exact search.
+"""
+
+import tempfile
+import time
+
+import numpy as np
+import pytest
+
+from src.dewey.utils.vector_index import VectorIndex
+
+DOCUMENTS = 200_000
+DIM = 384
+CLUSTERS = 1_000
+QUERIES = 200
+BATCH = 20_000
+
+
+def synthetic_embeddings(seed=7):
+    """Clustered unit vectors standing in for email embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(CLUSTERS, DIM)).astype(np.float32)
+    labels = rng.integers(0, CLUSTERS, DOCUMENTS)
+    vectors = centres[labels] + 0.5 * rng.normal(size=(DOCUMENTS, DIM)).astype(
+        np.float32,
+    )
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.choice(DOCUMENTS, QUERIES, replace=False)]
+    queries = queries + 0.1 * rng.normal(size=queries.shape).astype(np.float32)
+    return vectors, queries
+
+
+def run_benchmark():
+    """Build the index, time queries and measure recall@10."""
+    vectors, queries = synthetic_embeddings()
+    with tempfile.TemporaryDirectory() as path:
+        index = VectorIndex(path, nprobe=16, train_threshold=DOCUMENTS)
+        start = time.perf_counter()
+        for begin in range(0, DOCUMENTS, BATCH):
+            index.add(
+                [f"email:{i}" for i in range(begin, begin + BATCH)],
+                vectors[begin : begin + BATCH],
+                "email",
+            )
+        build_seconds = time.perf_counter() - start
+
+        latencies, hits = [], 0
+        for query in queries:
+            start = time.perf_counter()
+            found = index.search(query, k=10)
+            latencies.append(time.perf_counter() - start)
+            exact = np.argsort(-(vectors @ (query / np.linalg.norm(query))))[:10]
+            hits += len({int(r.doc_id[6:]) for r in found} & set(exact.tolist()))
+
+        start = time.perf_counter()
+        for query in queries[:20]:
+            np.argsort(-(vectors @ query))[:10]
+        brute_ms = (time.perf_counter() - start) / 20 * 1000
+        index.close()
+
+    return {
+        "build_seconds": build_seconds,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "brute_force_ms": brute_ms,
+        "recall_at_10": hits / (QUERIES * 10),
+    }
+
+
+@pytest.mark.slow
+def test_vector_index_benchmark():
+    """Queries over 200k documents take milliseconds with high recall."""
+    results = run_benchmark()
+    print(results)
+
+    assert results["recall_at_10"] >= 0.9
+    assert results["p95_ms"] < results["brute_force_ms"]
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        shown = f"{value:,.2f}" if isinstance(value, float) else value
+        print(f"{name:>22}: {shown}")
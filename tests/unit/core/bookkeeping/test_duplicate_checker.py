@@ -11,6 +11,7 @@ from dewey.core.bookkeeping.duplicate_checker import (
     calculate_file_hash,
     main,
 )
+from dewey.core.bookkeeping.fingerprint_index import FingerprintIndex
 
 
 class MockFileSystem(FileSystemInterface):
@@ -324,3 +325,22 @@ class TestDuplicateChecker:
 
         mock_checker_class.assert_called_once()
         mock_instance.run.assert_called_once()
+
+    def test_find_duplicate_transactions(self, tmp_path) -> None:
+        """Test transaction-level duplicates across journal files."""
+        entry = "2024-03-01 Blue Bottle\n    expenses:meals  $4.50\n    assets:checking\n"
+        (tmp_path / "2024.journal").write_text(entry)
+        (tmp_path / "copy.journal").write_text(entry)
+        with patch("dewey.core.base_script.BaseScript.__init__", return_value=None):
+            checker = DuplicateChecker(
+                ledger_dir=str(tmp_path),
+                fingerprints=FingerprintIndex(":memory:"),
+            )
+            checker.logger = MagicMock()
+
+        groups = checker.find_duplicate_transactions()
+
+        assert groups == [
+            [f"{tmp_path / '2024.journal'}:1", f"{tmp_path / 'copy.journal'}:1"],
+        ]
+        checker.logger.warning.assert_called_once()
@@ -0,0 +1,128 @@
+"""Test module for fingerprint_index.py."""
+
+import os
+from decimal import Decimal
+
+import pytest
+from dewey.core.bookkeeping.fingerprint_index import (
+    FingerprintIndex,
+    journal_fingerprints,
+    normalize_payee,
+    transaction_fingerprint,
+)
+
+ACCOUNT = "assets:checking:mercury8542"
+
+JOURNAL = """\
+2024-03-01 * Blue Bottle | latte
+    expenses:meals            $4.50
+    assets:checking:mercury8542
+
+2024-03-02 (1001) Gusto
+    expenses:payroll          $1,000.00
+    assets:checking:mercury8542  $-1,000.00
+
+2024-03-03 Opening
+    assets:checking:mercury8542  = $500
+    equity:opening
+"""
+
+
+def test_normalize_payee():
+    """Case, punctuation, spacing and hledger notes do not matter."""
+    assert normalize_payee("  BLUE-BOTTLE  Coffee | latte") == "blue bottle coffee"
+
+
+def test_fingerprint_compares_amounts_by_value():
+    """Equal amounts in different spellings give the same fingerprint."""
+    expected = transaction_fingerprint("2024-03-01", Decimal("-4.50"), "Blue Bottle", ACCOUNT)
+
+    assert transaction_fingerprint("2024-03-01", -4.5, "blue bottle", ACCOUNT) == expected
+    assert transaction_fingerprint("2024-03-01", 4.5, "blue bottle", ACCOUNT) != expected
+
+
+def test_journal_fingerprints_match_bank_rows():
+    """Elided amounts are balanced; balance assignments are skipped."""
+    fingerprints = journal_fingerprints(JOURNAL, "2024.journal")
+
+    assert [location for _, location in fingerprints] == ["2024.journal:1"] * 2 + [
+        "2024.journal:5",
+    ] * 2
+    assert (
+        transaction_fingerprint("2024-03-01", -4.5, "Blue Bottle", ACCOUNT),
+        "2024.journal:1",
+    ) in fingerprints
+    assert (
+        transaction_fingerprint("2024-03-02", -1000, "Gusto", ACCOUNT),
+        "2024.journal:5",
+    ) in fingerprints
+
+
+class TestFingerprintIndex:
+    """Tests for the FingerprintIndex class."""
+
+    @pytest.fixture()
+    def ledger(self, tmp_path):
+        """A journal directory with one year file."""
+        directory = tmp_path / "journals"
+        directory.mkdir()
+        (directory / "2024.journal").write_text(JOURNAL)
+        return directory
+
+    def test_refresh_only_rescans_changed_files(self, ledger, tmp_path):
+        """Unchanged files are skipped, changed and deleted ones updated."""
+        path = tmp_path / "index.sqlite"
+        journal = str(ledger / "2024.journal")
+        with FingerprintIndex.for_ledger(ledger, path) as index:
+            assert len(index) == 4
+
+        with FingerprintIndex(path) as index:
+            assert index.refresh_directory(ledger) == []
+
+            with open(journal, "a") as f:
+                f.write("\n2024-03-04 Stripe\n    income:sales  $-20\n    assets:bank\n")
+            assert index.refresh_directory(ledger) == [journal]
+            assert len(index) == 6
+
+            os.remove(journal)
+            index.refresh_directory(ledger)
+            assert len(index) == 0
+
+    def test_unseen_matches_repeats_one_to_one(self, ledger):
+        """A second identical transaction in a batch is still new."""
+        coffee = transaction_fingerprint("2024-03-01", -4.5, "Blue Bottle", ACCOUNT)
+        other = transaction_fingerprint("2024-03-05", -4.5, "Blue Bottle", ACCOUNT)
+
+        with FingerprintIndex.for_ledger(ledger, ":memory:") as index:
+            assert coffee in index
+            assert index.unseen([[coffee], [coffee], [other]]) == [False, True, True]
+
+    def test_duplicate_groups(self, ledger):
+        """Transactions copied into another file are reported once each."""
+        (ledger / "copy.journal").write_text(JOURNAL.split("\n\n")[0] + "\n")
+
+        with FingerprintIndex.for_ledger(ledger, ":memory:") as index:
+            assert index.duplicate_groups() == [
+                [str(ledger / "2024.journal") + ":1", str(ledger / "copy.journal") + ":1"],
+            ]
+
+    def test_unparseable_files_are_retried(self, ledger):
+        """A file that fails to parse is not marked as indexed."""
+        bad = ledger / "bad.journal"
+        bad.write_text("2024-13-45 Bad date\n    expenses:meals  $1\n")
+
+        with FingerprintIndex.for_ledger(ledger, ":memory:") as index:
+            assert index.refresh([bad]) == []
+            bad.write_text(JOURNAL)
+            assert index.refresh([bad]) == [str(bad)]
+
+    def test_backups_are_not_indexed(self, ledger):
+        """Versioned backups do not count as recorded transactions."""
+        for stamp in ("20240301120000", "20240302120000"):
+            (ledger / f"2024_{stamp}.journal").write_text(JOURNAL)
+        coffee = transaction_fingerprint("2024-03-01", -4.5, "Blue Bottle", ACCOUNT)
+
+        with FingerprintIndex.for_ledger(ledger, ":memory:") as index:
+            assert index.count(coffee) == 1
+            assert index.unseen([[coffee], [coffee]]) == [False, True]
+            assert index.duplicate_groups() == []
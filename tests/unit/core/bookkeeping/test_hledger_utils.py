@@ -281,6 +281,52 @@ class TestHledgerUpdater:
                     mock_update.assert_any_call(2023)
                     mock_update.assert_any_call(2024)
 
+    def test_engine_balances_update_journal(self):
+        """Without a subprocess runner, balances come from the journal engine."""
+        journals = {
+            "all.journal": "include 2022.journal\ninclude 2023.journal\n",
+            "2022.journal": """
+2022-01-01 Opening Balances
+    assets:checking:mercury8542    = $9,000.00
+    assets:checking:mercury9281    = $4,000.00
+    equity:opening balances
+
+2022-06-01 Deposit
+    assets:checking:mercury8542    $1,000.00
+    income:sales
+
+2022-12-31 Fee on the end date
+    assets:checking:mercury9281    $-10.00
+    expenses:fees
+""",
+            "2023.journal": """
+2023-01-01 Opening Balances
+    assets:checking:mercury8542    = $1.00
+    assets:checking:mercury9281    = $1.00
+    equity:opening balances
+""",
+        }
+        fs = MockFileSystem(
+            existing_files=set(journals),
+            file_contents={f"/books/{name}": text for name, text in journals.items()},
+        )
+        fs.file_contents["2023.journal"] = journals["2023.journal"]
+
+        with patch("dewey.core.base_script.BaseScript.__init__", return_value=None):
+            updater = HledgerUpdater(fs=fs)
+        updater.logger = MagicMock()
+        updater.journal_file = "/books/all.journal"
+
+        assert updater.get_balance("assets:checking:mercury8542", "2022-12-31") == "$10,000.00"
+        assert updater.get_balance("equity", "2022-01-01") is None
+
+        updater.update_opening_balances(2023)
+
+        updated_content = fs.written_content["2023.journal"]
+        assert "assets:checking:mercury8542    = $10,000.00" in updated_content
+        assert "assets:checking:mercury9281    = $4,000.00" in updated_content
+        assert updater._engine is None
+
     @patch("dewey.core.bookkeeping.hledger_utils.HledgerUpdater")
     def test_main(self, mock_updater_class):
         """Test the main function."""
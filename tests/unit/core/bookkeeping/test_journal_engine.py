@@ -0,0 +1,112 @@
+"""Test module for journal_engine.py."""
+
+from decimal import Decimal
+
+import pytest
+from dewey.core.bookkeeping.journal_engine import (
+    CommodityStyle,
+    JournalEngine,
+    JournalError,
+)
+
+JOURNAL = """
+; Top-level comment
+account assets:checking:mercury8542
+    ; subdirective
+
+2021-06-01 Deposit
+    assets:checking:mercury8542    $1,000.00
+    income:sales
+
+2022-01-01 Opening Balances
+    assets:checking:mercury8542    = $9,500.00
+    assets:checking:mercury9281    = $4,500.50
+    equity:opening balances
+
+2022/03/05 * Buy shares
+    assets:brokerage    10 AAPL @ $150
+    assets:checking:mercury9281    $-1,500.00 = $3,000.50
+
+2022-12-31 Year end
+    assets:checking:mercury8542    -$100
+    (budget:fees)    $20
+    expenses:fees
+
+~ monthly
+    expenses:rent    $1000
+    assets:checking:mercury8542
+"""
+
+
+@pytest.fixture()
+def engine():
+    """Fixture providing an engine over the sample journal."""
+    return JournalEngine.from_text(JOURNAL)
+
+
+class TestJournalEngine:
+    """Tests for the JournalEngine class."""
+
+    def test_end_date_is_exclusive(self, engine):
+        """Postings on the end date are left out, as with hledger -e."""
+        assert engine.balance("assets:checking:mercury8542", "2022-12-31") == {
+            "$": Decimal("9500.00"),
+        }
+        assert engine.balance("assets:checking:mercury8542", "2023-01-01") == {
+            "$": Decimal("9400.00"),
+        }
+
+    def test_query_is_case_insensitive_regex(self, engine):
+        """A query matches every account containing it."""
+        assert engine.balance("MERCURY", "2023-01-01") == {"$": Decimal("12400.50")}
+        assert engine.balance("nothing", "2023-01-01") == {}
+
+    def test_begin_date(self, engine):
+        """A begin date limits the total to a period."""
+        assert engine.balance("mercury8542", end="2022-12-31", begin="2022-01-01") == {
+            "$": Decimal("8500.00"),
+        }
+
+    def test_costs_and_virtual_postings(self, engine):
+        """Costs balance in the cost commodity; unbalanced postings still count."""
+        assert engine.balance("brokerage") == {"AAPL": Decimal(10)}
+        assert engine.balance("budget") == {"$": Decimal(20)}
+        # Everything but the unbalanced virtual posting nets to zero in dollars
+        assert engine.balance()["$"] == Decimal("-1480.00")
+
+    def test_periodic_rules_are_skipped(self, engine):
+        """Periodic transactions only apply with --forecast."""
+        assert engine.balance("rent") == {}
+
+    def test_format_amount(self, engine):
+        """Amounts are rendered in the style the journal uses."""
+        assert engine.format_amount("$", Decimal("12400.5")) == "$12,400.50"
+        assert engine.format_amount("$", Decimal("-5")) == "$-5.00"
+        assert CommodityStyle("EUR", left=False, spaced=True).format(Decimal(3)) == "3 EUR"
+
+    def test_failed_assertion_raises(self):
+        """A failing balance assertion is an error, as in hledger."""
+        with pytest.raises(JournalError, match="balance assertion failed"):
+            JournalEngine.from_text(
+                "2022-01-01 x\n    assets:a    $5 = $6\n    equity:b\n",
+            )
+
+    def test_unbalanced_transaction_raises(self):
+        """Explicit amounts must sum to zero."""
+        with pytest.raises(JournalError, match="does not balance"):
+            JournalEngine.from_text("2022-01-01 x\n    assets:a    $5\n    equity:b    $-4\n")
+
+    def test_includes(self, tmp_path):
+        """Included files are resolved relative to the including file."""
+        (tmp_path / "2022.journal").write_text(
+            "2022-01-01 Opening\n    assets:a    = $7\n    equity:opening\n",
+        )
+        (tmp_path / "2023.journal").write_text(
+            "2023-01-01 Opening\n    assets:a    = $9\n    equity:opening\n",
+        )
+        (tmp_path / "all.journal").write_text("include 20*.journal\n")
+
+        engine = JournalEngine.from_file(str(tmp_path / "all.journal"))
+
+        assert engine.balance("assets", "2023-01-01") == {"$": Decimal(7)}
+        assert engine.balance("assets") == {"$": Decimal(9)}
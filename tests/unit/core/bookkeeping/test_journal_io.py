@@ -0,0 +1,198 @@
+"""Test module for journal_io.py and the streaming journal rewriters."""
+
+import io
+import json
+import logging
+import os
+
+import pytest
+from dewey.core.bookkeeping.journal_fixer import JournalFixer, fix_journal_file
+from dewey.core.bookkeeping.journal_io import (
+    AtomicFile,
+    JsonJournalReader,
+    iter_blocks,
+    run_parallel,
+    write_json_journal,
+)
+from dewey.core.bookkeeping.transaction_categorizer import categorize_journal_file
+
+RULES = {
+    "patterns": [
+        {"regex": "payment", "category": "Income:Payment"},
+        {"regex": "grocery", "category": "Expenses:Groceries"},
+    ],
+    "default_category": "Expenses:Uncategorized",
+}
+
+
+def test_atomic_file_replaces_only_on_success(tmp_path):
+    """The target changes on a clean exit and survives errors and discards."""
+    target = tmp_path / "2023.journal"
+    target.write_text("original")
+
+    with pytest.raises(RuntimeError):
+        with AtomicFile(str(target)) as out:
+            out.write("partial")
+            raise RuntimeError
+    with AtomicFile(str(target)) as out:
+        out.write("dropped")
+        out.discard()
+    assert target.read_text() == "original"
+
+    with AtomicFile(str(target)) as out:
+        out.write("new")
+    assert target.read_text() == "new"
+    assert os.listdir(tmp_path) == ["2023.journal"]
+
+
+@pytest.mark.parametrize(
+    "journal",
+    [
+        {"account": "checking", "transactions": [{"a": 1.5}, {"b": [1, {"c": "é"}]}], "n": 7},
+        {"transactions": []},
+        {"meta": {"x": None}},
+        {},
+    ],
+)
+def test_json_round_trip_matches_json_dump(journal):
+    """Streaming a journal back out gives exactly json.dump(indent=4)."""
+    reader = JsonJournalReader(io.StringIO(json.dumps(journal)), chunk_size=3)
+    head = reader.read_head()
+    transactions = reader.transactions() if reader.has_transactions else None
+
+    out = io.StringIO()
+    write_json_journal(out, head, transactions, reader.tail)
+    assert out.getvalue() == json.dumps(journal, indent=4)
+
+
+def test_numbers_split_across_chunks():
+    """A number cut by the read buffer is not decoded early."""
+    reader = JsonJournalReader(io.StringIO('{"transactions": [12345, 6]}'), chunk_size=4)
+    reader.read_head()
+    assert list(reader.transactions()) == [12345, 6]
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 9))
+def test_numbers_split_after_point_or_exponent(chunk_size):
+    """Numbers cut after ".", "e" or a sign decode whole at any offset."""
+    journal = {"rate": 12.34, "transactions": [-1.5e10, 6e-2, 0.5], "limit": 1e3}
+    text = json.dumps(journal, indent=4)
+    reader = JsonJournalReader(io.StringIO(text), chunk_size=chunk_size)
+
+    head = reader.read_head()
+    transactions = list(reader.transactions())
+
+    assert (head, transactions, reader.tail) == (
+        {"rate": 12.34},
+        [-1.5e10, 6e-2, 0.5],
+        {"limit": 1e3},
+    )
+
+
+def test_iter_blocks():
+    """Blocks are separated by whitespace-only lines."""
+    lines = ["a\n", "b\n", "  \n", "\n", "c"]
+    assert list(iter_blocks(lines)) == [["a", "b"], ["c"]]
+
+
+def test_run_parallel_keeps_order():
+    """Results come back in input order, in-process or pooled."""
+    assert run_parallel(abs, [-1, 2, -3], workers=1) == [1, 2, 3]
+    assert run_parallel(abs, [-1, 2, -3], workers=2) == [1, 2, 3]
+
+
+class TestCategorizeJournalFile:
+    """Tests for streaming categorization."""
+
+    @pytest.fixture()
+    def journal(self, tmp_path):
+        """A JSON journal with one already categorized transaction."""
+        path = tmp_path / "jan.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "transactions": [
+                        {"description": "Client payment", "amount": 1000},
+                        {"description": "Grocery run", "amount": -50, "category": "Food"},
+                        {"description": "Coffee", "amount": -5},
+                    ],
+                },
+            ),
+        )
+        return path
+
+    def test_dry_run_reports_changes_only(self, journal):
+        """A dry run lists uncategorized transactions and leaves the file."""
+        original = journal.read_text()
+
+        changes = categorize_journal_file(str(journal), RULES, dry_run=True)
+
+        assert [(c.index, c.after) for c in changes] == [
+            (0, "Income:Payment"),
+            (2, "Expenses:Uncategorized"),
+        ]
+        assert journal.read_text() == original
+
+    def test_writes_like_json_dump(self, journal):
+        """The rewritten file matches the in-memory categorizer's output."""
+        expected = json.loads(journal.read_text())
+        for trans, category in zip(
+            expected["transactions"],
+            ["Income:Payment", "Food", "Expenses:Uncategorized"],
+            strict=True,
+        ):
+            trans["category"] = category
+
+        categorize_journal_file(str(journal), RULES)
+
+        assert journal.read_text() == json.dumps(expected, indent=4)
+        assert categorize_journal_file(str(journal), RULES) == []
+
+    def test_explicit_null_category_is_kept(self, tmp_path):
+        """Only transactions without a category key are categorized."""
+        path = tmp_path / "feb.json"
+        path.write_text(
+            json.dumps({"transactions": [{"description": "Coffee", "category": None}]}),
+        )
+
+        assert categorize_journal_file(str(path), RULES) == []
+
+    def test_overwrite_recategorizes(self, journal):
+        """With overwrite, existing categories are replaced when they differ."""
+        changes = categorize_journal_file(str(journal), RULES, overwrite=True)
+
+        assert (1, "Food", "Expenses:Groceries") in [
+            (c.index, c.before, c.after) for c in changes
+        ]
+
+
+class TestFixJournalFile:
+    """Tests for streaming journal fixing."""
+
+    CONTENT = (
+        "2023-01-01 Opening\n"
+        "    assets:checking  $100\n"
+        "    equity:opening  $-100\n"
+        "\n"
+        "; a comment block\n"
+        "\n"
+        "2023-01-02   Coffee\n"
+        "    expenses:food    $5   ; note\n"
+        "    assets:checking\n"
+    )
+
+    def test_matches_in_memory_fixer(self, tmp_path):
+        """Streaming output equals process_transactions on the whole file."""
+        path = tmp_path / "2023.journal"
+        path.write_text(self.CONTENT)
+        fixer = JournalFixer.__new__(JournalFixer)
+        fixer.logger = logging.getLogger(__name__)
+        expected = fixer.process_transactions(fixer.parse_transactions(self.CONTENT))
+
+        changes = fix_journal_file(str(path), dry_run=True)
+        assert path.read_text() == self.CONTENT
+        assert [c.index for c in changes] == [1, 2]
+
+        fix_journal_file(str(path))
+        assert path.read_text() == expected
+        assert fix_journal_file(str(path)) == []
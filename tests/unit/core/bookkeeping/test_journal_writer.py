@@ -0,0 +1,72 @@
+"""Test module for journal_writer.py."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from dewey.core.bookkeeping.journal_writer import JournalWriter
+
+BANK = "    assets:checking:mercury8542\n"
+COFFEE = "2024-03-01 Blue Bottle\n    expenses:meals  $4.50\n" + BANK
+PAYROLL = "2024-03-02 Gusto\n    expenses:payroll  $1000\n" + BANK
+STRIPE = "2024-03-04 Stripe\n    income:sales  $-20\n" + BANK
+
+
+class DictConfig:
+    """Config source backed by a dict."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get_config_value(self, key, default=None):
+        """Return the configured value or the default."""
+        return self.values.get(key, default)
+
+
+class TestJournalWriter:
+    """Tests for the JournalWriter class."""
+
+    @pytest.fixture()
+    def journal_dir(self, tmp_path):
+        """An empty journal directory."""
+        return tmp_path / "journals"
+
+    def make_writer(self, journal_dir):
+        """A writer for the journal directory with a mock logger."""
+        with patch("dewey.core.base_script.BaseScript.__init__", return_value=None):
+            writer = JournalWriter(
+                config_source=DictConfig({"journal_dir": str(journal_dir)}),
+            )
+        writer.logger = MagicMock()
+        return writer
+
+    def test_rerun_writes_nothing(self, journal_dir):
+        """Entries already in the ledger are not written again."""
+        self.make_writer(journal_dir).write_entries({"2024": [COFFEE, PAYROLL]})
+        journal = journal_dir / "8542_2024.journal"
+        first = journal.read_text()
+
+        self.make_writer(journal_dir).write_entries({"2024": [COFFEE, PAYROLL]})
+
+        assert journal.read_text() == first
+        assert sorted(p.name for p in journal_dir.glob("*.journal")) == [
+            "8542_2024.journal",
+        ]
+
+    def test_new_entries_are_appended(self, journal_dir):
+        """New entries go after the existing text, which is backed up."""
+        writer = self.make_writer(journal_dir)
+        writer.write_entries({"2024": [COFFEE, PAYROLL]})
+        journal = journal_dir / "8542_2024.journal"
+        first = journal.read_text()
+
+        writer.write_entries({"2024": [PAYROLL, STRIPE]})
+
+        text = journal.read_text()
+        assert text.startswith(first.rstrip("\n"))
+        assert text.endswith(STRIPE + "\n")
+        assert text.count("Gusto") == 1
+        assert len(list(journal_dir.glob("8542_2024_*.journal"))) == 1
+        # The backup holds the earlier text and is not indexed
+        assert self.make_writer(journal_dir).filter_new_entries([COFFEE, COFFEE]) == [
+            COFFEE,
+        ]
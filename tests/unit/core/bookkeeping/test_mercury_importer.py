@@ -0,0 +1,46 @@
+"""Test module for mercury_importer.py."""
+
+from unittest.mock import MagicMock, patch
+
+from dewey.core.bookkeeping.fingerprint_index import FingerprintIndex
+from dewey.core.bookkeeping.mercury_importer import MercuryImporter
+
+JOURNAL = """\
+2024-03-01 Blue Bottle
+    expenses:meals  $4.50
+    assets:checking:mercury8542
+"""
+
+
+def make_row(day, description, amount, is_income=False):
+    """A validated Mercury row."""
+    return {
+        "date": day,
+        "description": description,
+        "amount": amount,
+        "is_income": is_income,
+        "account_id": "8542",
+    }
+
+
+def test_filter_new_transactions(tmp_path):
+    """Rows already in the ledger are dropped, repeats beyond it are kept."""
+    (tmp_path / "8542_2024.journal").write_text(JOURNAL)
+    with patch("dewey.core.base_script.BaseScript.__init__", return_value=None):
+        importer = MercuryImporter(
+            fingerprints=FingerprintIndex.for_ledger(tmp_path, ":memory:"),
+        )
+    importer.logger = MagicMock()
+    recorded = make_row("2024-03-01", "BLUE BOTTLE", 4.5)
+    second = make_row("2024-03-01", "Blue Bottle", 4.5)
+    refund = make_row("2024-03-01", "Blue Bottle", 4.5, is_income=True)
+
+    with patch.object(
+        MercuryImporter,
+        "get_config_value",
+        side_effect=lambda key, default=None: default,
+    ):
+        new_rows = importer.filter_new_transactions([recorded, second, refund])
+
+    assert new_rows == [second, refund]
+    importer.logger.info.assert_called_once()
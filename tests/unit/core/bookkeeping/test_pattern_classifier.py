@@ -0,0 +1,102 @@
+"""Test module for pattern_classifier.py."""
+
+import random
+import re
+
+import pytest
+from dewey.core.bookkeeping.pattern_classifier import (
+    PatternClassifier,
+    required_literals,
+)
+
+
+def test_required_literals():
+    """Only text every match must contain is used for the prefilter."""
+    assert required_literals(r"blue\s+bottle") == ["blue", "bottle"]
+    assert required_literals(r"amazon\.com") == ["amazon.com"]
+    assert required_literals("ab?cde") == ["a", "cde"]
+    assert required_literals("(foo)?bar[xy]baz") == ["bar", "baz"]
+    assert required_literals("gusto|adp") == []
+    assert required_literals("(?i)coffee") == []
+
+
+class TestPatternClassifier:
+    """Tests for the PatternClassifier class."""
+
+    def test_first_rule_wins_not_leftmost_match(self):
+        """Priority follows rule order, not position in the description."""
+        classifier = PatternClassifier([("coffee", "meals"), ("shop", "supplies")])
+
+        assert classifier.classify("SHOP coffee") == "meals"
+        assert classifier.classify("shop") == "supplies"
+        assert classifier.classify("rent", "unknown") == "unknown"
+
+    def test_anchors_keep_search_semantics(self):
+        """^ and $ still refer to the start and end of the description."""
+        classifier = PatternClassifier([("^stripe", "income"), ("fee$", "fees")])
+
+        assert classifier.classify("stripe payout") == "income"
+        assert classifier.classify("payout stripe") is None
+        assert classifier.classify("wire fee") == "fees"
+        assert classifier.classify("fee refund") is None
+
+    def test_standalone_patterns_keep_their_place(self):
+        """Backreferences and clashing group names are matched on their own."""
+        classifier = PatternClassifier(
+            [
+                (r"(\d)\1", "repeat"),
+                ("(?P<x>amazon)", "shopping"),
+                ("(?P<x>aws)", "software"),
+                ("a", "fallback"),
+            ],
+        )
+
+        assert classifier.classify("order 55 amazon") == "repeat"
+        assert classifier.classify("aws amazon") == "shopping"
+        assert classifier.classify("aws") == "software"
+        assert classifier.all_matches("amazon aws 11") == [0, 1, 2, 3]
+
+    def test_prefilter_skips_rules_without_shared_trigrams(self):
+        """Literal rules are indexed; only the rest share a combined regex."""
+        classifier = PatternClassifier(
+            [(r"blue\s+bottle", "meals"), (r"\d{4}", "numbered"), ("ab", "short")],
+        )
+
+        assert sorted(i for ids in classifier.index.values() for i in ids) == [0]
+        assert classifier.classify("BLUE  BOTTLE 1234") == "meals"
+        assert classifier.classify("blue 1234 bottle") == "numbered"
+        assert classifier.classify("Café blue bottle") == "meals"
+
+    def test_invalid_pattern_raises(self):
+        """Invalid patterns are reported as regex errors."""
+        with pytest.raises(re.error):
+            PatternClassifier([("ok", 1), ("(unclosed", 2)])
+
+    def test_classify_many_matches_each_description_once(self):
+        """Batches return one result per input and reuse repeated ones."""
+        classifier = PatternClassifier([("gusto", "payroll")])
+
+        results = classifier.classify_many(["Gusto", "Gusto", "other"], "none")
+
+        assert results == ["payroll", "payroll", "none"]
+        assert classifier.first_match.cache_info().misses == 2
+
+    def test_agrees_with_search_loop(self):
+        """Combined chunks give the same answers as searching rule by rule."""
+        rng = random.Random(3)
+        words = ["ab", "bc", "ca", "xyz", "q", "a.c", "b+", "^ab", "c$", "(a|q)"]
+        patterns = [
+            "".join(rng.choice(words) for _ in range(rng.randint(1, 2)))
+            for _ in range(200)
+        ]
+        classifier = PatternClassifier(
+            [(pattern, i) for i, pattern in enumerate(patterns)], chunk_size=64,
+        )
+
+        for _ in range(500):
+            text = "".join(rng.choice("abcxyzq ") for _ in range(rng.randint(0, 20)))
+            expected = [
+                i for i, pattern in enumerate(patterns) if re.search(pattern, text, re.I)
+            ]
+            assert classifier.all_matches(text) == expected
+            assert classifier.classify(text) == (expected[0] if expected else None)
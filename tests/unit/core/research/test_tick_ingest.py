@@ -0,0 +1,249 @@
+"""Unit tests for tick ingestion against a local fake Polygon server."""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import duckdb
+from dewey.core.research.port.tick_ingest import (
+    PolygonClient,
+    TickIngestor,
+    TickStore,
+    next_url,
+    trading_days,
+    transform_page,
+)
+
+# Nanoseconds since the epoch of 2024-01-02 14:30 UTC
+OPEN_NS = 1704205800 * 10**9
+
+
+def fake_trades(ticker: str, day: str, count: int = 5) -> list[dict]:
+    """Deterministic trades for a ticker and day."""
+    offset = (date.fromisoformat(day) - date(2024, 1, 2)).days * 86400 * 10**9
+    return [
+        {
+            "id": f"{ticker}{i}",
+            "sip_timestamp": OPEN_NS + offset + i * 1000,
+            "price": 100.0 + i,
+            "size": 10 * (i + 1),
+            "conditions": [12, 37] if i % 2 else None,
+            "sequence_number": i,
+            "exchange": 4,
+        }
+        for i in range(count)
+    ]
+
+
+class FakePolygon(BaseHTTPRequestHandler):
+    """Serves /v3/trades pages of two trades with next_url cursors."""
+
+    page_size = 2
+    throttle_first = False
+    requests: list[str] = []
+
+    def log_message(self, *args) -> None:
+        """Keep test output quiet."""
+
+    def do_GET(self) -> None:
+        """Answer a trades request."""
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        type(self).requests.append(self.path)
+        if query.get("apiKey") != "test-key":
+            self._send(401, {"status": "ERROR"})
+            return
+        if type(self).throttle_first:
+            type(self).throttle_first = False
+            self._send(429, {"status": "ERROR"}, {"Retry-After": "0"})
+            return
+        ticker = url.path.rsplit("/", 1)[1]
+        day, cursor = query.get("timestamp"), int(query.get("cursor", 0))
+        if "cursor" in query:
+            day = query["day"]
+        trades = fake_trades(ticker, day) if ticker != "EMPTY" else []
+        end = cursor + self.page_size
+        body = {"status": "OK", "results": trades[cursor:end]}
+        if end < len(trades):
+            host = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+            body["next_url"] = f"{host}{url.path}?cursor={end}&day={day}"
+        self._send(200, body)
+
+    def _send(self, status: int, body: dict, headers: dict | None = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TestTickIngest(unittest.TestCase):
+    """Test suite for PolygonClient, TickStore and TickIngestor."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start the fake Polygon server."""
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakePolygon)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        host, port = cls.server.server_address
+        cls.base_url = f"http://{host}:{port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the fake Polygon server."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """Create an empty store and a client for the fake server."""
+        FakePolygon.requests = []
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = TickStore(Path(self.temp_dir.name) / "ticks")
+        self.client = PolygonClient("test-key", base_url=self.base_url, backoff=0)
+
+    def tearDown(self):
+        """Remove the store."""
+        self.temp_dir.cleanup()
+
+    def test_pages_follow_cursor(self):
+        """Every page of a day is fetched and the key is sent each time."""
+        pages = list(self.client.iter_trade_pages("AAPL", date(2024, 1, 2)))
+
+        self.assertEqual(
+            [len(json.loads(page)["results"]) for page in pages], [2, 2, 1],
+        )
+        self.assertEqual(len(FakePolygon.requests), 3)
+        self.assertTrue(all("apiKey=test-key" in path for path in FakePolygon.requests))
+
+    def test_retries_rate_limited_requests(self):
+        """A 429 response is retried."""
+        FakePolygon.throttle_first = True
+
+        pages = list(self.client.iter_trade_pages("AAPL", date(2024, 1, 2)))
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(len(FakePolygon.requests), 4)
+
+    def test_next_url(self):
+        """The cursor is found without decoding the trades."""
+        page = json.dumps(
+            {"results": [{"id": "1"}], "next_url": "https://api.polygon.io/v3/trades/A?cursor=x%2F"},
+        )
+
+        self.assertEqual(next_url(page), "https://api.polygon.io/v3/trades/A?cursor=x%2F")
+        self.assertIsNone(next_url('{"results": []}'))
+
+    def test_transform(self):
+        """Conditions are joined and SIP timestamps converted to UTC."""
+        page = json.dumps({"results": fake_trades("AAPL", "2024-01-02", 2)})
+        with duckdb.connect() as con:
+            df = transform_page(con, page)
+
+        self.assertEqual(df["trade_id"].tolist(), ["AAPL0", "AAPL1"])
+        self.assertEqual(str(df["timestamp"][1]), "2024-01-02 14:30:00.000001")
+        self.assertTrue(df["conditions"].isna()[0])
+        self.assertEqual(df["conditions"][1], "12,37")
+
+    def test_ingest_writes_partitioned_zstd_parquet(self):
+        """Each ticker and day gets its own compressed partition."""
+        days = [date(2024, 1, 2), date(2024, 1, 3)]
+        ingestor = TickIngestor(self.client, self.store, workers=4)
+        try:
+            counts = ingestor.ingest(["AAPL", "MSFT", "EMPTY"], days)
+        finally:
+            ingestor.close()
+
+        self.assertEqual(counts[("AAPL", days[0])], 5)
+        self.assertEqual(counts[("EMPTY", days[1])], 0)
+        files = sorted(Path(self.store.root).rglob("*.parquet"))
+        self.assertEqual(len(files), 12)
+        self.assertEqual(
+            files[0].relative_to(self.store.root).as_posix(),
+            "ticker=AAPL/date=2024-01-02/part-00000.parquet",
+        )
+        with duckdb.connect() as con:
+            codecs = con.execute(
+                "SELECT DISTINCT compression FROM parquet_metadata(?)", [str(files[0])],
+            ).fetchall()
+        self.assertEqual(codecs, [("ZSTD",)])
+
+    def test_view_scans_only_matching_partitions(self):
+        """A ticker range scan never opens other tickers' files."""
+        ingestor = TickIngestor(self.client, self.store)
+        try:
+            ingestor.ingest(["AAPL", "MSFT"], [date(2024, 1, 2), date(2024, 1, 3)])
+            # Re-ingesting a day replaces it rather than adding to it
+            ingestor.ingest(["AAPL"], [date(2024, 1, 3)])
+        finally:
+            ingestor.close()
+        for path in self.store.partition("MSFT", date(2024, 1, 2)).iterdir():
+            path.write_bytes(b"not parquet")
+
+        with duckdb.connect() as con:
+            self.assertTrue(self.store.create_view(con))
+            df = self.store.scan(con, "AAPL", date(2024, 1, 1), date(2024, 1, 3))
+
+        self.assertEqual(len(df), 10)
+        self.assertEqual(df["date"].astype(str).unique().tolist(), ["2024-01-02", "2024-01-03"])
+
+    def test_failed_pairs_are_left_out(self):
+        """Errors for one pair do not stop the others."""
+        client = PolygonClient("wrong-key", base_url=self.base_url)
+        ingestor = TickIngestor(client, self.store)
+        try:
+            counts = ingestor.ingest(["AAPL"], [date(2024, 1, 2)])
+        finally:
+            ingestor.close()
+
+        self.assertEqual(counts, {})
+        with duckdb.connect() as con:
+            self.assertFalse(self.store.create_view(con))
+
+    def test_failed_swap_keeps_previous_day(self):
+        """If the new partition cannot be moved in, the old one is restored."""
+        day = date(2024, 1, 2)
+        ingestor = TickIngestor(self.client, self.store)
+        try:
+            ingestor.ingest(["AAPL"], [day])
+        finally:
+            ingestor.close()
+        final = self.store.partition("AAPL", day)
+        before = sorted(path.name for path in final.iterdir())
+        real_replace = os.replace
+
+        def fail_swap_in(src, dst):
+            if Path(dst) == final and not Path(src).name.endswith(".old"):
+                raise OSError("disk full")
+            real_replace(src, dst)
+
+        pages = self.client.iter_trade_pages("AAPL", day)
+        with duckdb.connect() as con, mock.patch(
+            "dewey.core.research.port.tick_ingest.os.replace", fail_swap_in,
+        ):
+            with self.assertRaises(OSError):
+                self.store.write_day(con, "AAPL", day, pages)
+
+        self.assertEqual(sorted(path.name for path in final.iterdir()), before)
+        self.assertEqual([p.name for p in final.parent.iterdir()], [final.name])
+
+    def test_trading_days(self):
+        """Weekends are skipped."""
+        self.assertEqual(
+            trading_days(date(2024, 1, 5), date(2024, 1, 8)),
+            [date(2024, 1, 5), date(2024, 1, 8)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
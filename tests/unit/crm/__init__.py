@@ -0,0 +1,5 @@
+"""
+CRM test package.
+
+This package contains tests for the dewey.core.crm module.
+"""
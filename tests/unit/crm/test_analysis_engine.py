@@ -0,0 +1,145 @@
+"""Tests for the concurrent email analysis engine."""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from dewey.core.crm.email_classifier.analysis_engine import (
+    AnalysisEngine,
+    TokenBucket,
+    is_transient_error,
+)
+from dewey.llm.exceptions import LLMRateLimitError
+
+
+class FakeResponse:
+    """Just enough of an HTTP response for error classification."""
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class HTTPFailure(Exception):
+    """Exception carrying a response, like requests.HTTPError."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code)
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests for TokenBucket."""
+
+    def test_limits_sustained_rate_after_burst(self):
+        """Requests beyond the burst are spaced at the bucket's rate."""
+        bucket = TokenBucket(rate=50, capacity=5)
+
+        async def take(n):
+            for _ in range(n):
+                await bucket.acquire()
+
+        started = time.monotonic()
+        asyncio.run(take(15))
+        elapsed = time.monotonic() - started
+
+        # 5 tokens are free, the other 10 arrive at 50/s
+        self.assertGreaterEqual(elapsed, 0.18)
+        self.assertLess(elapsed, 1.0)
+
+
+class TestIsTransientError(unittest.TestCase):
+    """Tests for is_transient_error."""
+
+    def test_classification(self):
+        """Rate limits, timeouts and 5xx are retried; client errors are not."""
+        self.assertTrue(is_transient_error(LLMRateLimitError("slow down")))
+        self.assertTrue(is_transient_error(TimeoutError()))
+        self.assertTrue(is_transient_error(HTTPFailure(503)))
+        self.assertTrue(is_transient_error(HTTPFailure(429)))
+        self.assertFalse(is_transient_error(HTTPFailure(400)))
+        self.assertFalse(is_transient_error(ValueError("bad json")))
+
+
+class TestAnalysisEngine(unittest.TestCase):
+    """Tests for AnalysisEngine."""
+
+    def test_keeps_requests_in_flight_and_batches_writes(self):
+        """Analyses overlap up to the concurrency limit; writes are batched."""
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+        batches = []
+
+        def analyze(item):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return item * 2
+
+        engine = AnalysisEngine(
+            analyze, batches.append, concurrency=8, write_batch_size=10,
+        )
+        started = time.monotonic()
+        stats = engine.run(range(80))
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(peak, 8)
+        self.assertLess(elapsed, 80 * 0.02 / 2)
+        self.assertEqual(sorted(r for b in batches for r in b), list(range(0, 160, 2)))
+        self.assertTrue(all(len(b) <= 10 for b in batches))
+        self.assertEqual(stats["analyzed"], 80)
+        self.assertEqual(stats["stored"], 80)
+
+    def test_retries_transient_errors_and_falls_back(self):
+        """Transient errors are retried; permanent ones go to on_error."""
+        attempts = {}
+        stored = []
+
+        async def analyze(item):
+            attempts[item] = attempts.get(item, 0) + 1
+            if item == "flaky" and attempts[item] < 3:
+                raise HTTPFailure(503)
+            if item == "broken":
+                raise ValueError("unparseable response")
+            return item
+
+        engine = AnalysisEngine(
+            analyze,
+            stored.extend,
+            concurrency=2,
+            retry_base_delay=0.001,
+            on_error=lambda item, e: f"fallback:{item}",
+        )
+        stats = engine.run(["ok", "flaky", "broken"])
+
+        self.assertEqual(attempts, {"ok": 1, "flaky": 3, "broken": 1})
+        self.assertEqual(sorted(stored), ["fallback:broken", "flaky", "ok"])
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(stats["failed"], 1)
+
+    def test_gives_up_after_max_attempts(self):
+        """An item that keeps failing transiently is attempted max_attempts times."""
+        calls = []
+
+        def analyze(item):
+            calls.append(item)
+            raise TimeoutError
+
+        engine = AnalysisEngine(
+            analyze, lambda batch: None, max_attempts=3, retry_base_delay=0.001,
+        )
+        stats = engine.run(["slow"])
+
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["stored"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Tests for the staged email processing pipeline.
+
+This module tests batching, error isolation, backpressure, stopping and
+running the work in processes.
+"""
+
+import os
+import threading
+import time
+import unittest
+
+from src.dewey.core.crm.gmail.email_pipeline import EmailPipeline
+
+
+def square_in_process(item):
+    """Square an item and report the process that did it."""
+    if item == 3:
+        raise ValueError("bad email")
+    return item * item, os.getpid()
+
+
+class TestEmailPipeline(unittest.TestCase):
+    """Test the reader -> workers -> writer pipeline."""
+
+    def setUp(self):
+        """Collect written batches and the threads that wrote them."""
+        self.written = []
+        self.writer_threads = set()
+
+    def _write(self, batch):
+        self.writer_threads.add(threading.current_thread().name)
+        self.written.append(list(batch))
+
+    def test_all_items_written_in_batches(self):
+        """Test that every result is written once, by a single writer thread."""
+        pipeline = EmailPipeline(
+            read_batches=lambda: ([i * 10 + j for j in range(10)] for i in range(10)),
+            process=lambda item: item * 2,
+            write_batch=self._write,
+            workers=4,
+            write_batch_size=25,
+        )
+
+        stats = pipeline.run()
+
+        results = [r for batch in self.written for r in batch]
+        self.assertEqual(sorted(results), [i * 2 for i in range(100)])
+        self.assertTrue(all(len(batch) <= 25 for batch in self.written))
+        self.assertEqual(self.writer_threads, {"pipeline-writer"})
+        self.assertEqual(stats["reader"]["items"], 100)
+        self.assertEqual(stats["writer"]["items"], 100)
+        self.assertEqual(stats["work_queue_depth"], 0)
+
+    def test_processes_run_work_outside_this_process(self):
+        """Test that with processes the work runs in a pool, errors included."""
+        failed = []
+        pipeline = EmailPipeline(
+            read_batches=lambda: [list(range(8))],
+            process=square_in_process,
+            write_batch=self._write,
+            workers=2,
+            on_error=lambda item, e: failed.append((item, str(e))),
+            processes=True,
+        )
+
+        stats = pipeline.run()
+
+        results = [r for batch in self.written for r in batch]
+        self.assertEqual(
+            sorted(value for value, _pid in results),
+            [i * i for i in range(8) if i != 3],
+        )
+        self.assertNotIn(os.getpid(), {pid for _value, pid in results})
+        self.assertEqual(failed, [(3, "bad email")])
+        self.assertEqual(stats["workers"]["errors"], 1)
+        self.assertEqual(self.writer_threads, {"pipeline-writer"})
+
+    def test_worker_errors_are_isolated(self):
+        """Test that a failing item is counted and the rest still written."""
+
+        def process(item):
+            if item == 3:
+                raise ValueError("bad email")
+            return item
+
+        pipeline = EmailPipeline(
+            read_batches=lambda: [list(range(6))],
+            process=process,
+            write_batch=self._write,
+            workers=2,
+        )
+
+        stats = pipeline.run()
+
+        self.assertEqual(sorted(r for b in self.written for r in b), [0, 1, 2, 4, 5])
+        self.assertEqual(stats["workers"]["errors"], 1)
+
+    def test_partial_batch_flushed_after_interval(self):
+        """Test that a slow trickle of results is not held back."""
+
+        def read_batches():
+            yield [1]
+            time.sleep(0.2)
+            yield [2]
+
+        pipeline = EmailPipeline(
+            read_batches=read_batches,
+            process=lambda item: item,
+            write_batch=self._write,
+            workers=1,
+            write_batch_size=100,
+            flush_interval=0.05,
+        )
+
+        pipeline.run()
+
+        self.assertEqual(self.written, [[1], [2]])
+
+    def test_bounded_queues_apply_backpressure(self):
+        """Test that a slow writer stops the reader from running ahead."""
+        depths = []
+
+        def slow_write(batch):
+            depths.append(pipeline.work_queue.qsize())
+            time.sleep(0.01)
+
+        pipeline = EmailPipeline(
+            read_batches=lambda: ([i] for i in range(200)),
+            process=lambda item: item,
+            write_batch=slow_write,
+            workers=2,
+            queue_size=5,
+            write_batch_size=1,
+        )
+
+        stats = pipeline.run()
+
+        self.assertEqual(stats["writer"]["items"], 200)
+        self.assertLessEqual(max(depths), 5)
+
+    def test_stop_halts_reading(self):
+        """Test that stop() ends the run without reading everything."""
+        pipeline = EmailPipeline(
+            read_batches=lambda: ([i] for i in range(10_000)),
+            process=lambda item: item,
+            write_batch=lambda batch: time.sleep(0.001),
+            workers=1,
+            queue_size=2,
+            write_batch_size=1,
+        )
+        threading.Timer(0.05, pipeline.stop).start()
+
+        stats = pipeline.run()
+
+        self.assertLess(stats["reader"]["items"], 10_000)
+        self.assertEqual(stats["writer"]["items"], stats["workers"]["items"])
+
+
+if __name__ == "__main__":
+    unittest.main()
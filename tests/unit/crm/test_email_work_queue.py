@@ -0,0 +1,104 @@
+"""
+Tests for the email work queue.
+
+This module tests claim pagination, leasing and enqueueing SQL.
+"""
+
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from src.dewey.core.crm.gmail.email_work_queue import EPOCH, EmailWorkQueue
+
+
+class TestEmailWorkQueue(unittest.TestCase):
+    """Test the lease-based email work queue."""
+
+    def setUp(self):
+        """Patch the PostgreSQL cursor factory."""
+        self.cursor = MagicMock()
+        self.cursor.rowcount = 0
+        self.cursor_patcher = patch(
+            "src.dewey.core.crm.gmail.email_work_queue.get_db_cursor",
+        )
+        self.mock_get_cursor = self.cursor_patcher.start()
+        self.mock_get_cursor.return_value.__enter__.return_value = self.cursor
+        self.queue = EmailWorkQueue(owner="worker-1", max_attempts=3)
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.cursor_patcher.stop()
+
+    def test_claim_skips_locked_rows_and_pages_by_keyset(self):
+        """Test that claims lease rows newest first and continue below the last."""
+        self.cursor.fetchall.return_value = [
+            ("b", datetime(2024, 1, 1)),
+            ("c", datetime(2024, 1, 2)),
+            ("a", datetime(2024, 1, 1)),
+        ]
+
+        claimed = self.queue.claim(3)
+
+        self.assertEqual(claimed, ["c", "b", "a"])
+        query, params = self.cursor.execute.call_args.args
+        self.assertIn("FOR UPDATE SKIP LOCKED", query)
+        self.assertNotIn("(internal_date, message_id) <", query)
+        self.assertEqual(params, [3, 3, "worker-1", 600])
+
+        self.cursor.fetchall.return_value = []
+        self.assertEqual(self.queue.claim(3), [])
+        query, params = self.cursor.execute.call_args.args
+        self.assertIn("(internal_date, message_id) < (%s, %s)", query)
+        self.assertEqual(params[1:3], [datetime(2024, 1, 1), "a"])
+
+    def test_complete_only_own_leases(self):
+        """Test that completion is scoped to this owner's leases."""
+        self.assertEqual(self.queue.complete([]), 0)
+        self.cursor.execute.assert_not_called()
+
+        self.queue.complete(["a", "b"])
+
+        query, params = self.cursor.execute.call_args.args
+        self.assertIn("lease_owner = %s", query)
+        self.assertEqual(params, [["a", "b"], "worker-1"])
+
+    def test_fail_parks_after_max_attempts(self):
+        """Test that failures are parked once attempts are used up."""
+        self.queue.fail("a", "boom")
+
+        query, params = self.cursor.execute.call_args.args
+        self.assertIn("WHEN attempts >= %s THEN 'failed'", query)
+        self.assertEqual(params, [3, "boom", "a", "worker-1"])
+
+    @patch("src.dewey.core.crm.gmail.email_work_queue.insert_many")
+    def test_enqueue_leaves_queued_emails_alone(self, mock_insert_many):
+        """Test that enqueueing only inserts IDs missing from the queue."""
+        mock_insert_many.return_value = 1
+        received = datetime(2024, 1, 1)
+
+        self.assertEqual(self.queue.enqueue([("a", received)], status="done"), 1)
+
+        table, rows = mock_insert_many.call_args.args
+        self.assertEqual(table, "email_work_queue")
+        self.assertEqual(list(rows), [("a", received, "done")])
+        kwargs = mock_insert_many.call_args.kwargs
+        self.assertEqual(kwargs["conflict_target"], ["message_id"])
+
+    @patch("src.dewey.core.crm.gmail.email_work_queue.insert_many")
+    def test_missing_dates_are_queued_as_epoch(self, mock_insert_many):
+        """Test that emails without an internal_date get a comparable one."""
+        self.queue.enqueue([("a", None)])
+
+        rows = list(mock_insert_many.call_args.args[1])
+        self.assertEqual(rows, [("a", EPOCH, "pending")])
+
+        self.cursor.fetchall.return_value = [
+            ("a", EPOCH),
+            ("b", datetime(2024, 1, 1)),
+        ]
+        self.assertEqual(self.queue.claim(2), ["b", "a"])
+        self.assertEqual(self.queue._cursor, (EPOCH, "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
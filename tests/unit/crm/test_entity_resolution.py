@@ -0,0 +1,134 @@
+"""Tests for blocking-key contact entity resolution."""
+
+import unittest
+
+import numpy as np
+
+from dewey.core.crm.contacts.entity_resolution import (
+    ContactRecord,
+    EntityResolver,
+    UnionFind,
+    bigram_vectors,
+    canonical_email,
+    dice_similarity,
+    phone_suffix,
+    soundex,
+)
+
+
+class TestKeys(unittest.TestCase):
+    """Tests for the normalization and blocking helpers."""
+
+    def test_soundex(self):
+        """Standard Soundex codes, including the h/w rule."""
+        self.assertEqual(soundex("robert"), "r163")
+        self.assertEqual(soundex("rupert"), "r163")
+        self.assertEqual(soundex("ashcraft"), "a261")
+        self.assertEqual(soundex("lee"), "l000")
+        self.assertEqual(soundex(""), "")
+
+    def test_canonical_email_and_phone(self):
+        """Display names and formatting are stripped."""
+        self.assertEqual(
+            canonical_email("Jane Doe <Jane.Doe@Acme.com>"), "jane.doe@acme.com",
+        )
+        self.assertIsNone(canonical_email("not an address"))
+        self.assertEqual(phone_suffix("+1 (555) 123-4567"), "1234567")
+        self.assertIsNone(phone_suffix("12345"))
+
+    def test_record_names_and_block_keys(self):
+        """Names fall back to the display name; free-mail domains do not block."""
+        record = ContactRecord.from_contact(
+            {"email": "Zoë Smith <zoe.smith+news@gmail.com>", "phone": None},
+        )
+
+        self.assertEqual(record.name, "zoe smith")
+        self.assertEqual(record.local, "zoesmith")
+        self.assertEqual(record.block_keys(), {"local:zoesmith", "name:z000:s530"})
+
+    def test_dice_similarity(self):
+        """Identical strings score 1 and unrelated ones near 0."""
+        left = bigram_vectors(["jane doe", "jane doe", ""])
+        right = bigram_vectors(["jane doe", "xyz", ""])
+
+        np.testing.assert_allclose(dice_similarity(left, right), [1.0, 0.0, 0.0])
+
+
+class TestUnionFind(unittest.TestCase):
+    """Tests for UnionFind."""
+
+    def test_earliest_member_is_root(self):
+        """Joining sets keeps the root that was added first."""
+        sets = UnionFind()
+        for item in "abcd":
+            sets.add(item)
+        sets.union("d", "c")
+        sets.union("c", "b")
+
+        self.assertEqual(sets.find("d"), "b")
+        self.assertEqual(sets.find("a"), "a")
+
+
+class TestEntityResolver(unittest.TestCase):
+    """Tests for EntityResolver."""
+
+    def record(self, email, first="", last="", phone=None):
+        """Build a record from raw fields."""
+        return ContactRecord.from_contact(
+            {"email": email, "first_name": first, "last_name": last, "phone": phone},
+        )
+
+    def test_merges_variants_within_blocks(self):
+        """Same-domain name variants and shared phones merge; others do not."""
+        resolver = EntityResolver()
+        resolver.add(
+            [
+                self.record("jane.doe@acme.com", "Jane", "Doe"),
+                self.record("jdoe@acme.com", "Jane", "Doe"),
+                self.record("jane@gmail.com", "Jane", "Doe", "555-123-4567"),
+                self.record("doe.j@other.org", "Jane", "Doe", "+1 555 123 4567"),
+                self.record("john.doe@acme.com", "John", "Doe"),
+            ],
+        )
+        entities = resolver.entities()
+
+        self.assertEqual(entities["jdoe@acme.com"], "jane.doe@acme.com")
+        self.assertEqual(entities["doe.j@other.org"], "jane@gmail.com")
+        self.assertEqual(entities["john.doe@acme.com"], "john.doe@acme.com")
+
+    def test_incremental_add_only_scores_new_records(self):
+        """Seeded records keep their entity and are not compared to each other."""
+        resolver = EntityResolver()
+        resolver.seed(self.record("jane.doe@acme.com", "Jane", "Doe"), "jane@acme.com")
+        resolver.seed(self.record("janedoe@acme.com", "Jane", "Doe"), "janedoe@acme.com")
+
+        matches = resolver.add([self.record("jane.d@acme.com", "Jane", "Doe")])
+
+        self.assertEqual(
+            {(a, b) for a, b, _ in matches},
+            {
+                ("jane.doe@acme.com", "jane.d@acme.com"),
+                ("janedoe@acme.com", "jane.d@acme.com"),
+            },
+        )
+        # The new record bridged two entities; the one seeded first wins
+        self.assertEqual(resolver.entity("janedoe@acme.com"), "jane@acme.com")
+
+    def test_oversized_blocks_are_skipped(self):
+        """A record joining a block at the size cap is not compared within it."""
+        resolver = EntityResolver(max_block_size=2)
+        resolver.add(
+            [
+                self.record("jane.doe@acme.com", "Jane", "Doe"),
+                self.record("janedoe@acme.com", "Jane", "Doe"),
+                self.record("jane.d@acme.com", "Jane", "Doe"),
+            ],
+        )
+        entities = resolver.entities()
+
+        self.assertEqual(entities["janedoe@acme.com"], "jane.doe@acme.com")
+        self.assertEqual(entities["jane.d@acme.com"], "jane.d@acme.com")
+        self.assertEqual(len(resolver.blocks["domain:acme.com"]), 3)
+
+if __name__ == "__main__":
+    unittest.main()
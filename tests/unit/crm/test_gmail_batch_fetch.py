@@ -0,0 +1,160 @@
+"""
+Tests for Gmail batch fetching.
+
+This module runs the batch fetcher against a local fake of the Gmail batch
+endpoint that answers with recorded responses.
+"""
+
+import json
+import re
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import requests
+except ImportError:  # pragma: no cover
+    requests = None
+
+from src.dewey.core.crm.gmail.batch_fetch import AdaptiveThrottle, GmailBatchFetcher
+
+RECORDED_MESSAGE = {
+    "id": "",
+    "threadId": "18c2f0a1b2c3d4e5",
+    "labelIds": ["INBOX", "UNREAD"],
+    "snippet": "Quarterly statement attached",
+    "historyId": "1234567",
+    "internalDate": "1700000000000",
+    "payload": {
+        "mimeType": "text/plain",
+        "headers": [{"name": "Subject", "value": "Statement"}],
+        "body": {"size": 5, "data": "aGVsbG8="},
+    },
+}
+RATE_LIMITED = {
+    "error": {
+        "code": 429,
+        "message": "Too many concurrent requests for user",
+        "errors": [{"reason": "rateLimitExceeded", "domain": "usageLimits"}],
+    },
+}
+NOT_FOUND = {"error": {"code": 404, "message": "Requested entity was not found."}}
+
+REQUEST_LINE = re.compile(r"GET /gmail/v1/users/me/messages/([^?\s]+)")
+
+
+class FakeBatchHandler(BaseHTTPRequestHandler):
+    """Answer batch requests with recorded per-message responses."""
+
+    def log_message(self, *args):
+        """Keep test output quiet."""
+
+    def do_POST(self):
+        """Reply to each embedded GET in the request."""
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        msg_ids = REQUEST_LINE.findall(body)
+        with server.lock:
+            server.batch_sizes.append(len(msg_ids))
+
+        parts = []
+        for index, msg_id in enumerate(msg_ids):
+            with server.lock:
+                throttle = msg_id in server.throttle_once
+                server.throttle_once.discard(msg_id)
+            if throttle:
+                status, payload = "429 Too Many Requests", RATE_LIMITED
+            elif msg_id in server.missing:
+                status, payload = "404 Not Found", NOT_FOUND
+            else:
+                status, payload = "200 OK", {**RECORDED_MESSAGE, "id": msg_id}
+            parts.append(
+                "--batch_resp\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-item{index}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload)}\r\n",
+            )
+        content = ("".join(parts) + "--batch_resp--\r\n").encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "multipart/mixed; boundary=batch_resp")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+@unittest.skipUnless(requests, "requests is not installed")
+class TestGmailBatchFetcher(unittest.TestCase):
+    """Test batching, retries and missing messages against a fake server."""
+
+    def setUp(self):
+        """Start the fake batch endpoint."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBatchHandler)
+        self.server.lock = threading.Lock()
+        self.server.batch_sizes = []
+        self.server.throttle_once = set()
+        self.server.missing = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.throttle = AdaptiveThrottle(base_delay=0.01)
+        self.fetcher = GmailBatchFetcher(
+            session_factory=requests.Session,
+            batch_url=f"http://127.0.0.1:{self.server.server_port}/batch/gmail/v1",
+            max_workers=3,
+            throttle=self.throttle,
+        )
+
+    def tearDown(self):
+        """Stop the fake batch endpoint."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _fetch_all(self, msg_ids):
+        return [msg for batch in self.fetcher.fetch(msg_ids) for msg in batch]
+
+    def test_fetches_in_batches_of_one_hundred(self):
+        """Test that 250 messages take three HTTP requests."""
+        msg_ids = [f"m{i}" for i in range(250)]
+
+        messages = self._fetch_all(msg_ids)
+
+        self.assertEqual(sorted(m["id"] for m in messages), sorted(msg_ids))
+        self.assertEqual(sorted(self.server.batch_sizes), [50, 100, 100])
+        self.assertEqual(messages[0]["payload"]["body"]["data"], "aGVsbG8=")
+
+    def test_throttled_messages_are_retried(self):
+        """Test that rate-limited calls are resent with a smaller batch."""
+        msg_ids = [f"m{i}" for i in range(20)]
+        self.server.throttle_once = {"m3", "m7"}
+
+        messages = self._fetch_all(msg_ids)
+
+        self.assertEqual(len(messages), 20)
+        self.assertEqual(self.fetcher.stats["retried"], 2)
+        self.assertGreaterEqual(self.throttle.throttle_count, 1)
+        self.assertEqual(self.server.batch_sizes[-1], 2)
+
+    def test_missing_messages_are_skipped(self):
+        """Test that deleted messages are counted but not retried."""
+        self.server.missing = {"m1"}
+
+        messages = self._fetch_all(["m0", "m1", "m2"])
+
+        self.assertEqual([m["id"] for m in messages], ["m0", "m2"])
+        self.assertEqual(self.fetcher.stats["missing"], 1)
+        self.assertEqual(self.server.batch_sizes, [3])
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that a message throttled on every attempt is reported failed."""
+        self.fetcher.max_attempts = 1
+        self.server.throttle_once = {"m0"}
+
+        messages = self._fetch_all(["m0", "m1"])
+
+        self.assertEqual([m["id"] for m in messages], ["m1"])
+        self.assertEqual(self.fetcher.stats["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
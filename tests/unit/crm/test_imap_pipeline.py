@@ -0,0 +1,339 @@
+"""
+Tests for the pipelined IMAP importer.
+
+The importer runs against a small local IMAP4rev1 server that speaks the
+commands it uses (LOGIN, SELECT, STATUS, UID SEARCH, UID FETCH) and
+reports Gmail's X-GM-MSGID and X-GM-THRID attributes.
+"""
+
+import imaplib
+import re
+import socketserver
+import threading
+import unittest
+from datetime import date
+from email.message import EmailMessage
+
+import duckdb
+
+from dewey.core.crm.email.imap_import import (
+    UnifiedIMAPImporter,
+    parse_fetched_message,
+)
+from dewey.core.crm.email.imap_pipeline import (
+    IMAPPipeline,
+    parse_uid_fetch,
+    uid_set,
+)
+
+
+def make_message(uid):
+    """A small multipart message."""
+    msg = EmailMessage()
+    msg["Subject"] = f"Invoice {uid}"
+    msg["From"] = "Billing <billing@example.com>"
+    msg["To"] = "sloane@example.com"
+    msg["Date"] = "Mon, 01 Jan 2024 10:00:00 +0000"
+    msg["Message-ID"] = f"<{uid}@example.com>"
+    msg.set_content(f"Amount due for order {uid}.")
+    msg.add_alternative(f"<p>Amount due for order {uid}.</p>", subtype="html")
+    return msg.as_bytes()
+
+
+class FakeIMAPHandler(socketserver.StreamRequestHandler):
+    """Serves one IMAP session from the server's mailbox."""
+
+    def send(self, line):
+        self.wfile.write(line + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        self.send(b"* OK [CAPABILITY IMAP4rev1] fake server ready")
+        while line := self.rfile.readline():
+            tag, command, *rest = line.decode().rstrip("\r\n").split(" ", 2)
+            args = rest[0] if rest else ""
+            command = command.upper()
+            if command == "UID":
+                command, _, args = args.partition(" ")
+                command = f"UID {command.upper()}"
+            server.commands.append((command, args))
+
+            if command == "LOGOUT":
+                self.send(b"* BYE logging out")
+                self.send(f"{tag} OK LOGOUT completed".encode())
+                return
+            if command == "SELECT":
+                self.send(f"* {len(server.mailbox)} EXISTS".encode())
+                self.send(f"* OK [UIDVALIDITY {server.uidvalidity}] UIDs".encode())
+                self.send(f"{tag} OK [READ-WRITE] SELECT completed".encode())
+            elif command == "STATUS":
+                self.send(
+                    f'* STATUS "INBOX" (UIDVALIDITY {server.uidvalidity})'.encode(),
+                )
+                self.send(f"{tag} OK STATUS completed".encode())
+            elif command == "UID SEARCH":
+                uids = self.search(args)
+                self.send(b"* SEARCH " + " ".join(map(str, uids)).encode())
+                self.send(f"{tag} OK SEARCH completed".encode())
+            elif command == "UID FETCH":
+                uid_range, _ = args.split(" ", 1)
+                for seq, uid in enumerate(sorted(server.mailbox), 1):
+                    if self.in_set(uid, uid_range):
+                        raw = server.mailbox[uid]
+                        header = (
+                            f"* {seq} FETCH (X-GM-THRID {9000 + uid // 2} "
+                            f"X-GM-MSGID {5000 + uid} RFC822 {{{len(raw)}}}\r\n"
+                        )
+                        self.wfile.write(
+                            header.encode()
+                            + raw
+                            + f" UID {uid})\r\n".encode(),
+                        )
+                self.send(f"{tag} OK FETCH completed".encode())
+            else:
+                self.send(f"{tag} OK {command} completed".encode())
+
+    def in_set(self, uid, uid_range):
+        for part in uid_range.split(","):
+            low, _, high = part.partition(":")
+            high = max(self.server.mailbox) if high == "*" else int(high or low)
+            if min(int(low), high) <= uid <= max(int(low), high):
+                return True
+        return False
+
+    def search(self, criteria):
+        uids = sorted(self.server.mailbox)
+        match = re.search(r"UID (\S+)", criteria)
+        if match:
+            # Like real servers, "n:*" matches the newest message even below n
+            uids = [uid for uid in uids if self.in_set(uid, match.group(1))]
+        return uids
+
+
+class FakeIMAPServer(socketserver.ThreadingTCPServer):
+    """Local IMAP server holding one mailbox keyed by UID."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, mailbox, uidvalidity=7):
+        super().__init__(("127.0.0.1", 0), FakeIMAPHandler)
+        self.mailbox = mailbox
+        self.uidvalidity = uidvalidity
+        self.commands = []
+
+
+class TestIMAPPipeline(unittest.TestCase):
+    """Tests for IMAPPipeline against the local IMAP server."""
+
+    def setUp(self):
+        """Start the server and create the emails table."""
+        mailbox = {uid: make_message(uid) for uid in range(1, 31) if uid != 13}
+        self.server = FakeIMAPServer(mailbox)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.db = duckdb.connect(":memory:")
+        importer = UnifiedIMAPImporter.__new__(UnifiedIMAPImporter)
+        importer._init_schema_and_indexes()
+        self.db.execute(importer.email_schema)
+        for index_sql in importer.email_indexes:
+            self.db.execute(index_sql)
+
+    def tearDown(self):
+        """Stop the server."""
+        self.db.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def run_import(
+        self,
+        workers=0,
+        max_emails=None,
+        criteria="ALL",
+        since=None,
+        parse=parse_fetched_message,
+        **kwargs,
+    ):
+        """Run one import over a fresh connection."""
+        host, port = self.server.server_address
+        with imaplib.IMAP4(host, port) as imap:
+            imap.login("sloane", "secret")
+            imap.select("INBOX")
+            pipeline = IMAPPipeline(
+                imap,
+                self.db,
+                mailbox="INBOX",
+                parse=parse,
+                batch_size=10,
+                workers=workers,
+                extra_columns={"batch_id": "test"},
+                **kwargs,
+            )
+            uids = pipeline.pending_uids(criteria, since=since, limit=max_emails)
+            return pipeline.run(uids)
+
+    def fetch_commands(self):
+        """Arguments of every UID FETCH the server received."""
+        commands = self.server.commands
+        return [args for command, args in commands if command == "UID FETCH"]
+
+    def test_imports_in_range_fetches_with_process_pool(self):
+        """Each batch is one UID FETCH and rows carry the Gmail ids."""
+        stats = self.run_import(workers=2)
+
+        self.assertEqual(stats.stored, 29)
+        self.assertEqual(stats.fetch_commands, 3)
+        self.assertEqual(
+            [args.split(" ")[0] for args in self.fetch_commands()],
+            ["1:10", "11:12,14:21", "22:30"],
+        )
+        row = self.db.execute(
+            "SELECT thread_id, subject, from_address, snippet, batch_id "
+            "FROM emails WHERE msg_id = '5021'",
+        ).fetchone()
+        self.assertEqual(
+            row,
+            (
+                "9010",
+                "Invoice 21",
+                "Billing <billing@example.com>",
+                "Amount due for order 21.\n",
+                "test",
+            ),
+        )
+
+    def searches(self):
+        """Criteria of every UID SEARCH the server received."""
+        commands = self.server.commands
+        return [args for command, args in commands if command == "UID SEARCH"]
+
+    def checkpoint(self):
+        """The stored (last UID, since) checkpoint."""
+        return self.db.execute("SELECT last_uid, since FROM imap_sync_state").fetchone()
+
+    def test_resumes_after_checkpoint(self):
+        """A second run only fetches UIDs above the stored checkpoint."""
+        later = {uid: self.server.mailbox.pop(uid) for uid in range(14, 31)}
+        self.run_import()
+        self.server.commands.clear()
+        self.server.mailbox.update(later)
+        self.server.mailbox[31] = make_message(31)
+
+        stats = self.run_import()
+
+        self.assertEqual(stats.stored, 18)
+        self.assertEqual(stats.last_uid, 31)
+        self.assertEqual(
+            self.db.execute("SELECT count(*) FROM emails").fetchone()[0], 30,
+        )
+        self.assertEqual(self.searches(), ["UID 13:* ALL"])
+        self.assertEqual(self.fetch_commands()[0].split(" ")[0], "14:23")
+
+        # Nothing new: "32:*" still returns UID 31, which must be skipped
+        self.server.commands.clear()
+        self.assertEqual(self.run_import().fetch_commands, 0)
+
+    def test_resumed_run_with_limit_takes_oldest(self):
+        """A capped resumed run advances the checkpoint without gaps."""
+        self.server.mailbox = {1: make_message(1)}
+        self.run_import()
+        self.server.mailbox.update({uid: make_message(uid) for uid in range(2, 31)})
+
+        stats = self.run_import(max_emails=5)
+
+        self.assertEqual(stats.last_uid, 6)
+        self.assertEqual(self.checkpoint(), (6, None))
+
+    def test_wider_window_ignores_narrower_checkpoint(self):
+        """All mail is searched in full after runs over a recent window."""
+        self.run_import(criteria="SINCE 01-Jun-2024", since=date(2024, 6, 1))
+        self.assertEqual(self.checkpoint(), (30, date(2024, 6, 1)))
+        self.server.commands.clear()
+
+        stats = self.run_import()
+
+        self.assertEqual(self.searches(), ["ALL"])
+        self.assertEqual(stats.fetched, 29)
+        self.assertEqual(self.checkpoint(), (30, None))
+
+        # The wider checkpoint now covers a narrower window
+        self.server.commands.clear()
+        self.run_import(criteria="SINCE 01-Jun-2024", since=date(2024, 6, 1))
+        self.assertEqual(self.searches(), ["UID 31:* SINCE 01-Jun-2024"])
+        self.assertEqual(self.checkpoint(), (30, None))
+
+    def test_limit_takes_newest_without_checkpoint(self):
+        """A capped run that does not resume keeps the newest matches."""
+        stats = self.run_import(max_emails=5)
+
+        self.assertEqual(self.fetch_commands()[0].split(" ")[0], "26:30")
+        self.assertEqual(stats.stored, 5)
+        self.assertIsNone(self.checkpoint())
+
+    def test_parse_failure_holds_back_checkpoint(self):
+        """A message that fails to parse is fetched again on the next run."""
+
+        def flaky_parse(message):
+            if message.uid == 15:
+                raise ValueError("malformed message")
+            return parse_fetched_message(message)
+
+        stats = self.run_import(parse=flaky_parse)
+
+        self.assertEqual((stats.stored, stats.errors), (28, 1))
+        self.assertEqual(self.checkpoint(), (14, None))
+
+        self.server.commands.clear()
+        stats = self.run_import()
+
+        self.assertEqual(self.searches(), ["UID 15:* ALL"])
+        self.assertEqual(stats.stored, 1)
+        self.assertEqual(self.checkpoint(), (30, None))
+
+    def test_changed_uidvalidity_rescans_without_duplicates(self):
+        """A renumbered mailbox is scanned again; stored rows are not duplicated."""
+        self.run_import()
+        self.server.uidvalidity = 8
+        self.server.commands.clear()
+
+        stats = self.run_import()
+
+        self.assertEqual(stats.fetched, 29)
+        self.assertEqual(stats.stored, 0)
+        self.assertEqual(
+            self.db.execute(
+                "SELECT uidvalidity, last_uid FROM imap_sync_state",
+            ).fetchone(),
+            (8, 30),
+        )
+
+
+class TestFetchParsing(unittest.TestCase):
+    """Tests for UID set compression and FETCH response parsing."""
+
+    def test_uid_set(self):
+        """Consecutive UIDs collapse into ranges."""
+        self.assertEqual(uid_set([1, 2, 3, 5, 7, 8]), "1:3,5,7:8")
+
+    def test_parse_uid_fetch_reads_attributes_around_literal(self):
+        """UID may come before or after the RFC822 literal."""
+        data = [
+            (b"1 (UID 4 X-GM-MSGID 10 X-GM-THRID 11 RFC822 {3}", b"abc"),
+            b")",
+            (b"2 (X-GM-MSGID 12 RFC822 {3}", b"def"),
+            b" UID 6)",
+            (b"3 (RFC822 {3}", b"ghi"),
+            b")",
+        ]
+
+        messages = parse_uid_fetch(data)
+
+        self.assertEqual(
+            [(m.uid, m.gmail_msgid) for m in messages], [(4, "10"), (6, "12")],
+        )
+        self.assertEqual(messages[0].gmail_thrid, "11")
+        self.assertIsNone(messages[1].gmail_thrid)
+        self.assertEqual(messages[1].raw, b"def")
+
+
+if __name__ == "__main__":
+    unittest.main()
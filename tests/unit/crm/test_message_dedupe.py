@@ -0,0 +1,141 @@
+"""Tests for the Bloom-filter message ID dedupe."""
+
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+import duckdb
+
+from dewey.core.crm.message_dedupe import (
+    BloomFilter,
+    CSVIDSource,
+    DuckDBIDSource,
+    MessageDedupe,
+)
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Tests for BloomFilter."""
+
+    def test_no_false_negatives_and_few_false_positives(self):
+        """Added keys are always found; unseen keys rarely are."""
+        bloom = BloomFilter(10_000, 0.01)
+        for i in range(10_000):
+            bloom.add(f"msg-{i}")
+
+        self.assertTrue(all(f"msg-{i}" in bloom for i in range(10_000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        self.assertLess(false_positives, 300)
+
+    def test_save_and_load_round_trip(self):
+        """A saved filter loads with the same bits and source count."""
+        bloom = BloomFilter(100)
+        bloom.add("a")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "ids.bloom"
+            bloom.save(path, source_count=1)
+
+            loaded, source_count = BloomFilter.load(path)
+
+        self.assertEqual(source_count, 1)
+        self.assertEqual(loaded.count, 1)
+        self.assertIn("a", loaded)
+        self.assertNotIn("b", loaded)
+
+    def test_load_rejects_corrupt_file(self):
+        """Unreadable files load as None."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "ids.bloom"
+            path.write_bytes(b"not a filter")
+
+            self.assertIsNone(BloomFilter.load(path))
+            self.assertIsNone(BloomFilter.load(Path(tmp) / "missing.bloom"))
+
+
+class TestMessageDedupe(unittest.TestCase):
+    """Tests for MessageDedupe over DuckDB and CSV sources."""
+
+    def setUp(self):
+        """Create a table of stored message IDs."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "emails.bloom"
+        self.db = duckdb.connect(":memory:")
+        self.db.execute("CREATE TABLE emails (msg_id VARCHAR PRIMARY KEY)")
+        self.db.executemany(
+            "INSERT INTO emails VALUES (?)", [(f"m{i}",) for i in range(500)],
+        )
+
+    def tearDown(self):
+        """Close the database and remove the filter file."""
+        self.db.close()
+        self.tmp.cleanup()
+
+    def open(self, **kwargs):
+        """Open a dedupe over the emails table."""
+        return MessageDedupe(
+            DuckDBIDSource(self.db, "emails"), path=self.path, **kwargs,
+        )
+
+    def test_check_many_confirms_filter_hits(self):
+        """Only stored IDs are reported, even with a useless filter."""
+        dedupe = self.open(capacity=1, error_rate=0.9)
+
+        stored = dedupe.check_many(["m1", "m499", "new-1", "new-2"])
+
+        self.assertEqual(stored, {"m1", "m499"})
+        self.assertEqual(dedupe.stats()["confirmed"], 2)
+
+    def test_added_ids_persist_without_rebuild(self):
+        """IDs stored through the dedupe are found after reopening."""
+        with self.open() as dedupe:
+            self.db.execute("INSERT INTO emails VALUES ('new-1')")
+            dedupe.add(["new-1"])
+
+        reopened = self.open()
+
+        self.assertEqual(reopened.bloom.count, 501)
+        self.assertEqual(reopened.check_many(["new-1", "new-2"]), {"new-1"})
+
+    def test_outside_writes_trigger_rebuild(self):
+        """Rows stored by another writer are picked up on the next open."""
+        self.open().save()
+        self.db.execute("INSERT INTO emails VALUES ('elsewhere')")
+
+        dedupe = self.open()
+
+        self.assertEqual(dedupe.bloom.count, 501)
+        self.assertIn("elsewhere", dedupe)
+
+    def test_stricter_error_rate_rebuilds_filter(self):
+        """A filter saved for a looser rate is not reused for a stricter one."""
+        self.open(error_rate=0.01).save()
+
+        stricter = self.open(error_rate=1e-6)
+        stricter.save()
+        looser = self.open(error_rate=0.1)
+
+        self.assertEqual(stricter.bloom.error_rate, 1e-6)
+        self.assertEqual(looser.bloom.error_rate, 1e-6)
+
+    def test_csv_source_trusts_filter(self):
+        """CSV-backed dedupe streams the file and grows as rows are written."""
+        csv_file = Path(self.tmp.name) / "emails.csv"
+        with open(csv_file, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["msg_id", "subject"])
+            writer.writeheader()
+            writer.writerows({"msg_id": f"g{i}", "subject": "hi"} for i in range(50))
+
+        with MessageDedupe(CSVIDSource(csv_file), path=self.path) as dedupe:
+            self.assertEqual(dedupe.check_many(["g0", "g49", "g50"]), {"g0", "g49"})
+            with open(csv_file, "a", newline="") as f:
+                csv.writer(f).writerow(["g50", "hi"])
+            dedupe.add(["g50"])
+
+        reopened = MessageDedupe(CSVIDSource(csv_file), path=self.path)
+        self.assertEqual(reopened.bloom.count, 51)
+        self.assertIn("g50", reopened)
+
+
+if __name__ == "__main__":
+    unittest.main()
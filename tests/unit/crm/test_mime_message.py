@@ -0,0 +1,142 @@
+"""Tests for the shared lazy MIME message model."""
+
+import base64
+import tempfile
+import unittest
+from email.message import EmailMessage
+from pathlib import Path
+
+from dewey.core.crm.email.mime_message import (
+    BlobStore,
+    GmailPayload,
+    ParsedMessage,
+)
+
+
+def make_message(attachment):
+    """A multipart message with text, HTML and one attachment."""
+    msg = EmailMessage()
+    msg["Subject"] = "=?utf-8?q?Caf=C3=A9?="
+    msg["From"] = "Billing <billing@example.com>"
+    msg["To"] = "sloane@example.com"
+    msg["Date"] = "Mon, 01 Jan 2024 10:00:00 +0000"
+    msg["Message-ID"] = "<1@example.com>"
+    msg.set_content("Amount due.")
+    msg.add_alternative("<p>Amount due.</p>", subtype="html")
+    msg.add_attachment(
+        attachment, maintype="application", subtype="pdf", filename="invoice.pdf",
+    )
+    return msg.as_bytes()
+
+
+class TestParsedMessage(unittest.TestCase):
+    """Tests for ParsedMessage."""
+
+    def setUp(self):
+        """Build a message with a 1 MB attachment."""
+        self.attachment = bytes(range(256)) * 4096
+        self.raw = make_message(self.attachment)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the blob directory."""
+        self.tmp.cleanup()
+
+    def test_headers_parsed_without_body(self):
+        """Creating the message parses headers only."""
+        msg = ParsedMessage(self.raw)
+
+        self.assertEqual(msg.subject, "Café")
+        self.assertEqual(msg.message_id, "<1@example.com>")
+        self.assertEqual(msg.date.year, 2024)
+        self.assertNotIn("tree", vars(msg))
+
+    def test_bodies_exclude_attachments(self):
+        """Text and HTML bodies come from the non-attachment parts."""
+        msg = ParsedMessage(self.raw)
+
+        self.assertEqual(msg.body_text, "Amount due.\n")
+        self.assertEqual(msg.body_html, "<p>Amount due.</p>\n")
+
+    def test_attachment_streamed_to_blob_store(self):
+        """Attachment content is stored by hash; only metadata is returned."""
+        store = BlobStore(Path(self.tmp.name))
+
+        [attachment] = ParsedMessage(self.raw, store).attachments
+
+        self.assertEqual(attachment["filename"], "invoice.pdf")
+        self.assertEqual(attachment["size"], len(self.attachment))
+        self.assertEqual(store.read(attachment["sha256"]), self.attachment)
+
+    def test_attachment_hashed_without_store(self):
+        """Without a store the hash is still recorded."""
+        [stored] = ParsedMessage(self.raw, BlobStore(self.tmp.name)).attachments
+        [hashed] = ParsedMessage(self.raw).attachments
+
+        self.assertEqual(hashed, stored)
+
+    def test_structure_reports_encoded_sizes(self):
+        """The structure lists each part without serializing it."""
+        structure = ParsedMessage(self.raw).structure()
+
+        self.assertTrue(structure["multipart"])
+        self.assertEqual(
+            [part["content_type"] for part in structure["parts"]],
+            ["multipart/alternative", "application/pdf"],
+        )
+        self.assertGreater(structure["parts"][1]["size"], len(self.attachment))
+
+
+class TestGmailPayload(unittest.TestCase):
+    """Tests for GmailPayload."""
+
+    def setUp(self):
+        """Build a payload with an inline attachment."""
+        self.payload = {
+            "mimeType": "multipart/mixed",
+            "headers": [{"name": "Subject", "value": "Hello"}],
+            "parts": [
+                {
+                    "mimeType": "text/plain",
+                    "headers": [
+                        {
+                            "name": "Content-Type",
+                            "value": "text/plain; charset=iso-8859-1",
+                        },
+                    ],
+                    "body": {"data": base64.urlsafe_b64encode(b"caf\xe9").decode()},
+                },
+                {
+                    "mimeType": "text/plain",
+                    "filename": "notes.txt",
+                    "body": {
+                        "size": 5,
+                        "data": base64.urlsafe_b64encode(b"notes").decode(),
+                    },
+                },
+            ],
+        }
+
+    def test_bodies_and_attachments(self):
+        """Bodies use the part charset; named parts are attachments."""
+        with tempfile.TemporaryDirectory() as tmp:
+            store = BlobStore(tmp)
+            message = GmailPayload(self.payload, store)
+
+            self.assertEqual(message.headers["subject"], "Hello")
+            self.assertEqual(message.body_text, "café")
+            [attachment] = message.attachments
+            self.assertEqual(attachment["filename"], "notes.txt")
+            self.assertEqual(store.read(attachment["sha256"]), b"notes")
+
+    def test_without_attachment_data(self):
+        """Stripping keeps the body parts and drops attachment content."""
+        stripped = GmailPayload(self.payload).without_attachment_data()
+
+        self.assertIn("data", stripped["parts"][0]["body"])
+        self.assertEqual(stripped["parts"][1]["body"], {"size": 5})
+        self.assertIn("data", self.payload["parts"][1]["body"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for the compiled email priority rules.
+
+This module checks the compiled matcher against the original rule walk.
+"""
+
+import random
+import unittest
+
+from src.dewey.core.crm.email_classifier.priority_rules import (
+    RULE_SECTIONS,
+    get_priority_matcher,
+    invalidate_priority_matchers,
+)
+
+
+def walk_rules(metadata, preferences):
+    """Match rules the way calculate_priority did before compilation."""
+    for section, priority_key in RULE_SECTIONS:
+        rules = preferences.get(section, [])
+        if isinstance(rules, dict):
+            rules = rules.values()
+        for rule in rules:
+            for keyword in rule["keywords"]:
+                if (
+                    keyword.lower() in metadata.get("topics", [])
+                    or keyword.lower() in metadata.get("source", "").lower()
+                ):
+                    return rule[priority_key]
+    return None
+
+
+PREFERENCES = {
+    "override_rules": [{"keywords": ["Board", "audit"], "min_priority": 4}],
+    "high_priority_sources": [
+        {"keywords": ["client", "ACME Corp"], "min_priority": 3},
+    ],
+    "low_priority_sources": [{"keywords": ["noreply", "corp"], "max_priority": 1}],
+    "newsletter_defaults": {
+        "substack": {"keywords": ["substack", "digest"], "default_priority": 0},
+    },
+}
+
+
+class TestPriorityRuleMatcher(unittest.TestCase):
+    """Test rule precedence and matching semantics."""
+
+    def test_precedence_follows_rule_order(self):
+        """Test that the earliest matching rule wins regardless of position."""
+        matcher = get_priority_matcher(PREFERENCES)
+
+        self.assertEqual(matcher.match({"source": "noreply@acme corp.com"}), 3)
+        self.assertEqual(
+            matcher.match({"source": "Weekly Digest", "topics": ["board"]}), 4,
+        )
+        self.assertEqual(matcher.match({"source": "news@substack.com"}), 0)
+        self.assertIsNone(matcher.match({"source": "friend", "topics": ["Board"]}))
+
+    def test_matches_original_rule_walk(self):
+        """Test agreement with the uncompiled walk on random inputs."""
+        rng = random.Random(7)
+        alphabet = "abcde"
+        words = ["".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(60)]
+        preferences = {
+            section: [
+                {"keywords": rng.sample(words, 3), key: rng.randint(0, 4)}
+                for _ in range(5)
+            ]
+            for section, key in RULE_SECTIONS
+        }
+        matcher = get_priority_matcher(preferences)
+
+        for _ in range(2000):
+            metadata = {
+                "source": "".join(rng.choices(alphabet + "AB ", k=rng.randint(0, 12))),
+                "topics": rng.sample(words, 2),
+            }
+            self.assertEqual(
+                matcher.match(metadata), walk_rules(metadata, preferences), metadata,
+            )
+
+    def test_cache_invalidation(self):
+        """Test that the matcher is reused until preferences are saved."""
+        preferences = {"override_rules": [{"keywords": ["x"], "min_priority": 4}]}
+        matcher = get_priority_matcher(preferences)
+        self.assertIs(get_priority_matcher(preferences), matcher)
+
+        preferences["override_rules"][0]["keywords"] = ["y"]
+        invalidate_priority_matchers()
+
+        self.assertIsNot(get_priority_matcher(preferences), matcher)
+        self.assertEqual(get_priority_matcher(preferences).match({"source": "y"}), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
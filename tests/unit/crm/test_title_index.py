@@ -0,0 +1,100 @@
+"""Tests for trigram-indexed transcript title matching."""
+
+import logging
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from dewey.core.crm.transcripts.title_index import TitleIndex, trigrams
+from dewey.core.crm.transcripts.transcript_matching import TranscriptMatcher
+
+
+class TestTitleIndex(unittest.TestCase):
+    """Tests for TitleIndex."""
+
+    def setUp(self):
+        """Index a few cleaned titles."""
+        self.index = TitleIndex(
+            [
+                "the future of impact investing",
+                "",
+                "climate risk in bond markets",
+                "impact investing basics",
+            ],
+        )
+
+    def test_trigrams_ignore_spaces(self):
+        """Titles with and without separators share their trigrams."""
+        self.assertEqual(trigrams("my title"), trigrams("mytitle"))
+
+    def test_candidates_ranked_by_shared_trigrams(self):
+        """The closest titles come first; empty titles never match."""
+        candidates = self.index.candidates("impact investing basics", k=2)
+
+        self.assertEqual(candidates, [3, 0])
+        self.assertNotIn(1, self.index.candidates("anything at all", k=4))
+
+    def test_best_match(self):
+        """The best candidate is rescored exactly; no overlap gives None."""
+        title_id, score = self.index.best_match("climateriskinbondmarketstxt")
+
+        self.assertEqual(title_id, 2)
+        self.assertGreater(score, 0.8)
+        self.assertEqual(self.index.best_match("zzzz"), (None, 0.0))
+
+
+class TestTranscriptMatcher(unittest.TestCase):
+    """Tests for TranscriptMatcher.match_transcript_files."""
+
+    def setUp(self):
+        """Create an episode database and a transcript directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.db_path = root / "episodes.db"
+        self.transcripts = root / "transcripts"
+        self.transcripts.mkdir()
+        with sqlite3.connect(self.db_path) as con:
+            con.execute(
+                "CREATE TABLE episodes "
+                "(title TEXT, file TEXT, transcript TEXT, link TEXT, publish_date TEXT)",
+            )
+            con.executemany(
+                "INSERT INTO episodes (title, link) VALUES (?, ?)",
+                [
+                    ("The Future of Impact Investing", "a"),
+                    ("Climate Risk in Bond Markets", "b"),
+                    (None, "c"),
+                ],
+            )
+        for name in ["climate-risk-in-bond-markets.txt", "unrelated-notes.txt"]:
+            (self.transcripts / name).write_text("transcript")
+        self.matcher = TranscriptMatcher.__new__(TranscriptMatcher)
+        self.matcher.logger = logging.getLogger(__name__)
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        self.tmp.cleanup()
+
+    def test_matches_are_written_in_one_update(self):
+        """Matched files are stored; unmatched files are reported."""
+        matches, unmatched = self.matcher.match_transcript_files(
+            str(self.db_path), str(self.transcripts), similarity_threshold=0.7,
+        )
+
+        self.assertEqual([m["title"] for m in matches], ["Climate Risk in Bond Markets"])
+        self.assertEqual(unmatched, [str(self.transcripts / "unrelated-notes.txt")])
+        with sqlite3.connect(self.db_path) as con:
+            rows = con.execute("SELECT link, file FROM episodes ORDER BY link").fetchall()
+        self.assertEqual(
+            rows,
+            [
+                ("a", None),
+                ("b", str(self.transcripts / "climate-risk-in-bond-markets.txt")),
+                ("c", None),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
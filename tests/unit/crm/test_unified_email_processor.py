@@ -0,0 +1,124 @@
+"""
+Tests for the unified email processor.
+
+This module tests how analysis batches are written to email_analyses and
+how raw emails reach the work queue.
+"""
+
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, call, patch
+
+from src.dewey.core.crm.gmail.gmail_sync import GmailSync
+from src.dewey.core.crm.gmail.unified_email_processor import (
+    UnifiedEmailProcessor,
+    analyze_email,
+)
+
+
+class TestStoreEmailAnalyses(unittest.TestCase):
+    """Test the pipeline's batch writer."""
+
+    def setUp(self):
+        """Create a processor without running its constructor."""
+        self.db_manager_patcher = patch(
+            "src.dewey.core.crm.gmail.unified_email_processor.db_manager",
+        )
+        self.mock_db_manager = self.db_manager_patcher.start()
+        self.conn = self.mock_db_manager.get_connection.return_value
+        self.processor = UnifiedEmailProcessor.__new__(UnifiedEmailProcessor)
+        self.processor.email_queue = MagicMock()
+        self.processor._enrich_contact_from_email = MagicMock()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.db_manager_patcher.stop()
+
+    def test_internal_date_is_stored(self):
+        """Test that each analysis row carries the email's internal_date."""
+        received = datetime(2024, 3, 1, 9, 30)
+        analysis = analyze_email(
+            ("m1", "t1", received, "Invoice", "billing@example.com", "Thanks"),
+            {"phone": r"Tel:\s*([\d-]+)"},
+        )
+
+        self.processor._store_email_analyses([analysis])
+
+        query, rows = self.conn.executemany.call_args.args
+        columns = query.split("(", 1)[1].split(")", 1)[0]
+        names = [name.strip() for name in columns.split(",")]
+        self.assertEqual(rows[0][names.index("internal_date")], received)
+        self.processor.email_queue.complete.assert_called_once_with(["m1"])
+
+
+class TestEmailQueueFilling(unittest.TestCase):
+    """Test that the queue is filled from the store raw emails are read from."""
+
+    def setUp(self):
+        """Create a processor without running its constructor."""
+        self.db_manager_patcher = patch(
+            "src.dewey.core.crm.gmail.unified_email_processor.db_manager",
+        )
+        self.mock_db_manager = self.db_manager_patcher.start()
+        self.processor = UnifiedEmailProcessor.__new__(UnifiedEmailProcessor)
+        self.processor.email_queue = MagicMock()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.db_manager_patcher.stop()
+
+    def test_seed_reads_the_pipeline_store(self):
+        """Test that an empty queue is seeded from db_manager's raw_emails."""
+        received = datetime(2024, 3, 1)
+        self.processor.email_queue.is_empty.return_value = True
+        self.mock_db_manager.execute_query.return_value = [
+            ("m1", received, False),
+            ("m2", received, True),
+        ]
+
+        self.processor._seed_email_queue()
+
+        self.assertEqual(
+            self.processor.email_queue.enqueue.call_args_list,
+            [
+                call([("m1", received)], status="pending"),
+                call([("m2", received)], status="done"),
+            ],
+        )
+
+    def test_seed_skipped_once_queue_is_filled(self):
+        """Test that a filled queue is not rescanned unless asked to."""
+        self.processor.email_queue.is_empty.return_value = False
+
+        self.processor._seed_email_queue()
+
+        self.mock_db_manager.execute_query.assert_not_called()
+
+    def test_gmail_sync_enqueues_stored_messages(self):
+        """Test that GmailSync hands every stored message to the queue."""
+        received = datetime(2024, 3, 1)
+        sync = GmailSync.__new__(GmailSync)
+        sync._get_connection = MagicMock()
+        sync.work_queue = MagicMock()
+        message = {
+            "message_id": "m1",
+            "thread_id": "t1",
+            "internal_date": received,
+            "labels": [],
+            "subject": "Invoice",
+            "sender": "billing@example.com",
+            "recipient": "me@example.com",
+            "body": "Thanks",
+            "headers": {},
+            "attachments": [],
+            "history_id": "1",
+        }
+
+        sync._store_messages([message])
+
+        (emails,), _ = sync.work_queue.enqueue.call_args
+        self.assertEqual(list(emails), [("m1", received)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for change log maintenance.
+
+This module tests change_log compaction, retention and compacted reads.
+"""
+
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from src.dewey.core.db.change_log import (
+    compact_change_log,
+    prune_change_log,
+    run_change_log_maintenance,
+)
+from src.dewey.core.db.sync import get_changes_since
+
+
+class TestChangeLogMaintenance(unittest.TestCase):
+    """Test change_log compaction and retention."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.db_manager_patcher = patch("src.dewey.core.db.change_log.db_manager")
+        self.mock_db_manager = self.db_manager_patcher.start()
+        self.mock_conn = self.mock_db_manager.get_connection.return_value
+        self.since = datetime(2024, 1, 1)
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.db_manager_patcher.stop()
+
+    def test_compact_keeps_newest_entry_per_record(self):
+        """Test that repeated changes collapse onto the newest entry."""
+        self.mock_db_manager.execute_query.return_value = [
+            (1, "t", "INSERT", "a", self.since, None, '{"x": 1}'),
+            (2, "t", "UPDATE", "a", self.since, None, '{"y": 2}'),
+            (3, "t", "UPDATE", "a", self.since, None, '{"x": 3}'),
+        ]
+
+        removed = compact_change_log("t", self.since)
+
+        self.assertEqual(removed, 2)
+        updates = self.mock_conn.executemany.call_args_list[0].args[1]
+        self.assertEqual(updates, [["INSERT", '{"x": 3, "y": 2}', 3]])
+        self.mock_conn.execute.assert_any_call("COMMIT")
+
+    def test_compact_nothing_to_do(self):
+        """Test that no transaction is opened without duplicates."""
+        self.mock_db_manager.execute_query.return_value = []
+
+        self.assertEqual(compact_change_log("t", self.since), 0)
+        self.mock_conn.execute.assert_not_called()
+
+    def test_prune_deletes_synced_entries(self):
+        """Test that entries before the last sync are removed."""
+        self.mock_db_manager.execute_query.return_value = [(5,)]
+
+        self.assertEqual(prune_change_log(self.since), 5)
+        delete_query = self.mock_db_manager.execute_query.call_args.args[0]
+        self.assertIn("DELETE FROM change_log", delete_query)
+
+    def test_prune_one_table(self):
+        """Test that pruning can be limited to one table."""
+        self.mock_db_manager.execute_query.return_value = [(2,)]
+
+        prune_change_log(self.since, table_name="t")
+
+        delete_query, params = self.mock_db_manager.execute_query.call_args.args
+        self.assertIn("AND table_name = ?", delete_query)
+        self.assertEqual(params, [self.since, "t"])
+
+    def test_maintenance_skipped_before_first_sync(self):
+        """Test that nothing is pruned before any successful sync."""
+        self.mock_db_manager.execute_query.return_value = []
+
+        self.assertEqual(run_change_log_maintenance(), {})
+        self.assertEqual(self.mock_db_manager.execute_query.call_count, 1)
+
+    def test_maintenance_uses_each_tables_last_sync(self):
+        """Test that a table is pruned only up to its own last sync."""
+        later = datetime(2024, 2, 1)
+        self.mock_db_manager.execute_query.return_value = [
+            ("contacts", self.since),
+            ("emails", later),
+        ]
+
+        with patch("src.dewey.core.db.change_log.compact_change_log") as mock_compact, \
+                patch("src.dewey.core.db.change_log.prune_change_log") as mock_prune:
+            mock_compact.return_value = 0
+            mock_prune.return_value = 1
+            results = run_change_log_maintenance()
+
+        self.assertEqual(
+            [c.args for c in mock_prune.call_args_list],
+            [(self.since, True, "contacts"), (later, True, "emails")],
+        )
+        self.assertEqual(mock_compact.call_args_list[1].args, ("emails", later, True))
+        self.assertEqual(results["pruned"], 2)
+
+
+class TestCompactedReads(unittest.TestCase):
+    """Test that sync reads only the net delta."""
+
+    def test_get_changes_since_compacts(self):
+        """Test that get_changes_since folds repeated changes."""
+        since = datetime(2024, 1, 1)
+        with patch("src.dewey.core.db.sync.db_manager") as mock_db_manager:
+            mock_db_manager.execute_query.return_value = [
+                (1, "t", "UPDATE", "a", since, None, {"x": 1}),
+                (2, "t", "UPDATE", "a", since, None, {"x": 2}),
+                (3, "t", "DELETE", "b", since, None, None),
+            ]
+
+            changes = get_changes_since("t", since)
+
+        self.assertEqual([c["record_id"] for c in changes], ["a", "b"])
+        self.assertEqual(changes[0]["details"], {"x": 2})
+        self.assertNotIn("SELECT *", mock_db_manager.execute_query.call_args.args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
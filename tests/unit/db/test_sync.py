@@ -0,0 +1,264 @@
+"""
+Tests for database synchronization.
+
+This module tests change compaction, set-based change application and the
+parallel direct-copy scheduler.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import duckdb
+
+from src.dewey.core.db.sync import (
+    TableSyncStats,
+    _incremental_copy,
+    _schema_signature,
+    apply_changes,
+    compact_changes,
+    direct_copy_all_tables,
+    sync_table,
+)
+
+
+class TestCompactChanges(unittest.TestCase):
+    """Test folding change_log rows into their net effect."""
+
+    def test_insert_then_updates_become_one_insert(self):
+        """Test that updates after an insert are folded into the insert."""
+        changes = [
+            {"record_id": "1", "operation": "INSERT", "details": {"name": "a"}},
+            {"record_id": "1", "operation": "UPDATE", "details": '{"value": 2}'},
+            {"record_id": "1", "operation": "UPDATE", "details": {"name": "b"}},
+        ]
+
+        result = compact_changes(changes)
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["operation"], "INSERT")
+        self.assertEqual(result[0]["details"], {"name": "b", "value": 2})
+
+    def test_delete_wins(self):
+        """Test that a trailing delete replaces earlier changes."""
+        changes = [
+            {"record_id": "1", "operation": "UPDATE", "details": {"name": "a"}},
+            {"record_id": "1", "operation": "DELETE", "details": None},
+            {"record_id": "2", "operation": "UPDATE", "details": {"name": "b"}},
+        ]
+
+        result = compact_changes(changes)
+
+        self.assertEqual([c["operation"] for c in result], ["DELETE", "UPDATE"])
+
+
+class TestBulkApply(unittest.TestCase):
+    """Test set-based application of changes."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.db_manager_patcher = patch("src.dewey.core.db.sync.db_manager")
+        self.mock_db_manager = self.db_manager_patcher.start()
+        self.mock_conn = self.mock_db_manager.get_connection.return_value
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.db_manager_patcher.stop()
+
+    def test_one_statement_per_group(self):
+        """Test that changes are staged and applied once per operation group."""
+        changes = [
+            {"record_id": str(i), "operation": "UPDATE", "details": {"name": "x"}}
+            for i in range(100)
+        ] + [{"record_id": "200", "operation": "DELETE", "details": {}}]
+
+        applied = apply_changes("test_table", changes, bulk=True)
+
+        self.assertEqual(applied, 101)
+        self.mock_db_manager.execute_query.assert_not_called()
+        self.assertEqual(self.mock_conn.executemany.call_count, 2)
+        statements = [c.args[0] for c in self.mock_conn.execute.call_args_list]
+        self.assertEqual(statements[0], "BEGIN TRANSACTION")
+        self.assertEqual(statements[-1], "COMMIT")
+        self.assertEqual(sum(s.startswith("UPDATE") for s in statements), 1)
+        self.assertEqual(sum(s.startswith("DELETE") for s in statements), 1)
+
+    def test_rollback_on_error(self):
+        """Test that a failing group rolls back the whole table and raises."""
+        self.mock_conn.executemany.side_effect = Exception("boom")
+        changes = [{"record_id": "1", "operation": "INSERT", "details": {"a": 1}}]
+
+        with self.assertRaises(Exception):
+            apply_changes("test_table", changes, bulk=True)
+
+        self.mock_conn.execute.assert_any_call("ROLLBACK")
+
+    def test_insert_into_table_without_key(self):
+        """Test that inserts replace rows in a table with no key on id."""
+        conn = duckdb.connect()
+        conn.execute("CREATE TABLE test_table (id VARCHAR, name VARCHAR)")
+        conn.execute("INSERT INTO test_table VALUES ('1', 'old'), ('2', 'keep')")
+        self.mock_db_manager.get_connection.return_value = conn
+        changes = [
+            {"record_id": "1", "operation": "INSERT", "details": {"name": "new"}},
+            {"record_id": "3", "operation": "INSERT", "details": {"name": "added"}},
+        ]
+
+        applied = apply_changes("test_table", changes, bulk=True)
+
+        self.assertEqual(applied, 2)
+        rows = conn.execute("SELECT * FROM test_table ORDER BY id").fetchall()
+        self.assertEqual(rows, [("1", "new"), ("2", "keep"), ("3", "added")])
+
+    def test_failed_apply_is_not_recorded_as_success(self):
+        """Test that sync_table reports a failed bulk apply."""
+        self.mock_conn.executemany.side_effect = Exception("boom")
+        changes = [{"record_id": "1", "operation": "INSERT", "details": {"a": 1}}]
+
+        sync = "src.dewey.core.db.sync"
+        with patch(f"{sync}.get_last_sync_time", return_value=None), \
+                patch(f"{sync}.get_changes_since", side_effect=[changes, []]), \
+                patch(f"{sync}.record_sync_status") as mock_record:
+            result = sync_table("test_table", direction="up", bulk=True)
+
+        self.assertFalse(result)
+        statuses = [c.args[1] for c in mock_record.call_args_list]
+        self.assertEqual(statuses, ["failed"])
+
+    def test_rows_per_second(self):
+        """Test throughput calculation."""
+        self.assertEqual(TableSyncStats("t", "up", 500, 2.0).rows_per_second, 250.0)
+        self.assertEqual(TableSyncStats("t", "up", 500, 0.0).rows_per_second, 0.0)
+
+
+class TestDirectCopyAllTables(unittest.TestCase):
+    """Test the parallel direct-copy scheduler."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.db_manager_patcher = patch("src.dewey.core.db.sync.db_manager")
+        self.mock_db_manager = self.db_manager_patcher.start()
+        self.source_conn = MagicMock()
+        self.mock_db_manager.get_connection.return_value = self.source_conn
+
+        sizes = {"small": 10, "large": 1_000_000, "medium": 5_000}
+
+        def mock_execute(query, *args):
+            result = MagicMock()
+            if query == "SHOW TABLES":
+                result.fetchall.return_value = [(t,) for t in sizes]
+            else:
+                result.fetchone.return_value = (sizes[query.rsplit(" ", 1)[-1]],)
+            return result
+
+        self.source_conn.execute.side_effect = mock_execute
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.db_manager_patcher.stop()
+
+    def test_largest_table_first(self):
+        """Test that tables are scheduled in descending size order."""
+        with patch("src.dewey.core.db.sync.direct_copy_table") as mock_copy:
+            mock_copy.return_value = True
+
+            result = direct_copy_all_tables(max_workers=1)
+
+        self.assertTrue(result)
+        copied = [c.args[0] for c in mock_copy.call_args_list]
+        self.assertEqual(copied, ["large", "medium", "small"])
+
+    def test_failure_is_reported(self):
+        """Test that one failed table fails the whole run."""
+        with patch("src.dewey.core.db.sync.direct_copy_table") as mock_copy:
+            mock_copy.side_effect = lambda t, **kwargs: t != "medium"
+
+            result = direct_copy_all_tables(max_workers=3)
+
+        self.assertFalse(result)
+        self.assertEqual(mock_copy.call_count, 3)
+
+
+
+class TestIncrementalCopy(unittest.TestCase):
+    """Test watermark-based incremental direct copies."""
+
+    schema = [("id", "INTEGER"), ("name", "VARCHAR"), ("updated_at", "TIMESTAMP")]
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.watermark_patcher = patch("src.dewey.core.db.sync.get_copy_watermark")
+        self.mock_watermark = self.watermark_patcher.start()
+        self.record_patcher = patch("src.dewey.core.db.sync.record_sync_status")
+        self.mock_record = self.record_patcher.start()
+        self.source_conn = MagicMock()
+        self.target_conn = MagicMock()
+        self.source_conn.execute.return_value.fetchone.return_value = (3, 42)
+        self.target_conn.execute.return_value.fetchone.return_value = (3, 42)
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.watermark_patcher.stop()
+        self.record_patcher.stop()
+
+    def test_no_watermark_requires_full_refresh(self):
+        """Test that the first run falls back to a full refresh."""
+        self.mock_watermark.return_value = None
+
+        result = _incremental_copy(
+            "t", self.source_conn, self.target_conn, self.schema, True,
+        )
+
+        self.assertIsNone(result)
+        self.target_conn.execute.assert_not_called()
+
+    def test_schema_change_requires_full_refresh(self):
+        """Test that a changed schema signature falls back to a full refresh."""
+        self.mock_watermark.return_value = {
+            "column": "updated_at",
+            "value": "2024-01-01",
+            "schema": _schema_signature(self.schema[:2]),
+        }
+
+        result = _incremental_copy(
+            "t", self.source_conn, self.target_conn, self.schema, True,
+        )
+
+        self.assertIsNone(result)
+
+    def test_delta_is_upserted_and_watermark_advanced(self):
+        """Test that only the delta is copied and the watermark is stored."""
+        self.mock_watermark.return_value = {
+            "column": "updated_at",
+            "value": "2024-01-01",
+            "schema": _schema_signature(self.schema),
+        }
+
+        result = _incremental_copy(
+            "t", self.source_conn, self.target_conn, self.schema, True,
+        )
+
+        self.assertEqual(result, 3)
+        statements = [c.args[0] for c in self.target_conn.execute.call_args_list]
+        self.assertTrue(any(s.startswith("DELETE FROM t USING") for s in statements))
+        self.assertNotIn("DROP TABLE IF EXISTS t", statements)
+        self.assertEqual(self.mock_record.call_args.args[1], "watermark")
+
+    def test_checksum_mismatch_requires_full_refresh(self):
+        """Test that drift below the watermark triggers a full refresh."""
+        self.mock_watermark.return_value = {
+            "column": "updated_at",
+            "value": "2024-01-01",
+            "schema": _schema_signature(self.schema),
+        }
+        self.target_conn.execute.return_value.fetchone.return_value = (2, 7)
+
+        result = _incremental_copy(
+            "t", self.source_conn, self.target_conn, self.schema, True,
+        )
+
+        self.assertIsNone(result)
+        self.mock_record.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+"""
+Tests for the async LiteLLMClient API.
+
+The client is pointed at a local OpenAI-compatible server that streams
+server-sent events over keep-alive HTTP/1.1 connections.
+"""
+
+import asyncio
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from dewey.llm.exceptions import LLMAuthenticationError, LLMResponseError
+from dewey.llm.litellm_client import LiteLLMClient, LiteLLMConfig, Message
+
+TOKENS = ["Quarterly ", "report ", "attached."]
+
+
+class FakeProvider(BaseHTTPRequestHandler):
+    """Chat completions endpoint recording requests and connections."""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+    connections = set()
+    fail_next = []
+    malformed = False
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeProvider.requests.append((body, self.headers.get("Authorization")))
+        FakeProvider.connections.add(self.client_address)
+        if FakeProvider.fail_next:
+            status = FakeProvider.fail_next.pop(0)
+            self._send(status, {"error": {"message": "try again"}})
+            return
+
+        if FakeProvider.malformed and not body.get("stream"):
+            payload = b"<html>502 Bad Gateway</html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        if not body.get("stream"):
+            self._send(
+                200,
+                {
+                    "id": "cmpl-1",
+                    "object": "chat.completion",
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {
+                                "role": "assistant",
+                                "content": "".join(TOKENS),
+                            },
+                        },
+                    ],
+                },
+            )
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        if FakeProvider.malformed:
+            self._chunk(b"data: {truncated\n\n")
+        for i, token in enumerate(TOKENS):
+            chunk = {
+                "object": "chat.completion.chunk",
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": token},
+                        "finish_reason": "stop" if i == len(TOKENS) - 1 else None,
+                    },
+                ],
+            }
+            self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self._chunk(b"data: [DONE]\n\n")
+        self._chunk(b"")
+
+
+class TestAsyncCompletion(unittest.TestCase):
+    """Tests for agenerate_completion and astream_completion."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start the fake provider."""
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeProvider)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        host, port = cls.server.server_address
+        cls.base_url = f"http://{host}:{port}/v1/openai"
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the fake provider."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """Reset recorded requests and patch response construction."""
+        FakeProvider.requests = []
+        FakeProvider.connections = set()
+        FakeProvider.fail_next = []
+        FakeProvider.malformed = False
+        patcher = patch(
+            "dewey.llm.litellm_client.ModelResponse", side_effect=lambda **kw: kw,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def client(self, **overrides):
+        """Client configured for the fake DeepInfra endpoint."""
+        config = LiteLLMConfig(
+            model="deepinfra/meta-llama/Llama-3-8B-Instruct",
+            api_key="test-key",
+            base_url=self.base_url,
+            max_retries=2,
+            **overrides,
+        )
+        return LiteLLMClient(config)
+
+    def test_stream_yields_tokens_over_one_connection(self):
+        """Tokens arrive one by one and calls reuse a keep-alive connection."""
+        client = self.client()
+        messages = [Message(role="user", content="Summarize\x00 this")]
+
+        async def main():
+            async with client:
+                streamed = [t async for t in client.astream_completion(messages)]
+                response = await client.agenerate_completion(messages)
+                return streamed, response
+
+        streamed, response = asyncio.run(main())
+
+        self.assertEqual(streamed, TOKENS)
+        self.assertEqual(response["choices"][0]["message"]["content"], "".join(TOKENS))
+        self.assertEqual(len(FakeProvider.connections), 1)
+        body, auth = FakeProvider.requests[0]
+        self.assertEqual(body["model"], "meta-llama/Llama-3-8B-Instruct")
+        self.assertEqual(body["messages"][0]["content"], "Summarize this")
+        self.assertEqual(auth, "Bearer test-key")
+
+    def test_many_concurrent_calls_from_one_loop(self):
+        """Concurrent calls share the client's pool without threads."""
+        client = self.client()
+
+        async def main():
+            async with client:
+                return await asyncio.gather(
+                    *(
+                        client.agenerate_completion(
+                            [{"role": "user", "content": f"email {i}"}],
+                        )
+                        for i in range(20)
+                    ),
+                )
+
+        responses = asyncio.run(main())
+
+        self.assertEqual(len(responses), 20)
+        self.assertEqual(len(FakeProvider.requests), 20)
+
+    def test_retries_rate_limits_and_maps_errors(self):
+        """429s are retried; authentication failures are raised at once."""
+        client = self.client()
+        messages = [Message(role="user", content="hello")]
+
+        async def main():
+            async with client:
+                FakeProvider.fail_next = [429, 503]
+                with patch("dewey.llm.litellm_client.asyncio.sleep"):
+                    streamed = [t async for t in client.astream_completion(messages)]
+                FakeProvider.fail_next = [401]
+                with self.assertRaises(LLMAuthenticationError):
+                    await client.agenerate_completion(messages)
+                return streamed
+
+        self.assertEqual(asyncio.run(main()), TOKENS)
+        self.assertEqual(len(FakeProvider.requests), 4)
+
+    def test_malformed_bodies_raise_response_errors(self):
+        """Bodies and stream events that are not JSON raise LLMResponseError."""
+        client = self.client()
+        messages = [Message(role="user", content="hello")]
+        FakeProvider.malformed = True
+
+        async def main():
+            async with client:
+                with self.assertRaisesRegex(LLMResponseError, "502 Bad Gateway"):
+                    await client.agenerate_completion(messages)
+                with self.assertRaisesRegex(LLMResponseError, "truncated"):
+                    [t async for t in client.astream_completion(messages)]
+
+        asyncio.run(main())
+
+    def test_streamed_response_is_cached(self):
+        """A finished stream is cached and replayed without a request."""
+        with tempfile.TemporaryDirectory() as cache_folder:
+            client = self.client(cache=True, cache_folder=cache_folder)
+            messages = [Message(role="user", content="cached prompt")]
+
+            async def main():
+                async with client:
+                    first = [t async for t in client.astream_completion(messages)]
+                    second = [t async for t in client.astream_completion(messages)]
+                    return first, second
+
+            first, second = asyncio.run(main())
+            client.response_cache.close()
+
+        self.assertEqual(first, TOKENS)
+        self.assertEqual(second, ["".join(TOKENS)])
+        self.assertEqual(len(FakeProvider.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ This module tests the LiteLLMClient class, including configuration loading and
 API interaction with proper mocking of external dependencies.
 """
 
+import tempfile
 import unittest
 from unittest.mock import MagicMock, mock_open, patch
 
@@ -472,6 +473,65 @@ class TestLiteLLMClient(unittest.TestCase):
         with self.assertRaises(LLMResponseError):
             client.get_model_details()
 
+    def test_generate_completion_served_from_cache(self):
+        """Test that a repeated completion is answered from the response cache."""
+        mock_response = MagicMock()
+        mock_response.model_dump.return_value = {
+            "id": "chatcmpl-1",
+            "choices": [{"message": {"role": "assistant", "content": "Cached"}}],
+        }
+        self.mock_completion.return_value = mock_response
+
+        with tempfile.TemporaryDirectory() as cache_folder, patch(
+            "dewey.llm.litellm_client.ModelResponse",
+        ) as mock_model_response:
+            client = LiteLLMClient(
+                LiteLLMConfig(model="gpt-4", cache=True, cache_folder=cache_folder),
+            )
+            messages = [Message(role="user", content="Summarize this email")]
+
+            first = client.generate_completion(messages, temperature=0)
+            second = client.generate_completion(messages, temperature=0)
+            client.generate_completion(messages, temperature=0, bypass_cache=True)
+
+            self.assertIs(first, mock_response)
+            mock_model_response.assert_called_once_with(
+                **mock_response.model_dump.return_value,
+            )
+            self.assertIs(second, mock_model_response.return_value)
+            self.assertEqual(self.mock_completion.call_count, 2)
+
+            stats = client.cache_stats()
+            self.assertEqual(stats["hits"], 1)
+            self.assertEqual(stats["misses"], 1)
+            self.assertEqual(stats["writes"], 2)
+            client.response_cache.close()
+
+    def test_cache_disabled_by_default(self):
+        """Test that no response cache is used unless configured."""
+        client = LiteLLMClient(LiteLLMConfig(model="gpt-4"))
+
+        self.assertIsNone(client.response_cache)
+        self.assertEqual(client.cache_stats(), {})
+
+    def test_cache_settings_from_dewey_config(self):
+        """Test that every cache setting is read from the llm config section."""
+        client = LiteLLMClient(LiteLLMConfig(model="gpt-4"))
+        config = client._create_config_from_dewey(
+            {
+                "llm": {
+                    "cache": True,
+                    "cache_ttl": 3600,
+                    "cache_max_bytes": 1024,
+                    "cache_memory_entries": 16,
+                },
+            },
+        )
+
+        self.assertEqual(config.cache_ttl, 3600)
+        self.assertEqual(config.cache_max_bytes, 1024)
+        self.assertEqual(config.cache_memory_entries, 16)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,133 @@
+"""Tests for the content-addressed LLM response cache."""
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from dewey.llm.response_cache import (
+    ResponseCache,
+    make_cache_key,
+    normalize_messages,
+)
+
+
+class TestCacheKey(unittest.TestCase):
+    """Tests for make_cache_key and normalize_messages."""
+
+    def test_equivalent_requests_share_a_key(self):
+        """Whitespace, line endings and unkeyed params do not change the key."""
+        first = normalize_messages([{"role": "user", "content": "Hi\r\nthere "}])
+        second = normalize_messages([{"role": "user", "content": "Hi\nthere"}])
+
+        self.assertEqual(
+            make_cache_key("completion", "gpt-4", first, temperature=0.2, user="a"),
+            make_cache_key("completion", "gpt-4", second, temperature=0.2, user="b"),
+        )
+
+    def test_output_affecting_params_change_the_key(self):
+        """Model, kind and sampling parameters are part of the key."""
+        messages = normalize_messages([{"role": "user", "content": "Hi"}])
+        base = make_cache_key("completion", "gpt-4", messages, temperature=0.2)
+
+        self.assertNotEqual(
+            base, make_cache_key("completion", "gpt-4", messages, temperature=0.3),
+        )
+        self.assertNotEqual(
+            base, make_cache_key("completion", "gpt-3.5", messages, temperature=0.2),
+        )
+        self.assertNotEqual(
+            base, make_cache_key("embedding", "gpt-4", messages, temperature=0.2),
+        )
+
+
+class TestResponseCache(unittest.TestCase):
+    """Tests for ResponseCache."""
+
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "cache" / "responses.sqlite"
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def test_round_trip_and_counters(self):
+        """Responses survive a reopen and hits count the bytes they saved."""
+        cache = ResponseCache(self.path)
+        self.assertIsNone(cache.get("k"))
+        cache.put("k", {"choices": [{"text": "hello"}]}, "completion", "gpt-4")
+        self.assertEqual(cache.get("k"), {"choices": [{"text": "hello"}]})
+        cache.close()
+
+        reopened = ResponseCache(self.path)
+        self.assertEqual(reopened.get("k"), {"choices": [{"text": "hello"}]})
+        self.assertEqual(reopened.get("k"), {"choices": [{"text": "hello"}]})
+
+        stats = reopened.stats.as_dict()
+        self.assertEqual(stats["disk_hits"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertGreater(stats["bytes_saved"], 0)
+        reopened.close()
+
+    def test_expired_entries_are_misses(self):
+        """Entries older than the TTL are dropped on lookup."""
+        cache = ResponseCache(self.path, ttl_seconds=0.05, memory_entries=0)
+        cache.put("k", {"v": 1})
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats.expired, 1)
+        self.assertEqual(cache.size_bytes, 0)
+        cache.close()
+
+    def test_evicts_least_recently_used_over_budget(self):
+        """Going over max_bytes evicts the entries used longest ago."""
+        value = {"text": "x" * 90}
+        cache = ResponseCache(self.path, max_bytes=500, memory_entries=0)
+        for i in range(4):
+            cache.put(f"k{i}", value)
+            time.sleep(0.01)
+        cache.get("k0")  # k0 is now the most recently used
+        cache.put("k4", value)
+        cache.put("k5", value)
+
+        self.assertLessEqual(cache.size_bytes, 500)
+        self.assertIsNotNone(cache.get("k0"))
+        self.assertIsNone(cache.get("k1"))
+        self.assertGreater(cache.stats.evictions, 0)
+        cache.close()
+
+    def test_memory_hits_count_for_eviction(self):
+        """Entries read from the memory tier are not evicted as least used."""
+        value = {"text": "x" * 90}
+        cache = ResponseCache(self.path, max_bytes=500)
+        for i in range(4):
+            cache.put(f"k{i}", value)
+            time.sleep(0.01)
+        cache.get("k0")  # served from memory, access time not yet written
+        cache.put("k4", value)
+        cache.put("k5", value)
+
+        self.assertEqual(cache.stats.memory_hits, 1)
+        self.assertIsNotNone(cache.get("k0"))
+        self.assertIsNone(cache.get("k1"))
+        cache.close()
+
+    def test_memory_hit_access_times_are_written(self):
+        """Memory hits update last_access once the touch interval has passed."""
+        query = "SELECT last_access FROM llm_responses"
+        cache = ResponseCache(self.path, touch_interval=0)
+        cache.put("k", {"v": 1})
+        (stored,) = cache._conn.execute(query).fetchone()
+        time.sleep(0.01)
+        cache.get("k")
+
+        (touched,) = cache._conn.execute(query).fetchone()
+        self.assertGreater(touched, stored)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,5 @@
+"""
+Utils test package.
+
+This package contains tests for the dewey.utils module.
+"""
@@ -0,0 +1,168 @@
+"""
+Tests for the PostgreSQL utility layer.
+
+This module tests the bounded connection pool and the bulk write helpers.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import psycopg2.extensions
+
+from src.dewey.utils.database import (
+    BoundedConnectionPool,
+    PoolTimeoutError,
+    copy_from_iter,
+    insert_many,
+    upsert_many,
+)
+
+
+def _fake_connection(*args, **kwargs):
+    conn = MagicMock()
+    conn.closed = 0
+    conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    return conn
+
+
+class TestBoundedConnectionPool(unittest.TestCase):
+    """Test blocking acquire, recycling and metrics."""
+
+    def setUp(self):
+        """Patch psycopg2.connect with fake connections."""
+        self.connect_patcher = patch(
+            "psycopg2.pool.psycopg2.connect", side_effect=_fake_connection,
+        )
+        self.mock_connect = self.connect_patcher.start()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.connect_patcher.stop()
+
+    def test_timeout_when_exhausted(self):
+        """Test that acquire gives up after the timeout instead of blocking forever."""
+        pool = BoundedConnectionPool(1, 1, dsn="", timeout=0.05)
+        pool.getconn()
+
+        with self.assertRaises(PoolTimeoutError):
+            pool.getconn()
+
+        stats = pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["in_use"], 1)
+
+    def test_waiter_gets_released_connection(self):
+        """Test that a blocked caller receives a connection once one is returned."""
+        pool = BoundedConnectionPool(1, 1, dsn="", timeout=2)
+        conn = pool.getconn()
+        threading.Timer(0.05, pool.putconn, args=[conn]).start()
+
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(pool.stats()["checkouts"], 2)
+        self.assertGreater(pool.stats()["p95_acquire_ms"], 0)
+
+    def test_expired_connection_is_recycled(self):
+        """Test that connections older than max_lifetime are replaced."""
+        pool = BoundedConnectionPool(1, 2, dsn="", max_lifetime=0.01)
+        first = pool.getconn()
+        pool.putconn(first)
+        time.sleep(0.02)
+
+        second = pool.getconn()
+
+        self.assertIsNot(first, second)
+        first.close.assert_called()
+
+    def test_broken_connection_is_replaced(self):
+        """Test that closed connections are never handed out."""
+        pool = BoundedConnectionPool(1, 2, dsn="")
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.closed = 1
+
+        self.assertIsNot(pool.getconn(), conn)
+        self.assertEqual(pool.stats()["recycled"], 1)
+
+
+class TestBulkHelpers(unittest.TestCase):
+    """Test paged multi-row inserts, upserts and COPY streaming."""
+
+    def setUp(self):
+        """Patch execute_values and the cursor factory."""
+        self.cursor = MagicMock()
+        self.cursor.rowcount = 2
+        self.cursor_patcher = patch("src.dewey.utils.database.get_db_cursor")
+        self.mock_get_cursor = self.cursor_patcher.start()
+        self.mock_get_cursor.return_value.__enter__.return_value = self.cursor
+        self.values_patcher = patch(
+            "src.dewey.utils.database.psycopg2.extras.execute_values",
+        )
+        self.mock_execute_values = self.values_patcher.start()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.cursor_patcher.stop()
+        self.values_patcher.stop()
+
+    def test_insert_many_pages_in_one_transaction(self):
+        """Test that rows are sent a page at a time under a single commit."""
+        rows = ({"id": i, "name": f"n{i}"} for i in range(5))
+
+        inserted = insert_many("items", rows, page_size=2)
+
+        self.mock_get_cursor.assert_called_once_with(commit=True)
+        self.assertEqual(self.mock_execute_values.call_count, 3)
+        query, page = self.mock_execute_values.call_args_list[0].args[1:3]
+        self.assertEqual(query, "INSERT INTO items (id, name) VALUES %s")
+        self.assertEqual(page, [(0, "n0"), (1, "n1")])
+        self.assertEqual(inserted, 6)
+
+    def test_insert_many_joins_caller_cursor(self):
+        """Test that a given cursor is used without opening a transaction."""
+        insert_many("items", [(1, "a")], columns=["id", "name"], cursor=self.cursor)
+
+        self.mock_get_cursor.assert_not_called()
+        self.assertIs(self.mock_execute_values.call_args.args[0], self.cursor)
+
+    def test_insert_many_empty(self):
+        """Test that no statement is issued for no rows."""
+        self.assertEqual(insert_many("items", []), 0)
+        self.mock_get_cursor.assert_not_called()
+
+    def test_upsert_many_updates_non_key_columns(self):
+        """Test the generated ON CONFLICT clause."""
+        upsert_many("items", [{"id": 1, "name": "a", "qty": 2}], ["id"])
+
+        query = self.mock_execute_values.call_args.args[1]
+        self.assertTrue(
+            query.endswith(
+                "ON CONFLICT (id) DO UPDATE SET "
+                "name = EXCLUDED.name, qty = EXCLUDED.qty",
+            ),
+        )
+
+    def test_copy_from_iter_streams_csv(self):
+        """Test that COPY reads CSV rendered from the rows."""
+        copied = {}
+
+        def copy_expert(query, stream):
+            copied["query"] = query
+            copied["data"] = stream.read()
+
+        self.cursor.copy_expert.side_effect = copy_expert
+        rows = [(1, None, {"a": 1}), (2, 'say "hi"', [1])]
+
+        count = copy_from_iter("items", rows, columns=["id", "name", "meta"])
+
+        self.assertEqual(count, 2)
+        self.assertTrue(copied["query"].startswith("COPY items (id, name, meta)"))
+        self.assertEqual(
+            copied["data"], '1,\\N,"{""a"": 1}"\n2,"say ""hi""",[1]\n',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
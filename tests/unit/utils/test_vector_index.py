@@ -0,0 +1,99 @@
+"""Tests for the embedded vector index."""
+
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.dewey.utils.vector_index import VectorIndex
+
+
+def clustered_vectors(n, dim=32, clusters=20, seed=0):
+    """Unit vectors scattered around random cluster centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    points = centres[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim))
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+
+class TestVectorIndex(unittest.TestCase):
+    """Tests for VectorIndex."""
+
+    def setUp(self):
+        """Create a temporary index directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+
+    def tearDown(self):
+        """Remove the index directory."""
+        self.tmp.cleanup()
+
+    def test_exact_search_persists_across_reopen(self):
+        """Results survive closing and reopening the memory-mapped files."""
+        vectors = clustered_vectors(3000)
+        ids = [f"email:{i}" for i in range(3000)]
+        index = VectorIndex(self.path)
+        index.add(ids, vectors, "email", [{"n": i} for i in range(3000)])
+        index.close()
+
+        reopened = VectorIndex(self.path)
+        results = reopened.search(vectors[42], k=3)
+
+        self.assertEqual(len(reopened), 3000)
+        self.assertEqual(results[0].doc_id, "email:42")
+        self.assertAlmostEqual(results[0].score, 1.0, places=5)
+        self.assertEqual(results[0].metadata, {"n": 42})
+        self.assertEqual(results[0].content_type, "email")
+        reopened.close()
+
+    def test_delete_replace_filter_and_compact(self):
+        """Deleted ids vanish, re-added ids replace, filters restrict types."""
+        vectors = clustered_vectors(200)
+        index = VectorIndex(self.path)
+        index.add([f"e{i}" for i in range(100)], vectors[:100], "email")
+        index.add([f"t{i}" for i in range(100)], vectors[100:], "transcript")
+
+        self.assertEqual(index.delete(["e5"]), 1)
+        self.assertNotIn("e5", [r.doc_id for r in index.search(vectors[5], k=5)])
+
+        index.add(["e6"], vectors[150:151], "email")
+        self.assertEqual(index.search(vectors[150], k=1)[0].doc_id, "t50")
+        only_email = index.search(vectors[150], k=1, content_type="email")
+        self.assertEqual(only_email[0].doc_id, "e6")
+        self.assertEqual(index.search(vectors[0], content_type="research"), [])
+
+        index.compact()
+        self.assertEqual(index.size, 199)
+        self.assertEqual(len(index), 199)
+        only_email = index.search(vectors[150], k=1, content_type="email")
+        self.assertEqual(only_email[0].doc_id, "e6")
+        self.assertEqual(index.search(vectors[170], k=1)[0].doc_id, "t70")
+        index.close()
+
+    def test_trained_index_recall(self):
+        """After training, probing a few lists still finds the true neighbours."""
+        vectors = clustered_vectors(20_000, dim=48, clusters=200)
+        index = VectorIndex(self.path, nprobe=16, train_threshold=10_000)
+        for start in range(0, 20_000, 5_000):
+            index.add(
+                [str(i) for i in range(start, start + 5_000)],
+                vectors[start : start + 5_000],
+            )
+        self.assertIsNotNone(index.centroids)
+
+        rng = np.random.default_rng(1)
+        queries = vectors[rng.choice(20_000, 100, replace=False)] + 0.05 * rng.normal(
+            size=(100, 48),
+        ).astype(np.float32)
+        hits = 0
+        for query in queries:
+            exact = np.argsort(-(vectors @ (query / np.linalg.norm(query))))[:10]
+            found = {int(r.doc_id) for r in index.search(query, k=10)}
+            hits += len(found & set(exact.tolist()))
+
+        self.assertGreaterEqual(hits / 1000, 0.9)
+        index.close()
+
+
+if __name__ == "__main__":
+    unittest.main()